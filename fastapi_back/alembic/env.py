@@ -32,6 +32,8 @@ from app.models.step_template import StepTemplate, StepTemplateItem
 from app.models.tag import Tag, ProjectTag, HistoricalProjectTag
 from app.models.historical_project import HistoricalProject
 from app.models.system_settings import SystemSettings
+from app.models.upload_session import UploadSession, UploadChunk
+from app.models.file_blob import FileBlob
 
 # Alembic Config object
 config = context.config
@@ -49,7 +51,8 @@ config.set_main_option("sqlalchemy.url", db_url)
 
 # Setup logging
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    # 保留应用已创建的 logger（迁移在应用启动时执行）
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # Target metadata for autogenerate support
 target_metadata = SQLModel.metadata
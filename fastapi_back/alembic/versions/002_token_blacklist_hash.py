@@ -0,0 +1,70 @@
+"""Store token blacklist entries by SHA-256 digest
+
+Replaces the raw ``token`` column of ``tokenblacklist`` with a fixed-size
+``token_hash`` column (unique index) and indexes ``expires_at`` for the
+expiry sweeper. Existing rows are backfilled with the digest of their token.
+
+Revision ID: 002_token_blacklist_hash
+Revises: 001_baseline
+Create Date: 2026-10-18
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_token_blacklist_hash'
+down_revision: Union[str, None] = '001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(table: str) -> set:
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    columns = _columns("tokenblacklist")
+    if "token" not in columns:
+        # Table missing (created later by create_all) or already migrated
+        return
+
+    bind = op.get_bind()
+    with op.batch_alter_table("tokenblacklist") as batch_op:
+        batch_op.add_column(sa.Column("token_hash", sa.String(length=64), nullable=True))
+
+    rows = bind.execute(sa.text("SELECT id, token FROM tokenblacklist")).fetchall()
+    for row_id, token in rows:
+        bind.execute(
+            sa.text("UPDATE tokenblacklist SET token_hash = :token_hash WHERE id = :id"),
+            {"token_hash": hashlib.sha256(token.encode("utf-8")).hexdigest(), "id": row_id},
+        )
+
+    with op.batch_alter_table("tokenblacklist") as batch_op:
+        batch_op.drop_index("ix_tokenblacklist_token")
+        batch_op.drop_column("token")
+        batch_op.alter_column("token_hash", existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index("ix_tokenblacklist_token_hash", ["token_hash"], unique=True)
+        batch_op.create_index("ix_tokenblacklist_expires_at", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered from their digests; the blacklist is
+    # short-lived (entries expire with their access token), so it is emptied.
+    if "token_hash" not in _columns("tokenblacklist"):
+        return
+
+    op.execute("DELETE FROM tokenblacklist")
+    with op.batch_alter_table("tokenblacklist") as batch_op:
+        batch_op.drop_index("ix_tokenblacklist_expires_at")
+        batch_op.drop_index("ix_tokenblacklist_token_hash")
+        batch_op.drop_column("token_hash")
+        batch_op.add_column(sa.Column("token", sa.String(), nullable=False))
+        batch_op.create_index("ix_tokenblacklist_token", ["token"], unique=True)
@@ -0,0 +1,95 @@
+"""Add composite indexes for hot repository filters
+
+Adds indexes matching the WHERE / ORDER BY clauses used by the repositories
+(foreign keys, per-project timelines, login lookups, tag associations) so
+list pages stop degrading to full table scans as the tables grow.
+
+Indexes are only created for tables/columns that exist and are skipped when
+already present (fresh databases get them from create_all).
+
+Revision ID: 003_hot_filter_indexes
+Revises: 002_token_blacklist_hash
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_hot_filter_indexes'
+down_revision: Union[str, None] = '002_token_blacklist_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, index name, columns)
+INDEXES = [
+    ("project", "ix_project_user_id_status", ["user_id", "status"]),
+    ("project", "ix_project_platform_id", ["platform_id"]),
+    ("projectstep", "ix_projectstep_project_id_order_index", ["project_id", "order_index"]),
+    ("attachment", "ix_attachment_project_id_folder_id", ["project_id", "folder_id"]),
+    ("attachment", "ix_attachment_historical_project_id_folder_id", ["historical_project_id", "folder_id"]),
+    ("attachment", "ix_attachment_folder_id", ["folder_id"]),
+    ("attachmentfolder", "ix_attachmentfolder_project_id_name", ["project_id", "name"]),
+    ("attachmentfolder", "ix_attachmentfolder_historical_project_id_name", ["historical_project_id", "name"]),
+    ("todo", "ix_todo_target_date", ["target_date"]),
+    ("todo", "ix_todo_created_at", ["created_at"]),
+    ("todo", "ix_todo_project_id", ["project_id"]),
+    ("todo", "ix_todo_historical_project_id", ["historical_project_id"]),
+    ("projectlog", "ix_projectlog_project_id_created_at", ["project_id", "created_at"]),
+    ("projectlog", "ix_projectlog_historical_project_id_created_at", ["historical_project_id", "created_at"]),
+    ("github_commit", "ix_github_commit_project_id_branch_commit_date", ["project_id", "branch", "commit_date"]),
+    ("videoplayback", "ix_videoplayback_project_id", ["project_id"]),
+    ("videoplaybacklink", "ix_videoplaybacklink_video_id", ["video_id"]),
+    ("videoplaybackstat", "ix_videoplaybackstat_video_id_watched_at", ["video_id", "watched_at"]),
+    ("videoplaybackstat", "ix_videoplaybackstat_link_id_watched_at", ["link_id", "watched_at"]),
+    ("tag", "ix_tag_user_id", ["user_id"]),
+    ("projecttag", "ix_projecttag_project_id_tag_id", ["project_id", "tag_id"]),
+    ("projecttag", "ix_projecttag_tag_id", ["tag_id"]),
+    ("historicalprojecttag", "ix_historicalprojecttag_historical_project_id_tag_id", ["historical_project_id", "tag_id"]),
+    ("historicalprojecttag", "ix_historicalprojecttag_tag_id", ["tag_id"]),
+    ("loginlog", "ix_loginlog_username_created_at", ["username", "created_at"]),
+    ("loginlog", "ix_loginlog_user_id_created_at", ["user_id", "created_at"]),
+    ("historicalproject", "ix_historicalproject_user_id_imported_at", ["user_id", "imported_at"]),
+    ("historicalproject", "ix_historicalproject_platform_id", ["platform_id"]),
+    ("refreshtoken", "ix_refreshtoken_user_id_created_at", ["user_id", "created_at"]),
+    ("steptemplateitem", "ix_steptemplateitem_template_id_order_index", ["template_id", "order_index"]),
+    ("projectpart", "ix_projectpart_project_id", ["project_id"]),
+    ("projectpart", "ix_projectpart_historical_project_id", ["historical_project_id"]),
+]
+
+
+def _existing(inspector, table: str):
+    """Return (column names, index names) of a table, or None if it does not exist"""
+    if table not in inspector.get_table_names():
+        return None
+    columns = {column["name"] for column in inspector.get_columns(table)}
+    indexes = {index["name"] for index in inspector.get_indexes(table)}
+    return columns, indexes
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        existing = _existing(inspector, table)
+        if existing is None:
+            continue
+        table_columns, table_indexes = existing
+        if name in table_indexes or not set(columns) <= table_columns:
+            continue
+        op.create_index(name, table, columns, unique=False)
+
+    # Refresh planner statistics so the new indexes are picked up immediately
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _ in reversed(INDEXES):
+        existing = _existing(inspector, table)
+        if existing is not None and name in existing[1]:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,72 @@
+"""Add resumable upload session tables
+
+Creates ``uploadsession`` (one row per chunked upload) and ``uploadchunk``
+(one row per received chunk, unique per session/index) used by the
+resumable upload API. Tables are skipped when already present (fresh
+databases get them from create_all).
+
+Revision ID: 004_upload_sessions
+Revises: 003_hot_filter_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_upload_sessions'
+down_revision: Union[str, None] = '003_hot_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if "uploadsession" not in tables:
+        op.create_table(
+            "uploadsession",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("upload_id", sa.String(length=32), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+            sa.Column("target", sa.String(), nullable=False),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("project.id"), nullable=True),
+            sa.Column("historical_project_id", sa.Integer(), sa.ForeignKey("historicalproject.id"), nullable=True),
+            sa.Column("folder_id", sa.Integer(), nullable=True),
+            sa.Column("file_name", sa.String(), nullable=False),
+            sa.Column("file_type", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("total_size", sa.Integer(), nullable=False),
+            sa.Column("chunk_size", sa.Integer(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("result_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_uploadsession_upload_id", "uploadsession", ["upload_id"], unique=True)
+        op.create_index("ix_uploadsession_user_id", "uploadsession", ["user_id"], unique=False)
+        op.create_index("ix_uploadsession_status_expires_at", "uploadsession", ["status", "expires_at"], unique=False)
+
+    if "uploadchunk" not in tables:
+        op.create_table(
+            "uploadchunk",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("upload_session_id", sa.Integer(), sa.ForeignKey("uploadsession.id"), nullable=False),
+            sa.Column("chunk_index", sa.Integer(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("sha256", sa.String(length=64), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("upload_session_id", "chunk_index", name="uq_uploadchunk_session_index"),
+        )
+
+
+def downgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "uploadchunk" in tables:
+        op.drop_table("uploadchunk")
+    if "uploadsession" in tables:
+        op.drop_table("uploadsession")
@@ -0,0 +1,62 @@
+"""Add content-addressed file blobs for attachments
+
+Creates ``fileblob`` (one row per distinct file content, keyed by SHA-256,
+with a reference count) and adds ``attachment.blob_sha256`` pointing at it.
+Existing attachments keep their file paths with a NULL ``blob_sha256``; run
+``python dedup_uploads.py`` to move them into the blob store.
+
+Revision ID: 005_file_blobs
+Revises: 004_upload_sessions
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_file_blobs'
+down_revision: Union[str, None] = '004_upload_sessions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "fileblob" not in tables:
+        op.create_table(
+            "fileblob",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sha256", sa.String(length=64), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("storage_path", sa.String(), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_fileblob_sha256", "fileblob", ["sha256"], unique=True)
+
+    if "attachment" in tables:
+        columns = {column["name"] for column in inspector.get_columns("attachment")}
+        if "blob_sha256" not in columns:
+            with op.batch_alter_table("attachment") as batch_op:
+                batch_op.add_column(sa.Column("blob_sha256", sa.String(length=64), nullable=True))
+                batch_op.create_index("ix_attachment_blob_sha256", ["blob_sha256"], unique=False)
+
+
+def downgrade() -> None:
+    # Files stay in uploads/blobs and attachment.file_path keeps pointing at them
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "attachment" in tables:
+        columns = {column["name"] for column in inspector.get_columns("attachment")}
+        if "blob_sha256" in columns:
+            with op.batch_alter_table("attachment") as batch_op:
+                batch_op.drop_index("ix_attachment_blob_sha256")
+                batch_op.drop_column("blob_sha256")
+    if "fileblob" in tables:
+        op.drop_table("fileblob")
@@ -0,0 +1,43 @@
+"""Add FTS5 full-text index for historical project search
+
+Creates the ``historicalproject_fts`` virtual table (SQLite only) indexing
+title, student name, requirements, notes and tag names. The rowid is the
+historical project id. Text is stored as n-gram tokens produced by the
+application, so the table is filled at startup (the index is rebuilt when
+its row count differs from ``historicalproject``) or with
+``python rebuild_search_index.py``.
+
+Revision ID: 006_historical_project_fts
+Revises: 005_file_blobs
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_historical_project_fts'
+down_revision: Union[str, None] = '005_file_blobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS historicalproject_fts USING fts5("
+        "title, student_name, requirements, notes, tag_names, "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    op.execute("DROP TABLE IF EXISTS historicalproject_fts")
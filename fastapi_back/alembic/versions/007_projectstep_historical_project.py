@@ -0,0 +1,48 @@
+"""Let project steps belong to a historical project
+
+Adds ``projectstep.historical_project_id`` so archiving a project can move
+its steps to the historical project along with attachments, todos and logs
+(todos reference step ids, so steps are moved rather than copied).
+
+Revision ID: 007_projectstep_historical_project
+Revises: 006_historical_project_fts
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_projectstep_historical_project'
+down_revision: Union[str, None] = '006_historical_project_fts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "projectstep" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("projectstep")}
+    if "historical_project_id" not in columns:
+        with op.batch_alter_table("projectstep") as batch_op:
+            batch_op.add_column(sa.Column("historical_project_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                "fk_projectstep_historical_project_id", "historicalproject", ["historical_project_id"], ["id"]
+            )
+            batch_op.create_index("ix_projectstep_historical_project_id", ["historical_project_id"], unique=False)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "projectstep" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("projectstep")}
+    if "historical_project_id" in columns:
+        with op.batch_alter_table("projectstep") as batch_op:
+            batch_op.drop_index("ix_projectstep_historical_project_id")
+            batch_op.drop_constraint("fk_projectstep_historical_project_id", type_="foreignkey")
+            batch_op.drop_column("historical_project_id")
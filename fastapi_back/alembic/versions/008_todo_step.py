@@ -0,0 +1,82 @@
+"""Add todo_step association table
+
+Creates ``todo_step`` (todo_id, step_id, position) and backfills it from the
+JSON ``todo.step_ids`` column, so the todos of a day can be loaded together
+with their steps in one joined query. Step ids that no longer exist are
+skipped.
+
+Revision ID: 008_todo_step
+Revises: 007_projectstep_historical_project
+Create Date: 2026-10-18
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_todo_step'
+down_revision: Union[str, None] = '007_projectstep_historical_project'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 1000
+
+
+def _parse_step_ids(value):
+    try:
+        step_ids = json.loads(value) if value else []
+    except ValueError:
+        return []
+    if not isinstance(step_ids, list):
+        return []
+    return [step_id for step_id in step_ids if isinstance(step_id, int) and not isinstance(step_id, bool)]
+
+
+def _backfill(bind) -> None:
+    todo = sa.table("todo", sa.column("id"), sa.column("step_ids"))
+    step = sa.table("projectstep", sa.column("id"))
+    todo_step = sa.table("todo_step", sa.column("todo_id"), sa.column("step_id"), sa.column("position"))
+
+    existing_step_ids = set(bind.execute(sa.select(step.c.id)).scalars())
+    rows = []
+    for todo_id, step_ids in bind.execute(sa.select(todo.c.id, todo.c.step_ids).order_by(todo.c.id)):
+        seen = set()
+        for step_id in _parse_step_ids(step_ids):
+            if step_id in existing_step_ids and step_id not in seen:
+                seen.add(step_id)
+                rows.append({"todo_id": todo_id, "step_id": step_id, "position": len(seen) - 1})
+        if len(rows) >= _BATCH_SIZE:
+            bind.execute(todo_step.insert(), rows)
+            rows = []
+    if rows:
+        bind.execute(todo_step.insert(), rows)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+    if "todo" not in tables or "todo_step" in tables:
+        return
+    op.create_table(
+        "todo_step",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("todo_id", sa.Integer(), sa.ForeignKey("todo.id"), nullable=False),
+        sa.Column("step_id", sa.Integer(), sa.ForeignKey("projectstep.id"), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_todo_step_todo_id_position", "todo_step", ["todo_id", "position"], unique=False)
+    op.create_index("ix_todo_step_step_id", "todo_step", ["step_id"], unique=False)
+    _backfill(bind)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "todo_step" in inspector.get_table_names():
+        op.drop_index("ix_todo_step_step_id", table_name="todo_step")
+        op.drop_index("ix_todo_step_todo_id_position", table_name="todo_step")
+        op.drop_table("todo_step")
@@ -0,0 +1,46 @@
+"""Track when a file blob was last referenced
+
+Adds ``fileblob.last_ref_at``, set whenever a reference is added, so the
+storage GC can skip blobs that were referenced recently (their attachment
+row may not be written yet) when reconciling reference counts. Existing
+rows are backfilled from ``created_at``.
+
+Revision ID: 009_fileblob_last_ref_at
+Revises: 008_todo_step
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_fileblob_last_ref_at'
+down_revision: Union[str, None] = '008_todo_step'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "fileblob" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("fileblob")}
+    if "last_ref_at" not in columns:
+        with op.batch_alter_table("fileblob") as batch_op:
+            batch_op.add_column(sa.Column("last_ref_at", sa.DateTime(), nullable=True))
+        fileblob = sa.table("fileblob", sa.column("created_at"), sa.column("last_ref_at"))
+        bind.execute(fileblob.update().values(last_ref_at=fileblob.c.created_at))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "fileblob" not in inspector.get_table_names():
+        return
+    columns = {column["name"] for column in inspector.get_columns("fileblob")}
+    if "last_ref_at" in columns:
+        with op.batch_alter_table("fileblob") as batch_op:
+            batch_op.drop_column("last_ref_at")
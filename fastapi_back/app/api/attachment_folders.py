@@ -1,26 +1,70 @@
 """
 附件文件夹管理API路由层
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
 from app.repositories.attachment_folder_repository import AttachmentFolderRepository
+from app.repositories.attachment_repository import AttachmentRepository
 from app.repositories.project_repository import ProjectRepository
 from app.repositories.historical_project_repository import HistoricalProjectRepository
 from app.repositories.system_settings_repository import SystemSettingsRepository
 from app.models.user import User
-from app.models.attachment_folder import AttachmentFolderRead, AttachmentFolderCreate, AttachmentFolderUpdate
-from app.models.attachment import Attachment
+from app.models.attachment_folder import AttachmentFolder, AttachmentFolderRead, AttachmentFolderCreate, AttachmentFolderUpdate
+from app.models.attachment import Attachment, AttachmentRead
 
 router = APIRouter()
 
+# 未归入文件夹的附件显示在该文件夹中
+OTHER_FOLDER_NAME = "其他"
+
+
+def _build_folder_list(
+    session: Session,
+    folders: List[AttachmentFolder],
+    recent: int,
+    project_id: Optional[int] = None,
+    historical_project_id: Optional[int] = None
+) -> List[AttachmentFolderRead]:
+    """
+    组装文件夹列表：附件数量一次 GROUP BY 查询；recent > 0 时每个文件夹的最近附件一次窗口函数查询
+
+    "其他"文件夹的数量和最近附件包含未归入任何文件夹（folder_id 为空）的附件。
+    """
+    attachment_repo = AttachmentRepository(session)
+    counts = attachment_repo.count_by_folder(project_id=project_id, historical_project_id=historical_project_id)
+    other_folder = next((folder for folder in folders if folder.name == OTHER_FOLDER_NAME), None)
+
+    recent_by_folder = {}
+    if recent > 0:
+        recent_by_folder = attachment_repo.list_recent_by_folder(
+            recent,
+            project_id=project_id,
+            historical_project_id=historical_project_id,
+            null_folder_id=other_folder.id if other_folder else None
+        )
+
+    result = []
+    for folder in folders:
+        folder_read = AttachmentFolderRead.model_validate(folder)
+        folder_read.attachment_count = counts.get(folder.id, 0)
+        if folder is other_folder:
+            folder_read.attachment_count += counts.get(None, 0)
+        if recent > 0:
+            folder_read.recent_attachments = [
+                AttachmentRead.model_validate(att) for att in recent_by_folder.get(folder.id, [])
+            ]
+        result.append(folder_read)
+    return result
+
 
 @router.get("/project/{project_id}", response_model=List[AttachmentFolderRead])
 async def list_folders(
     project_id: int,
+    recent: int = Query(0, ge=0, le=50, description="每个文件夹附带的最近附件数，0 表示不返回"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -42,29 +86,7 @@ async def list_folders(
     
     folder_repo = AttachmentFolderRepository(session)
     folders = folder_repo.list_by_project(project_id)
-    
-    # 计算每个文件夹的附件数量
-    from app.models.attachment import Attachment
-    from sqlalchemy import or_
-    result = []
-    for folder in folders:
-        # 如果是"其他"文件夹，统计所有 folder_id 为 NULL 的文件
-        if folder.name == "其他":
-            count = session.exec(
-                select(func.count(Attachment.id)).where(
-                    Attachment.project_id == project_id,
-                    or_(Attachment.folder_id.is_(None), Attachment.folder_id == folder.id)
-                )
-            ).one()
-        else:
-            count = session.exec(
-                select(func.count(Attachment.id)).where(Attachment.folder_id == folder.id)
-            ).one()
-        folder_dict = AttachmentFolderRead.model_validate(folder)
-        folder_dict.attachment_count = count
-        result.append(folder_dict)
-    
-    return result
+    return _build_folder_list(session, folders, recent, project_id=project_id)
 
 
 @router.post("/project/{project_id}", response_model=AttachmentFolderRead)
@@ -172,6 +194,7 @@ async def delete_folder(
 @router.get("/historical-project/{historical_project_id}", response_model=List[AttachmentFolderRead])
 async def list_historical_project_folders(
     historical_project_id: int,
+    recent: int = Query(0, ge=0, le=50, description="每个文件夹附带的最近附件数，0 表示不返回"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -198,27 +221,7 @@ async def list_historical_project_folders(
     
     folder_repo = AttachmentFolderRepository(session)
     folders = folder_repo.list_by_historical_project(historical_project_id)
-    
-    # 计算每个文件夹的附件数量
-    result = []
-    for folder in folders:
-        # 如果是"其他"文件夹，统计所有 folder_id 为 NULL 的文件
-        if folder.name == "其他":
-            count = session.exec(
-                select(func.count(Attachment.id)).where(
-                    Attachment.historical_project_id == historical_project_id,
-                    or_(Attachment.folder_id.is_(None), Attachment.folder_id == folder.id)
-                )
-            ).one()
-        else:
-            count = session.exec(
-                select(func.count(Attachment.id)).where(Attachment.folder_id == folder.id)
-            ).one()
-        folder_dict = AttachmentFolderRead.model_validate(folder)
-        folder_dict.attachment_count = count
-        result.append(folder_dict)
-    
-    return result
+    return _build_folder_list(session, folders, recent, historical_project_id=historical_project_id)
 
 
 @router.post("/historical-project/{historical_project_id}", response_model=AttachmentFolderRead)
@@ -2,15 +2,22 @@
 附件管理API路由层（重构后）
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlmodel import Session
 from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
 from app.services.attachment_service import AttachmentService
+from app.services.derivative_cache import THUMBNAIL_FORMATS, THUMBNAIL_SIZES, derivative_cache
 from app.models.user import User
 from app.models.attachment import AttachmentRead, AttachmentUpdate
+from app.utils.media_response import MediaFileResponse
+from app.utils.upload_pipeline import save_upload
+from app.utils.http_range import RangeNotSatisfiable, parse_range_header, if_range_matches
+from app.utils.zip_stream import ZipEntry, ZipStream
 import os
-import uuid
+from urllib.parse import quote
 
 router = APIRouter()
 
@@ -50,59 +57,20 @@ async def upload_attachment(
     current_user: User = Depends(get_current_active_user)
 ):
     """上传附件（支持大文件，最大1GB）"""
-    # 文件大小限制：1GB
-    MAX_FILE_SIZE = 1 * 1024 * 1024 * 1024  # 1GB
-    
-    # 生成唯一文件名
-    file_extension = get_file_extension(file.filename)
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # 流式保存文件（支持大文件）
-    try:
-        file_size = 0
-        with open(file_path, "wb") as buffer:
-            # 分块读取，避免一次性加载到内存
-            while True:
-                chunk = await file.read(8192)  # 8KB chunks
-                if not chunk:
-                    break
-                file_size += len(chunk)
-                # 检查文件大小
-                if file_size > MAX_FILE_SIZE:
-                    # 删除已写入的部分文件
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"文件大小超过限制（最大1GB），当前文件大小：{file_size / (1024*1024):.2f}MB"
-                    )
-                buffer.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        # 如果出错，删除可能已创建的文件
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}"
-        )
+    saved = await save_upload(file, UPLOAD_DIR)
     
     # 创建附件记录
     attachment_service = AttachmentService(session)
     attachment = attachment_service.create_attachment(
         project_id=project_id,
-        file_path=file_path,
+        file_path=saved.path,
         file_name=file.filename,
         file_type=file_type,
         description=description,
         folder_id=folder_id,
         current_user_id=current_user.id,
-        is_admin=(current_user.role == "admin")
+        is_admin=(current_user.role == "admin"),
+        sha256=saved.sha256
     )
     
     # 如果附件属于"项目需求"文件夹，且项目刚创建（1分钟内），更新项目创建日志
@@ -202,26 +170,9 @@ async def delete_attachment(
     current_user: User = Depends(get_current_active_user)
 ):
     """删除附件"""
-    from fastapi.responses import FileResponse
-    
     attachment_service = AttachmentService(session)
-    
-    # 先获取附件信息（用于删除文件）
-    attachment = attachment_service.get_attachment_by_id(
-        attachment_id=attachment_id,
-        current_user_id=current_user.id,
-        is_admin=(current_user.role == "admin")
-        )
-    
-    # 删除文件
-    if os.path.exists(attachment.file_path):
-        try:
-            os.remove(attachment.file_path)
-        except Exception as e:
-            # 记录错误但不阻止删除数据库记录
-            print(f"Warning: Failed to delete file {attachment.file_path}: {e}")
-    
-    # 删除数据库记录
+
+    # 删除数据库记录并释放文件（共享内容的文件在最后一个引用删除时才删除）
     attachment_service.delete_attachment(
         attachment_id=attachment_id,
         current_user_id=current_user.id,
@@ -239,74 +190,15 @@ async def copy_attachment(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    """复制附件到指定项目/文件夹"""
-    import shutil
+    """复制附件到指定项目/文件夹（共享文件内容，不复制字节）"""
     attachment_service = AttachmentService(session)
-    
-    # 获取原附件
-    attachment = attachment_service.attachment_repo.get_by_id(attachment_id)
-    if not attachment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Attachment not found"
-        )
-    
-    # 权限检查
-    project = attachment_service.project_repo.get_by_id(attachment.project_id)
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Project not found"
-        )
-    
-    if current_user.role != "admin" and project.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    
-    # 确定目标项目
-    target_project = attachment.project_id
-    if target_project_id:
-        target_project_obj = attachment_service.project_repo.get_by_id(target_project_id)
-        if not target_project_obj:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Target project not found"
-            )
-        if current_user.role != "admin" and target_project_obj.user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions for target project"
-            )
-        target_project = target_project_id
-    
-    # 复制文件
-    file_extension = get_file_extension(attachment.file_name)
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    new_file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    try:
-        shutil.copy2(attachment.file_path, new_file_path)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to copy file: {str(e)}"
-        )
-    
-    # 创建新附件记录
-    new_attachment = attachment_service.create_attachment(
-        project_id=target_project,
-        file_path=new_file_path,
-        file_name=attachment.file_name,
-        file_type=attachment.file_type,
-        description=attachment.description,
-        folder_id=target_folder_id,
+    return attachment_service.copy_attachment(
+        attachment_id=attachment_id,
+        target_project_id=target_project_id,
+        target_folder_id=target_folder_id,
         current_user_id=current_user.id,
         is_admin=(current_user.role == "admin")
     )
-    
-    return new_attachment
 
 
 @router.post("/batch", response_model=List[AttachmentRead])
@@ -315,21 +207,13 @@ async def get_attachments_batch(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    """批量获取附件信息"""
+    """批量获取附件信息（不存在或无权访问的附件跳过，保持请求顺序）"""
     attachment_service = AttachmentService(session)
-    attachments = []
-    for attachment_id in attachment_ids:
-        try:
-            attachment = attachment_service.get_attachment_by_id(
-                attachment_id=attachment_id,
-                current_user_id=current_user.id,
-                is_admin=(current_user.role == "admin")
-            )
-            attachments.append(attachment)
-        except HTTPException:
-            # 如果附件不存在或无权访问，跳过
-            continue
-    return attachments
+    return attachment_service.get_attachments_batch(
+        attachment_ids=attachment_ids,
+        current_user_id=current_user.id,
+        is_admin=(current_user.role == "admin")
+    )
 
 
 def get_media_type(filename: str) -> str:
@@ -452,9 +336,6 @@ async def download_attachment(
     current_user: User = Depends(get_current_active_user)
 ):
     """下载附件"""
-    from fastapi.responses import StreamingResponse
-    from urllib.parse import quote
-
     attachment_service = AttachmentService(session)
     attachment = attachment_service.get_attachment_by_id(
         attachment_id=attachment_id,
@@ -468,26 +349,11 @@ async def download_attachment(
             detail="File not found"
         )
 
-    # 根据文件扩展名确定MIME类型
-    media_type = get_media_type(attachment.file_name)
-
-    # 处理中文文件名编码
-    encoded_filename = quote(attachment.file_name, safe='')
-
-    def file_generator():
-        with open(attachment.file_path, 'rb') as f:
-            while True:
-                chunk = f.read(8192)
-                if not chunk:
-                    break
-                yield chunk
-
-    return StreamingResponse(
-        file_generator(),
-        media_type=media_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{encoded_filename}"; filename*=UTF-8\'\'{encoded_filename}'
-        }
+    # 根据文件扩展名确定MIME类型；支持断点续传和条件请求
+    return MediaFileResponse(
+        attachment.file_path,
+        media_type=get_media_type(attachment.file_name),
+        filename=attachment.file_name
     )
 
 
@@ -498,8 +364,6 @@ async def preview_attachment(
     current_user: User = Depends(get_current_active_user)
 ):
     """预览附件（返回文件内容用于在线预览）"""
-    from fastapi.responses import Response, StreamingResponse
-    import mimetypes
     from app.core.exceptions import NotFoundException
 
     try:
@@ -521,6 +385,75 @@ async def preview_attachment(
             detail="Attachment not found"
         )
 
+    file_path = _resolve_attachment_file(attachment)
+
+    # 根据文件扩展名确定MIME类型
+    media_type = get_media_type(attachment.file_name)
+
+    # 对于文本文件，返回缓存的文本预览（统一转为 UTF-8，过大时截断）
+    if media_type.startswith('text/') or media_type in ['application/json', 'application/xml']:
+        try:
+            preview = await run_in_threadpool(derivative_cache.text_preview, file_path)
+        except OSError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to read file: {str(e)}"
+            )
+        # 无法按文本解码时按二进制文件返回
+        if preview is not None:
+            return MediaFileResponse(
+                preview.path,
+                media_type=f"{media_type}; charset=utf-8",
+                headers={"X-Preview-Truncated": "true" if preview.truncated else "false"}
+            )
+
+    # 对于其他文件（视频、音频、图片等），支持 Range 请求以便拖动进度条
+    return MediaFileResponse(
+        file_path,
+        media_type=media_type,
+        filename=attachment.file_name,
+        content_disposition_type="inline"
+    )
+
+
+@router.get("/{attachment_id}/thumbnail")
+async def get_attachment_thumbnail(
+    attachment_id: int,
+    size: int = Query(256, ge=1, le=THUMBNAIL_SIZES[-1], description="最长边像素，按 128/256/512/1024 取整"),
+    fmt: str = Query("webp", alias="format", description="输出格式: webp / jpeg"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取图片附件的缩略图（首次请求时生成并缓存）；无法生成时返回原文件"""
+    if fmt not in THUMBNAIL_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的格式，支持的格式：{', '.join(THUMBNAIL_FORMATS)}"
+        )
+
+    attachment_service = AttachmentService(session)
+    attachment = attachment_service.get_attachment_by_id(
+        attachment_id=attachment_id,
+        current_user_id=current_user.id,
+        is_admin=(current_user.role == "admin")
+    )
+    file_path = _resolve_attachment_file(attachment)
+
+    thumbnail = await run_in_threadpool(
+        derivative_cache.thumbnail, file_path, size, fmt, attachment.file_name
+    )
+    if thumbnail is None:
+        return MediaFileResponse(
+            file_path,
+            media_type=get_media_type(attachment.file_name),
+            filename=attachment.file_name,
+            content_disposition_type="inline"
+        )
+    return MediaFileResponse(thumbnail.path, media_type=thumbnail.media_type)
+
+
+def _resolve_attachment_file(attachment: AttachmentRead) -> str:
+    """定位附件文件（兼容只保存了文件名的旧记录），不存在时抛出 404"""
     # 处理文件路径（可能是相对路径，需要转换为绝对路径）
     file_path = attachment.file_path
     if not os.path.isabs(file_path):
@@ -537,60 +470,98 @@ async def preview_attachment(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File not found: {attachment.file_path}"
             )
+    return file_path
 
-    # 根据文件扩展名确定MIME类型
-    media_type = get_media_type(attachment.file_name)
 
-    # 对于文本文件，直接读取并返回
-    if media_type.startswith('text/') or media_type in ['application/json', 'application/xml']:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return Response(content=content, media_type=media_type)
-        except UnicodeDecodeError:
-            # 如果UTF-8解码失败，尝试其他编码
-            try:
-                with open(file_path, 'r', encoding='gbk') as f:
-                    content = f.read()
-                return Response(content=content, media_type=media_type)
-            except Exception as e:
-                # 如果还是失败，返回二进制流
-                print(f"Warning: Failed to read text file as text: {e}")
-                pass
-        except Exception as e:
-            print(f"Error reading text file: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to read file: {str(e)}"
-            )
+async def _archive_response(request: Request, archive_name: str, entries: List[ZipEntry]) -> Response:
+    """
+    构建 ZIP 打包下载响应
+
+    归档按需流式生成；支持单区间 Range 请求（断点续传），多区间请求按完整响应处理。
+    """
+    stream = ZipStream(entries)
+    encoded_filename = quote(archive_name, safe='')
+    headers = {
+        "Content-Disposition": f'attachment; filename="{encoded_filename}"; filename*=UTF-8\'\'{encoded_filename}',
+        "Accept-Ranges": "bytes",
+        "ETag": stream.etag,
+    }
 
-    # 对于其他文件，返回文件流
-    def file_generator():
+    range_header = request.headers.get("range")
+    if range_header and if_range_matches(request.headers.get("if-range"), stream.etag):
+        # 续传需要知道总大小，未缓存的条目需要先读取一遍计算 CRC 和压缩后大小
+        total_size = await run_in_threadpool(stream.prepare)
         try:
-            with open(file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)
-                    if not chunk:
-                        break
-                    yield chunk
-        except Exception as e:
-            print(f"Error reading file stream: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to read file stream: {str(e)}"
+            ranges = parse_range_header(range_header, total_size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{total_size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if ranges and len(ranges) == 1:
+            start, end = ranges[0]
+            headers["Content-Range"] = f"bytes {start}-{end}/{total_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                stream.iter_bytes(start, end + 1),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="application/zip",
+                headers=headers
             )
 
-    # 处理文件名编码，避免中文字符导致的编码错误
-    from urllib.parse import quote
-    encoded_filename = quote(attachment.file_name, safe='')
+    total_size = stream.total_size
+    if total_size is not None:
+        headers["Content-Length"] = str(total_size)
+    return StreamingResponse(stream.iter_bytes(), media_type="application/zip", headers=headers)
 
-    return StreamingResponse(
-        file_generator(),
-        media_type=media_type,
-        headers={
-            "Content-Disposition": f'inline; filename="{encoded_filename}"; filename*=UTF-8\'\'{encoded_filename}'
-        }
+
+@router.get("/project/{project_id}/archive")
+async def download_project_archive(
+    project_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """打包下载项目的全部附件（ZIP，按文件夹分目录）"""
+    attachment_service = AttachmentService(session)
+    archive_name, entries = attachment_service.collect_archive_entries(
+        project_id=project_id,
+        current_user_id=current_user.id,
+        is_admin=(current_user.role == "admin")
+    )
+    return await _archive_response(request, archive_name, entries)
+
+
+@router.get("/historical-project/{historical_project_id}/archive")
+async def download_historical_project_archive(
+    historical_project_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """打包下载历史项目的全部附件（ZIP，按文件夹分目录）"""
+    attachment_service = AttachmentService(session)
+    archive_name, entries = attachment_service.collect_archive_entries(
+        historical_project_id=historical_project_id,
+        current_user_id=current_user.id,
+        is_admin=(current_user.role == "admin")
     )
+    return await _archive_response(request, archive_name, entries)
+
+
+@router.get("/folder/{folder_id}/archive")
+async def download_folder_archive(
+    folder_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """打包下载单个文件夹中的附件（ZIP）"""
+    attachment_service = AttachmentService(session)
+    archive_name, entries = attachment_service.collect_archive_entries(
+        folder_id=folder_id,
+        current_user_id=current_user.id,
+        is_admin=(current_user.role == "admin")
+    )
+    return await _archive_response(request, archive_name, entries)
 
 
 # 历史项目附件相关端点
@@ -620,59 +591,20 @@ async def upload_historical_project_attachment(
     current_user: User = Depends(get_current_active_user)
 ):
     """为历史项目上传附件（支持大文件，最大1GB）"""
-    # 文件大小限制：1GB
-    MAX_FILE_SIZE = 1 * 1024 * 1024 * 1024  # 1GB
-    
-    # 生成唯一文件名
-    file_extension = get_file_extension(file.filename)
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
-    
-    # 流式保存文件（支持大文件）
-    try:
-        file_size = 0
-        with open(file_path, "wb") as buffer:
-            # 分块读取，避免一次性加载到内存
-            while True:
-                chunk = await file.read(8192)  # 8KB chunks
-                if not chunk:
-                    break
-                file_size += len(chunk)
-                # 检查文件大小
-                if file_size > MAX_FILE_SIZE:
-                    # 删除已写入的部分文件
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"文件大小超过限制（最大1GB），当前文件大小：{file_size / (1024*1024):.2f}MB"
-                    )
-                buffer.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        # 如果出错，删除可能已创建的文件
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}"
-        )
+    saved = await save_upload(file, UPLOAD_DIR)
     
     # 创建附件记录
     attachment_service = AttachmentService(session)
     attachment = attachment_service.create_attachment_for_historical_project(
         historical_project_id=historical_project_id,
-        file_path=file_path,
+        file_path=saved.path,
         file_name=file.filename,
         file_type=file_type,
         description=description,
         folder_id=folder_id,
         current_user_id=current_user.id,
-        is_admin=(current_user.role == "admin")
+        is_admin=(current_user.role == "admin"),
+        sha256=saved.sha256
     )
     
     return attachment
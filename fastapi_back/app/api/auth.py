@@ -4,17 +4,19 @@
 """
 from typing import Optional
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
+from app.api.responses import set_cursor_headers
 from app.core.database import get_session
 from app.core.security import (
     verify_password, get_password_hash, create_access_token,
     validate_password_strength, create_refresh_token, is_password_expired,
-    should_lock_account, get_lockout_until
+    should_lock_account, get_lockout_until, decode_access_token
 )
 from app.core.config import settings
-from app.core.dependencies import get_current_user, get_current_admin_user
+from app.core.dependencies import get_current_user, get_current_admin_user, extract_token_from_request
+from app.core.token_cache import token_cache
 from app.models.user import User, UserCreate, UserRead, UserUpdate, Token
 from app.models.refresh_token import RefreshToken, RefreshTokenCreate
 from app.models.login_log import LoginStatus, LoginLogCreate
@@ -23,6 +25,7 @@ from app.repositories.refresh_token_repository import RefreshTokenRepository
 from app.repositories.token_blacklist_repository import TokenBlacklistRepository
 from app.repositories.login_log_repository import LoginLogRepository
 from app.repositories.user_repository import UserRepository
+from app.services.token_blacklist_service import TokenBlacklistService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -128,6 +131,7 @@ async def login(
             user.locked_until = get_lockout_until()
             log_status = LoginStatus.LOCKED
             failure_reason = f"账户因多次登录失败被锁定"
+            token_cache.invalidate_user(user.id)
         else:
             log_status = LoginStatus.FAILED
             failure_reason = "密码错误"
@@ -256,6 +260,7 @@ async def refresh_token(
 
 @router.post("/logout")
 async def logout(
+    request: Request,
     refresh_token: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
@@ -265,15 +270,24 @@ async def logout(
     撤销刷新令牌并将访问令牌加入黑名单
     """
     refresh_token_repo = RefreshTokenRepository(session)
-    blacklist_repo = TokenBlacklistRepository(session)
     
     # 撤销刷新令牌
     if refresh_token:
         refresh_token_repo.revoke_token(refresh_token)
-    
-    # 注意：访问令牌无法直接撤销（JWT是无状态的），但可以加入黑名单
-    # 实际应用中，需要在验证token时检查黑名单
-    
+
+    # 访问令牌无法直接撤销（JWT是无状态的），将其摘要加入黑名单直至自然过期，
+    # 并清除其验证缓存
+    access_token = await extract_token_from_request(request)
+    if access_token:
+        payload = decode_access_token(access_token)
+        if payload and payload.get("exp"):
+            TokenBlacklistService(session).revoke(
+                access_token,
+                expires_at=datetime.utcfromtimestamp(payload["exp"]),
+                reason="logout"
+            )
+        token_cache.invalidate_token(access_token)
+
     return {"message": "Successfully logged out"}
 
 
@@ -287,6 +301,7 @@ async def logout_all(
     """
     refresh_token_repo = RefreshTokenRepository(session)
     count = refresh_token_repo.revoke_all_user_tokens(current_user.id)
+    token_cache.invalidate_user(current_user.id)
     
     return {"message": f"Successfully logged out from {count} devices"}
 
@@ -338,7 +353,9 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
 @router.get("/login-logs")
 async def get_login_logs(
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值"),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
@@ -346,6 +363,10 @@ async def get_login_logs(
     获取当前用户的登录日志（企业级审计）
     """
     login_log_repo = LoginLogRepository(session)
+    if cursor is not None:
+        page = login_log_repo.list_by_user_page(user_id=current_user.id, cursor=cursor, limit=limit)
+        set_cursor_headers(response, page.next_cursor)
+        return page.items
     logs = login_log_repo.list_by_user(user_id=current_user.id, limit=limit)
     return logs
 
@@ -3,10 +3,12 @@ GitHub Commits API路由
 """
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
 from sqlmodel import Session
 from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
+from app.core.exceptions import BusinessException
+from app.api.responses import set_cursor_headers
 from app.services.github_service import GitHubService
 from app.models.user import User
 from app.models.github_commit import GitHubCommitRead
@@ -18,8 +20,10 @@ router = APIRouter(prefix="/github-commits", tags=["GitHub Commits"])
 @router.get("/projects/{project_id}/commits", response_model=List[GitHubCommitRead])
 async def get_project_commits(
     project_id: int,
+    response: Response,
     branch: str = Query("main", description="分支名称"),
     limit: Optional[int] = Query(None, ge=1, le=1000, description="限制返回数量"),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值"),
     force_sync: bool = Query(False, description="强制同步（忽略1分钟限制）"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
@@ -30,10 +34,18 @@ async def get_project_commits(
     - 如果force_sync=True，会强制从GitHub同步
     - 如果force_sync=False，会检查是否需要同步（1分钟限制）
     - 返回缓存的commits或同步后的commits
+    - 传入 cursor 时从数据库按提交时间倒序分页返回，只有首页（空游标）会触发同步检查
     """
     try:
         github_service = GitHubService(session)
         
+        if cursor is not None:
+            if not cursor and (force_sync or github_service.should_sync(project_id, branch)):
+                github_service.sync_commits(project_id, branch, force=force_sync)
+            page = github_service.get_commits_page(project_id, branch, cursor, limit or 100)
+            set_cursor_headers(response, page.next_cursor)
+            return page.items
+        
         if force_sync:
             # 强制同步
             commits = github_service.sync_commits(project_id, branch, force=True)
@@ -47,7 +59,7 @@ async def get_project_commits(
                 commits = github_service.get_commits(project_id, branch, limit)
         
         return commits
-    except HTTPException:
+    except (HTTPException, BusinessException):
         raise
     except Exception as e:
         logger.error(f"获取项目 {project_id} 的commits失败: {e}", exc_info=True)
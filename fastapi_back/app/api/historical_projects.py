@@ -2,13 +2,18 @@
 历史项目管理API路由层
 """
 import logging
+import os
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File, Form
+import anyio
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, UploadFile, File, Form
 from fastapi import status as http_status
 from sqlmodel import Session
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.dependencies import get_current_active_user
+from app.core.exceptions import BusinessException, ValidationException
+from app.api.responses import set_cursor_headers
 from app.services.historical_project_service import HistoricalProjectService
+from app.services.historical_import_service import HistoricalImportService
 from app.models.user import User
 from app.models.historical_project import (
     HistoricalProjectCreate, HistoricalProjectReadWithRelations, HistoricalProjectUpdate,
@@ -18,28 +23,38 @@ from app.models.historical_project import (
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["历史项目管理"])
 
+# 导入文件扩展名 -> 格式
+IMPORT_FILE_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
 
 @router.get("/", response_model=List[HistoricalProjectReadWithRelations])
 async def list_historical_projects(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值（忽略 skip）"),
+    with_total: bool = Query(False, description="是否在响应头 X-Total-Count 中返回总数（缓存值）"),
     search: Optional[str] = Query(None, description="搜索关键词（标题、学生姓名、需求描述）"),
     platform_id: Optional[int] = Query(None, description="平台ID（筛选）"),
     status: Optional[str] = Query(None, description="项目状态（筛选）"),
     tag_ids: Optional[str] = Query(None, description="标签ID列表，用逗号分隔"),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取历史项目列表"""
-    logger.info(f"[历史项目API] list_historical_projects - 开始处理请求")
-    logger.info(f"[历史项目API] 当前用户: id={current_user.id}, username={current_user.username}, role={current_user.role}")
-    logger.info(f"[历史项目API] 请求参数: skip={skip}, limit={limit}, search={search}, platform_id={platform_id}, status={status}, tag_ids={tag_ids}")
+    """
+    获取历史项目列表
+
+    传入 cursor 时使用游标分页，下一页游标在响应头 X-Next-Cursor 中（最后一页没有该响应头）。
+    """
+    logger.debug(f"[历史项目API] list_historical_projects - 开始处理请求")
+    logger.debug(f"[历史项目API] 当前用户: id={current_user.id}, username={current_user.username}, role={current_user.role}")
+    logger.debug(f"[历史项目API] 请求参数: skip={skip}, limit={limit}, search={search}, platform_id={platform_id}, status={status}, tag_ids={tag_ids}")
     
     historical_project_service = HistoricalProjectService(session)
     
     # 如果不是管理员，只能查看自己创建的历史项目
     user_id = None if current_user.role == "admin" else current_user.id
-    logger.info(f"[历史项目API] 过滤用户ID: {user_id} (admin={current_user.role == 'admin'})")
+    logger.debug(f"[历史项目API] 过滤用户ID: {user_id} (admin={current_user.role == 'admin'})")
     
     # 解析标签ID列表
     tag_id_list = None
@@ -49,18 +64,20 @@ async def list_historical_projects(
         except ValueError:
             tag_id_list = None
     
+    filters = dict(search=search, user_id=user_id, platform_id=platform_id, status=status, tag_ids=tag_id_list)
     try:
-        result = historical_project_service.list_historical_projects(
-            skip=skip,
-            limit=limit,
-            search=search,
-            user_id=user_id,
-            platform_id=platform_id,
-            status=status,
-            tag_ids=tag_id_list
-        )
-        logger.info(f"[历史项目API] list_historical_projects - 成功返回 {len(result)} 条记录")
+        if cursor is not None:
+            page = historical_project_service.list_historical_projects_page(cursor=cursor, limit=limit, **filters)
+            result = page.items
+            set_cursor_headers(response, page.next_cursor)
+        else:
+            result = historical_project_service.list_historical_projects(skip=skip, limit=limit, **filters)
+        if with_total:
+            set_cursor_headers(response, None, historical_project_service.get_count(**filters))
+        logger.debug(f"[历史项目API] list_historical_projects - 成功返回 {len(result)} 条记录")
         return result
+    except BusinessException:
+        raise
     except Exception as e:
         logger.error(f"[历史项目API] Error in list_historical_projects API: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -75,11 +92,11 @@ async def get_historical_projects_count(
     platform_id: Optional[int] = Query(None, description="平台ID（筛选）"),
     status: Optional[str] = Query(None, description="项目状态（筛选）"),
     tag_ids: Optional[str] = Query(None, description="标签ID列表，用逗号分隔"),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取历史项目总数"""
-    logger.info(f"[历史项目API] get_historical_projects_count - 当前用户: id={current_user.id}, username={current_user.username}")
+    """获取历史项目总数（按筛选条件缓存，新增、修改、删除后失效）"""
+    logger.debug(f"[历史项目API] get_historical_projects_count - 当前用户: id={current_user.id}, username={current_user.username}")
     historical_project_service = HistoricalProjectService(session)
     
     # 如果不是管理员，只能统计自己创建的历史项目
@@ -101,7 +118,7 @@ async def get_historical_projects_count(
             status=status,
             tag_ids=tag_id_list
         )
-        logger.info(f"[历史项目API] get_historical_projects_count - 返回总数: {count}")
+        logger.debug(f"[历史项目API] get_historical_projects_count - 返回总数: {count}")
         return {"count": count}
     except Exception as e:
         logger.error(f"[历史项目API] Error in get_historical_projects_count API: {str(e)}", exc_info=True)
@@ -118,15 +135,15 @@ async def create_historical_project(
     current_user: User = Depends(get_current_active_user)
 ):
     """创建历史项目"""
-    logger.info(f"[历史项目API] create_historical_project - 当前用户: id={current_user.id}, username={current_user.username}")
-    logger.info(f"[历史项目API] 项目数据: title={project_data.title}, platform_id={project_data.platform_id}")
+    logger.debug(f"[历史项目API] create_historical_project - 当前用户: id={current_user.id}, username={current_user.username}")
+    logger.debug(f"[历史项目API] 项目数据: title={project_data.title}, platform_id={project_data.platform_id}")
     historical_project_service = HistoricalProjectService(session)
     try:
         result = historical_project_service.create_historical_project(
             project_data=project_data,
             user_id=current_user.id
         )
-        logger.info(f"[历史项目API] create_historical_project - 创建成功: id={result.id}")
+        logger.debug(f"[历史项目API] create_historical_project - 创建成功: id={result.id}")
         return result
     except HTTPException:
         raise
@@ -161,6 +178,30 @@ async def import_from_project(
         )
 
 
+@router.post("/archive-from-project/{project_id}", response_model=HistoricalProjectReadWithRelations)
+async def archive_from_project(
+    project_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """将项目连同全部关联数据归档为历史项目（原项目删除，附件文件不复制）"""
+    historical_project_service = HistoricalProjectService(session)
+    try:
+        return historical_project_service.archive_project(
+            project_id=project_id,
+            current_user_id=current_user.id,
+            is_admin=(current_user.role == "admin")
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in archive_from_project API: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
 @router.post("/batch-import", response_model=List[HistoricalProjectReadWithRelations])
 async def batch_import_historical_projects(
     import_request: HistoricalProjectImportRequest,
@@ -182,18 +223,48 @@ async def batch_import_historical_projects(
         )
 
 
+@router.post("/batch-import/file")
+async def batch_import_historical_projects_file(
+    file: UploadFile = File(..., description="CSV（首行为表头）或 JSONL 文件"),
+    import_source: Optional[str] = Form("批量导入", description="导入来源"),
+    dry_run: bool = Form(False, description="只校验不导入"),
+    skip_invalid: bool = Form(True, description="跳过错误行；为 false 时存在错误行则整批不导入"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    从文件批量导入历史项目
+
+    先校验全部行，再分批写入；返回逐行结果（导入的项目ID、失败行的行号和原因）。
+    """
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    fmt = IMPORT_FILE_FORMATS.get(extension)
+    if fmt is None:
+        raise ValidationException("仅支持 CSV 或 JSONL 文件", field="file")
+
+    import_service = HistoricalImportService(session)
+    # 大文件导入耗时较长，在线程中执行，不阻塞事件循环
+    report = await anyio.to_thread.run_sync(
+        lambda: import_service.import_file(
+            file.file, fmt, current_user.id,
+            import_source=import_source, dry_run=dry_run, skip_invalid=skip_invalid
+        )
+    )
+    return report.to_dict()
+
+
 @router.get("/{project_id}", response_model=HistoricalProjectReadWithRelations)
 async def get_historical_project(
     project_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取历史项目详情"""
-    logger.info(f"[历史项目API] get_historical_project - 项目ID: {project_id}, 当前用户: id={current_user.id}, username={current_user.username}")
+    logger.debug(f"[历史项目API] get_historical_project - 项目ID: {project_id}, 当前用户: id={current_user.id}, username={current_user.username}")
     historical_project_service = HistoricalProjectService(session)
     try:
         result = historical_project_service.get_historical_project_with_relations(project_id)
-        logger.info(f"[历史项目API] get_historical_project - 成功获取项目: id={result.id}, title={result.title}")
+        logger.debug(f"[历史项目API] get_historical_project - 成功获取项目: id={result.id}, title={result.title}")
         return result
     except HTTPException:
         raise
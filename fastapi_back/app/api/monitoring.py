@@ -0,0 +1,62 @@
+"""
+系统监控API路由层
+
+提供按路由统计的数据库查询次数与耗时（仅管理员），用于发现 N+1 查询和慢接口；
+以及上传文件对账（孤儿文件、缺失文件）结果。
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.core.database import get_session
+from app.core.db_profiler import route_stats
+from app.services import storage_gc_service
+from app.services.storage_gc_service import StorageGcService
+from app.core.dependencies import get_current_admin_user
+from app.models.user import User
+from app.api.responses import ApiResponse, success
+from app.core.exceptions import ValidationException
+
+router = APIRouter()
+
+
+@router.get("/routes", response_model=ApiResponse[List[dict]])
+async def get_route_stats(
+    limit: int = Query(10, ge=1, le=100, description="返回的路由数量"),
+    sort_by: str = Query("queries", description="排序字段: queries / avg_queries / db_time / avg_db_time"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """获取查询次数或数据库耗时最高的路由（仅管理员）"""
+    if sort_by not in route_stats.SORT_KEYS:
+        raise ValidationException(f"不支持的排序字段: {sort_by}", field="sort_by")
+    return success(route_stats.top(limit, sort_by))
+
+
+@router.delete("/routes", response_model=ApiResponse[None])
+async def reset_route_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """清空路由统计（仅管理员）"""
+    route_stats.reset()
+    return success(msg="统计已清空")
+
+
+@router.get("/storage", response_model=ApiResponse[Optional[dict]])
+async def get_storage_report(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """获取最近一次上传文件对账结果（仅管理员），尚未执行过时返回 null"""
+    report = storage_gc_service.last_report
+    return success(report.to_dict() if report else None)
+
+
+@router.post("/storage/gc", response_model=ApiResponse[dict])
+async def run_storage_gc(
+    quarantine: bool = Query(False, description="是否将孤儿文件移入隔离区（否则只报告）"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """立即执行一次上传文件对账（仅管理员）"""
+    report = await run_in_threadpool(StorageGcService(session).run, quarantine)
+    return success(report.to_dict())
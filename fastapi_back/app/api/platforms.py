@@ -4,7 +4,7 @@
 from typing import List
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.dependencies import get_current_active_user
 from app.services.platform_service import PlatformService
 from app.models.user import User
@@ -16,7 +16,7 @@ router = APIRouter()
 
 @router.get("/", response_model=ApiResponse[List[PlatformRead]])
 async def list_platforms(
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取所有平台列表"""
@@ -40,7 +40,7 @@ async def create_platform(
 @router.get("/{platform_id}", response_model=ApiResponse[PlatformRead])
 async def get_platform(
     platform_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取平台详情"""
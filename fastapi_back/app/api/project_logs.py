@@ -1,12 +1,14 @@
 """
 项目日志API路由
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status, Body
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status, Body
 from sqlmodel import Session
 from typing import List, Optional
 from pydantic import BaseModel
 from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
+from app.api.responses import set_cursor_headers
+from app.models.project_log import LogAction
 from app.models.user import User
 from app.services.project_log_service import ProjectLogService
 
@@ -34,7 +36,10 @@ class StepUpdateLog(BaseModel):
 @router.get("/project/{project_id}")
 async def get_project_logs(
     project_id: int,
+    response: Response,
     limit: int = Query(50, description="返回数量限制"),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值"),
+    action: Optional[List[LogAction]] = Query(None, description="按操作类型过滤，可重复传入多个"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -50,15 +55,23 @@ async def get_project_logs(
     if current_user.role != "admin" and project.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问该项目")
     
+    actions = [a.value for a in action] if action else None
     log_service = ProjectLogService(session)
-    logs = log_service.get_project_logs(project_id, limit)
+    if cursor is not None:
+        page = log_service.get_project_logs_page(project_id, cursor, limit, actions)
+        set_cursor_headers(response, page.next_cursor)
+        return page.items
+    logs = log_service.get_project_logs(project_id, limit, actions)
     return logs
 
 
 @router.get("/historical-project/{historical_project_id}")
 async def get_historical_project_logs(
     historical_project_id: int,
+    response: Response,
     limit: int = Query(50, description="返回数量限制"),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值"),
+    action: Optional[List[LogAction]] = Query(None, description="按操作类型过滤，可重复传入多个"),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -80,33 +93,13 @@ async def get_historical_project_logs(
     if current_user.role != "admin" and historical_project.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问该历史项目")
     
-    from app.repositories.project_log_repository import ProjectLogRepository
-    log_repo = ProjectLogRepository(session)
-    logs = log_repo.list_by_historical_project(historical_project_id, limit)
-    
-    # 获取用户信息
-    from app.repositories.user_repository import UserRepository
-    user_repo = UserRepository(session)
-    result = []
-    for log in logs:
-        user_name = None
-        if log.user_id:
-            user = user_repo.get_by_id(log.user_id)
-            user_name = user.username if user else None
-        
-        result.append({
-            "id": log.id,
-            "project_id": log.project_id,
-            "historical_project_id": log.historical_project_id,
-            "action": log.action.value if hasattr(log.action, 'value') else str(log.action),
-            "description": log.description,
-            "details": log.details,
-            "user_id": log.user_id,
-            "user_name": user_name,
-            "created_at": log.created_at
-        })
-    
-    return result
+    actions = [a.value for a in action] if action else None
+    log_service = ProjectLogService(session)
+    if cursor is not None:
+        page = log_service.get_historical_project_logs_page(historical_project_id, cursor, limit, actions)
+        set_cursor_headers(response, page.next_cursor)
+        return page.items
+    return log_service.get_historical_project_logs(historical_project_id, limit, actions)
 
 
 @router.post("/step-update")
@@ -6,10 +6,10 @@ API层只负责请求处理，业务逻辑在Service层。
 """
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlmodel import Session
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.dependencies import get_current_active_user
 from app.services.project_service import ProjectService
 from app.models.user import User
@@ -17,7 +17,7 @@ from app.schemas.project import (
     ProjectCreate, ProjectUpdate, ProjectReadWithRelations,
     ProjectStepCreate, ProjectStepRead, ProjectStepUpdate
 )
-from app.api.responses import ApiResponse, success
+from app.api.responses import ApiResponse, success, set_cursor_headers
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -25,16 +25,22 @@ router = APIRouter()
 
 @router.get("/", response_model=ApiResponse[List[ProjectReadWithRelations]])
 async def list_projects(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="游标分页：首页传空字符串，之后传响应头 X-Next-Cursor 的值（忽略 skip）"),
     user_id: Optional[int] = None,
     platform_id: Optional[int] = None,
     status: Optional[str] = None,
     tag_ids: Optional[str] = Query(None, description="标签ID列表，用逗号分隔"),
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取项目列表"""
+    """
+    获取项目列表
+
+    传入 cursor 时使用游标分页，下一页游标在响应头 X-Next-Cursor 中（最后一页没有该响应头）。
+    """
     project_service = ProjectService(session)
 
     # 如果不是管理员，只能查看自己的项目
@@ -49,6 +55,18 @@ async def list_projects(
         except ValueError:
             tag_id_list = None
 
+    if cursor is not None:
+        page = project_service.list_projects_page(
+            cursor=cursor,
+            limit=limit,
+            user_id=user_id,
+            platform_id=platform_id,
+            status=status,
+            tag_ids=tag_id_list
+        )
+        set_cursor_headers(response, page.next_cursor)
+        return success(page.items)
+
     projects = project_service.list_projects(
         user_id=user_id,
         platform_id=platform_id,
@@ -79,7 +97,7 @@ async def create_project(
 @router.get("/{project_id}", response_model=ApiResponse[ProjectReadWithRelations])
 async def get_project(
     project_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取项目详情"""
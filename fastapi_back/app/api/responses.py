@@ -20,6 +20,7 @@
         return success(project)
 """
 from typing import Generic, TypeVar, Optional, List, Any
+from fastapi import Response
 from pydantic import BaseModel, Field
 
 T = TypeVar('T')
@@ -178,6 +179,33 @@ def paged_success(
     return PagedResponse(code=200, msg=msg, data=paged_data)
 
 
+# ==================== 游标分页 ====================
+
+# 游标分页的下一页游标和总数放在响应头中，列表接口的响应体保持不变
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def set_cursor_headers(response: Response, next_cursor: Optional[str], total: Optional[int] = None) -> None:
+    """
+    设置游标分页响应头
+
+    Args:
+        response: FastAPI 注入的 Response
+        next_cursor: 下一页游标，最后一页为 None（不设置响应头）
+        total: 总记录数（可选）
+
+    Example:
+        page = service.list_projects_page(cursor, limit)
+        set_cursor_headers(response, page.next_cursor)
+        return success(page.items)
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+
 # ==================== 常用响应码定义 ====================
 
 class ResponseCode:
@@ -4,7 +4,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
 from app.models.tag import Tag, TagCreate, TagRead, TagUpdate, ProjectTag, HistoricalProjectTag
@@ -50,7 +50,7 @@ async def create_tag(
 @router.get("/", response_model=ApiResponse[List[TagRead]])
 async def list_tags(
     include_common: bool = True,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取标签列表（全局共享，所有标签）"""
@@ -76,7 +76,7 @@ async def list_tags(
 
 @router.get("/common", response_model=ApiResponse[List[TagRead]])
 async def list_common_tags(
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_read_session)
 ):
     """获取常用标签列表"""
     tag_repo = TagRepository(session)
@@ -101,7 +101,7 @@ async def list_common_tags(
 @router.get("/{tag_id}", response_model=ApiResponse[TagRead])
 async def get_tag(
     tag_id: int,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取标签详情"""
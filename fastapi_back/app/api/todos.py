@@ -8,21 +8,48 @@ from datetime import datetime, date, timezone, timedelta
 from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
 from app.models.user import User
-from app.repositories.todo_repository import TodoRepository
+from app.repositories.todo_repository import TodoRepository, TodoWithSteps, group_by_local_day, parse_step_ids
 from app.repositories.step_repository import StepRepository
 from app.services.project_log_service import ProjectLogService
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoReadWithRelations
+from app.schemas.todo import TodoCreate, TodoUpdate, TodoReadWithRelations, TodoDayGroup
 from app.api.responses import ApiResponse, success
-import json
 
 router = APIRouter()
 
+# 区间查询最多返回的天数
+MAX_RANGE_DAYS = 366
+
 
 def _today_local() -> date:
     """获取本地（北京时间，UTC+8）的今天日期，避免 UTC 跨天问题"""
     return datetime.now(timezone.utc).astimezone(timezone(timedelta(hours=8))).date()
 
 
+def _todo_read(item: TodoWithSteps) -> TodoReadWithRelations:
+    """由联表查询结果构建待办读取模型"""
+    todo = item.todo
+    project_title = "未知项目"
+    if todo.project_id:
+        project_title = item.project_title or project_title
+    elif todo.historical_project_id and item.historical_project_title:
+        project_title = f"[历史] {item.historical_project_title}"
+
+    return TodoReadWithRelations(
+        id=todo.id,
+        project_id=todo.project_id,
+        historical_project_id=todo.historical_project_id,
+        description=todo.description,
+        step_ids=item.step_ids,
+        completion_note=todo.completion_note,
+        is_completed=todo.is_completed,
+        target_date=todo.target_date,
+        created_at=todo.created_at,
+        updated_at=todo.updated_at,
+        project_title=project_title,
+        step_names=item.step_names
+    )
+
+
 @router.get("/", response_model=ApiResponse[List[TodoReadWithRelations]])
 async def get_todos(
     target_date: Optional[date] = Query(None, description="目标日期，默认为今天"),
@@ -31,58 +58,40 @@ async def get_todos(
 ):
     """获取指定日期的待办列表"""
     todo_repo = TodoRepository(session)
-    step_repo = StepRepository(session)
 
     user_id = None if current_user.role == "admin" else current_user.id
     target = target_date or _today_local()
-    todos = todo_repo.list_by_date(target, user_id)
-
-    result = []
-    for todo in todos:
-        try:
-            step_ids = json.loads(todo.step_ids)
-            steps = [step_repo.get_by_id(sid) for sid in step_ids]
-            step_names = [s.name for s in steps if s]
-
-            # 获取项目信息（支持历史项目）
-            project_title = "未知项目"
-            if todo.project_id:
-                from app.repositories.project_repository import ProjectRepository
-                project_repo = ProjectRepository(session)
-                project = project_repo.get_by_id(todo.project_id)
-                if project:
-                    project_title = project.title
-            elif todo.historical_project_id:
-                from app.repositories.historical_project_repository import HistoricalProjectRepository
-                historical_project_repo = HistoricalProjectRepository(session)
-                historical_project = historical_project_repo.get_by_id(todo.historical_project_id)
-                if historical_project:
-                    project_title = f"[历史] {historical_project.title}"
-
-            todo_dict = {
-                "id": todo.id,
-                "project_id": todo.project_id,
-                "historical_project_id": todo.historical_project_id,
-                "description": todo.description,
-                "step_ids": step_ids,
-                "completion_note": todo.completion_note,
-                "is_completed": todo.is_completed,
-                "target_date": todo.target_date,
-                "created_at": todo.created_at,
-                "updated_at": todo.updated_at,
-                "project_title": project_title,
-                "step_names": step_names
-            }
-            result.append(TodoReadWithRelations(**todo_dict))
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error processing todo {todo.id}: {str(e)}", exc_info=True)
-            continue
 
+    # 待办、关联步骤和所属项目一次联表查询
+    result = [_todo_read(item) for item in todo_repo.list_by_date_with_steps(target, user_id)]
     return success(result)
 
 
+@router.get("/range", response_model=ApiResponse[List[TodoDayGroup]])
+async def get_todos_by_range(
+    start_date: date = Query(..., description="开始日期（本地日期，含）"),
+    end_date: date = Query(..., description="结束日期（本地日期，含）"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取日期区间内的待办，按本地日期分组（只返回有待办的日期）"""
+    if end_date < start_date:
+        from fastapi import HTTPException, status
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="结束日期不能早于开始日期")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        from fastapi import HTTPException, status
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"日期区间不能超过 {MAX_RANGE_DAYS} 天")
+
+    todo_repo = TodoRepository(session)
+    user_id = None if current_user.role == "admin" else current_user.id
+    groups = todo_repo.list_by_range_with_steps(start_date, end_date, user_id)
+
+    return success([
+        TodoDayGroup(date=day, todos=[_todo_read(item) for item in items])
+        for day, items in groups.items()
+    ])
+
+
 @router.post("/", response_model=ApiResponse[TodoReadWithRelations])
 async def create_todo(
     todo_data: TodoCreate,
@@ -135,8 +144,9 @@ async def create_todo(
     # 将相关步骤标记为待办，并将状态改为"进行中"（仅对项目有效，历史项目没有步骤）
     step_names = []
     if todo.project_id:
+        steps = {step.id: step for step in step_repo.get_by_ids(todo_data.step_ids)}
         for step_id in todo_data.step_ids:
-            step = step_repo.get_by_id(step_id)
+            step = steps.get(step_id)
             if step:
                 step.is_todo = True
                 # 如果步骤状态是"待开始"，则改为"进行中"
@@ -168,7 +178,7 @@ async def create_todo(
         })
 
     # 构建返回数据
-    step_ids = json.loads(todo.step_ids)
+    step_ids = parse_step_ids(todo.step_ids)
     project_title = project.title if project else (historical_project.title if historical_project else "未知项目")
 
     todo_read = TodoReadWithRelations(
@@ -197,7 +207,6 @@ async def update_todo(
 ):
     """更新待办"""
     todo_repo = TodoRepository(session)
-    step_repo = StepRepository(session)
 
     todo = todo_repo.get_by_id(todo_id)
     if not todo:
@@ -231,11 +240,11 @@ async def update_todo(
 
     # 记录完成前的信息
     was_completed = todo.is_completed
-    step_ids = json.loads(todo.step_ids)
+    steps = todo_repo.get_steps(todo.id)
+    step_ids = [step.id for step in steps]
     step_names = []
     if todo.project_id:
-        steps = [step_repo.get_by_id(sid) for sid in step_ids]
-        step_names = [s.name for s in steps if s]
+        step_names = [step.name for step in steps]
 
     # 更新待办
     todo = todo_repo.update(todo, todo_data)
@@ -243,12 +252,10 @@ async def update_todo(
     # 如果标记为完成，更新步骤状态并记录日志（仅对项目有效）
     if todo_data.is_completed and not was_completed:
         if todo.project_id:
-            for step_id in step_ids:
-                step = step_repo.get_by_id(step_id)
-                if step:
-                    step.status = "已完成"
-                    step.is_todo = False
-                    session.add(step)
+            for step in steps:
+                step.status = "已完成"
+                step.is_todo = False
+                session.add(step)
         session.commit()
 
         # 记录完成日志
@@ -426,10 +433,13 @@ async def get_todo_calendar(
             date_str = settle_date.isoformat()
             daily_revenue[date_str] = daily_revenue.get(date_str, 0) + (project.actual_income or 0)
 
+    # 整月待办一次查询，按本地日期分组
+    todos_by_day = group_by_local_day(todo_repo.list_by_range(start_date, end_date, user_id))
+
     calendar_data = []
     current_date = start_date
     while current_date <= end_date:
-        todos = todo_repo.list_by_date(current_date, user_id)
+        todos = todos_by_day.get(current_date, [])
         todo_count = len([t for t in todos if not t.is_completed])
         completed_count = len([t for t in todos if t.is_completed])
         date_str = current_date.isoformat()
@@ -0,0 +1,112 @@
+"""
+分片上传API路由层（断点续传）
+
+    POST   /api/uploads                              创建上传会话
+    PUT    /api/uploads/{upload_id}/chunks/{index}   上传分片（请求体为分片原始字节，X-Chunk-SHA256 为校验值）
+    GET    /api/uploads/{upload_id}                  查询已接收的分片和续传偏移量
+    POST   /api/uploads/{upload_id}/complete         完成上传，生成附件或视频记录
+    DELETE /api/uploads/{upload_id}                  取消上传
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Path, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.api.responses import ApiResponse, success
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.dependencies import get_current_active_user
+from app.core.exceptions import ValidationException
+from app.models.upload_session import UploadSessionComplete, UploadSessionCreate, UploadSessionRead
+from app.models.user import User
+from app.services.upload_session_service import UploadSessionService
+
+router = APIRouter()
+
+
+async def _read_chunk_body(request: Request, limit: int) -> bytes:
+    """读取分片请求体，超过上限立即拒绝"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise ValidationException(f"分片大小超过限制（最大 {limit} 字节）", field="chunk")
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > limit:
+            raise ValidationException(f"分片大小超过限制（最大 {limit} 字节）", field="chunk")
+    return bytes(body)
+
+
+@router.post("", response_model=ApiResponse[UploadSessionRead])
+async def create_upload(
+    upload_data: UploadSessionCreate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """创建分片上传会话"""
+    service = UploadSessionService(session)
+    upload = await run_in_threadpool(
+        service.create_upload, upload_data, current_user.id, current_user.role == "admin"
+    )
+    return success(upload)
+
+
+@router.get("/{upload_id}", response_model=ApiResponse[UploadSessionRead])
+async def get_upload_status(
+    upload_id: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """查询上传进度（续传前调用，获取缺失的分片）"""
+    service = UploadSessionService(session)
+    return success(service.get_upload_status(upload_id, current_user.id, current_user.role == "admin"))
+
+
+@router.put("/{upload_id}/chunks/{chunk_index}", response_model=ApiResponse[UploadSessionRead])
+async def put_chunk(
+    request: Request,
+    upload_id: str,
+    chunk_index: int = Path(..., ge=0),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", description="分片内容的SHA-256（十六进制）"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """上传一个分片（可重复上传，幂等）"""
+    data = await _read_chunk_body(request, settings.UPLOAD_MAX_CHUNK_SIZE)
+    service = UploadSessionService(session)
+    # 校验和写盘在线程池中执行，不阻塞事件循环
+    upload = await run_in_threadpool(
+        service.put_chunk, upload_id, chunk_index, data, chunk_sha256, current_user.id, current_user.role == "admin"
+    )
+    return success(upload)
+
+
+@router.post("/{upload_id}/complete", response_model=ApiResponse[UploadSessionRead])
+async def complete_upload(
+    upload_id: str,
+    complete_data: Optional[UploadSessionComplete] = None,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """完成上传，创建附件或视频记录（result_id 为新记录ID）"""
+    service = UploadSessionService(session)
+    upload = await run_in_threadpool(
+        service.complete_upload,
+        upload_id,
+        current_user.id,
+        current_user.role == "admin",
+        complete_data.sha256 if complete_data else None
+    )
+    return success(upload, msg="上传完成")
+
+
+@router.delete("/{upload_id}", response_model=ApiResponse[None])
+async def abort_upload(
+    upload_id: str,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """取消上传并删除已上传的分片"""
+    service = UploadSessionService(session)
+    await run_in_threadpool(service.abort_upload, upload_id, current_user.id, current_user.role == "admin")
+    return success(msg="上传已取消")
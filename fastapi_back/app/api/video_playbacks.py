@@ -3,7 +3,7 @@
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from datetime import datetime
 
@@ -11,6 +11,9 @@ from app.core.database import get_session
 from app.core.dependencies import get_current_active_user
 from app.core.config import settings
 from app.services.video_playback_service import VideoPlaybackService
+from app.utils.constants import VIDEO_UPLOAD_DIR
+from app.utils.media_response import MediaFileResponse
+from app.utils.upload_pipeline import save_upload
 from app.models.user import User
 from app.models.video_playback import (
     VideoPlaybackRead,
@@ -22,8 +25,8 @@ from app.models.video_playback import (
     VideoPasswordVerify,
     VideoPlayback
 )
+import mimetypes
 import os
-import uuid
 
 router = APIRouter(prefix="/video-playbacks", tags=["视频回放"])
 
@@ -53,57 +56,17 @@ async def upload_video(
             detail=f"不支持的文件类型，支持的格式：{', '.join(allowed_extensions)}"
         )
     
-    # 验证文件大小（最大1GB）
-    max_size = 1 * 1024 * 1024 * 1024  # 1GB
-    
-    # 生成唯一文件名
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    upload_dir = "uploads/videos"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # 流式保存文件（支持大文件）
-    try:
-        file_size = 0
-        with open(file_path, "wb") as buffer:
-            # 分块读取，避免一次性加载到内存
-            while True:
-                chunk = await file.read(8192)  # 8KB chunks
-                if not chunk:
-                    break
-                file_size += len(chunk)
-                # 检查文件大小
-                if file_size > max_size:
-                    # 删除已写入的部分文件
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"文件大小超过限制（最大1GB），当前文件大小：{file_size / (1024*1024):.2f}MB"
-                    )
-                buffer.write(chunk)
-    except HTTPException:
-        raise
-    except Exception as e:
-        # 如果出错，删除可能已创建的文件
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"保存文件失败: {str(e)}"
-        )
+    # 流式保存文件（最大1GB）
+    saved = await save_upload(file, VIDEO_UPLOAD_DIR)
     
     # 创建视频记录
     video_service = VideoPlaybackService(session)
     video = video_service.create_video(
         project_id=project_id,
         title=title,
-        file_path=file_path,
+        file_path=saved.path,
         file_name=file.filename,
-        file_size=file_size,
+        file_size=saved.size,
         current_user_id=current_user.id,
         is_admin=(current_user.role == "admin")
     )
@@ -472,10 +435,13 @@ async def get_video_file(
             detail="视频文件不存在"
         )
     
-    return FileResponse(
+    # 支持 Range/条件请求，拖动进度条时只传输需要的片段
+    media_type = mimetypes.guess_type(video.file_name)[0] or "video/mp4"
+    return MediaFileResponse(
         video.file_path,
-        media_type="video/mp4",
-        filename=video.file_name
+        media_type=media_type,
+        filename=video.file_name,
+        content_disposition_type="inline"
     )
 
 
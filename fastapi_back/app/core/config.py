@@ -5,6 +5,23 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./project_manager.db"
+    DATABASE_ECHO: bool = False  # 是否打印所有SQL语句（仅调试时开启）
+    ASYNC_DATABASE_URL: Optional[str] = None  # 异步引擎URL，未配置时由 DATABASE_URL 推导（sqlite -> sqlite+aiosqlite）
+
+    # SQLite 连接参数（每个新连接建立时通过 PRAGMA 设置）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL：读写互不阻塞，写入只追加日志
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 足够安全（断电最多丢失最近提交的事务）
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 遇到写锁时等待的最长时间，避免立即报 "database is locked"
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取大小（字节），0 表示关闭
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 每个连接的页缓存大小（KB）
+
+    # 连接池配置（内存数据库不使用连接池参数）
+    DB_POOL_SIZE: int = 5  # 常驻连接数
+    DB_MAX_OVERFLOW: int = 10  # 高峰期允许额外创建的连接数
+    DB_POOL_TIMEOUT: int = 30  # 获取连接的最长等待时间（秒）
+    DB_POOL_RECYCLE: int = 1800  # 连接最长复用时间（秒）
+    DB_READ_POOL_ENABLED: bool = True  # GET 接口是否使用独立的只读连接池
+    DB_READ_POOL_SIZE: int = 10  # 只读连接池常驻连接数
     
     # JWT配置
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -21,6 +38,16 @@ class Settings(BaseSettings):
     PASSWORD_REQUIRE_NUMBER: bool = True  # 要求数字
     PASSWORD_REQUIRE_SPECIAL: bool = False  # 要求特殊字符
     PASSWORD_EXPIRE_DAYS: Optional[int] = None  # 密码过期天数（None表示不过期）
+
+    # Token 验证缓存配置（进程内，按 token 摘要缓存解码结果和用户快照）
+    TOKEN_CACHE_ENABLED: bool = True  # 是否启用缓存
+    TOKEN_CACHE_TTL_SECONDS: int = 60  # 缓存条目最长存活时间（不会超过 token 的 exp）
+    TOKEN_CACHE_MAX_SIZE: int = 10000  # 最大缓存条目数（LRU 淘汰）
+
+    # Token 黑名单配置
+    TOKEN_BLACKLIST_BLOOM_CAPACITY: int = 100000  # Bloom 过滤器预期容量
+    TOKEN_BLACKLIST_BLOOM_ERROR_RATE: float = 0.001  # Bloom 过滤器目标误判率
+    TOKEN_BLACKLIST_SWEEP_INTERVAL_SECONDS: int = 600  # 过期记录清理及过滤器重建间隔（秒）
     
     # CORS配置
     # 允许 localhost 和局域网访问（开发环境）
@@ -40,6 +67,33 @@ class Settings(BaseSettings):
     # 开发模式：是否允许所有来源（仅开发环境使用）
     CORS_ALLOW_ALL: bool = True  # 开发环境设为 True，生产环境设为 False
     
+    # 日志配置
+    LOG_LEVEL: str = "INFO"
+    REQUEST_LOG_SAMPLE_RATE: float = 1.0  # 访问日志采样率（0~1），5xx 和慢请求总是记录
+    REQUEST_LOG_SLOW_MS: int = 1000  # 慢请求阈值（毫秒）
+    REQUEST_LOG_DEBUG_ROUTES: List[str] = []  # 开启调试日志的路由模板，如 ["/api/historical-projects/"]
+    SERVER_TIMING_ENABLED: bool = True  # 是否输出 Server-Timing 响应头（SQL 次数与耗时）
+    DB_SLOW_QUERY_MS: int = 200  # 慢查询阈值（毫秒），超过时记录语句与路由
+
+    # 分片上传配置（断点续传）
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # 默认分片大小（字节）
+    UPLOAD_MAX_CHUNK_SIZE: int = 64 * 1024 * 1024  # 客户端可指定的最大分片大小（字节）
+    UPLOAD_MAX_FILE_SIZE: int = 20 * 1024 * 1024 * 1024  # 分片上传的最大文件大小（字节）
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # 上传会话有效期（小时），过期后清理已上传的分片
+
+    # 列表分页配置
+    LIST_COUNT_CACHE_TTL_SECONDS: int = 30  # 列表总数缓存时间（秒），写操作后立即失效
+
+    # 上传文件对账（孤儿文件清理）配置
+    STORAGE_GC_ENABLED: bool = True  # 是否启用后台对账任务
+    STORAGE_GC_INTERVAL_SECONDS: int = 6 * 3600  # 对账间隔（秒）
+    STORAGE_GC_QUARANTINE: bool = False  # 是否将孤儿文件移入 uploads/.quarantine（否则只报告）
+    STORAGE_GC_MIN_AGE_SECONDS: int = 3600  # 修改时间在此之内的文件不视为孤儿（可能正在上传）
+
+    # 附件预览派生文件缓存（缩略图、文本预览）
+    DERIVATIVE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 缓存总大小上限（字节），超出后按最近访问时间淘汰
+    TEXT_PREVIEW_MAX_BYTES: int = 512 * 1024  # 文本预览读取的最大字节数，超出部分截断
+
     # 前端URL配置（用于生成外部链接）
     FRONTEND_URL: str = "http://localhost:5173"
     
@@ -1,14 +1,181 @@
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
 from app.core.config import settings
+from app.core.db_profiler import install_db_profiler
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _is_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+
+def _is_memory_database(url: URL) -> bool:
+    """内存数据库（每个连接/引擎各自独立，不能使用连接池和只读池）"""
+    database = url.database or ""
+    return database in ("", ":memory:") or "mode=memory" in database or url.query.get("mode") == "memory"
+
+
+def apply_sqlite_pragmas(dbapi_connection, read_only: bool = False) -> None:
+    """
+    在新建的 SQLite 连接上应用 settings 中的 PRAGMA 配置
+
+    Args:
+        dbapi_connection: DBAPI 连接（sqlite3 或 aiosqlite 适配连接）
+        read_only: 是否设置为只读连接（PRAGMA query_only）
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in _JOURNAL_MODES:
+        raise ValueError(f"不支持的 SQLITE_JOURNAL_MODE: {settings.SQLITE_JOURNAL_MODE}")
+    if synchronous not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"不支持的 SQLITE_SYNCHRONOUS: {settings.SQLITE_SYNCHRONOUS}")
+
+    cursor = dbapi_connection.cursor()
+    try:
+        # busy_timeout 需最先设置：切换 WAL 时也可能需要等待其他连接释放锁
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # 负数表示以 KB 为单位
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def _pool_options(url: URL, pool_size: int) -> Dict[str, Any]:
+    """连接池参数（内存数据库使用 SQLAlchemy 默认的单连接池）"""
+    if _is_memory_database(url):
+        return {}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _install_sqlite_pragmas(sync_engine: Engine, read_only: bool = False) -> None:
+    """在引擎上注册连接建立事件，为每个新连接应用 PRAGMA"""
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, read_only=read_only)
+
+
+def create_database_engine(database_url: str, read_only: bool = False, pool_size: int = None) -> Engine:
+    """
+    按 settings 创建同步数据库引擎
+
+    SQLite 连接自动应用 WAL / synchronous / busy_timeout / mmap / cache_size，
+    文件数据库使用带上限的连接池。
+
+    Args:
+        database_url: 数据库URL
+        read_only: 是否为只读引擎（连接设置 PRAGMA query_only）
+        pool_size: 常驻连接数，默认 DB_POOL_SIZE
+    """
+    url = make_url(database_url)
+    connect_args = {"check_same_thread": False} if _is_sqlite(url) else {}  # SQLite需要这个参数
+    new_engine = create_engine(
+        database_url,
+        connect_args=connect_args,
+        echo=settings.DATABASE_ECHO,  # 调试时可通过 DATABASE_ECHO=true 打印SQL语句
+        **_pool_options(url, pool_size or settings.DB_POOL_SIZE)
+    )
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(new_engine, read_only=read_only)
+    install_db_profiler(new_engine)
+    return new_engine
+
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite需要这个参数
-    echo=True  # 开发时打印SQL语句
-)
+engine = create_database_engine(settings.DATABASE_URL)
+
+
+def _create_read_engine() -> Engine:
+    """只读引擎：独立连接池，写请求占满连接池时读请求不受影响"""
+    url = make_url(settings.DATABASE_URL)
+    if not settings.DB_READ_POOL_ENABLED or _is_memory_database(url):
+        return engine
+    return create_database_engine(settings.DATABASE_URL, read_only=True, pool_size=settings.DB_READ_POOL_SIZE)
+
+
+read_engine = _create_read_engine()
+
+
+# 同步驱动 -> 异步驱动
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url() -> str:
+    """
+    获取异步引擎使用的数据库URL
+
+    优先使用 ASYNC_DATABASE_URL；未配置时由 DATABASE_URL 推导（sqlite -> sqlite+aiosqlite）。
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or "+" in url.drivername:
+        return str(url)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    获取异步数据库引擎（首次调用时创建）
+
+    延迟创建，未安装异步驱动（aiosqlite / asyncpg）时只影响使用异步会话的接口。
+    """
+    database_url = get_async_database_url()
+    url = make_url(database_url)
+    async_engine = create_async_engine(
+        database_url,
+        echo=settings.DATABASE_ECHO,
+        **_pool_options(url, settings.DB_POOL_SIZE)
+    )
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(async_engine.sync_engine)
+    install_db_profiler(async_engine.sync_engine)
+    return async_engine
 
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+
+def get_read_session():
+    """
+    只读数据库会话依赖（用于不写库的 GET 接口）
+
+    使用独立的只读连接池；未启用只读池或使用内存数据库时与 get_session 相同。
+    """
+    with Session(read_engine) as session:
+        yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    异步数据库会话依赖
+
+    查询在事件循环中等待 I/O，不阻塞同一 worker 上的其他请求。
+    expire_on_commit=False：提交后仍可访问实体属性（异步会话不支持隐式懒加载）。
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
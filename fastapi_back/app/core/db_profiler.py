@@ -0,0 +1,148 @@
+"""
+数据库查询性能分析模块
+
+基于 SQLAlchemy 事件统计每个请求的 SQL 查询次数和累计耗时：
+- 统计结果写入当前请求上下文，由请求日志中间件输出为 Server-Timing 响应头和访问日志
+- 超过 DB_SLOW_QUERY_MS 的语句单独记录慢查询日志（附带路由）
+- 按路由模板累计统计，供管理员接口查询查询次数/数据库耗时最高的路由
+
+使用示例:
+    install_db_profiler(engine)
+    route_stats.record("/api/projects/", query_count=3, db_time_ms=2.5, duration_ms=12.0)
+    route_stats.top(10, sort_by="queries")
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.request_context import get_request_context, get_route_template
+
+logger = logging.getLogger("app.db.slow_query")
+
+# 慢查询日志中语句的最大长度
+_MAX_STATEMENT_LENGTH = 500
+
+# 未匹配任何路由的请求统一记录的键
+UNMATCHED_ROUTE = "<unmatched>"
+
+# 路由数达到上限后，新路由统一记录的键
+OVERFLOW_ROUTE = "<other>"
+
+
+# 开始时间保存在语句的执行上下文上：语句出错时 after_cursor_execute 不会触发，
+# 放在连接级的栈上会残留在连接池的连接中，使之后的计时错位
+_START_TIME_ATTR = "_db_profiler_start_time"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    ctx = get_request_context()
+    if ctx is not None:
+        ctx.query_count += 1
+    if context is not None:
+        setattr(context, _START_TIME_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, _START_TIME_ATTR, None)
+    if start_time is None:
+        return
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    ctx = get_request_context()
+    if ctx is not None:
+        ctx.db_time_ms += elapsed_ms
+
+    if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+        route = None
+        if ctx is not None and ctx.scope:
+            route = get_route_template(ctx.scope) or ctx.scope.get("path")
+        logger.warning(
+            f"慢查询 {elapsed_ms:.1f}ms route={route or '-'} "
+            f"sql={' '.join(statement.split())[:_MAX_STATEMENT_LENGTH]}"
+        )
+
+
+def install_db_profiler(engine: Engine) -> None:
+    """在 Engine 上注册查询计数与计时监听器（重复调用无副作用）"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@dataclass
+class RouteStat:
+    """单个路由的累计统计"""
+    route: str
+    requests: int = 0
+    total_queries: int = 0
+    max_queries: int = 0
+    total_db_time_ms: float = 0.0
+    max_db_time_ms: float = 0.0
+    total_duration_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        requests = self.requests or 1
+        data["avg_queries"] = round(self.total_queries / requests, 2)
+        data["avg_db_time_ms"] = round(self.total_db_time_ms / requests, 2)
+        data["avg_duration_ms"] = round(self.total_duration_ms / requests, 2)
+        data["total_db_time_ms"] = round(self.total_db_time_ms, 2)
+        data["max_db_time_ms"] = round(self.max_db_time_ms, 2)
+        data["total_duration_ms"] = round(self.total_duration_ms, 2)
+        return data
+
+
+class RouteStats:
+    """按路由模板累计的请求数据库统计（进程内）"""
+
+    SORT_KEYS = {
+        "queries": lambda s: s.total_queries,
+        "avg_queries": lambda s: s.total_queries / (s.requests or 1),
+        "db_time": lambda s: s.total_db_time_ms,
+        "avg_db_time": lambda s: s.total_db_time_ms / (s.requests or 1),
+    }
+
+    def __init__(self, max_routes: int = 1000):
+        self.max_routes = max_routes
+        self._stats: Dict[str, RouteStat] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, query_count: int, db_time_ms: float, duration_ms: float) -> None:
+        """记录一次请求（路由数达到上限后，新路由计入 OVERFLOW_ROUTE）"""
+        with self._lock:
+            stat = self._stats.get(route)
+            if stat is None:
+                if len(self._stats) >= self.max_routes:
+                    route = OVERFLOW_ROUTE
+                    stat = self._stats.get(route)
+                if stat is None:
+                    stat = self._stats[route] = RouteStat(route=route)
+            stat.requests += 1
+            stat.total_queries += query_count
+            stat.max_queries = max(stat.max_queries, query_count)
+            stat.total_db_time_ms += db_time_ms
+            stat.max_db_time_ms = max(stat.max_db_time_ms, db_time_ms)
+            stat.total_duration_ms += duration_ms
+
+    def top(self, limit: int = 10, sort_by: str = "queries") -> List[dict]:
+        """获取排名前 limit 的路由统计"""
+        key = self.SORT_KEYS.get(sort_by)
+        if key is None:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+        with self._lock:
+            stats = sorted(self._stats.values(), key=key, reverse=True)[:limit]
+            return [stat.to_dict() for stat in stats]
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+
+route_stats = RouteStats()
@@ -0,0 +1,87 @@
+"""
+日志配置模块
+
+所有日志记录先写入内存队列（QueueHandler），由后台线程（QueueListener）
+负责格式化和输出，日志 I/O 不会阻塞事件循环。
+
+访问日志（logger 名为 "app.access"）使用 JSON 单行格式输出，其余日志沿用
+文本格式。
+
+使用示例:
+    listener = setup_logging()
+    ...
+    listener.stop()
+"""
+import json
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+from app.core.config import settings
+
+ACCESS_LOGGER_NAME = "app.access"
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonAccessFormatter(logging.Formatter):
+    """将访问日志记录的 access 字段格式化为单行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"ts": self.formatTime(record), "level": record.levelname}
+        data.update(getattr(record, "access", None) or {"message": record.getMessage()})
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class _RoutingFormatter(logging.Formatter):
+    """访问日志使用 JSON 格式，其余使用文本格式"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+        self._access = JsonAccessFormatter()
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.name == ACCESS_LOGGER_NAME:
+            return self._access.format(record)
+        return super().format(record)
+
+
+def setup_logging(level: Optional[str] = None) -> logging.handlers.QueueListener:
+    """
+    配置根日志记录器使用队列异步输出
+
+    Args:
+        level: 日志级别，默认取 settings.LOG_LEVEL
+
+    Returns:
+        已启动的 QueueListener（重复调用返回同一个）
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(_RoutingFormatter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level or settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """停止后台日志线程并刷新队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,66 @@
+"""
+请求上下文模块
+
+通过 contextvars 保存当前请求的统计信息（SQL 查询次数与耗时、认证用户ID），
+供请求日志中间件在请求结束时读取。
+
+SQL 统计由 app.core.db_profiler 挂在 Engine 上的 SQLAlchemy 事件写入；
+不在请求内执行的语句（启动迁移、后台任务等）不会被计入。
+
+使用示例:
+    ctx = begin_request()
+    try:
+        ...  # 处理请求
+    finally:
+        end_request(ctx)
+    print(ctx.query_count)
+"""
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class RequestContext:
+    """单个请求的统计信息"""
+    query_count: int = 0
+    db_time_ms: float = 0.0
+    user_id: Optional[int] = None
+    scope: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    _token: Optional[Token] = field(default=None, repr=False, compare=False)
+
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+
+def begin_request(scope: Optional[Dict[str, Any]] = None) -> RequestContext:
+    """为当前请求创建上下文（scope 用于在请求处理中获取匹配到的路由）"""
+    ctx = RequestContext(scope=scope)
+    ctx._token = _current_request.set(ctx)
+    return ctx
+
+
+def end_request(ctx: RequestContext) -> None:
+    """结束当前请求的上下文"""
+    if ctx._token is not None:
+        _current_request.reset(ctx._token)
+        ctx._token = None
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """获取当前请求上下文（不在请求内时返回 None）"""
+    return _current_request.get()
+
+
+def set_request_user(user_id: Optional[int]) -> None:
+    """记录当前请求的认证用户ID"""
+    ctx = _current_request.get()
+    if ctx is not None:
+        ctx.user_id = user_id
+
+
+def get_route_template(scope: Optional[Dict[str, Any]]) -> Optional[str]:
+    """从 ASGI scope 获取匹配到的路由模板，未匹配路由时返回 None"""
+    if not scope:
+        return None
+    return getattr(scope.get("route"), "path", None)
@@ -0,0 +1,128 @@
+"""
+请求日志中间件
+
+每个请求只输出一行结构化（JSON）访问日志，包含：
+method、路由模板、状态码、耗时、SQL 查询次数与耗时、用户ID。
+
+同时为响应添加 Server-Timing 头（db: SQL 次数与累计耗时，app: 总耗时），
+并把每个请求的数据库统计累计到 app.core.db_profiler.route_stats。
+
+- 采样：按 REQUEST_LOG_SAMPLE_RATE 采样；5xx 和慢请求（>= REQUEST_LOG_SLOW_MS）总是记录
+- 调试：对 REQUEST_LOG_DEBUG_ROUTES 中的路由（或运行时通过 enable_route_debug 开启的路由）
+  总是记录，并附带查询参数、客户端地址和请求头名称（不记录请求头的值）
+
+日志写入由 app.core.logging_config 中的队列处理器异步完成。
+
+中间件是纯 ASGI 实现，不改写响应消息，http.response.zerocopysend 等服务器扩展消息
+可以原样透传给服务器。
+"""
+import logging
+import random
+import time
+from typing import Iterable, Optional, Set
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.db_profiler import UNMATCHED_ROUTE, route_stats
+from app.core.logging_config import ACCESS_LOGGER_NAME
+from app.core.request_context import RequestContext, begin_request, end_request, get_route_template
+
+access_logger = logging.getLogger(ACCESS_LOGGER_NAME)
+
+_debug_routes: Set[str] = set()
+
+
+def enable_route_debug(route: str) -> None:
+    """开启指定路由模板（如 /api/projects/{project_id}）的调试日志"""
+    _debug_routes.add(route)
+
+
+def disable_route_debug(route: str) -> None:
+    """关闭指定路由模板的调试日志"""
+    _debug_routes.discard(route)
+
+
+def get_debug_routes() -> Set[str]:
+    """获取当前开启调试日志的路由模板"""
+    return set(_debug_routes)
+
+
+class RequestLoggingMiddleware:
+    """结构化、可采样的请求日志中间件"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        slow_ms: int = 1000,
+        debug_routes: Optional[Iterable[str]] = None,
+        server_timing: bool = True
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.server_timing = server_timing
+        _debug_routes.update(debug_routes or ())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # 非 HTTP 请求和 CORS 预检请求不记录
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = begin_request(scope)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - start) * 1000
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={ctx.db_time_ms:.2f};desc="{ctx.query_count} queries", app;dur={app_ms:.2f}'
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            end_request(ctx)
+            self._log(Request(scope), ctx, status_code, duration_ms)
+
+    def _log(self, request: Request, ctx: RequestContext, status_code: int, duration_ms: float) -> None:
+        template = get_route_template(request.scope)
+        # 未匹配任何路由的请求（404、扫描探测）归到同一个键，避免按任意路径累计统计
+        route = template or UNMATCHED_ROUTE
+        route_stats.record(route, ctx.query_count, ctx.db_time_ms, duration_ms)
+        debug = route in _debug_routes
+        if not (debug or self._should_log(status_code, duration_ms)):
+            return
+        access = {
+            "method": request.method,
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_queries": ctx.query_count,
+            "db_time_ms": round(ctx.db_time_ms, 2),
+            "user_id": ctx.user_id,
+        }
+        if template is None:
+            access["path"] = request.url.path
+        if debug:
+            access["path"] = request.url.path
+            access["query"] = str(request.query_params)
+            access["client"] = request.client.host if request.client else None
+            access["headers"] = sorted(request.headers.keys())
+        level = logging.WARNING if status_code >= 500 else logging.INFO
+        access_logger.log(level, "request", extra={"access": access})
+
+    def _should_log(self, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 500 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
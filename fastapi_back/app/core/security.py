@@ -3,6 +3,7 @@ from typing import Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
 import secrets
+import hashlib
 import re
 from app.core.config import settings
 from sqlmodel import Session
@@ -97,6 +98,11 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+def hash_token(token: str) -> str:
+    """计算 token 的 SHA-256 摘要（64位十六进制），用于缓存键和黑名单存储"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def validate_password_strength(password: str) -> Tuple[bool, Optional[str]]:
     """
     验证密码强度（企业级密码策略）
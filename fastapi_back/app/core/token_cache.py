@@ -0,0 +1,158 @@
+"""
+Token 验证缓存模块
+
+缓存已验证 access token 的解码结果和用户快照，避免每个请求都查询黑名单表、
+解码 JWT 并按用户名查询用户表。
+
+特性：
+- 以 token 的 SHA-256 摘要为键，不在内存中保存原始 token
+- TTL + LRU 淘汰，条目的过期时间不会超过 token 本身的 exp
+- 提供显式失效接口：登出（单个 token）、登出全部设备 / 禁用 / 锁定 / 角色变更（按用户）
+
+注意：缓存是进程内的，多 worker 部署时其他 worker 上的条目只能依赖 TTL 过期，
+因此 TOKEN_CACHE_TTL_SECONDS 即为权限变更在其他 worker 上生效的最大延迟。
+
+使用示例:
+    from app.core.token_cache import token_cache
+
+    entry = token_cache.get(token)
+    if entry is None:
+        ...  # 完整验证
+        token_cache.set(token, payload, user)
+
+    token_cache.invalidate_user(user.id)
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.core.security import hash_token
+from app.models.user import User
+
+# 用户快照包含的字段（认证检查和 current_user 使用方所需的全部字段）
+USER_SNAPSHOT_FIELDS = (
+    "id",
+    "username",
+    "role",
+    "created_at",
+    "is_active",
+    "is_locked",
+    "locked_until",
+    "last_login_at",
+    "must_change_password",
+)
+
+
+@dataclass
+class CachedToken:
+    """缓存条目：解码后的 claims 与用户快照"""
+    claims: Dict[str, Any]
+    user_snapshot: Dict[str, Any]
+    expires_at: float
+
+    def to_user(self) -> User:
+        """从快照重建游离（不绑定会话）的 User 对象"""
+        return User(password_hash="", **self.user_snapshot)
+
+
+class TokenCache:
+    """
+    进程内 token 验证缓存（TTL + LRU）
+
+    Attributes:
+        ttl_seconds: 条目最长存活时间（秒）
+        max_size: 最大条目数，超出后淘汰最久未使用的条目
+    """
+
+    def __init__(self, ttl_seconds: int = 60, max_size: int = 10000, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        """获取缓存条目，不存在或已过期返回 None"""
+        if not self.enabled:
+            return None
+        key = hash_token(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, token: str, claims: Dict[str, Any], user: User) -> None:
+        """缓存验证结果，过期时间取 TTL 与 token exp 中较早者"""
+        if not self.enabled or user.id is None:
+            return
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, datetime):
+            exp = exp.replace(tzinfo=exp.tzinfo or timezone.utc).timestamp()
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        key = hash_token(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedToken(claims=dict(claims), user_snapshot=snapshot, expires_at=expires_at)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_token(self, token: str) -> None:
+        """使单个 token 的缓存失效（登出）"""
+        with self._lock:
+            self._remove(hash_token(token))
+
+    def invalidate_user(self, user_id: int) -> int:
+        """使某个用户的全部缓存失效（登出全部设备、禁用、锁定、角色变更、删除）"""
+        with self._lock:
+            keys = list(self._keys_by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        """移除条目并维护用户索引（调用方需持有锁）"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry.user_snapshot.get("id")
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    enabled=settings.TOKEN_CACHE_ENABLED,
+)
@@ -3,7 +3,7 @@ from app.models.user import User
 from app.models.platform import Platform
 from app.models.project import Project, ProjectStep
 from app.models.attachment import Attachment
-from app.models.todo import Todo
+from app.models.todo import Todo, TodoStep
 from app.models.project_log import ProjectLog
 from app.models.project_part import ProjectPart
 from app.models.github_commit import GitHubCommit
@@ -24,6 +24,7 @@ __all__ = [
     "ProjectStep",
     "Attachment",
     "Todo",
+    "TodoStep",
     "ProjectLog",
     "ProjectPart",
     "GitHubCommit",
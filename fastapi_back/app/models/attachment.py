@@ -4,6 +4,7 @@
 包含数据库表定义和DTO。
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
@@ -28,6 +29,12 @@ class AttachmentType(str, Enum):
 class Attachment(SQLModel, table=True):
     """附件表"""
     __tablename__ = "attachment"
+    __table_args__ = (
+        Index("ix_attachment_project_id_folder_id", "project_id", "folder_id"),
+        Index("ix_attachment_historical_project_id_folder_id", "historical_project_id", "folder_id"),
+        Index("ix_attachment_folder_id", "folder_id"),
+        Index("ix_attachment_blob_sha256", "blob_sha256"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", description="所属项目ID")
@@ -37,6 +44,7 @@ class Attachment(SQLModel, table=True):
     file_type: str = Field(default="其他", description="文件类型")
     description: Optional[str] = Field(default=None, description="文件描述")
     folder_id: Optional[int] = Field(default=None, foreign_key="attachmentfolder.id", description="所属文件夹ID")
+    blob_sha256: Optional[str] = Field(default=None, max_length=64, description="内容摘要（指向 fileblob，旧文件为空）")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     # 关系
@@ -2,10 +2,13 @@
 附件文件夹模型
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import field_validator
 
+from app.models.attachment import AttachmentRead
+
 if TYPE_CHECKING:
     from app.models.project import Project
     from app.models.historical_project import HistoricalProject
@@ -21,6 +24,11 @@ class AttachmentFolderBase(SQLModel):
 
 
 class AttachmentFolder(AttachmentFolderBase, table=True):
+    __table_args__ = (
+        Index("ix_attachmentfolder_project_id_name", "project_id", "name"),
+        Index("ix_attachmentfolder_historical_project_id_name", "historical_project_id", "name"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
@@ -53,4 +61,5 @@ class AttachmentFolderRead(AttachmentFolderBase):
     created_at: datetime
     updated_at: datetime
     attachment_count: Optional[int] = 0  # 附件数量
+    recent_attachments: Optional[List[AttachmentRead]] = None  # 最近上传的附件（按需返回）
 
@@ -0,0 +1,22 @@
+"""
+文件内容块模型（内容寻址存储）
+
+上传的文件按 SHA-256 存放在 uploads/blobs/<前2位>/<3-4位>/<sha256>，
+内容相同的附件共享同一个文件，ref_count 记录引用它的附件数量。
+"""
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class FileBlob(SQLModel, table=True):
+    """文件内容块表"""
+    __tablename__ = "fileblob"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sha256: str = Field(unique=True, index=True, max_length=64, description="文件内容的SHA-256")
+    size: int = Field(description="文件大小（字节）")
+    storage_path: str = Field(description="存储路径")
+    ref_count: int = Field(default=0, description="引用该内容的附件数量")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_ref_at: Optional[datetime] = Field(default_factory=datetime.utcnow, description="最近一次增加引用的时间")
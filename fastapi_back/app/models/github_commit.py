@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
@@ -23,6 +24,9 @@ class GitHubCommitBase(SQLModel):
 class GitHubCommit(GitHubCommitBase, table=True):
     """GitHub Commit数据库模型"""
     __tablename__ = "github_commit"
+    __table_args__ = (
+        Index("ix_github_commit_project_id_branch_commit_date", "project_id", "branch", "commit_date"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
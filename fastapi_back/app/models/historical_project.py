@@ -3,6 +3,7 @@
 支持导入历史项目和文件，兼容现有所有模块
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import field_validator
@@ -18,6 +19,7 @@ if TYPE_CHECKING:
     from app.models.github_commit import GitHubCommit
     from app.models.video_playback import VideoPlayback
     from app.models.tag import HistoricalProjectTag
+    from app.models.project import ProjectStep
 
 
 class HistoricalProjectBase(SQLModel):
@@ -44,6 +46,10 @@ class HistoricalProjectBase(SQLModel):
 class HistoricalProject(HistoricalProjectBase, table=True):
     """历史项目表"""
     __tablename__ = "historicalproject"
+    __table_args__ = (
+        Index("ix_historicalproject_user_id_imported_at", "user_id", "imported_at"),
+        Index("ix_historicalproject_platform_id", "platform_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
@@ -52,6 +58,10 @@ class HistoricalProject(HistoricalProjectBase, table=True):
     # 关系 - 兼容现有所有模块
     platform: Optional["Platform"] = Relationship(back_populates="historical_projects")
     user: "User" = Relationship(back_populates="historical_projects")
+    steps: List["ProjectStep"] = Relationship(
+        back_populates="historical_project",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
     attachments: List["Attachment"] = Relationship(
         back_populates="historical_project",
         sa_relationship_kwargs={"cascade": "all, delete-orphan"}
@@ -3,6 +3,7 @@
 用于审计和安全性监控
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
@@ -33,6 +34,10 @@ class LoginLogBase(SQLModel):
 class LoginLog(LoginLogBase, table=True):
     """登录日志表"""
     __tablename__ = "loginlog"
+    __table_args__ = (
+        Index("ix_loginlog_username_created_at", "username", "created_at"),
+        Index("ix_loginlog_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True, description="创建时间")
@@ -4,6 +4,7 @@
 仅包含数据库表定义，DTO已移至schemas目录。
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 
@@ -18,11 +19,16 @@ if TYPE_CHECKING:
     from app.models.github_commit import GitHubCommit
     from app.models.video_playback import VideoPlayback
     from app.models.tag import ProjectTag
+    from app.models.historical_project import HistoricalProject
 
 
 class Project(SQLModel, table=True):
     """项目表"""
     __tablename__ = "project"
+    __table_args__ = (
+        Index("ix_project_user_id_status", "user_id", "status"),
+        Index("ix_project_platform_id", "platform_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True, max_length=200)
@@ -55,10 +61,15 @@ class Project(SQLModel, table=True):
 class ProjectStep(SQLModel, table=True):
     """项目步骤表"""
     __tablename__ = "projectstep"
+    __table_args__ = (
+        Index("ix_projectstep_project_id_order_index", "project_id", "order_index"),
+        Index("ix_projectstep_historical_project_id", "historical_project_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=100)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id")
+    historical_project_id: Optional[int] = Field(default=None, foreign_key="historicalproject.id", description="所属历史项目ID（项目归档后）")
     order_index: int = Field(default=0)
     status: str = Field(default="待开始")
     is_todo: bool = Field(default=False)
@@ -68,4 +79,5 @@ class ProjectStep(SQLModel, table=True):
 
     # 关系
     project: Optional[Project] = Relationship(back_populates="steps")
+    historical_project: Optional["HistoricalProject"] = Relationship(back_populates="steps")
 
@@ -4,6 +4,8 @@
 包含数据库表定义和DTO。
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
+from pydantic import ConfigDict
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
@@ -42,6 +44,10 @@ class LogAction(str, Enum):
 class ProjectLog(SQLModel, table=True):
     """项目日志表"""
     __tablename__ = "projectlog"
+    __table_args__ = (
+        Index("ix_projectlog_project_id_created_at", "project_id", "created_at"),
+        Index("ix_projectlog_historical_project_id_created_at", "historical_project_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", description="所属项目ID")
@@ -84,9 +90,29 @@ class ProjectLogRead(ProjectLogBase):
         from_attributes = True
 
 
+class ProjectLogDetails(SQLModel):
+    """
+    解析后的日志详细信息
+    
+    各操作类型写入的字段见 ProjectLogService.log_*，未知字段原样保留。
+    """
+    model_config = ConfigDict(extra="allow")
+
+    step_name: Optional[str] = None
+    step_names: Optional[List[str]] = None
+    old_status: Optional[str] = None
+    new_status: Optional[str] = None
+    update_note: Optional[str] = None
+    completion_note: Optional[str] = None
+    snapshot_note: Optional[str] = None
+    attachment_ids: Optional[List[int]] = None
+    photos: Optional[List[str]] = None
+
+
 class ProjectLogReadWithRelations(ProjectLogRead):
     """包含关联的项目日志读取"""
     user_name: Optional[str] = None
+    payload: Optional[ProjectLogDetails] = None  # details 解析结果，无详细信息或格式不正确时为 None
     attachments: List["Attachment"] = []
 
 
@@ -2,6 +2,7 @@
 项目配件清单数据模型
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING, List
 from datetime import datetime
 from pydantic import field_validator
@@ -26,6 +27,11 @@ class ProjectPartBase(SQLModel):
 
 class ProjectPart(ProjectPartBase, table=True):
     """项目配件表"""
+    __table_args__ = (
+        Index("ix_projectpart_project_id", "project_id"),
+        Index("ix_projectpart_historical_project_id", "historical_project_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
@@ -2,6 +2,7 @@
 刷新令牌模型（企业级认证系统）
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, timedelta
 
@@ -22,6 +23,9 @@ class RefreshTokenBase(SQLModel):
 class RefreshToken(RefreshTokenBase, table=True):
     """刷新令牌表"""
     __tablename__ = "refreshtoken"
+    __table_args__ = (
+        Index("ix_refreshtoken_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
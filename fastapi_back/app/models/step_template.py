@@ -2,6 +2,7 @@
 项目步骤模板数据模型
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import field_validator
@@ -37,6 +38,10 @@ class StepTemplateItemBase(SQLModel):
 
 
 class StepTemplateItem(StepTemplateItemBase, table=True):
+    __table_args__ = (
+        Index("ix_steptemplateitem_template_id_order_index", "template_id", "order_index"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # 关系
@@ -4,6 +4,7 @@
 包含数据库表定义和DTO。
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime
 from pydantic import field_validator
@@ -17,6 +18,9 @@ if TYPE_CHECKING:
 class Tag(SQLModel, table=True):
     """标签表"""
     __tablename__ = "tag"
+    __table_args__ = (
+        Index("ix_tag_user_id", "user_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(unique=True, index=True, max_length=50, description="标签名称")
@@ -37,6 +41,10 @@ class Tag(SQLModel, table=True):
 class ProjectTag(SQLModel, table=True):
     """项目标签关联表"""
     __tablename__ = "projecttag"
+    __table_args__ = (
+        Index("ix_projecttag_project_id_tag_id", "project_id", "tag_id"),
+        Index("ix_projecttag_tag_id", "tag_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: int = Field(foreign_key="project.id", description="项目ID")
@@ -51,6 +59,10 @@ class ProjectTag(SQLModel, table=True):
 class HistoricalProjectTag(SQLModel, table=True):
     """历史项目标签关联表"""
     __tablename__ = "historicalprojecttag"
+    __table_args__ = (
+        Index("ix_historicalprojecttag_historical_project_id_tag_id", "historical_project_id", "tag_id"),
+        Index("ix_historicalprojecttag_tag_id", "tag_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     historical_project_id: int = Field(foreign_key="historicalproject.id", description="历史项目ID")
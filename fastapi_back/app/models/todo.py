@@ -4,6 +4,7 @@
 包含数据库表定义和DTO。
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date
 from pydantic import field_validator
@@ -16,12 +17,18 @@ if TYPE_CHECKING:
 class Todo(SQLModel, table=True):
     """待办表"""
     __tablename__ = "todo"
+    __table_args__ = (
+        Index("ix_todo_target_date", "target_date"),
+        Index("ix_todo_created_at", "created_at"),
+        Index("ix_todo_project_id", "project_id"),
+        Index("ix_todo_historical_project_id", "historical_project_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id", description="所属项目ID")
     historical_project_id: Optional[int] = Field(default=None, foreign_key="historicalproject.id", description="所属历史项目ID")
     description: str = Field(description="待办描述")
-    step_ids: str = Field(description="步骤ID列表，JSON格式字符串")
+    step_ids: str = Field(description="步骤ID列表，JSON格式字符串（写入后同步到 todo_step 关联表）")
     completion_note: Optional[str] = Field(default=None, description="完成说明")
     is_completed: bool = Field(default=False, description="是否已完成")
     target_date: Optional[datetime] = Field(default=None, description="目标日期")
@@ -33,6 +40,20 @@ class Todo(SQLModel, table=True):
     historical_project: Optional["HistoricalProject"] = Relationship(back_populates="todos")
 
 
+class TodoStep(SQLModel, table=True):
+    """待办-步骤关联表（由 Todo.step_ids 同步，用于联表查询）"""
+    __tablename__ = "todo_step"
+    __table_args__ = (
+        Index("ix_todo_step_todo_id_position", "todo_id", "position"),
+        Index("ix_todo_step_step_id", "step_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    todo_id: int = Field(foreign_key="todo.id", description="待办ID")
+    step_id: int = Field(foreign_key="projectstep.id", description="步骤ID")
+    position: int = Field(default=0, description="在 step_ids 中的顺序")
+
+
 # DTO类（保持向后兼容）
 class TodoBase(SQLModel):
     """待办基础模型"""
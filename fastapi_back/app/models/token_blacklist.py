@@ -1,6 +1,8 @@
 """
 Token黑名单模型（企业级认证系统）
 用于撤销已签发的token
+
+只保存 token 的 SHA-256 摘要（固定64字符），不保存原始 JWT。
 """
 from sqlmodel import SQLModel, Field
 from typing import Optional
@@ -9,8 +11,8 @@ from datetime import datetime
 
 class TokenBlacklistBase(SQLModel):
     """Token黑名单基础模型"""
-    token: str = Field(unique=True, index=True, description="被撤销的token")
-    expires_at: datetime = Field(description="token过期时间")
+    token_hash: str = Field(unique=True, index=True, max_length=64, description="被撤销token的SHA-256摘要")
+    expires_at: datetime = Field(index=True, description="token过期时间")
 
 
 class TokenBlacklist(TokenBlacklistBase, table=True):
@@ -23,8 +25,7 @@ class TokenBlacklist(TokenBlacklistBase, table=True):
 
 
 class TokenBlacklistCreate(SQLModel):
-    """创建黑名单记录"""
+    """创建黑名单记录（传入原始token，入库前计算摘要）"""
     token: str
     expires_at: datetime
     reason: Optional[str] = None
-
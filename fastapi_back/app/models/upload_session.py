@@ -0,0 +1,120 @@
+"""
+分片上传会话模型（断点续传）
+
+客户端先创建上传会话，再按编号逐个上传分片（带 SHA-256 校验，可重复上传），
+随时可以查询已接收的分片以便续传，全部上传后调用完成接口生成附件或视频记录。
+"""
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, UniqueConstraint
+from typing import Optional, List, Literal
+from datetime import datetime
+from enum import Enum
+
+
+class UploadTarget(str, Enum):
+    """上传完成后创建的记录类型"""
+    ATTACHMENT = "attachment"
+    VIDEO = "video"
+
+
+class UploadStatus(str, Enum):
+    """上传会话状态"""
+    UPLOADING = "uploading"
+    COMPLETING = "completing"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+
+class UploadSessionBase(SQLModel):
+    """上传会话基础模型"""
+    target: str = Field(description="上传目标：attachment / video")
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id", description="所属项目ID")
+    historical_project_id: Optional[int] = Field(default=None, foreign_key="historicalproject.id", description="所属历史项目ID（仅附件）")
+    folder_id: Optional[int] = Field(default=None, description="附件文件夹ID")
+    file_name: str = Field(description="原始文件名")
+    file_type: str = Field(default="其他", description="附件文件类型")
+    title: Optional[str] = Field(default=None, description="视频标题")
+    description: Optional[str] = Field(default=None, description="描述")
+    total_size: int = Field(description="文件总大小（字节）")
+    chunk_size: int = Field(description="分片大小（字节），最后一个分片可以更小")
+
+
+class UploadSession(UploadSessionBase, table=True):
+    """上传会话表"""
+    __tablename__ = "uploadsession"
+    __table_args__ = (
+        Index("ix_uploadsession_status_expires_at", "status", "expires_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    upload_id: str = Field(unique=True, index=True, max_length=32, description="上传会话标识")
+    user_id: int = Field(foreign_key="user.id", index=True, description="创建者用户ID")
+    status: str = Field(default=UploadStatus.UPLOADING, description="会话状态")
+    result_id: Optional[int] = Field(default=None, description="完成后创建的附件或视频ID")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(description="过期时间")
+
+    chunks: List["UploadChunk"] = Relationship(
+        back_populates="upload_session", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
+
+    @property
+    def total_chunks(self) -> int:
+        """分片总数（空文件也占一个分片）"""
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index: int) -> int:
+        """第 index 个分片应有的大小"""
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
+
+
+class UploadChunk(SQLModel, table=True):
+    """已接收的分片（每个分片一行，重复上传同一分片只更新该行）"""
+    __tablename__ = "uploadchunk"
+    __table_args__ = (
+        UniqueConstraint("upload_session_id", "chunk_index", name="uq_uploadchunk_session_index"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    upload_session_id: int = Field(foreign_key="uploadsession.id", description="上传会话ID")
+    chunk_index: int = Field(description="分片编号（从0开始）")
+    size: int = Field(description="分片大小（字节）")
+    sha256: str = Field(max_length=64, description="分片内容的SHA-256")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    upload_session: Optional[UploadSession] = Relationship(back_populates="chunks")
+
+
+# DTO类
+class UploadSessionCreate(SQLModel):
+    """创建上传会话"""
+    target: Literal["attachment", "video"] = "attachment"
+    project_id: Optional[int] = None
+    historical_project_id: Optional[int] = None
+    folder_id: Optional[int] = None
+    file_name: str = Field(min_length=1, max_length=255)
+    file_type: str = "其他"
+    title: Optional[str] = None
+    description: Optional[str] = None
+    total_size: int = Field(ge=0)
+    chunk_size: Optional[int] = Field(default=None, gt=0)
+
+
+class UploadSessionComplete(SQLModel):
+    """完成上传（可选整文件校验）"""
+    sha256: Optional[str] = Field(default=None, min_length=64, max_length=64)
+
+
+class UploadSessionRead(UploadSessionBase):
+    """上传会话状态"""
+    upload_id: str
+    status: str
+    total_chunks: int
+    received_chunks: List[int] = []
+    received_bytes: int = 0
+    offset: int = 0  # 从文件开头起连续接收的字节数（可从此处续传）
+    result_id: Optional[int] = None
+    created_at: datetime
+    expires_at: datetime
@@ -2,6 +2,7 @@
 视频回放插件数据模型
 """
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime, timedelta
 from enum import Enum
@@ -36,6 +37,9 @@ class VideoPlaybackBase(SQLModel):
 class VideoPlayback(VideoPlaybackBase, table=True):
     """视频回放表"""
     __tablename__ = "videoplayback"
+    __table_args__ = (
+        Index("ix_videoplayback_project_id", "project_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -62,6 +66,9 @@ class VideoPlaybackLinkBase(SQLModel):
 class VideoPlaybackLink(VideoPlaybackLinkBase, table=True):
     """视频观看链接表"""
     __tablename__ = "videoplaybacklink"
+    __table_args__ = (
+        Index("ix_videoplaybacklink_video_id", "video_id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     token: str = Field(unique=True, index=True, description="访问令牌（唯一标识）")
@@ -88,6 +95,10 @@ class VideoPlaybackStatBase(SQLModel):
 class VideoPlaybackStat(VideoPlaybackStatBase, table=True):
     """视频观看统计表"""
     __tablename__ = "videoplaybackstat"
+    __table_args__ = (
+        Index("ix_videoplaybackstat_video_id_watched_at", "video_id", "watched_at"),
+        Index("ix_videoplaybackstat_link_id_watched_at", "link_id", "watched_at"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     watched_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,245 @@
+"""
+异步数据访问层基类
+
+与 BaseRepository 提供相同的通用CRUD操作，基于 AsyncSession，
+查询在事件循环中等待 I/O，不阻塞同一 worker 上的其他请求。
+
+注意：异步会话不支持隐式懒加载，关联数据需显式查询（或使用 selectinload）。
+
+使用示例:
+    class AsyncProjectRepository(AsyncBaseRepository[Project]):
+        def __init__(self, session: AsyncSession):
+            super().__init__(session, Project)
+
+        async def list_by_user(self, user_id: int) -> List[Project]:
+            result = await self.session.exec(
+                select(Project).where(Project.user_id == user_id)
+            )
+            return list(result.all())
+"""
+from typing import Generic, Optional, List, Type, Dict, Any
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+import logging
+
+from app.repositories.base import ModelType
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """
+    异步数据访问层基类
+
+    方法与 BaseRepository 一一对应（均为协程），子类可以扩展或覆盖这些方法。
+
+    Type Parameters:
+        ModelType: SQLModel模型类型
+
+    Attributes:
+        session: 异步数据库会话
+        model: 模型类
+    """
+
+    def __init__(self, session: AsyncSession, model: Type[ModelType]):
+        """
+        初始化Repository
+
+        Args:
+            session: 异步数据库会话
+            model: 模型类
+        """
+        self.session = session
+        self.model = model
+
+    async def get_by_id(self, id: int) -> Optional[ModelType]:
+        """
+        根据ID获取单个实体
+
+        Example:
+            project = await repo.get_by_id(1)
+        """
+        try:
+            return await self.session.get(self.model, id)
+        except Exception as e:
+            logger.error(f"获取{self.model.__name__}失败, id={id}: {e}")
+            return None
+
+    async def get_by_ids(self, ids: List[int]) -> List[ModelType]:
+        """
+        根据ID列表获取多个实体
+
+        Example:
+            projects = await repo.get_by_ids([1, 2, 3])
+        """
+        if not ids:
+            return []
+        try:
+            result = await self.session.exec(
+                select(self.model).where(self.model.id.in_(ids))
+            )
+            return list(result.all())
+        except Exception as e:
+            logger.error(f"批量获取{self.model.__name__}失败, ids={ids}: {e}")
+            return []
+
+    async def list_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Optional[str] = None
+    ) -> List[ModelType]:
+        """
+        获取所有实体
+
+        Example:
+            projects = await repo.list_all(skip=0, limit=10)
+        """
+        try:
+            query = select(self.model).offset(skip).limit(limit)
+            if order_by:
+                column = getattr(self.model, order_by, None)
+                if column is not None:
+                    query = query.order_by(column)
+            result = await self.session.exec(query)
+            return list(result.all())
+        except Exception as e:
+            logger.error(f"获取{self.model.__name__}列表失败: {e}")
+            return []
+
+    async def create(self, entity: ModelType) -> ModelType:
+        """
+        创建实体
+
+        Example:
+            new_project = await repo.create(Project(title="新项目"))
+        """
+        try:
+            self.session.add(entity)
+            await self.session.commit()
+            await self.session.refresh(entity)
+            logger.info(f"创建{self.model.__name__}成功, id={entity.id}")
+            return entity
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"创建{self.model.__name__}失败: {e}")
+            raise
+
+    async def update(self, entity: ModelType, data: Dict[str, Any]) -> ModelType:
+        """
+        更新实体
+
+        Example:
+            project = await repo.update(project, {"title": "新标题"})
+        """
+        try:
+            for field, value in data.items():
+                if hasattr(entity, field):
+                    setattr(entity, field, value)
+            self.session.add(entity)
+            await self.session.commit()
+            await self.session.refresh(entity)
+            logger.info(f"更新{self.model.__name__}成功, id={entity.id}")
+            return entity
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"更新{self.model.__name__}失败, id={entity.id}: {e}")
+            raise
+
+    async def delete(self, entity: ModelType) -> bool:
+        """
+        删除实体
+
+        Example:
+            await repo.delete(project)
+        """
+        try:
+            await self.session.delete(entity)
+            await self.session.commit()
+            logger.info(f"删除{self.model.__name__}成功, id={entity.id}")
+            return True
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"删除{self.model.__name__}失败, id={entity.id}: {e}")
+            return False
+
+    async def delete_by_id(self, id: int) -> bool:
+        """
+        根据ID删除实体
+
+        Example:
+            await repo.delete_by_id(1)
+        """
+        entity = await self.get_by_id(id)
+        if entity is None:
+            return False
+        return await self.delete(entity)
+
+    async def exists(self, id: int) -> bool:
+        """
+        检查实体是否存在
+
+        Example:
+            if await repo.exists(1):
+                print("存在")
+        """
+        return await self.get_by_id(id) is not None
+
+    async def count(self, **filters) -> int:
+        """
+        统计实体数量
+
+        Example:
+            count = await repo.count(status="active")
+        """
+        try:
+            query = select(func.count()).select_from(self.model)
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+            result = await self.session.exec(query)
+            return result.one() or 0
+        except Exception as e:
+            logger.error(f"统计{self.model.__name__}数量失败: {e}")
+            return 0
+
+    async def find_one(self, **filters) -> Optional[ModelType]:
+        """
+        根据条件查找单个实体
+
+        Example:
+            user = await repo.find_one(username="admin")
+        """
+        try:
+            query = select(self.model)
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+            result = await self.session.exec(query.limit(1))
+            return result.first()
+        except Exception as e:
+            logger.error(f"查找{self.model.__name__}失败: {e}")
+            return None
+
+    async def find_many(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        **filters
+    ) -> List[ModelType]:
+        """
+        根据条件查找多个实体
+
+        Example:
+            projects = await repo.find_many(skip=0, limit=10, status="active")
+        """
+        try:
+            query = select(self.model)
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+            result = await self.session.exec(query.offset(skip).limit(limit))
+            return list(result.all())
+        except Exception as e:
+            logger.error(f"查找{self.model.__name__}列表失败: {e}")
+            return []
@@ -1,7 +1,7 @@
 """
 附件文件夹数据访问层
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from sqlmodel import Session, select
 from app.models.attachment_folder import AttachmentFolder, AttachmentFolderCreate, AttachmentFolderUpdate
 
@@ -30,6 +30,16 @@ class AttachmentFolderRepository:
         """根据ID获取文件夹"""
         return self.session.get(AttachmentFolder, folder_id)
     
+    def get_name_map(self, folder_ids: Iterable[int]) -> Dict[int, str]:
+        """批量获取文件夹名称（一次 IN 查询）"""
+        ids = list(set(folder_ids))
+        if not ids:
+            return {}
+        rows = self.session.exec(
+            select(AttachmentFolder.id, AttachmentFolder.name).where(AttachmentFolder.id.in_(ids))
+        ).all()
+        return dict(rows)
+    
     def list_by_project(self, project_id: int) -> List[AttachmentFolder]:
         """获取项目的所有文件夹"""
         query = select(AttachmentFolder).where(AttachmentFolder.project_id == project_id)
@@ -3,8 +3,8 @@
 
 重构后继承 BaseRepository。
 """
-from typing import Optional, List
-from sqlmodel import Session, select
+from typing import Optional, List, Dict
+from sqlmodel import Session, select, func
 
 from app.repositories.base import BaseRepository
 from app.models.attachment import Attachment
@@ -25,7 +25,8 @@ class AttachmentRepository(BaseRepository[Attachment]):
         file_name: str = None,
         file_type: str = None,
         description: Optional[str] = None,
-        folder_id: Optional[int] = None
+        folder_id: Optional[int] = None,
+        blob_sha256: Optional[str] = None
     ) -> Attachment:
         """创建附件记录"""
         attachment = Attachment(
@@ -35,7 +36,8 @@ class AttachmentRepository(BaseRepository[Attachment]):
             file_name=file_name,
             file_type=file_type or "其他",
             description=description,
-            folder_id=folder_id
+            folder_id=folder_id,
+            blob_sha256=blob_sha256
         )
         return super().create(attachment)
 
@@ -46,3 +48,85 @@ class AttachmentRepository(BaseRepository[Attachment]):
     def list_by_historical_project(self, historical_project_id: int) -> List[Attachment]:
         """获取历史项目的所有附件"""
         return self.find_many(historical_project_id=historical_project_id)
+
+    def list_by_folder(self, folder_id: int) -> List[Attachment]:
+        """获取文件夹中的所有附件"""
+        return list(self.session.exec(
+            select(Attachment).where(Attachment.folder_id == folder_id).order_by(Attachment.id)
+        ).all())
+
+    def list_without_blob(self, after_id: int = 0, limit: int = 500) -> List[Attachment]:
+        """按 ID 分批获取尚未移入内容寻址存储的附件"""
+        return list(self.session.exec(
+            select(Attachment)
+            .where(Attachment.blob_sha256.is_(None), Attachment.id > after_id)
+            .order_by(Attachment.id)
+            .limit(limit)
+        ).all())
+
+    @staticmethod
+    def _owner_condition(project_id: Optional[int], historical_project_id: Optional[int]):
+        if project_id is not None:
+            return Attachment.project_id == project_id
+        return Attachment.historical_project_id == historical_project_id
+
+    def count_by_folder(
+        self,
+        project_id: Optional[int] = None,
+        historical_project_id: Optional[int] = None
+    ) -> Dict[Optional[int], int]:
+        """
+        统计项目（或历史项目）各文件夹的附件数量（一次 GROUP BY 查询）
+
+        Returns:
+            folder_id -> 数量；未归入文件夹的附件计入 None
+        """
+        rows = self.session.exec(
+            select(Attachment.folder_id, func.count(Attachment.id))
+            .where(self._owner_condition(project_id, historical_project_id))
+            .group_by(Attachment.folder_id)
+        ).all()
+        return dict(rows)
+
+    def list_recent_by_folder(
+        self,
+        limit_per_folder: int,
+        project_id: Optional[int] = None,
+        historical_project_id: Optional[int] = None,
+        null_folder_id: Optional[int] = None
+    ) -> Dict[Optional[int], List[Attachment]]:
+        """
+        获取项目（或历史项目）每个文件夹最近上传的若干附件（ROW_NUMBER 窗口函数，一次查询）
+
+        Args:
+            limit_per_folder: 每个文件夹返回的数量
+            null_folder_id: 未归入文件夹的附件视为属于该文件夹（"其他"）
+
+        Returns:
+            folder_id -> 按上传时间倒序的附件列表
+        """
+        folder_key = Attachment.folder_id
+        if null_folder_id is not None:
+            folder_key = func.coalesce(Attachment.folder_id, null_folder_id)
+        ranked = (
+            select(
+                Attachment.id.label("id"),
+                folder_key.label("folder_key"),
+                func.row_number().over(
+                    partition_by=folder_key,
+                    order_by=(Attachment.created_at.desc(), Attachment.id.desc())
+                ).label("position")
+            )
+            .where(self._owner_condition(project_id, historical_project_id))
+            .subquery()
+        )
+        rows = self.session.exec(
+            select(Attachment, ranked.c.folder_key)
+            .join(ranked, ranked.c.id == Attachment.id)
+            .where(ranked.c.position <= limit_per_folder)
+            .order_by(ranked.c.folder_key, ranked.c.position)
+        ).all()
+        result: Dict[Optional[int], List[Attachment]] = {}
+        for attachment, key in rows:
+            result.setdefault(key, []).append(attachment)
+        return result
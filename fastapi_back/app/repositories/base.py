@@ -18,6 +18,8 @@ from typing import Generic, TypeVar, Optional, List, Type, Dict, Any
 from sqlmodel import Session, select, SQLModel
 import logging
 
+from app.repositories.pagination import Page, keyset_paginate
+
 logger = logging.getLogger(__name__)
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
@@ -121,6 +123,39 @@ class BaseRepository(Generic[ModelType]):
             logger.error(f"获取{self.model.__name__}列表失败: {e}")
             return []
 
+    def paginate(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        sort_column: Any = None,
+        descending: bool = True,
+        query: Any = None,
+        **filters
+    ) -> Page[ModelType]:
+        """
+        游标分页获取实体（按 (sort_column, id) 定位，不使用 OFFSET）
+
+        Args:
+            cursor: 上一页返回的 next_cursor，首页不传
+            limit: 每页数量
+            sort_column: 排序列（不可为空），默认只按 id 排序
+            descending: 是否倒序
+            query: 自定义的未排序查询（包含过滤条件），不传时按 filters 等值过滤
+            **filters: 过滤条件
+
+        Returns:
+            Page（items 和 next_cursor）
+
+        Example:
+            page = repo.paginate(cursor, limit=50, sort_column=Project.created_at, user_id=1)
+        """
+        if query is None:
+            query = select(self.model)
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+        return keyset_paginate(self.session, query, sort_column, self.model.id, cursor, limit, descending)
+
     def create(self, entity: ModelType) -> ModelType:
         """
         创建实体
@@ -0,0 +1,39 @@
+"""
+文件内容块数据访问层
+
+引用计数使用单条 UPDATE 语句原子增减，避免并发上传/删除时丢失更新。
+"""
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Session, delete, select, update
+from app.models.file_blob import FileBlob
+from app.repositories.base import BaseRepository
+
+
+class FileBlobRepository(BaseRepository[FileBlob]):
+    """文件内容块数据访问层"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, FileBlob)
+
+    def get_by_sha256(self, sha256: str) -> Optional[FileBlob]:
+        """根据内容摘要获取"""
+        return self.session.exec(select(FileBlob).where(FileBlob.sha256 == sha256)).first()
+
+    def add_references(self, sha256: str, delta: int) -> Optional[int]:
+        """增减引用计数，返回更新后的计数（记录不存在时返回 None）"""
+        values = {"ref_count": FileBlob.ref_count + delta}
+        if delta > 0:
+            # 记录最近引用时间，对账时跳过刚被引用、附件记录可能尚未写入的内容块
+            values["last_ref_at"] = datetime.utcnow()
+        self.session.exec(update(FileBlob).where(FileBlob.sha256 == sha256).values(**values))
+        self.session.commit()
+        return self.session.exec(select(FileBlob.ref_count).where(FileBlob.sha256 == sha256)).first()
+
+    def delete_if_unreferenced(self, sha256: str) -> bool:
+        """引用计数不大于 0 时删除记录，返回是否删除（期间被重新引用时不删除）"""
+        result = self.session.exec(
+            delete(FileBlob).where(FileBlob.sha256 == sha256, FileBlob.ref_count <= 0)
+        )
+        self.session.commit()
+        return result.rowcount > 0
@@ -5,6 +5,7 @@ from typing import Optional, List
 from sqlmodel import Session, select, and_
 from datetime import datetime
 from app.models.github_commit import GitHubCommit, GitHubCommitCreate, GitHubCommitUpdate
+from app.repositories.pagination import Page, keyset_paginate
 
 
 class GitHubCommitRepository:
@@ -54,6 +55,22 @@ class GitHubCommitRepository:
         
         return list(self.session.exec(statement).all())
     
+    def get_page_by_project_and_branch(
+        self,
+        project_id: int,
+        branch: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Page[GitHubCommit]:
+        """游标分页获取项目分支的Commits（按提交时间倒序）"""
+        statement = select(GitHubCommit).where(
+            and_(
+                GitHubCommit.project_id == project_id,
+                GitHubCommit.branch == branch
+            )
+        )
+        return keyset_paginate(self.session, statement, GitHubCommit.commit_date, GitHubCommit.id, cursor, limit)
+    
     def get_latest_sync_time(self, project_id: int, branch: str) -> Optional[datetime]:
         """获取最新的同步时间"""
         statement = select(GitHubCommit).where(
@@ -1,9 +1,18 @@
 """
 历史项目数据访问层
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy import delete, insert, literal, literal_column, update
 from sqlmodel import Session, select, func
 from app.models.historical_project import HistoricalProject, HistoricalProjectCreate
+from app.repositories.pagination import Page, count_cache, keyset_paginate
+from app.repositories.search_index import (
+    FTS_TABLE, HistoricalProjectSearchIndex, build_match_query, fts_table, ranked_matches, search_index_available
+)
+
+# 总数缓存的命名空间
+COUNT_CACHE_NAMESPACE = "historicalproject"
 
 
 class HistoricalProjectRepository:
@@ -19,28 +28,44 @@ class HistoricalProjectRepository:
         project = HistoricalProject(**project_dict)
         self.session.add(project)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         self.session.refresh(project)
         return project
     
     def get_by_id(self, project_id: int) -> Optional[HistoricalProject]:
         """根据ID获取历史项目"""
         return self.session.get(HistoricalProject, project_id)
+
+    def get_by_ids(self, project_ids: List[int]) -> List[HistoricalProject]:
+        """批量获取历史项目（一次 IN 查询），不存在的ID会被忽略"""
+        if not project_ids:
+            return []
+        return list(self.session.exec(
+            select(HistoricalProject).where(HistoricalProject.id.in_(project_ids))
+        ).all())
     
-    def list(
+    def get_owner_map(self, project_ids: Iterable[int]) -> Dict[int, int]:
+        """批量获取历史项目所有者（一次 IN 查询，只取 id 和 user_id），不存在的项目不在结果中"""
+        ids = list(set(project_ids))
+        if not ids:
+            return {}
+        rows = self.session.exec(
+            select(HistoricalProject.id, HistoricalProject.user_id).where(HistoricalProject.id.in_(ids))
+        ).all()
+        return dict(rows)
+    
+    def _filtered_query(
         self,
-        skip: int = 0,
-        limit: int = 100,
+        query,
         search: Optional[str] = None,
         user_id: Optional[int] = None,
         platform_id: Optional[int] = None,
         status: Optional[str] = None,
         tag_ids: Optional[List[int]] = None
-    ) -> List[HistoricalProject]:
-        """获取历史项目列表（支持搜索和筛选）"""
+    ):
+        """为查询添加搜索和筛选条件（list、count 和游标分页共用）"""
         from app.models.tag import HistoricalProjectTag
         
-        query = select(HistoricalProject)
-        
         if user_id is not None:
             query = query.where(HistoricalProject.user_id == user_id)
         
@@ -51,31 +76,81 @@ class HistoricalProjectRepository:
             query = query.where(HistoricalProject.status == status)
         
         if search:
-            # 搜索标题、学生姓名、需求描述
-            search_filter = (
-                HistoricalProject.title.contains(search) |
-                HistoricalProject.student_name.contains(search) |
-                HistoricalProject.requirements.contains(search)
-            )
-            query = query.where(search_filter)
+            match_query = self._match_query(search)
+            if match_query:
+                # 全文检索索引（标题、学生姓名、需求描述、备注、标签名）
+                query = query.where(
+                    HistoricalProject.id.in_(
+                        select(fts_table.c.rowid).where(literal_column(FTS_TABLE).op("MATCH")(match_query))
+                    )
+                )
+            else:
+                # 搜索标题、学生姓名、需求描述、备注
+                search_filter = (
+                    HistoricalProject.title.contains(search) |
+                    HistoricalProject.student_name.contains(search) |
+                    HistoricalProject.requirements.contains(search) |
+                    HistoricalProject.notes.contains(search)
+                )
+                query = query.where(search_filter)
         
-        # 标签筛选
+        # 标签筛选（子查询，不在内存中展开项目ID）
         if tag_ids:
-            # 找到有这些标签的项目ID
-            project_ids_result = self.session.exec(
-                select(HistoricalProjectTag.historical_project_id).where(
-                    HistoricalProjectTag.tag_id.in_(tag_ids)
-                ).distinct()
-            ).all()
-            project_ids_list = list(project_ids_result)
-            if project_ids_list:
-                query = query.where(HistoricalProject.id.in_(project_ids_list))
-            else:
-                # 如果没有项目匹配，返回空结果
-                query = query.where(HistoricalProject.id == -1)  # 不存在的ID，确保返回空
+            query = query.where(
+                HistoricalProject.id.in_(
+                    select(HistoricalProjectTag.historical_project_id).where(
+                        HistoricalProjectTag.tag_id.in_(tag_ids)
+                    )
+                )
+            )
         
-        query = query.order_by(HistoricalProject.imported_at.desc()).offset(skip).limit(limit)
-        return list(self.session.exec(query).all())
+        return query
+    
+    def _match_query(self, search: str) -> Optional[str]:
+        """全文检索表达式；索引不可用或输入无可检索字符时返回 None（回退到 LIKE）"""
+        match_query = build_match_query(search)
+        if match_query and search_index_available(self.session):
+            return match_query
+        return None
+    
+    def list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None
+    ) -> List[HistoricalProject]:
+        """获取历史项目列表（支持搜索和筛选；使用全文检索时按相关度排序）"""
+        match_query = self._match_query(search) if search else None
+        if match_query:
+            ranked = ranked_matches(match_query)
+            query = self._filtered_query(select(HistoricalProject), None, user_id, platform_id, status, tag_ids)
+            query = query.join(ranked, ranked.c.rowid == HistoricalProject.id).order_by(
+                ranked.c.rank, HistoricalProject.imported_at.desc(), HistoricalProject.id.desc()
+            )
+        else:
+            query = self._filtered_query(select(HistoricalProject), search, user_id, platform_id, status, tag_ids)
+            query = query.order_by(HistoricalProject.imported_at.desc(), HistoricalProject.id.desc())
+        return list(self.session.exec(query.offset(skip).limit(limit)).all())
+    
+    def list_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        search: Optional[str] = None,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None
+    ) -> Page[HistoricalProject]:
+        """游标分页获取历史项目列表（按导入时间倒序）"""
+        query = self._filtered_query(select(HistoricalProject), search, user_id, platform_id, status, tag_ids)
+        return keyset_paginate(
+            self.session, query, HistoricalProject.imported_at, HistoricalProject.id, cursor, limit
+        )
     
     def count(
         self,
@@ -85,43 +160,42 @@ class HistoricalProjectRepository:
         status: Optional[str] = None,
         tag_ids: Optional[List[int]] = None
     ) -> int:
-        """获取历史项目总数"""
-        from app.models.tag import HistoricalProjectTag
-        
-        query = select(func.count(HistoricalProject.id))
-        
-        if user_id is not None:
-            query = query.where(HistoricalProject.user_id == user_id)
-        
-        if platform_id is not None:
-            query = query.where(HistoricalProject.platform_id == platform_id)
-        
-        if status is not None:
-            query = query.where(HistoricalProject.status == status)
+        """获取历史项目总数（按筛选条件缓存，写操作后失效）"""
+        key = (
+            COUNT_CACHE_NAMESPACE, search or None, user_id, platform_id, status,
+            tuple(sorted(set(tag_ids))) if tag_ids else None
+        )
         
-        if search:
-            search_filter = (
-                HistoricalProject.title.contains(search) |
-                HistoricalProject.student_name.contains(search) |
-                HistoricalProject.requirements.contains(search)
+        def compute() -> int:
+            query = self._filtered_query(
+                select(func.count(HistoricalProject.id)), search, user_id, platform_id, status, tag_ids
             )
-            query = query.where(search_filter)
-        
-        # 标签筛选
-        if tag_ids:
-            project_ids_result = self.session.exec(
-                select(HistoricalProjectTag.historical_project_id).where(
-                    HistoricalProjectTag.tag_id.in_(tag_ids)
-                ).distinct()
-            ).all()
-            project_ids_list = list(project_ids_result)
-            if project_ids_list:
-                query = query.where(HistoricalProject.id.in_(project_ids_list))
-            else:
-                # 如果没有项目匹配，返回空结果
-                query = query.where(HistoricalProject.id == -1)  # 不存在的ID，确保返回空
+            return self.session.exec(query).one()
         
-        return self.session.exec(query).one()
+        return count_cache.get_or_compute(key, compute)
+    
+    def bulk_insert(self, rows: List[dict], user_id: int) -> List[int]:
+        """
+        批量插入历史项目（一条 executemany 语句，不提交事务）
+
+        绕过 ORM，调用方需自行同步全文检索索引并在提交后使总数缓存失效。
+
+        Args:
+            rows: 历史项目字段（HistoricalProjectCreate 校验后的数据）
+            user_id: 创建人ID
+
+        Returns:
+            新建记录的ID，与 rows 顺序一致
+        """
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        values = [
+            {**row, "user_id": user_id, "imported_at": now, "created_at": now, "updated_at": now}
+            for row in rows
+        ]
+        statement = insert(HistoricalProject).returning(HistoricalProject.id, sort_by_parameter_order=True)
+        return list(self.session.connection().execute(statement, values).scalars())
     
     def update(self, project: HistoricalProject, update_data: dict) -> HistoricalProject:
         """更新历史项目信息"""
@@ -129,6 +203,7 @@ class HistoricalProjectRepository:
             setattr(project, field, value)
         self.session.add(project)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         self.session.refresh(project)
         return project
     
@@ -136,20 +211,12 @@ class HistoricalProjectRepository:
         """删除历史项目"""
         self.session.delete(project)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
     
-    def import_from_project(self, project_id: int, user_id: int) -> Optional[HistoricalProject]:
-        """从现有项目导入为历史项目"""
-        from app.models.project import Project
-        from app.repositories.project_repository import ProjectRepository
-        
-        project_repo = ProjectRepository(self.session)
-        original_project = project_repo.get_by_id(project_id)
-        
-        if not original_project:
-            return None
-        
-        # 创建历史项目
-        historical_project = HistoricalProject(
+    @staticmethod
+    def _from_project(original_project, user_id: int, import_source: str) -> HistoricalProject:
+        """以项目的字段构建历史项目"""
+        return HistoricalProject(
             title=original_project.title,
             student_name=original_project.student_name,
             platform_id=original_project.platform_id,
@@ -160,14 +227,108 @@ class HistoricalProjectRepository:
             github_url=original_project.github_url,
             requirements=original_project.requirements,
             is_paid=original_project.is_paid,
-            original_project_id=project_id,
-            import_source="从项目导入",
+            original_project_id=original_project.id,
+            import_source=import_source,
             completion_date=original_project.updated_at
         )
+    
+    def import_from_project(self, project_id: int, user_id: int) -> Optional[HistoricalProject]:
+        """从现有项目导入为历史项目"""
+        from app.repositories.project_repository import ProjectRepository
+        
+        project_repo = ProjectRepository(self.session)
+        original_project = project_repo.get_by_id(project_id)
+        
+        if not original_project:
+            return None
+        
+        # 创建历史项目
+        historical_project = self._from_project(original_project, user_id, "从项目导入")
         
         self.session.add(historical_project)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
+        self.session.refresh(historical_project)
+        
+        return historical_project
+    
+    def archive_project(self, project_id: int) -> Optional[HistoricalProject]:
+        """
+        将项目连同全部关联数据移动为历史项目（单个事务）
+        
+        步骤、附件、文件夹、待办、日志、部件、提交记录、视频和附件上传会话通过
+        每张表一条 UPDATE ... SET historical_project_id = ?, project_id = NULL 整体改挂，
+        标签关联以 INSERT ... SELECT 转存；记录和文件都不复制（ID、文件路径、内容块引用计数不变），
+        最后删除原项目。耗时与关联数据量基本无关。
+        
+        Returns:
+            新建的历史项目；项目不存在时返回 None
+        """
+        from app.models.project import Project
+        from app.models.tag import HistoricalProjectTag, ProjectTag
+        
+        original_project = self.session.get(Project, project_id)
+        if not original_project:
+            return None
+        
+        historical_project = self._from_project(original_project, original_project.user_id, "项目归档")
+        connection = self.session.connection()
+        try:
+            self.session.add(historical_project)
+            self.session.flush()
+            historical_project_id = historical_project.id
+            
+            for model, condition in _archive_moves():
+                connection.execute(
+                    update(model)
+                    .where(model.project_id == project_id, *condition)
+                    .values(project_id=None, historical_project_id=historical_project_id)
+                )
+            
+            connection.execute(
+                insert(HistoricalProjectTag).from_select(
+                    ["historical_project_id", "tag_id", "created_at"],
+                    select(literal(historical_project_id), ProjectTag.tag_id, ProjectTag.created_at)
+                    .where(ProjectTag.project_id == project_id)
+                )
+            )
+            connection.execute(delete(ProjectTag).where(ProjectTag.project_id == project_id))
+            # 直接删除项目行，避免 ORM 级联删除已移走的关联数据
+            connection.execute(delete(Project).where(Project.id == project_id))
+            self.session.expunge(original_project)
+            
+            HistoricalProjectSearchIndex(self.session).reindex([historical_project_id])
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         self.session.refresh(historical_project)
         
         return historical_project
 
+
+def _archive_moves():
+    """项目归档时整体改挂的表及附加条件"""
+    from app.models.attachment import Attachment
+    from app.models.attachment_folder import AttachmentFolder
+    from app.models.github_commit import GitHubCommit
+    from app.models.project import ProjectStep
+    from app.models.project_log import ProjectLog
+    from app.models.project_part import ProjectPart
+    from app.models.todo import Todo
+    from app.models.upload_session import UploadSession
+    from app.models.video_playback import VideoPlayback
+    
+    return [
+        (ProjectStep, ()),
+        (AttachmentFolder, ()),
+        (Attachment, ()),
+        (Todo, ()),
+        (ProjectLog, ()),
+        (ProjectPart, ()),
+        (GitHubCommit, ()),
+        (VideoPlayback, ()),
+        # 视频上传只能挂在项目下，进行中的视频上传会话不移动
+        (UploadSession, (UploadSession.target == "attachment",)),
+    ]
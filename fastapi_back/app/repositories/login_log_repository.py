@@ -5,6 +5,7 @@ from typing import Optional, List
 from sqlmodel import Session, select, func
 from datetime import datetime, timedelta
 from app.models.login_log import LoginLog, LoginLogCreate, LoginStatus
+from app.repositories.pagination import Page, keyset_paginate
 
 
 class LoginLogRepository:
@@ -54,6 +55,23 @@ class LoginLogRepository:
         query = query.order_by(LoginLog.created_at.desc()).limit(limit)
         return list(self.session.exec(query).all())
     
+    def list_by_user_page(
+        self,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Page[LoginLog]:
+        """游标分页获取用户的登录日志（按创建时间倒序）"""
+        query = select(LoginLog)
+        
+        if user_id:
+            query = query.where(LoginLog.user_id == user_id)
+        elif username:
+            query = query.where(LoginLog.username == username)
+        
+        return keyset_paginate(self.session, query, LoginLog.created_at, LoginLog.id, cursor, limit)
+    
     def get_last_successful_login(self, username: str) -> Optional[LoginLog]:
         """获取最后一次成功登录"""
         return self.session.exec(
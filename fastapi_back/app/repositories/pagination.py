@@ -0,0 +1,173 @@
+"""
+游标分页（keyset pagination）
+
+按 (排序列, id) 定位下一页，而不是 OFFSET：
+- 翻到多深都只扫描一页的数据（配合 (过滤列, 排序列) 索引）
+- 翻页期间插入或删除记录不会导致重复或遗漏
+
+游标是不透明字符串（base64url 编码的上一页最后一条记录的排序键），客户端原样传回即可。
+
+总数统计较慢且翻页时基本不变，CountCache 按过滤条件缓存一段时间，写操作后按表失效。
+
+使用示例:
+    page = keyset_paginate(session, select(Project).where(...), Project.created_at, Project.id, cursor, 50)
+    page.items, page.next_cursor
+
+    total = count_cache.get_or_compute(("historicalproject", user_id, status), lambda: repo.count(...))
+"""
+import base64
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, or_
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """一页数据"""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # 没有下一页时为 None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Tuple[Any, ...]) -> str:
+    """将排序键编码为不透明游标"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[Any, ...]:
+    """
+    解析游标
+
+    Raises:
+        ValidationException: 游标格式不正确
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("cursor size mismatch")
+        return tuple(_decode_value(v) for v in values)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationException("无效的分页游标", field="cursor")
+
+
+def keyset_paginate(
+    session: Session,
+    query,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Page:
+    """
+    按 (sort_column, id_column) 游标分页
+
+    Args:
+        session: 数据库会话
+        query: 已包含过滤条件、未排序的查询（select(Model)）
+        sort_column: 排序列（不可为空）；为 None 或与 id_column 相同时只按 id 分页
+        id_column: 唯一的 id 列，作为同值时的第二排序键
+        cursor: 上一页返回的游标，首页为 None 或空字符串
+        limit: 每页数量
+        descending: 是否倒序
+
+    Returns:
+        Page，next_cursor 为 None 表示没有下一页
+    """
+    keys = [id_column] if sort_column is None or sort_column is id_column else [sort_column, id_column]
+
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        if len(keys) == 1:
+            condition = keys[0] < values[0] if descending else keys[0] > values[0]
+        else:
+            sort_value, last_id = values
+            if descending:
+                condition = or_(keys[0] < sort_value, and_(keys[0] == sort_value, keys[1] < last_id))
+            else:
+                condition = or_(keys[0] > sort_value, and_(keys[0] == sort_value, keys[1] > last_id))
+        query = query.where(condition)
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    rows = list(session.exec(query.order_by(*order).limit(limit + 1)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(tuple(getattr(last, key.key) for key in keys))
+    return Page(items=rows, next_cursor=next_cursor)
+
+
+class CountCache:
+    """
+    列表总数缓存（进程内，TTL + 容量上限）
+
+    键的第一个元素为命名空间（通常是表名），写操作后调用 invalidate(命名空间) 失效。
+    多 worker 部署时其他 worker 上的缓存只能依赖 TTL 过期，总数仅作展示用途。
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Tuple[Hashable, ...], compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        value = compute()
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                # 先清理过期条目，仍然满时整体清空（总数缓存丢失的代价很小）
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_size:
+                    self._entries.clear()
+            self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, namespace: Hashable) -> None:
+        """使某个命名空间下的全部总数失效"""
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if k[0] != namespace}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局实例
+count_cache = CountCache(settings.LIST_COUNT_CACHE_TTL_SECONDS)
@@ -3,7 +3,7 @@
 
 重构后继承 BaseRepository，使用 schemas 中的 DTO。
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from sqlmodel import Session, select
 
 from app.repositories.base import BaseRepository
@@ -26,3 +26,6 @@ class PlatformRepository(BaseRepository[Platform]):
         """根据名称获取平台"""
         return self.find_one(name=name)
 
+    def get_name_map(self) -> Dict[int, str]:
+        """全部平台的 id -> 名称（只取两列）"""
+        return dict(self.session.exec(select(Platform.id, Platform.name)).all())
@@ -4,10 +4,12 @@
 重构后使用 schemas 中的 DTO。
 """
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import Any, Iterable, List, Optional
 
 from app.repositories.base import BaseRepository
+from app.repositories.pagination import Page, keyset_paginate
 from app.models.project_log import ProjectLog
+from app.models.user import User
 from app.schemas.project_log import ProjectLogCreate
 
 
@@ -38,3 +40,63 @@ class ProjectLogRepository(BaseRepository[ProjectLog]):
         if limit:
             query = query.limit(limit)
         return list(self.session.exec(query).all())
+
+    def list_by_project_page(self, project_id: int, cursor: Optional[str] = None, limit: int = 100) -> Page[ProjectLog]:
+        """游标分页获取项目的日志（按创建时间倒序）"""
+        return self.paginate(cursor, limit, sort_column=ProjectLog.created_at, project_id=project_id)
+
+    def list_by_historical_project_page(
+        self,
+        historical_project_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Page[ProjectLog]:
+        """游标分页获取历史项目的日志（按创建时间倒序）"""
+        return self.paginate(cursor, limit, sort_column=ProjectLog.created_at, historical_project_id=historical_project_id)
+
+    def _timeline_query(self, actions: Optional[Iterable[str]] = None, **filters: Any):
+        """日志时间线查询：日志各列 + 操作用户名（LEFT JOIN user）"""
+        query = (
+            select(*ProjectLog.__table__.c, User.username.label("user_name"))
+            .outerjoin(User, User.id == ProjectLog.user_id)
+        )
+        for name, value in filters.items():
+            query = query.where(getattr(ProjectLog, name) == value)
+        if actions:
+            query = query.where(ProjectLog.action.in_(list(actions)))
+        return query
+
+    def list_timeline(
+        self,
+        limit: Optional[int] = None,
+        actions: Optional[Iterable[str]] = None,
+        **filters: Any
+    ) -> List[Any]:
+        """
+        获取日志时间线（按创建时间倒序），一次查询带出用户名
+
+        Args:
+            limit: 返回数量限制
+            actions: 只返回这些操作类型
+            **filters: project_id 或 historical_project_id
+
+        Returns:
+            行记录列表，字段为日志各列和 user_name
+        """
+        query = self._timeline_query(actions, **filters).order_by(ProjectLog.created_at.desc(), ProjectLog.id.desc())
+        if limit:
+            query = query.limit(limit)
+        return list(self.session.exec(query).all())
+
+    def list_timeline_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        actions: Optional[Iterable[str]] = None,
+        **filters: Any
+    ) -> Page[Any]:
+        """游标分页获取日志时间线（按 (created_at, id) 倒序）"""
+        return keyset_paginate(
+            self.session, self._timeline_query(actions, **filters),
+            ProjectLog.created_at, ProjectLog.id, cursor, limit
+        )
@@ -3,12 +3,16 @@
 
 重构后继承 BaseRepository，复用通用 CRUD 方法。
 """
-from typing import Optional, List
-from sqlmodel import Session, select
+from typing import Optional, List, Tuple, Dict, Iterable
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.repositories.base import BaseRepository
+from app.repositories.async_base import AsyncBaseRepository
+from app.repositories.pagination import Page
 from app.repositories.tag_repository import ProjectTagRepository
 from app.models.project import Project
+from app.models.platform import Platform
 from app.schemas.project import ProjectCreate
 
 
@@ -36,16 +40,14 @@ class ProjectRepository(BaseRepository[Project]):
 
         return project
 
-    def list(
+    def _filtered_query(
         self,
         user_id: Optional[int] = None,
         platform_id: Optional[int] = None,
         status: Optional[str] = None,
-        tag_ids: Optional[List[int]] = None,
-        skip: int = 0,
-        limit: int = 100
-    ) -> List[Project]:
-        """获取项目列表（支持筛选）"""
+        tag_ids: Optional[List[int]] = None
+    ):
+        """构建带筛选条件的项目查询（不含排序和分页）"""
         from app.models.tag import ProjectTag
 
         query = select(Project)
@@ -59,24 +61,53 @@ class ProjectRepository(BaseRepository[Project]):
         if status is not None:
             query = query.where(Project.status == status)
 
-        # 标签筛选
+        # 标签筛选（子查询，不在内存中展开项目ID）
         if tag_ids:
-            project_ids_result = self.session.exec(
-                select(ProjectTag.project_id).where(ProjectTag.tag_id.in_(tag_ids)).distinct()
-            ).all()
-            project_ids_list = list(project_ids_result)
-            if project_ids_list:
-                query = query.where(Project.id.in_(project_ids_list))
-            else:
-                query = query.where(Project.id == -1)
-
-        query = query.offset(skip).limit(limit)
+            query = query.where(
+                Project.id.in_(select(ProjectTag.project_id).where(ProjectTag.tag_id.in_(tag_ids)))
+            )
+
+        return query
+
+    def list(
+        self,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Project]:
+        """获取项目列表（支持筛选）"""
+        query = self._filtered_query(user_id, platform_id, status, tag_ids)
+        query = query.order_by(Project.id).offset(skip).limit(limit)
         return list(self.session.exec(query).all())
 
+    def list_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None
+    ) -> Page[Project]:
+        """游标分页获取项目列表（按 id 升序，与 list 的顺序一致）"""
+        query = self._filtered_query(user_id, platform_id, status, tag_ids)
+        return self.paginate(cursor=cursor, limit=limit, descending=False, query=query)
+
     def list_by_user(self, user_id: int) -> List[Project]:
         """获取用户的所有项目"""
         return self.find_many(user_id=user_id)
 
+    def get_owner_map(self, project_ids: Iterable[int]) -> Dict[int, int]:
+        """批量获取项目所有者（一次 IN 查询，只取 id 和 user_id），不存在的项目不在结果中"""
+        ids = list(set(project_ids))
+        if not ids:
+            return {}
+        rows = self.session.exec(select(Project.id, Project.user_id).where(Project.id.in_(ids))).all()
+        return dict(rows)
+
     def update(self, project: Project, update_data: dict) -> Project:
         """更新项目信息"""
         tag_ids = update_data.pop('tag_ids', None)
@@ -112,3 +143,54 @@ class ProjectRepository(BaseRepository[Project]):
     def get_by_status(self, status: str, user_id: Optional[int] = None) -> List[Project]:
         """根据状态获取项目列表"""
         return self.find_many(status=status, user_id=user_id)
+
+    @staticmethod
+    def paid_income_by_platform_query(user_id: Optional[int] = None):
+        """构建按平台汇总已结账项目实际收入的查询语句（同步/异步 Repository 共用）"""
+        query = (
+            select(Platform.name, func.sum(Project.actual_income))
+            .select_from(Project)
+            .outerjoin(Platform, Platform.id == Project.platform_id)
+            .where(Project.is_paid == True, Project.actual_income > 0)
+        )
+        if user_id is not None:
+            query = query.where(Project.user_id == user_id)
+        return query.group_by(Platform.name)
+
+    @staticmethod
+    def count_pending_query(user_id: Optional[int] = None):
+        """构建统计未结账项目数量的查询语句（同步/异步 Repository 共用）"""
+        query = select(func.count(Project.id)).where(Project.status != "已结账")
+        if user_id is not None:
+            query = query.where(Project.user_id == user_id)
+        return query
+
+    def sum_paid_income_by_platform(self, user_id: Optional[int] = None) -> List[Tuple[Optional[str], float]]:
+        """按平台名称汇总已结账项目的实际收入（单次 GROUP BY 查询）"""
+        rows = self.session.exec(self.paid_income_by_platform_query(user_id)).all()
+        return [(name, float(total or 0)) for name, total in rows]
+
+    def count_pending(self, user_id: Optional[int] = None) -> int:
+        """统计未结账项目数量"""
+        return self.session.exec(self.count_pending_query(user_id)).one() or 0
+
+
+class AsyncProjectRepository(AsyncBaseRepository[Project]):
+    """项目数据访问层（异步）"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, Project)
+
+    async def list_by_user(self, user_id: int) -> List[Project]:
+        """获取用户的所有项目"""
+        return await self.find_many(user_id=user_id)
+
+    async def sum_paid_income_by_platform(self, user_id: Optional[int] = None) -> List[Tuple[Optional[str], float]]:
+        """按平台名称汇总已结账项目的实际收入（单次 GROUP BY 查询）"""
+        result = await self.session.exec(ProjectRepository.paid_income_by_platform_query(user_id))
+        return [(name, float(total or 0)) for name, total in result.all()]
+
+    async def count_pending(self, user_id: Optional[int] = None) -> int:
+        """统计未结账项目数量"""
+        result = await self.session.exec(ProjectRepository.count_pending_query(user_id))
+        return result.one() or 0
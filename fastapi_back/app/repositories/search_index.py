@@ -0,0 +1,267 @@
+"""
+历史项目全文检索索引（SQLite FTS5）
+
+historicalproject_fts 虚拟表以历史项目 id 为 rowid，索引标题、学生姓名、需求描述、备注和标签名：
+- 中文按二元组（n-gram，n=2）切分后写入，英文和数字按单词切分，查询时同样切分后做短语匹配，
+  每个检索词的最后一个词元按前缀匹配（"毕业设" 可以匹配 "毕业设计"，"java" 可以匹配 "javascript"）
+- 结果按 bm25 相关度排序，标题权重最高
+- 索引在 ORM flush 后于同一事务中同步（新增、修改、删除历史项目，增删标签关联，标签改名），
+  绕过 ORM 的批量写入需要调用 reindex()
+
+只在 SQLite 上启用；其他数据库或索引表不存在时，仓库层回退到 LIKE 查询。
+
+使用示例:
+    match = build_match_query("毕业设计 java")
+    if match and search_index_available(session):
+        ranked = ranked_matches(match)   # (rowid, rank) 子查询
+
+    HistoricalProjectSearchIndex(session).rebuild()
+"""
+import logging
+import re
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy import column as sa_column, func, literal_column, select, table as sa_table
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, SQLModel
+
+from app.models.historical_project import HistoricalProject
+from app.models.tag import HistoricalProjectTag, Tag
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "historicalproject_fts"
+
+# 索引列及 bm25 权重
+FTS_COLUMNS = ("title", "student_name", "requirements", "notes", "tag_names")
+_BM25_WEIGHTS = (10.0, 5.0, 1.0, 1.0, 3.0)
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ", ".join(FTS_COLUMNS)
+    + ", tokenize='unicode61 remove_diacritics 2')"
+)
+
+# 使用 create_all 建表（开发环境、测试）时一并创建虚拟表；正式环境由 Alembic 迁移创建
+event.listen(SQLModel.metadata, "after_create", DDL(CREATE_FTS_SQL).execute_if(dialect="sqlite"))
+
+fts_table = sa_table(FTS_TABLE, sa_column("rowid"), *(sa_column(name) for name in FTS_COLUMNS))
+
+_CJK = "㐀-䶿一-鿿豈-﫿"
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[^\\W{_CJK}]+")
+_CJK_RE = re.compile(f"[{_CJK}]")
+
+# 每批重建的记录数
+_REBUILD_BATCH_SIZE = 500
+
+# connection.info 中缓存索引表是否存在的键
+_AVAILABLE_KEY = "historicalproject_fts_available"
+
+
+def _run_tokens(run: str, for_query: bool) -> List[str]:
+    """切分一段连续的中文或非中文字符"""
+    if not _CJK_RE.match(run):
+        return [run.lower()]
+    if len(run) == 1:
+        return [run]
+    bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+    # 索引时追加末字，使每个字都是某个词元的开头，单字检索可以按前缀匹配
+    return bigrams if for_query else bigrams + [run[-1]]
+
+
+def ngram_text(value: Optional[str]) -> str:
+    """将文本切分为以空格分隔的词元（写入索引）"""
+    if not value:
+        return ""
+    tokens = []
+    for run in _TOKEN_RE.findall(value):
+        tokens.extend(_run_tokens(run, for_query=False))
+    return " ".join(tokens)
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    将用户输入转换为 FTS5 MATCH 表达式
+
+    按空白拆分为多个检索词（AND），每个检索词切分后作为短语，最后一个词元按前缀匹配。
+
+    Returns:
+        MATCH 表达式；输入中没有可检索的字符时返回 None
+    """
+    phrases = []
+    for term in search.split():
+        tokens = []
+        for run in _TOKEN_RE.findall(term):
+            tokens.extend(_run_tokens(run, for_query=True))
+        if tokens:
+            phrases.append('"' + " ".join(tokens).replace('"', '""') + '"*')
+    return " AND ".join(phrases) if phrases else None
+
+
+def search_index_available(session: Session) -> bool:
+    """当前数据库是否有全文检索索引（结果缓存在连接上）"""
+    connection = session.connection()
+    if connection.dialect.name != "sqlite":
+        return False
+    available = connection.info.get(_AVAILABLE_KEY)
+    if available is None:
+        available = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first() is not None
+        connection.info[_AVAILABLE_KEY] = available
+    return available
+
+
+def ranked_matches(match_query: str):
+    """匹配的历史项目 id 及相关度（rank 越小越相关）子查询"""
+    rank = func.bm25(literal_column(FTS_TABLE), *_BM25_WEIGHTS)
+    return (
+        select(fts_table.c.rowid.label("rowid"), rank.label("rank"))
+        .where(literal_column(FTS_TABLE).op("MATCH")(match_query))
+        .subquery()
+    )
+
+
+class HistoricalProjectSearchIndex:
+    """历史项目全文检索索引维护"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def reindex(self, project_ids: Iterable[int]) -> int:
+        """
+        重建指定历史项目的索引行（不存在的项目删除索引行），不提交事务
+
+        Returns:
+            写入的索引行数
+        """
+        ids = sorted({project_id for project_id in project_ids if project_id is not None})
+        if not ids or not search_index_available(self.session):
+            return 0
+        connection = self.session.connection()
+        written = 0
+        for start in range(0, len(ids), _REBUILD_BATCH_SIZE):
+            batch = ids[start:start + _REBUILD_BATCH_SIZE]
+            connection.execute(fts_table.delete().where(fts_table.c.rowid.in_(batch)))
+            rows = self._index_rows(connection, batch)
+            if rows:
+                connection.execute(fts_table.insert(), rows)
+                written += len(rows)
+        return written
+
+    def remove(self, project_ids: Iterable[int]) -> None:
+        """删除指定历史项目的索引行，不提交事务"""
+        ids = [project_id for project_id in project_ids if project_id is not None]
+        if ids and search_index_available(self.session):
+            self.session.connection().execute(fts_table.delete().where(fts_table.c.rowid.in_(ids)))
+
+    def rebuild(self) -> int:
+        """
+        清空并重建全部索引（按 id 分批）
+
+        Returns:
+            索引的历史项目数量
+        """
+        if not search_index_available(self.session):
+            return 0
+        connection = self.session.connection()
+        connection.execute(fts_table.delete())
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(connection.execute(
+                select(HistoricalProject.id)
+                .where(HistoricalProject.id > last_id)
+                .order_by(HistoricalProject.id)
+                .limit(_REBUILD_BATCH_SIZE)
+            ).scalars())
+            if not ids:
+                break
+            rows = self._index_rows(connection, ids)
+            connection.execute(fts_table.insert(), rows)
+            total += len(rows)
+            last_id = ids[-1]
+        self.session.commit()
+        logger.info(f"历史项目全文检索索引重建完成: {total} 条")
+        return total
+
+    def sync(self) -> int:
+        """
+        索引行数与历史项目数量不一致时重建（首次部署或绕过 ORM 写入后）
+
+        Returns:
+            重建的记录数，无需重建时为 0
+        """
+        if not search_index_available(self.session):
+            return 0
+        connection = self.session.connection()
+        indexed = connection.execute(select(func.count()).select_from(fts_table)).scalar()
+        expected = connection.execute(select(func.count(HistoricalProject.id))).scalar()
+        if indexed == expected:
+            return 0
+        return self.rebuild()
+
+    @staticmethod
+    def _index_rows(connection, project_ids: List[int]) -> List[dict]:
+        """读取一批历史项目的可检索字段和标签名，生成索引行"""
+        tag_names = {}
+        for project_id, name in connection.execute(
+            select(HistoricalProjectTag.historical_project_id, Tag.name)
+            .join(Tag, Tag.id == HistoricalProjectTag.tag_id)
+            .where(HistoricalProjectTag.historical_project_id.in_(project_ids))
+        ):
+            tag_names.setdefault(project_id, []).append(name)
+
+        rows = []
+        for project_id, title, student_name, requirements, notes in connection.execute(
+            select(
+                HistoricalProject.id, HistoricalProject.title, HistoricalProject.student_name,
+                HistoricalProject.requirements, HistoricalProject.notes
+            ).where(HistoricalProject.id.in_(project_ids))
+        ):
+            rows.append({
+                "rowid": project_id,
+                "title": ngram_text(title),
+                "student_name": ngram_text(student_name),
+                "requirements": ngram_text(requirements),
+                "notes": ngram_text(notes),
+                "tag_names": ngram_text(" ".join(tag_names.get(project_id, []))),
+            })
+        return rows
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _sync_search_index(session, flush_context) -> None:
+    """flush 后在同一事务中同步受影响历史项目的索引"""
+    changed: Set[int] = set()
+    removed: Set[int] = set()
+    changed_tags: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, HistoricalProject):
+            changed.add(obj.id)
+        elif isinstance(obj, HistoricalProjectTag):
+            changed.add(obj.historical_project_id)
+    for obj in session.dirty:
+        if isinstance(obj, HistoricalProject):
+            changed.add(obj.id)
+        elif isinstance(obj, Tag):
+            changed_tags.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, HistoricalProject):
+            removed.add(obj.id)
+        elif isinstance(obj, HistoricalProjectTag):
+            changed.add(obj.historical_project_id)
+
+    if not (changed or removed or changed_tags):
+        return
+    index = HistoricalProjectSearchIndex(session)
+    if not search_index_available(session):
+        return
+    if changed_tags:
+        changed.update(session.connection().execute(
+            select(HistoricalProjectTag.historical_project_id).where(HistoricalProjectTag.tag_id.in_(changed_tags))
+        ).scalars())
+    index.remove(removed)
+    index.reindex(changed - removed)
@@ -4,10 +4,12 @@
 重构后继承 BaseRepository，复用通用 CRUD 方法。
 """
 from typing import Optional, List
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.repositories.base import BaseRepository
-from app.models.project import ProjectStep
+from app.repositories.async_base import AsyncBaseRepository
+from app.models.project import Project, ProjectStep
 from app.schemas.project import ProjectStepCreate
 from app.utils.constants import StepStatus
 
@@ -32,6 +34,15 @@ class StepRepository(BaseRepository[ProjectStep]):
         query = select(ProjectStep).where(ProjectStep.project_id == project_id)
         return list(self.session.exec(query.order_by(ProjectStep.order_index)).all())
 
+    def list_by_projects(self, project_ids: List[int]) -> List[ProjectStep]:
+        """批量获取多个项目的步骤（按project_id、order_index排序，单次查询）"""
+        if not project_ids:
+            return []
+        query = select(ProjectStep).where(ProjectStep.project_id.in_(project_ids))
+        return list(self.session.exec(
+            query.order_by(ProjectStep.project_id, ProjectStep.order_index)
+        ).all())
+
     def list_todo_steps(self, project_ids: List[int]) -> List[ProjectStep]:
         """获取待办步骤列表"""
         query = select(ProjectStep).where(
@@ -49,6 +60,20 @@ class StepRepository(BaseRepository[ProjectStep]):
         )
         return list(self.session.exec(query).all())
 
+    @staticmethod
+    def count_in_progress_query(user_id: Optional[int] = None):
+        """构建统计进行中步骤数量的查询语句（同步/异步 Repository 共用）"""
+        query = select(func.count(ProjectStep.id)).where(ProjectStep.status != "已完成")
+        if user_id is not None:
+            return query.join(Project, Project.id == ProjectStep.project_id).where(
+                Project.user_id == user_id
+            )
+        return query.where(ProjectStep.project_id.is_not(None))
+
+    def count_in_progress_steps(self, user_id: Optional[int] = None) -> int:
+        """统计进行中（未完成）的步骤数量，可按项目负责人过滤"""
+        return self.session.exec(self.count_in_progress_query(user_id)).one() or 0
+
     def update(self, step: ProjectStep, update_data: dict) -> ProjectStep:
         """更新步骤信息"""
         return super().update(step, update_data)
@@ -75,3 +100,22 @@ class StepRepository(BaseRepository[ProjectStep]):
         self.session.commit()
         self.session.refresh(step)
         return step
+
+
+class AsyncStepRepository(AsyncBaseRepository[ProjectStep]):
+    """步骤数据访问层（异步）"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, ProjectStep)
+
+    async def list_by_project(self, project_id: int) -> List[ProjectStep]:
+        """获取项目的所有步骤（按order_index排序）"""
+        result = await self.session.exec(
+            select(ProjectStep).where(ProjectStep.project_id == project_id).order_by(ProjectStep.order_index)
+        )
+        return list(result.all())
+
+    async def count_in_progress_steps(self, user_id: Optional[int] = None) -> int:
+        """统计进行中（未完成）的步骤数量，可按项目负责人过滤"""
+        result = await self.session.exec(StepRepository.count_in_progress_query(user_id))
+        return result.one() or 0
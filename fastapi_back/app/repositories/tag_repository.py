@@ -3,10 +3,15 @@
 
 重构后使用 schemas 中的 DTO。
 """
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, update
 from sqlmodel import Session, select, or_
 
 from app.repositories.base import BaseRepository
+from app.repositories.historical_project_repository import COUNT_CACHE_NAMESPACE
+from app.repositories.pagination import count_cache
 from app.models.tag import Tag, ProjectTag, HistoricalProjectTag
 from app.schemas.tag import TagCreate, TagUpdate
 
@@ -28,6 +33,10 @@ class TagRepository(BaseRepository[Tag]):
         """根据名称获取标签"""
         return self.find_one(name=name)
     
+    def get_id_map(self) -> Dict[str, int]:
+        """全部标签的 名称 -> id（只取两列）"""
+        return {name: tag_id for tag_id, name in self.session.exec(select(Tag.id, Tag.name)).all()}
+    
     def list_all(self, user_id: Optional[int] = None, include_common: bool = True) -> List[Tag]:
         """获取所有标签（全局共享，不区分用户）"""
         query = select(Tag)
@@ -71,6 +80,8 @@ class TagRepository(BaseRepository[Tag]):
         
         self.session.delete(tag)
         self.session.commit()
+        # 级联删除了历史项目的标签关联，按标签筛选的总数随之变化
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         return True
     
     def increment_usage(self, tag_id: int):
@@ -125,6 +136,17 @@ class ProjectTagRepository:
         return list(self.session.exec(
             select(ProjectTag).where(ProjectTag.project_id == project_id)
         ).all())
+
+    def list_tags_by_projects(self, project_ids: List[int]) -> List[Tuple[int, Tag]]:
+        """批量获取多个项目的标签（单次JOIN查询），返回 (project_id, Tag) 列表"""
+        if not project_ids:
+            return []
+        return list(self.session.exec(
+            select(ProjectTag.project_id, Tag)
+            .join(Tag, Tag.id == ProjectTag.tag_id)
+            .where(ProjectTag.project_id.in_(project_ids))
+            .order_by(ProjectTag.project_id, ProjectTag.id)
+        ).all())
     
     def delete(self, project_id: int, tag_id: int) -> bool:
         """移除项目的标签"""
@@ -181,6 +203,7 @@ class HistoricalProjectTagRepository:
         project_tag = HistoricalProjectTag(historical_project_id=historical_project_id, tag_id=tag_id)
         self.session.add(project_tag)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         self.session.refresh(project_tag)
         
         # 增加标签使用次数
@@ -189,6 +212,43 @@ class HistoricalProjectTagRepository:
         
         return project_tag
     
+    def bulk_create(self, pairs: List[Tuple[int, int]]) -> None:
+        """
+        批量添加历史项目标签（executemany，不提交事务）
+
+        用于新建的历史项目，不检查重复关联；同时累加标签使用次数。
+
+        Args:
+            pairs: (历史项目ID, 标签ID) 列表
+        """
+        if not pairs:
+            return
+        now = datetime.utcnow()
+        connection = self.session.connection()
+        connection.execute(
+            insert(HistoricalProjectTag),
+            [
+                {"historical_project_id": project_id, "tag_id": tag_id, "created_at": now}
+                for project_id, tag_id in pairs
+            ]
+        )
+        usage = Counter(tag_id for _, tag_id in pairs)
+        connection.execute(
+            update(Tag).where(Tag.id == bindparam("target_id")).values(usage_count=Tag.usage_count + bindparam("added")),
+            [{"target_id": tag_id, "added": added} for tag_id, added in usage.items()]
+        )
+    
+    def list_tags_by_projects(self, historical_project_ids: List[int]) -> List[Tuple[int, Tag]]:
+        """批量获取多个历史项目的标签（单次JOIN查询），返回 (historical_project_id, Tag) 列表"""
+        if not historical_project_ids:
+            return []
+        return list(self.session.exec(
+            select(HistoricalProjectTag.historical_project_id, Tag)
+            .join(Tag, Tag.id == HistoricalProjectTag.tag_id)
+            .where(HistoricalProjectTag.historical_project_id.in_(historical_project_ids))
+            .order_by(HistoricalProjectTag.historical_project_id, HistoricalProjectTag.id)
+        ).all())
+    
     def list_by_project(self, historical_project_id: int) -> List[HistoricalProjectTag]:
         """获取历史项目的所有标签"""
         return list(self.session.exec(
@@ -209,6 +269,7 @@ class HistoricalProjectTagRepository:
         
         self.session.delete(project_tag)
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
         
         # 减少标签使用次数
         tag_repo = TagRepository(self.session)
@@ -226,4 +287,5 @@ class HistoricalProjectTagRepository:
             self.session.delete(project_tag)
         
         self.session.commit()
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
 
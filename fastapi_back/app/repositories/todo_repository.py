@@ -3,16 +3,86 @@
 
 重构后使用 schemas 中的 DTO。
 """
-from typing import Optional, List
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, List, Tuple, TypeVar
 from sqlmodel import Session, select
-from sqlalchemy import func
-from datetime import datetime, date, timezone, timedelta
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import and_, delete, event, inspect as sa_inspect, or_
+from sqlalchemy.orm import Session as OrmSession, aliased
+from datetime import datetime, date, time, timezone, timedelta
 import json
 
 from app.repositories.base import BaseRepository
-from app.models.todo import Todo
+from app.repositories.async_base import AsyncBaseRepository
+from app.models.historical_project import HistoricalProject
+from app.models.project import Project, ProjectStep
+from app.models.todo import Todo, TodoStep
 from app.schemas.todo import TodoCreate, TodoUpdate
 
+# 本地时区（北京时间，UTC+8），待办按本地日期归属
+LOCAL_TZ = timezone(timedelta(hours=8))
+
+T = TypeVar("T")
+
+
+@dataclass
+class TodoWithSteps:
+    """待办及其关联步骤（按 step_ids 顺序）和所属项目信息"""
+    todo: Todo
+    steps: List[ProjectStep] = field(default_factory=list)
+    project_title: Optional[str] = None
+    student_name: Optional[str] = None
+    historical_project_title: Optional[str] = None
+
+    @property
+    def step_ids(self) -> List[int]:
+        return [step.id for step in self.steps]
+
+    @property
+    def step_names(self) -> List[str]:
+        return [step.name for step in self.steps]
+
+
+def parse_step_ids(value: Optional[str]) -> List[int]:
+    """解析 Todo.step_ids（JSON），忽略格式不正确的内容和重复的 ID"""
+    try:
+        step_ids = json.loads(value) if value else []
+    except ValueError:
+        return []
+    if not isinstance(step_ids, list):
+        return []
+    result = []
+    for step_id in step_ids:
+        if isinstance(step_id, int) and not isinstance(step_id, bool) and step_id not in result:
+            result.append(step_id)
+    return result
+
+
+def local_day_range_utc(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """本地日期区间 [start_date, end_date] 对应的 UTC 时间范围 [开始, 结束)（不带时区，与库中存储一致）"""
+    start_local = datetime.combine(start_date, time.min, tzinfo=LOCAL_TZ)
+    end_local = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=LOCAL_TZ)
+    return (
+        start_local.astimezone(timezone.utc).replace(tzinfo=None),
+        end_local.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def todo_local_day(todo: Todo) -> date:
+    """待办所属的本地日期（target_date，未设置时为 created_at）"""
+    moment = todo.target_date or todo.created_at
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(LOCAL_TZ).date()
+
+
+def group_by_local_day(items: List[T], key: Callable[[T], Todo] = lambda todo: todo) -> Dict[date, List[T]]:
+    """按待办所属的本地日期分组（日期升序，组内保持原顺序）"""
+    groups: Dict[date, List[T]] = {}
+    for item in items:
+        groups.setdefault(todo_local_day(key(item)), []).append(item)
+    return dict(sorted(groups.items()))
+
 
 class TodoRepository(BaseRepository[Todo]):
     """待办数据访问层"""
@@ -20,7 +90,7 @@ class TodoRepository(BaseRepository[Todo]):
     @staticmethod
     def _today_local() -> date:
         """获取本地（北京时间，UTC+8）的今天日期"""
-        return datetime.now(timezone.utc).astimezone(timezone(timedelta(hours=8))).date()
+        return datetime.now(timezone.utc).astimezone(LOCAL_TZ).date()
 
     def __init__(self, session: Session):
         super().__init__(session, Todo)
@@ -36,68 +106,123 @@ class TodoRepository(BaseRepository[Todo]):
         )
         return super().create(todo)
     
-    def list_by_date(self, target_date: date, user_id: Optional[int] = None) -> List[Todo]:
-        """获取指定日期的待办列表"""
-        from sqlalchemy import or_, and_
+    @staticmethod
+    def list_by_date_query(target_date: Optional[date], user_id: Optional[int] = None):
+        """构建指定日期待办的查询语句（同步/异步 Repository 共用）；target_date 为 None 时不按日期过滤"""
+        return TodoRepository.list_by_range_query(target_date, target_date, user_id)
+
+    @staticmethod
+    def list_by_range_query(start_date: Optional[date], end_date: Optional[date], user_id: Optional[int] = None):
+        """
+        构建本地日期区间 [start_date, end_date] 内待办的查询语句（同步/异步 Repository 共用）
+
+        待办的日期为 target_date，未设置时为 created_at（均为 UTC），区间按本地时区换算为 UTC 范围；
+        用户过滤使用 EXISTS 在数据库中完成（项目或历史项目属于该用户）。
+        """
         query = select(Todo)
-        
-        # 如果指定了日期，匹配该日期的待办
-        if target_date:
-            # 计算目标日期在本地时区（UTC+8）的开始和结束时间（UTC）
-            # 目标日期的开始：本地时区 00:00:00 转换为 UTC
-            target_start_local = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone(timedelta(hours=8)))
-            target_start_utc = target_start_local.astimezone(timezone.utc)
-            
-            # 目标日期的结束：本地时区 23:59:59.999999 转换为 UTC
-            from datetime import time as dt_time
-            target_end_local = datetime.combine(target_date, dt_time(23, 59, 59, 999999)).replace(tzinfo=timezone(timedelta(hours=8)))
-            target_end_utc = target_end_local.astimezone(timezone.utc)
-            
-            # 匹配逻辑：
-            # 1. target_date不为None：target_date在该日期范围内
-            # 2. target_date为None：created_at在该日期范围内（使用created_at的日期）
+
+        if start_date and end_date:
+            range_start, range_end = local_day_range_utc(start_date, end_date)
             query = query.where(
                 or_(
-                    # target_date不为None，且target_date在目标日期范围内
                     and_(
                         Todo.target_date.is_not(None),
-                        Todo.target_date >= target_start_utc,
-                        Todo.target_date <= target_end_utc
+                        Todo.target_date >= range_start,
+                        Todo.target_date < range_end
                     ),
-                    # target_date为None，但created_at在目标日期范围内
                     and_(
                         Todo.target_date.is_(None),
-                        Todo.created_at >= target_start_utc,
-                        Todo.created_at <= target_end_utc
+                        Todo.created_at >= range_start,
+                        Todo.created_at < range_end
                     )
                 )
             )
-        else:
-            # 如果没有指定日期，返回所有待办
-            pass
-        
-        todos = list(self.session.exec(query).all())
-        
-        # 如果指定了用户ID，过滤项目（包括历史项目）
+
         if user_id:
-            from app.repositories.project_repository import ProjectRepository
-            from app.repositories.historical_project_repository import HistoricalProjectRepository
-            project_repo = ProjectRepository(self.session)
-            historical_project_repo = HistoricalProjectRepository(self.session)
-            
-            user_projects = project_repo.list_by_user(user_id)
-            project_ids = [p.id for p in user_projects]
-            
-            user_historical_projects = historical_project_repo.list(user_id=user_id, limit=10000)
-            historical_project_ids = [p.id for p in user_historical_projects]
-            
-            todos = [
-                t for t in todos 
-                if (t.project_id and t.project_id in project_ids) or 
-                   (t.historical_project_id and t.historical_project_id in historical_project_ids)
-            ]
-        
-        return todos
+            # 使用别名，外层联表 project / historicalproject 时（with_steps_query）子查询不会被关联掉
+            owner_project = aliased(Project)
+            owner_historical_project = aliased(HistoricalProject)
+            query = query.where(
+                or_(
+                    select(owner_project.id).where(
+                        owner_project.id == Todo.project_id, owner_project.user_id == user_id
+                    ).exists(),
+                    select(owner_historical_project.id).where(
+                        owner_historical_project.id == Todo.historical_project_id,
+                        owner_historical_project.user_id == user_id
+                    ).exists()
+                )
+            )
+
+        return query
+
+    def list_by_date(self, target_date: date, user_id: Optional[int] = None) -> List[Todo]:
+        """获取指定日期的待办列表"""
+        return list(self.session.exec(self.list_by_date_query(target_date, user_id)).all())
+
+    @staticmethod
+    def with_steps_query(query):
+        """
+        以待办查询的过滤条件联表带出关联步骤和所属项目（同步/异步 Repository 共用）
+
+        每个（待办, 步骤）一行，没有步骤的待办也返回一行，结果交给 group_with_steps 组装。
+        """
+        joined = select(Todo, ProjectStep, Project.title, Project.student_name, HistoricalProject.title)
+        if query.whereclause is not None:
+            joined = joined.where(query.whereclause)
+        return (
+            joined
+            .outerjoin(TodoStep, TodoStep.todo_id == Todo.id)
+            .outerjoin(ProjectStep, ProjectStep.id == TodoStep.step_id)
+            .outerjoin(Project, Project.id == Todo.project_id)
+            .outerjoin(HistoricalProject, HistoricalProject.id == Todo.historical_project_id)
+            .order_by(Todo.id, TodoStep.position)
+        )
+
+    @staticmethod
+    def group_with_steps(rows) -> List[TodoWithSteps]:
+        """按待办合并 with_steps_query 的结果行"""
+        result: List[TodoWithSteps] = []
+        for todo, step, project_title, student_name, historical_project_title in rows:
+            if not result or result[-1].todo.id != todo.id:
+                result.append(TodoWithSteps(
+                    todo=todo,
+                    project_title=project_title,
+                    student_name=student_name,
+                    historical_project_title=historical_project_title,
+                ))
+            if step is not None:
+                result[-1].steps.append(step)
+        return result
+
+    def list_by_date_with_steps(self, target_date: date, user_id: Optional[int] = None) -> List[TodoWithSteps]:
+        """获取指定日期的待办及其步骤、所属项目（一次联表查询）"""
+        rows = self.session.exec(self.with_steps_query(self.list_by_date_query(target_date, user_id))).all()
+        return self.group_with_steps(rows)
+
+    def list_by_range(self, start_date: date, end_date: date, user_id: Optional[int] = None) -> List[Todo]:
+        """获取本地日期区间内的待办列表"""
+        return list(self.session.exec(self.list_by_range_query(start_date, end_date, user_id)).all())
+
+    def list_by_range_with_steps(
+        self,
+        start_date: date,
+        end_date: date,
+        user_id: Optional[int] = None
+    ) -> Dict[date, List[TodoWithSteps]]:
+        """获取本地日期区间内的待办及其步骤、所属项目（一次联表查询），按本地日期分组"""
+        rows = self.session.exec(self.with_steps_query(self.list_by_range_query(start_date, end_date, user_id))).all()
+        return group_by_local_day(self.group_with_steps(rows), key=lambda item: item.todo)
+
+    def get_steps(self, todo_id: int) -> List[ProjectStep]:
+        """获取待办关联的步骤（按 step_ids 顺序）"""
+        query = (
+            select(ProjectStep)
+            .join(TodoStep, TodoStep.step_id == ProjectStep.id)
+            .where(TodoStep.todo_id == todo_id)
+            .order_by(TodoStep.position)
+        )
+        return list(self.session.exec(query).all())
     
     def update(self, todo: Todo, update_data: TodoUpdate) -> Todo:
         """更新待办"""
@@ -108,3 +233,68 @@ class TodoRepository(BaseRepository[Todo]):
         """删除待办"""
         return super().delete(todo)
 
+
+class AsyncTodoRepository(AsyncBaseRepository[Todo]):
+    """待办数据访问层（异步）"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, Todo)
+
+    async def list_by_date(self, target_date: date, user_id: Optional[int] = None) -> List[Todo]:
+        """获取指定日期的待办列表"""
+        result = await self.session.exec(TodoRepository.list_by_date_query(target_date, user_id))
+        return list(result.all())
+
+    async def list_by_date_with_steps(self, target_date: date, user_id: Optional[int] = None) -> List[TodoWithSteps]:
+        """获取指定日期的待办及其步骤、所属项目（一次联表查询）"""
+        result = await self.session.exec(
+            TodoRepository.with_steps_query(TodoRepository.list_by_date_query(target_date, user_id))
+        )
+        return TodoRepository.group_with_steps(result.all())
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _sync_todo_steps(session, flush_context) -> None:
+    """
+    flush 后在同一事务中按 Todo.step_ids 同步 todo_step 关联表
+
+    新增待办或 step_ids 变化时重写该待办的关联行，删除待办或步骤时删除对应关联行；
+    不存在的步骤 ID 不写入关联表。
+    """
+    changed = {}
+    removed_todo_ids = set()
+    removed_step_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Todo):
+            changed[obj.id] = parse_step_ids(obj.step_ids)
+    for obj in session.dirty:
+        if isinstance(obj, Todo) and sa_inspect(obj).attrs.step_ids.history.has_changes():
+            changed[obj.id] = parse_step_ids(obj.step_ids)
+    for obj in session.deleted:
+        if isinstance(obj, Todo):
+            removed_todo_ids.add(obj.id)
+        elif isinstance(obj, ProjectStep):
+            removed_step_ids.add(obj.id)
+
+    if not (changed or removed_todo_ids or removed_step_ids):
+        return
+    connection = session.connection()
+    stale_todo_ids = set(changed) | removed_todo_ids
+    if stale_todo_ids:
+        connection.execute(delete(TodoStep).where(TodoStep.todo_id.in_(stale_todo_ids)))
+    if removed_step_ids:
+        connection.execute(delete(TodoStep).where(TodoStep.step_id.in_(removed_step_ids)))
+
+    all_step_ids = {step_id for step_ids in changed.values() for step_id in step_ids}
+    if not all_step_ids:
+        return
+    existing = set(connection.execute(
+        select(ProjectStep.id).where(ProjectStep.id.in_(all_step_ids))
+    ).scalars()) - removed_step_ids
+    rows = [
+        {"todo_id": todo_id, "step_id": step_id, "position": position}
+        for todo_id, step_ids in changed.items()
+        for position, step_id in enumerate(sid for sid in step_ids if sid in existing)
+    ]
+    if rows:
+        connection.execute(TodoStep.__table__.insert(), rows)
@@ -1,9 +1,12 @@
 """
 Token黑名单数据访问层
+
+按 token 摘要（SHA-256）存取，查询走 token_hash 唯一索引。
 """
-from typing import Optional
-from sqlmodel import Session, select
+from typing import Iterator
+from sqlmodel import Session, select, delete
 from datetime import datetime
+from app.core.security import hash_token
 from app.models.token_blacklist import TokenBlacklist, TokenBlacklistCreate
 
 
@@ -14,41 +17,48 @@ class TokenBlacklistRepository:
         self.session = session
     
     def create(self, blacklist_data: TokenBlacklistCreate) -> TokenBlacklist:
-        """将token加入黑名单"""
-        blacklist_entry = TokenBlacklist(**blacklist_data.model_dump())
+        """将token加入黑名单（已存在则返回原记录）"""
+        token_hash = hash_token(blacklist_data.token)
+        existing = self.session.exec(
+            select(TokenBlacklist).where(TokenBlacklist.token_hash == token_hash)
+        ).first()
+        if existing:
+            return existing
+
+        blacklist_entry = TokenBlacklist(
+            token_hash=token_hash,
+            expires_at=blacklist_data.expires_at,
+            reason=blacklist_data.reason
+        )
         self.session.add(blacklist_entry)
         self.session.commit()
         self.session.refresh(blacklist_entry)
         return blacklist_entry
     
     def is_blacklisted(self, token: str) -> bool:
-        """检查token是否在黑名单中"""
-        blacklist_entry = self.session.exec(
-            select(TokenBlacklist).where(TokenBlacklist.token == token)
+        """检查token是否在黑名单中（已过期的记录视为不在黑名单，由定时清理删除）"""
+        blacklist_id = self.session.exec(
+            select(TokenBlacklist.id).where(
+                TokenBlacklist.token_hash == hash_token(token),
+                TokenBlacklist.expires_at >= datetime.utcnow()
+            )
         ).first()
-        
-        if not blacklist_entry:
-            return False
-        
-        # 如果token已过期，从黑名单中移除
-        if blacklist_entry.expires_at < datetime.utcnow():
-            self.session.delete(blacklist_entry)
-            self.session.commit()
-            return False
-        
-        return True
+        return blacklist_id is not None
+
+    def iter_active_hashes(self, batch_size: int = 1000) -> Iterator[str]:
+        """分批遍历所有未过期的token摘要（用于重建 Bloom 过滤器）"""
+        result = self.session.exec(
+            select(TokenBlacklist.token_hash)
+            .where(TokenBlacklist.expires_at >= datetime.utcnow())
+            .execution_options(yield_per=batch_size)
+        )
+        for token_hash in result:
+            yield token_hash
     
     def cleanup_expired_tokens(self) -> int:
-        """清理过期的黑名单token"""
-        expired_tokens = self.session.exec(
-            select(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.utcnow())
-        ).all()
-        
-        count = 0
-        for token in expired_tokens:
-            self.session.delete(token)
-            count += 1
-        
+        """清理过期的黑名单token（单条 DELETE 语句）"""
+        result = self.session.exec(
+            delete(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.utcnow())
+        )
         self.session.commit()
-        return count
-
+        return result.rowcount or 0
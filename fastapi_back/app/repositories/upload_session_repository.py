@@ -0,0 +1,85 @@
+"""
+分片上传会话数据访问层
+"""
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, delete, update
+from app.models.upload_session import UploadSession, UploadChunk, UploadStatus
+from app.repositories.base import BaseRepository
+
+
+class UploadSessionRepository(BaseRepository[UploadSession]):
+    """上传会话数据访问层"""
+
+    def __init__(self, session: Session):
+        super().__init__(session, UploadSession)
+
+    def get_by_upload_id(self, upload_id: str) -> Optional[UploadSession]:
+        """根据上传会话标识获取"""
+        return self.session.exec(
+            select(UploadSession).where(UploadSession.upload_id == upload_id)
+        ).first()
+
+    def transition_status(self, upload_session_id: int, from_status: str, to_status: str) -> bool:
+        """条件更新会话状态（仅当前状态为 from_status 时更新），返回是否更新成功"""
+        result = self.session.exec(
+            update(UploadSession)
+            .where(UploadSession.id == upload_session_id, UploadSession.status == from_status)
+            .values(status=to_status)
+        )
+        self.session.commit()
+        return result.rowcount > 0
+
+    def list_chunks(self, upload_session_id: int) -> List[UploadChunk]:
+        """获取已接收的分片（按编号排序）"""
+        return list(self.session.exec(
+            select(UploadChunk)
+            .where(UploadChunk.upload_session_id == upload_session_id)
+            .order_by(UploadChunk.chunk_index)
+        ).all())
+
+    def get_chunk(self, upload_session_id: int, chunk_index: int) -> Optional[UploadChunk]:
+        """获取单个分片记录"""
+        return self.session.exec(
+            select(UploadChunk).where(
+                UploadChunk.upload_session_id == upload_session_id,
+                UploadChunk.chunk_index == chunk_index
+            )
+        ).first()
+
+    def save_chunk(self, upload_session_id: int, chunk_index: int, size: int, sha256: str) -> UploadChunk:
+        """记录已接收的分片（同一分片重复上传时更新原记录）"""
+        chunk = self.get_chunk(upload_session_id, chunk_index)
+        if chunk is None:
+            chunk = UploadChunk(upload_session_id=upload_session_id, chunk_index=chunk_index, size=size, sha256=sha256)
+            self.session.add(chunk)
+            try:
+                self.session.commit()
+            except IntegrityError:
+                # 并发上传同一分片，另一个请求已插入
+                self.session.rollback()
+                chunk = self.get_chunk(upload_session_id, chunk_index)
+            else:
+                self.session.refresh(chunk)
+                return chunk
+
+        chunk.size = size
+        chunk.sha256 = sha256
+        self.session.add(chunk)
+        self.session.commit()
+        self.session.refresh(chunk)
+        return chunk
+
+    def delete_chunks(self, upload_session_id: int) -> None:
+        """删除会话的分片记录"""
+        self.session.exec(delete(UploadChunk).where(UploadChunk.upload_session_id == upload_session_id))
+        self.session.commit()
+
+    def list_expired(self, now: Optional[datetime] = None, limit: int = 100) -> List[UploadSession]:
+        """获取已过期且未完成的会话"""
+        return list(self.session.exec(
+            select(UploadSession)
+            .where(UploadSession.status == UploadStatus.UPLOADING, UploadSession.expires_at < (now or datetime.utcnow()))
+            .limit(limit)
+        ).all())
@@ -77,6 +77,7 @@ from app.schemas.todo import (
     TodoRead,
     TodoReadWithRelations,
     TodoList,
+    TodoDayGroup,
 )
 
 # 附件相关
@@ -160,6 +161,7 @@ __all__ = [
     "TodoRead",
     "TodoReadWithRelations",
     "TodoList",
+    "TodoDayGroup",
     # 附件
     "AttachmentType",
     "AttachmentBase",
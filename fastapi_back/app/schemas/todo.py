@@ -4,7 +4,7 @@
 将DTO与ORM模型分离，符合企业级规范。
 """
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
 
 
@@ -62,3 +62,9 @@ class TodoList(BaseModel):
     """待办列表响应"""
     items: List[TodoReadWithRelations]
     total: int
+
+
+class TodoDayGroup(BaseModel):
+    """某一本地日期的待办"""
+    date: date
+    todos: List[TodoReadWithRelations]
@@ -3,7 +3,9 @@
 
 重构后使用 schemas 中的 DTO 和自定义异常。
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
+import logging
+import os
 from sqlmodel import Session
 
 from app.repositories.attachment_repository import AttachmentRepository
@@ -13,6 +15,10 @@ from app.repositories.system_settings_repository import SystemSettingsRepository
 from app.models.attachment import Attachment
 from app.schemas.attachment import AttachmentUpdate, AttachmentRead
 from app.core.exceptions import NotFoundException, ForbiddenException, BusinessException
+from app.services.blob_store import BlobStore, hash_file
+from app.utils.zip_stream import ZipEntry
+
+logger = logging.getLogger(__name__)
 
 
 class AttachmentService:
@@ -24,6 +30,7 @@ class AttachmentService:
         self.project_repo = ProjectRepository(session)
         self.historical_project_repo = HistoricalProjectRepository(session)
         self.settings_repo = SystemSettingsRepository(session)
+        self.blob_store = BlobStore(session)
 
     def _check_project_access(self, project, current_user_id: int, is_admin: bool):
         """检查项目访问权限"""
@@ -48,19 +55,22 @@ class AttachmentService:
         description: Optional[str] = None,
         folder_id: Optional[int] = None,
         current_user_id: int = None,
-        is_admin: bool = False
+        is_admin: bool = False,
+        sha256: Optional[str] = None
     ) -> AttachmentRead:
-        """创建附件"""
+        """创建附件（文件移入内容寻址存储，相同内容只保存一份）"""
         project = self.project_repo.get_by_id(project_id)
         self._check_project_access(project, current_user_id, is_admin)
 
-        attachment = self.attachment_repo.create(
+        file_path, blob_sha256 = self._store_file(file_path, sha256)
+        attachment = self._create_record(
             project_id=project_id,
             file_path=file_path,
             file_name=file_name,
             file_type=file_type,
             description=description,
-            folder_id=folder_id
+            folder_id=folder_id,
+            blob_sha256=blob_sha256
         )
 
         folder_name = self._get_folder_name(folder_id)
@@ -69,6 +79,82 @@ class AttachmentService:
         result.folder_name = folder_name
         return result
 
+    def _store_file(self, file_path: str, sha256: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """将上传的文件移入内容寻址存储，返回 (存储路径, 内容摘要)；文件不存在时原样返回"""
+        if not file_path or not os.path.isfile(file_path) or self.blob_store.is_blob_path(file_path):
+            return file_path, None
+        blob = self.blob_store.ingest(file_path, sha256)
+        return blob.storage_path, blob.sha256
+
+    def _create_record(self, blob_sha256: Optional[str] = None, **fields) -> Attachment:
+        """创建附件记录，失败时释放已占用的内容引用"""
+        try:
+            return self.attachment_repo.create(blob_sha256=blob_sha256, **fields)
+        except Exception:
+            if blob_sha256:
+                self.blob_store.release(blob_sha256)
+            raise
+
+    def _release_file(self, attachment: Attachment) -> None:
+        """释放附件占用的文件（共享内容只减少引用，旧文件直接删除）"""
+        if attachment.blob_sha256:
+            self.blob_store.release(attachment.blob_sha256)
+            return
+        if attachment.file_path and os.path.exists(attachment.file_path):
+            try:
+                os.remove(attachment.file_path)
+            except OSError as e:
+                # 记录错误但不阻止删除数据库记录
+                logger.warning(f"删除附件文件失败: {attachment.file_path}: {e}")
+
+    def deduplicate_files(self, batch_size: int = 500, dry_run: bool = False) -> Dict[str, int]:
+        """
+        将旧附件（file_path 指向 uploads/<uuid>）移入内容寻址存储，相同内容只保留一份
+
+        按 ID 分批处理，可中断后重新运行。
+
+        Returns:
+            统计信息：processed / deduplicated / missing / bytes_saved
+        """
+        stats = {"processed": 0, "deduplicated": 0, "missing": 0, "bytes_saved": 0}
+        known_hashes = set()
+        moved_paths: Dict[str, str] = {}
+        last_id = 0
+        while True:
+            attachments = self.attachment_repo.list_without_blob(after_id=last_id, limit=batch_size)
+            if not attachments:
+                break
+            for attachment in attachments:
+                last_id = attachment.id
+                path = attachment.file_path
+                sha256 = moved_paths.get(path)
+                if sha256 is None:
+                    if not path or not os.path.isfile(path):
+                        stats["missing"] += 1
+                        continue
+                    sha256 = hash_file(path)
+                    size = os.path.getsize(path)
+                    if sha256 in known_hashes or self.blob_store.blob_repo.get_by_sha256(sha256):
+                        stats["deduplicated"] += 1
+                        stats["bytes_saved"] += size
+                    known_hashes.add(sha256)
+                    moved_paths[path] = sha256
+                    if dry_run:
+                        stats["processed"] += 1
+                        continue
+                    blob = self.blob_store.ingest(path, sha256)
+                else:
+                    # 多条记录指向同一个旧文件，文件已移走，只增加引用
+                    if dry_run:
+                        stats["processed"] += 1
+                        continue
+                    self.blob_store.add_reference(sha256)
+                    blob = self.blob_store.blob_repo.get_by_sha256(sha256)
+
+                self.attachment_repo.update(attachment, {"file_path": blob.storage_path, "blob_sha256": blob.sha256})
+                stats["processed"] += 1
+        return stats
+
     def _get_folder_name(self, folder_id: Optional[int]) -> Optional[str]:
         """获取文件夹名称"""
         if not folder_id:
@@ -89,6 +175,53 @@ class AttachmentService:
         self._check_attachment_permission(attachment, current_user_id, is_admin)
         return AttachmentRead.model_validate(attachment)
 
+    def get_attachments_batch(
+        self,
+        attachment_ids: List[int],
+        current_user_id: int = None,
+        is_admin: bool = False
+    ) -> List[AttachmentRead]:
+        """
+        批量获取附件详情
+
+        附件、所属项目（历史项目）所有者和文件夹名称各一次 IN 查询，权限在内存中判断；
+        不存在或无权访问的附件跳过，结果保持请求中的顺序（包括重复的 ID）。
+        """
+        attachments = {att.id: att for att in self.attachment_repo.get_by_ids(list(set(attachment_ids)))}
+        if not attachments:
+            return []
+
+        project_owners = self.project_repo.get_owner_map(
+            att.project_id for att in attachments.values() if att.project_id
+        )
+        historical_owners = self.historical_project_repo.get_owner_map(
+            att.historical_project_id for att in attachments.values()
+            if not att.project_id and att.historical_project_id
+        )
+        from app.repositories.attachment_folder_repository import AttachmentFolderRepository
+        folder_names = AttachmentFolderRepository(self.session).get_name_map(
+            att.folder_id for att in attachments.values() if att.folder_id
+        )
+
+        result = []
+        for attachment_id in attachment_ids:
+            att = attachments.get(attachment_id)
+            if att is None:
+                continue
+            # 与 _check_attachment_permission 相同的规则：优先按项目，其次按历史项目
+            if att.project_id:
+                owner_id = project_owners.get(att.project_id)
+            elif att.historical_project_id:
+                owner_id = historical_owners.get(att.historical_project_id)
+            else:
+                continue
+            if owner_id is None or (not is_admin and owner_id != current_user_id):
+                continue
+            att_read = AttachmentRead.model_validate(att)
+            att_read.folder_name = folder_names.get(att.folder_id)
+            result.append(att_read)
+        return result
+
     def _get_attachment_or_raise(self, attachment_id: int) -> Attachment:
         """获取附件，不存在则抛出异常"""
         attachment = self.attachment_repo.get_by_id(attachment_id)
@@ -163,10 +296,55 @@ class AttachmentService:
         current_user_id: int = None,
         is_admin: bool = False
     ) -> None:
-        """删除附件"""
+        """删除附件（同时释放文件）"""
         attachment = self._get_attachment_or_raise(attachment_id)
         self._check_attachment_permission(attachment, current_user_id, is_admin)
-        self.attachment_repo.delete(attachment)
+        if self.attachment_repo.delete(attachment):
+            self._release_file(attachment)
+
+    def copy_attachment(
+        self,
+        attachment_id: int,
+        target_project_id: Optional[int] = None,
+        target_folder_id: Optional[int] = None,
+        current_user_id: int = None,
+        is_admin: bool = False
+    ) -> AttachmentRead:
+        """
+        复制附件到指定项目/文件夹
+
+        只复制元数据并增加内容引用，不复制文件；尚未去重的旧附件会先移入内容寻址存储。
+        """
+        attachment = self._get_attachment_or_raise(attachment_id)
+        project = self.project_repo.get_by_id(attachment.project_id) if attachment.project_id else None
+        self._check_project_access(project, current_user_id, is_admin)
+
+        target_project_id = target_project_id or attachment.project_id
+        if target_project_id != attachment.project_id:
+            self._check_project_access(self.project_repo.get_by_id(target_project_id), current_user_id, is_admin)
+
+        if not attachment.blob_sha256:
+            if not os.path.isfile(attachment.file_path):
+                raise NotFoundException("附件文件")
+            blob = self.blob_store.ingest(attachment.file_path)
+            attachment = self.attachment_repo.update(
+                attachment, {"file_path": blob.storage_path, "blob_sha256": blob.sha256}
+            )
+
+        self.blob_store.add_reference(attachment.blob_sha256)
+        new_attachment = self._create_record(
+            project_id=target_project_id,
+            file_path=attachment.file_path,
+            file_name=attachment.file_name,
+            file_type=attachment.file_type,
+            description=attachment.description,
+            folder_id=target_folder_id,
+            blob_sha256=attachment.blob_sha256
+        )
+
+        result = AttachmentRead.model_validate(new_attachment)
+        result.folder_name = self._get_folder_name(target_folder_id)
+        return result
 
     def create_attachment_for_historical_project(
         self,
@@ -177,7 +355,8 @@ class AttachmentService:
         description: Optional[str] = None,
         folder_id: Optional[int] = None,
         current_user_id: int = None,
-        is_admin: bool = False
+        is_admin: bool = False,
+        sha256: Optional[str] = None
     ) -> AttachmentRead:
         """为历史项目创建附件"""
         if not self.settings_repo.is_feature_enabled("enable_resource_management"):
@@ -186,13 +365,15 @@ class AttachmentService:
         historical_project = self.historical_project_repo.get_by_id(historical_project_id)
         self._check_historical_project_access(historical_project, current_user_id, is_admin)
 
-        attachment = self.attachment_repo.create(
+        file_path, blob_sha256 = self._store_file(file_path, sha256)
+        attachment = self._create_record(
             historical_project_id=historical_project_id,
             file_path=file_path,
             file_name=file_name,
             file_type=file_type,
             description=description,
-            folder_id=folder_id
+            folder_id=folder_id,
+            blob_sha256=blob_sha256
         )
 
         folder_name = self._get_folder_name(folder_id)
@@ -234,3 +415,82 @@ class AttachmentService:
             result.append(att_dict)
 
         return result
+
+    def collect_archive_entries(
+        self,
+        project_id: Optional[int] = None,
+        historical_project_id: Optional[int] = None,
+        folder_id: Optional[int] = None,
+        current_user_id: int = None,
+        is_admin: bool = False
+    ) -> Tuple[str, List[ZipEntry]]:
+        """
+        收集打包下载的附件（项目、历史项目或单个文件夹，三选一）
+
+        归档内按文件夹分目录，重名文件自动追加序号；磁盘上已不存在的文件会被跳过。
+
+        Returns:
+            (归档文件名, 归档条目列表)
+        """
+        from app.repositories.attachment_folder_repository import AttachmentFolderRepository
+        folder_repo = AttachmentFolderRepository(self.session)
+
+        if folder_id is not None:
+            folder = folder_repo.get_by_id(folder_id)
+            if not folder:
+                raise NotFoundException("文件夹")
+            if folder.project_id:
+                self._check_project_access(self.project_repo.get_by_id(folder.project_id), current_user_id, is_admin)
+            elif folder.historical_project_id:
+                historical_project = self.historical_project_repo.get_by_id(folder.historical_project_id)
+                self._check_historical_project_access(historical_project, current_user_id, is_admin)
+            else:
+                raise BusinessException(code=400, msg="文件夹必须属于项目或历史项目")
+            attachments = self.attachment_repo.list_by_folder(folder_id)
+            return f"{folder.name}.zip", self._build_archive_entries(attachments, {})
+
+        if project_id is not None:
+            project = self.project_repo.get_by_id(project_id)
+            self._check_project_access(project, current_user_id, is_admin)
+            attachments = self.attachment_repo.list_by_project(project_id)
+            folders = folder_repo.list_by_project(project_id)
+            title = project.title
+        elif historical_project_id is not None:
+            if not self.settings_repo.is_feature_enabled("enable_resource_management"):
+                raise ForbiddenException("历史项目资源管理功能已禁用")
+            historical_project = self.historical_project_repo.get_by_id(historical_project_id)
+            self._check_historical_project_access(historical_project, current_user_id, is_admin)
+            attachments = self.attachment_repo.list_by_historical_project(historical_project_id)
+            folders = folder_repo.list_by_historical_project(historical_project_id)
+            title = historical_project.title
+        else:
+            raise BusinessException(code=400, msg="需要指定项目、历史项目或文件夹")
+
+        folder_names = {folder.id: folder.name for folder in folders}
+        return f"{title}.zip", self._build_archive_entries(attachments, folder_names)
+
+    @staticmethod
+    def _build_archive_entries(attachments: List[Attachment], folder_names: Dict[int, str]) -> List[ZipEntry]:
+        """将附件转换为归档条目（按文件夹分目录，处理重名和缺失文件）"""
+        def safe_name(name: str) -> str:
+            name = name.replace("\\", "_").replace("/", "_").strip()
+            return name if name and name not in (".", "..") else "_"
+
+        entries = []
+        used_names = set()
+        for attachment in sorted(attachments, key=lambda a: a.id):
+            if not attachment.file_path or not os.path.isfile(attachment.file_path):
+                logger.warning(f"打包时跳过不存在的附件文件: id={attachment.id}, path={attachment.file_path}")
+                continue
+
+            folder_name = folder_names.get(attachment.folder_id)
+            prefix = f"{safe_name(folder_name)}/" if folder_name else ""
+            stem, ext = os.path.splitext(safe_name(attachment.file_name))
+            arcname = f"{prefix}{stem}{ext}"
+            counter = 2
+            while arcname in used_names:
+                arcname = f"{prefix}{stem} ({counter}){ext}"
+                counter += 1
+            used_names.add(arcname)
+            entries.append(ZipEntry.from_path(arcname, attachment.file_path))
+        return entries
@@ -0,0 +1,152 @@
+"""
+内容寻址文件存储
+
+按 SHA-256 去重保存上传的文件：
+- 存储路径 uploads/blobs/<sha[0:2]>/<sha[2:4]>/<sha>，两级分片目录避免单目录文件过多
+- 同一内容只保存一份，fileblob.ref_count 记录引用它的附件数
+- 复制附件只增加引用计数（元数据操作），删除附件减少引用，归零时才删除文件
+
+使用示例:
+    store = BlobStore(session)
+    blob = store.ingest("uploads/tmp-upload.mp4")   # 移入存储（已存在相同内容时丢弃源文件）
+    store.add_reference(blob.sha256)                 # 复制附件
+    store.release(blob.sha256)                       # 删除附件
+"""
+import hashlib
+import logging
+import os
+import uuid
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.models.file_blob import FileBlob
+from app.repositories.file_blob_repository import FileBlobRepository
+from app.utils.constants import BLOB_DIR
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """内容寻址文件存储"""
+
+    def __init__(self, session: Session, root: str = BLOB_DIR):
+        self.session = session
+        self.root = root
+        self.blob_repo = FileBlobRepository(session)
+
+    def blob_path(self, sha256: str) -> str:
+        """内容摘要对应的存储路径"""
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def is_blob_path(self, path: str) -> bool:
+        """路径是否已位于存储目录中"""
+        return os.path.abspath(path).startswith(os.path.abspath(self.root) + os.sep)
+
+    def ingest(self, path: str, sha256: Optional[str] = None, references: int = 1) -> FileBlob:
+        """
+        将文件移入存储并增加引用
+
+        Args:
+            path: 源文件（移入后源路径不再存在）
+            sha256: 已知的内容摘要（上传时边写边算，可省去再读一遍）
+            references: 增加的引用数
+
+        Returns:
+            对应的 FileBlob
+        """
+        sha256 = (sha256 or hash_file(path)).lower()
+        blob_path = self.blob_path(sha256)
+
+        # 先增加引用：记录存在时引用已生效，并发的 release 不会再删除它
+        if self.blob_repo.add_references(sha256, references) is not None:
+            blob = self.blob_repo.get_by_sha256(sha256)
+            self._discard_source(path, blob.storage_path)
+            return blob
+
+        # 先写记录再放文件：记录提交后引用已生效，之后再检查存储文件，
+        # 即使并发的 release 刚处理完旧记录也不会删掉这里放入的文件
+        blob = FileBlob(sha256=sha256, size=os.path.getsize(path), storage_path=blob_path, ref_count=references)
+        self.session.add(blob)
+        try:
+            self.session.commit()
+            self.session.refresh(blob)
+        except IntegrityError:
+            # 并发上传了相同内容，另一个请求已创建记录
+            self.session.rollback()
+            self.blob_repo.add_references(sha256, references)
+            blob = self.blob_repo.get_by_sha256(sha256)
+        self._discard_source(path, blob.storage_path)
+        return blob
+
+    def _discard_source(self, path: str, blob_path: str) -> None:
+        """记录已存在时丢弃重复的源文件；存储文件缺失（并发删除）时用源文件补回"""
+        if os.path.abspath(path) == os.path.abspath(blob_path):
+            return
+        if os.path.exists(blob_path):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(path, blob_path)
+
+    def add_reference(self, sha256: str) -> None:
+        """增加一个引用（复制附件）"""
+        self.blob_repo.add_references(sha256, 1)
+
+    def release(self, sha256: str) -> bool:
+        """
+        释放一个引用，引用归零时删除文件和记录
+
+        Returns:
+            文件是否已被删除
+        """
+        remaining = self.blob_repo.add_references(sha256, -1)
+        if remaining is None or remaining > 0:
+            return False
+
+        blob = self.blob_repo.get_by_sha256(sha256)
+        blob_path = blob.storage_path if blob is not None else self.blob_path(sha256)
+        # 删除记录前先把文件改名为唯一的墓碑路径：记录删除后并发上传放入 blob_path 的新文件
+        # 不会被这里误删；记录未删除（期间被重新引用）时再改回原路径
+        tombstone = f"{blob_path}.deleting-{uuid.uuid4().hex}"
+        try:
+            os.replace(blob_path, tombstone)
+        except FileNotFoundError:
+            tombstone = None
+        except OSError as e:
+            # 文件无法处理时保留记录，由对账任务修正
+            logger.warning(f"删除文件内容块失败: {blob_path}: {e}")
+            return False
+
+        # 条件删除：释放后若已被并发上传重新引用，记录和文件都保留
+        if not self.blob_repo.delete_if_unreferenced(sha256):
+            if tombstone is not None:
+                self._restore_tombstone(tombstone, blob_path)
+            return False
+        if tombstone is not None:
+            try:
+                os.remove(tombstone)
+            except OSError as e:
+                # 记录已删除，残留文件由孤儿文件清理任务处理
+                logger.warning(f"删除文件内容块失败: {tombstone}: {e}")
+        return True
+
+    @staticmethod
+    def _restore_tombstone(tombstone: str, blob_path: str) -> None:
+        """把墓碑文件改回原路径；并发上传已补回文件时直接删除墓碑"""
+        if os.path.exists(blob_path):
+            os.remove(tombstone)
+        else:
+            os.replace(tombstone, blob_path)
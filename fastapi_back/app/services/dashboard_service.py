@@ -3,16 +3,15 @@ Dashboard服务层
 
 重构后使用 utils/constants 中的常量。
 """
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from datetime import date
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.repositories.project_repository import ProjectRepository
-from app.repositories.step_repository import StepRepository
+from app.repositories.project_repository import ProjectRepository, AsyncProjectRepository
+from app.repositories.step_repository import StepRepository, AsyncStepRepository
 from app.repositories.platform_repository import PlatformRepository
-from app.models.project import ProjectStep
-from app.models.platform import Platform
-from app.utils.constants import StepStatus
+from app.repositories.todo_repository import TodoRepository, AsyncTodoRepository, TodoWithSteps
 from pydantic import BaseModel
 
 
@@ -34,44 +33,75 @@ class DashboardService:
         self.platform_repo = PlatformRepository(session)
     
     def get_dashboard_stats(self, user_id: Optional[int], is_admin: bool) -> DashboardStats:
-        """获取Dashboard统计数据"""
-        # 获取项目列表
-        if is_admin:
-            projects = self.project_repo.list()
-        else:
-            projects = self.project_repo.list_by_user(user_id)
-        
-        project_ids = [p.id for p in projects]
-        
-        # 获取今日Todo列表（从新的待办表）
-        from app.repositories.todo_repository import TodoRepository
-        from datetime import date
-        import json
-        
+        """
+        获取Dashboard统计数据
+
+        收益、待处理项目数、进行中步骤数均由 SQL 聚合（GROUP BY / COUNT）计算，
+        不再把全部项目加载到内存；今日待办与步骤、项目一次联表查询。
+        """
+        scope_user_id = None if is_admin else user_id
+
+        today_todos = self._build_today_todos(scope_user_id)
+
+        return self._assemble_stats(
+            today_todos=today_todos,
+            income_rows=self.project_repo.sum_paid_income_by_platform(scope_user_id),
+            pending_projects_count=self.project_repo.count_pending(scope_user_id),
+            in_progress_steps_count=self.step_repo.count_in_progress_steps(scope_user_id)
+        )
+
+    @staticmethod
+    def _assemble_stats(
+        today_todos: List[dict],
+        income_rows: List[Tuple[Optional[str], float]],
+        pending_projects_count: int,
+        in_progress_steps_count: int
+    ) -> DashboardStats:
+        """由聚合查询结果组装统计数据（同步/异步服务共用）"""
+        # 按平台统计收益（使用实际收入字段）
+        platform_revenue: Dict[str, float] = {}
+        for platform_name, income in income_rows:
+            platform_name = platform_name or "未知平台"
+            platform_revenue[platform_name] = platform_revenue.get(platform_name, 0) + income
+
+        # 计算总收益（使用实际收入字段）
+        total_revenue = sum(platform_revenue.values())
+
+        return DashboardStats(
+            today_todos=today_todos,
+            total_revenue=total_revenue,
+            platform_revenue=platform_revenue,
+            pending_projects_count=pending_projects_count,
+            in_progress_steps_count=in_progress_steps_count
+        )
+
+    def _build_today_todos(self, user_id: Optional[int]) -> List[dict]:
+        """获取今日待办列表（待办、步骤和项目一次联表查询）"""
         todo_repo = TodoRepository(self.session)
-        todos = todo_repo.list_by_date(date.today(), user_id if not is_admin else None)
-        
+        return self._assemble_today_todos(todo_repo.list_by_date_with_steps(date.today(), user_id))
+
+    @staticmethod
+    def _assemble_today_todos(items: List[TodoWithSteps]) -> List[dict]:
+        """由联表查询的待办、步骤和项目组装今日待办列表（同步/异步服务共用）"""
         today_todos = []
-        for todo in todos:
+        for item in items:
             # 显示所有待办，包括已完成的
-            step_ids = json.loads(todo.step_ids)
-            steps = [self.step_repo.get_by_id(sid) for sid in step_ids]
-            step_names = [s.name for s in steps if s]
-            project = self.project_repo.get_by_id(todo.project_id)
-            
+            todo = item.todo
+            has_project = bool(todo.project_id and item.project_title is not None)
+
             # 返回完整的待办数据结构，匹配前端期望
             todo_dict = {
                 "id": todo.id,
                 "project_id": todo.project_id,
-                "project_title": project.title if project else "未知项目",
+                "project_title": item.project_title if has_project else "未知项目",
                 "description": todo.description,
-                "step_ids": step_ids,
-                "step_names": step_names,
+                "step_ids": item.step_ids,
+                "step_names": item.step_names,
                 "completion_note": todo.completion_note,
                 "is_completed": todo.is_completed,
-                "student_name": project.student_name or "" if project else ""
+                "student_name": item.student_name or "" if has_project else ""
             }
-            
+
             # 处理日期字段
             if todo.target_date:
                 todo_dict["target_date"] = todo.target_date.isoformat()
@@ -79,37 +109,44 @@ class DashboardService:
                 todo_dict["created_at"] = todo.created_at.isoformat()
             if todo.updated_at:
                 todo_dict["updated_at"] = todo.updated_at.isoformat()
-            
+
             today_todos.append(todo_dict)
-        
-        # 计算总收益（使用实际收入字段）
-        total_revenue = sum(
-            p.actual_income for p in projects if p.is_paid and p.actual_income > 0
-        )
-        
-        # 按平台统计收益（使用实际收入字段）
-        platform_revenue: Dict[str, float] = {}
-        for project in projects:
-            if project.is_paid and project.actual_income > 0:
-                platform = self.platform_repo.get_by_id(project.platform_id)
-                platform_name = platform.name if platform else "未知平台"
-                platform_revenue[platform_name] = platform_revenue.get(platform_name, 0) + project.actual_income
-        
-        # 待处理项目数（状态不是"已结账"的项目）
-        pending_projects = [
-            p for p in projects 
-            if p.status != "已结账"
-        ]
-        pending_projects_count = len(pending_projects)
-        
-        # 进行中步骤数
-        in_progress_steps = self.step_repo.list_in_progress_steps(project_ids)
-        
-        return DashboardStats(
+
+        return today_todos
+
+
+class AsyncDashboardService:
+    """
+    Dashboard服务层（异步）
+
+    与 DashboardService 执行相同的查询，但基于 AsyncSession，等待数据库期间
+    不阻塞事件循环，慢聚合查询不会拖住同一 worker 上的其他请求。
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.project_repo = AsyncProjectRepository(session)
+        self.step_repo = AsyncStepRepository(session)
+        self.todo_repo = AsyncTodoRepository(session)
+
+    async def get_dashboard_stats(self, user_id: Optional[int], is_admin: bool) -> DashboardStats:
+        """获取Dashboard统计数据"""
+        scope_user_id = None if is_admin else user_id
+
+        # 同一会话（连接）上的查询须顺序执行
+        today_todos = await self._build_today_todos(scope_user_id)
+        income_rows = await self.project_repo.sum_paid_income_by_platform(scope_user_id)
+        pending_projects_count = await self.project_repo.count_pending(scope_user_id)
+        in_progress_steps_count = await self.step_repo.count_in_progress_steps(scope_user_id)
+
+        return DashboardService._assemble_stats(
             today_todos=today_todos,
-            total_revenue=total_revenue,
-            platform_revenue=platform_revenue,
+            income_rows=income_rows,
             pending_projects_count=pending_projects_count,
-            in_progress_steps_count=len(in_progress_steps)
+            in_progress_steps_count=in_progress_steps_count
         )
 
+    async def _build_today_todos(self, user_id: Optional[int]) -> List[dict]:
+        """获取今日待办列表（待办、步骤和项目一次联表查询）"""
+        items = await self.todo_repo.list_by_date_with_steps(date.today(), user_id)
+        return DashboardService._assemble_today_todos(items)
@@ -0,0 +1,271 @@
+"""
+附件预览派生文件缓存
+
+首次请求时生成并缓存附件的派生文件，之后直接返回缓存：
+- 图片缩略图：按最长边缩放（128/256/512/1024），输出 WebP 或 JPEG，按 EXIF 方向旋转
+- 文本预览：只读取前 TEXT_PREVIEW_MAX_BYTES 字节，UTF-8 / GBK 解码后统一保存为 UTF-8
+
+派生文件保存在 uploads/.derivatives/<key[0:2]>/<key[2:4]>/<key>.<变体>，key 为内容摘要
+（内容寻址存储中的文件名即 SHA-256；旧文件按路径、大小和修改时间生成），同一内容的
+多个附件共用一份缓存，内容变化后自然失效。
+
+缓存总大小超过 DERIVATIVE_CACHE_MAX_BYTES 时按最近访问时间（命中时更新修改时间）
+淘汰到上限的 90%。总大小在进程内累计，淘汰时重新扫描目录校准，多 worker 共用同一目录。
+
+缩略图依赖 Pillow；未安装或图片无法解码时返回 None，由调用方回退到原文件。
+
+使用示例:
+    from app.services.derivative_cache import derivative_cache
+
+    thumb = derivative_cache.thumbnail(file_path, size=256, fmt="webp")
+    preview = derivative_cache.text_preview(file_path)
+"""
+import codecs
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.utils.constants import BLOB_DIR, DERIVATIVE_DIR
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - 未安装 Pillow 时不生成缩略图
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (128, 256, 512, 1024)
+
+# 格式名 -> (Pillow 格式, 扩展名, MIME 类型)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+
+# 可以生成缩略图的原图格式
+THUMBNAIL_SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff", ".tif"}
+
+_THUMBNAIL_QUALITY = 80
+
+# 淘汰后保留的比例
+_EVICT_TARGET_RATIO = 0.9
+
+_TMP_SUFFIX = ".tmp"
+
+
+@dataclass
+class Derivative:
+    """已生成的派生文件"""
+    path: str
+    media_type: str
+    truncated: bool = False
+
+
+def snap_thumbnail_size(size: int) -> int:
+    """取不小于请求尺寸的最小预设尺寸，限制缓存变体数量"""
+    for preset in THUMBNAIL_SIZES:
+        if preset >= size:
+            return preset
+    return THUMBNAIL_SIZES[-1]
+
+
+def _decode_prefix(data: bytes, final: bool) -> Optional[str]:
+    """
+    依次尝试 UTF-8、GBK 解码
+
+    数据被截断时（final=False）末尾不完整的多字节字符会被丢弃，而不是判定为解码失败。
+    """
+    for encoding in ("utf-8", "gbk"):
+        try:
+            return codecs.getincrementaldecoder(encoding)().decode(data, final=final)
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+class DerivativeCache:
+    """派生文件缓存"""
+
+    def __init__(self, root: str = DERIVATIVE_DIR, max_bytes: Optional[int] = None):
+        self.root = root
+        self.max_bytes = settings.DERIVATIVE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    # ---------- 缓存键与路径 ----------
+
+    @staticmethod
+    def content_key(source_path: str) -> str:
+        """原文件的缓存键：内容寻址存储中直接用 SHA-256，旧文件用路径、大小和修改时间"""
+        name = os.path.basename(source_path)
+        if len(name) == 64 and os.path.abspath(source_path).startswith(os.path.abspath(BLOB_DIR) + os.sep):
+            return name
+        stat_result = os.stat(source_path)
+        identity = f"{os.path.abspath(source_path)}:{stat_result.st_size}:{stat_result.st_mtime_ns}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def _derivative_path(self, key: str, variant: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}.{variant}")
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """命中时更新修改时间（作为最近访问时间）；文件不存在返回 False"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _store(self, path: str, write: Callable[[str], None]) -> None:
+        """写入临时文件后原子重命名，并计入缓存大小"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}{_TMP_SUFFIX}"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        self._account(os.path.getsize(path))
+
+    # ---------- 派生文件 ----------
+
+    def thumbnail(
+        self,
+        source_path: str,
+        size: int = 256,
+        fmt: str = "webp",
+        file_name: Optional[str] = None
+    ) -> Optional[Derivative]:
+        """
+        获取图片缩略图
+
+        Args:
+            source_path: 原图路径
+            size: 最长边像素（会对齐到预设尺寸）
+            fmt: webp 或 jpeg
+            file_name: 原始文件名（内容寻址存储中的文件没有扩展名，按原始文件名判断格式）
+
+        Returns:
+            缩略图；不支持的格式、未安装 Pillow 或图片无法解码时返回 None
+        """
+        if Image is None or fmt not in THUMBNAIL_FORMATS:
+            return None
+        if os.path.splitext(file_name or source_path)[1].lower() not in THUMBNAIL_SOURCE_EXTENSIONS:
+            return None
+
+        pil_format, extension, media_type = THUMBNAIL_FORMATS[fmt]
+        size = snap_thumbnail_size(size)
+        path = self._derivative_path(self.content_key(source_path), f"thumb-{size}.{extension}")
+        if self._touch(path):
+            return Derivative(path=path, media_type=media_type)
+
+        def write(tmp_path: str) -> None:
+            with Image.open(source_path) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size))
+                if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                elif image.mode not in ("RGB", "RGBA", "L"):
+                    image = image.convert("RGBA")
+                image.save(tmp_path, format=pil_format, quality=_THUMBNAIL_QUALITY)
+
+        try:
+            self._store(path, write)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.info(f"无法生成缩略图: {source_path}: {e}")
+            return None
+        return Derivative(path=path, media_type=media_type)
+
+    def text_preview(self, source_path: str, max_bytes: Optional[int] = None) -> Optional[Derivative]:
+        """
+        获取文本预览（UTF-8，超过 max_bytes 时截断）
+
+        Returns:
+            文本预览；内容无法按 UTF-8 或 GBK 解码时返回 None
+        """
+        max_bytes = settings.TEXT_PREVIEW_MAX_BYTES if max_bytes is None else max_bytes
+        truncated = os.path.getsize(source_path) > max_bytes
+        path = self._derivative_path(self.content_key(source_path), f"text-{max_bytes}.txt")
+        if self._touch(path):
+            return Derivative(path=path, media_type="text/plain; charset=utf-8", truncated=truncated)
+
+        with open(source_path, "rb") as f:
+            data = f.read(max_bytes)
+        text = _decode_prefix(data, final=not truncated)
+        if text is None:
+            return None
+
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+
+        self._store(path, write)
+        return Derivative(path=path, media_type="text/plain; charset=utf-8", truncated=truncated)
+
+    # ---------- 容量控制 ----------
+
+    def _scan(self):
+        """列出缓存文件：(修改时间, 大小, 路径)"""
+        entries = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(_TMP_SUFFIX):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat_result = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, path))
+        return entries
+
+    def _account(self, added: int) -> None:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += added
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked(int(self.max_bytes * _EVICT_TARGET_RATIO))
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """
+        按最近访问时间淘汰，直到缓存总大小不超过 target_bytes
+
+        Returns:
+            释放的字节数
+        """
+        target_bytes = int(self.max_bytes * _EVICT_TARGET_RATIO) if target_bytes is None else target_bytes
+        with self._lock:
+            return self._evict_locked(target_bytes)
+
+    def _evict_locked(self, target_bytes: int) -> int:
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            freed += size
+        self._total_bytes = total - freed
+        if freed:
+            logger.info(f"派生文件缓存淘汰 {freed / (1024 * 1024):.1f}MB，当前 {self._total_bytes / (1024 * 1024):.1f}MB")
+        return freed
+
+
+# 全局实例
+derivative_cache = DerivativeCache()
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from sqlmodel import Session
 from fastapi import HTTPException, status
 from app.repositories.github_commit_repository import GitHubCommitRepository
+from app.repositories.pagination import Page
 from app.repositories.project_repository import ProjectRepository
 from app.models.github_commit import GitHubCommitCreate, GitHubCommitRead
 
@@ -250,4 +251,15 @@ class GitHubService:
         """获取项目的commits（不触发同步）"""
         commits = self.commit_repo.get_by_project_and_branch(project_id, branch, limit)
         return [GitHubCommitRead.model_validate(c) for c in commits]
+    
+    def get_commits_page(
+        self,
+        project_id: int,
+        branch: str = 'main',
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Page[GitHubCommitRead]:
+        """游标分页获取项目的commits（不触发同步）"""
+        page = self.commit_repo.get_page_by_project_and_branch(project_id, branch, cursor, limit)
+        return Page(items=[GitHubCommitRead.model_validate(c) for c in page.items], next_cursor=page.next_cursor)
 
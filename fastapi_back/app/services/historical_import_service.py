@@ -0,0 +1,434 @@
+"""
+历史项目批量导入
+
+从 CSV / JSONL 文件或请求中的项目列表批量导入历史项目：
+- 第一遍流式读取并校验全部行（字段格式、平台、标签），不写库；dry_run 时到此为止，
+  skip_invalid=False 且存在错误行时整批不导入
+- 第二遍按 chunk_size 分批，每批在一个事务中用 executemany 插入历史项目和标签关联，
+  同步全文检索索引后提交；某一批写入失败只影响该批
+- 返回逐行结果：成功导入的项目ID和失败行的行号、原因
+
+文件只在两遍读取之间回到开头（上传文件已由框架落盘），内存占用与文件大小无关。
+
+CSV 首行为表头，支持英文字段名或中文列名（标题、学生姓名、平台、标签等）；标签列用
+逗号、分号或竖线分隔。文件编码支持 UTF-8（含 BOM）和 GBK（Excel 默认导出）。
+
+使用示例:
+    service = HistoricalImportService(session)
+    with open("projects.csv", "rb") as f:
+        report = service.import_file(f, "csv", user_id=1)
+    print(report.imported, report.failed, report.errors)
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+
+from app.core.exceptions import ValidationException
+from app.models.historical_project import HistoricalProjectCreate
+from app.models.tag import Tag
+from app.repositories.historical_project_repository import COUNT_CACHE_NAMESPACE, HistoricalProjectRepository
+from app.repositories.pagination import count_cache
+from app.repositories.platform_repository import PlatformRepository
+from app.repositories.search_index import HistoricalProjectSearchIndex
+from app.repositories.tag_repository import HistoricalProjectTagRepository, TagRepository
+
+logger = logging.getLogger(__name__)
+
+# 表头别名 -> 字段名
+FIELD_ALIASES = {
+    "标题": "title", "项目标题": "title", "项目名称": "title",
+    "学生姓名": "student_name", "学生": "student_name",
+    "平台": "platform", "平台名称": "platform", "平台id": "platform_id",
+    "价格": "price", "项目价格": "price",
+    "实际收入": "actual_income",
+    "状态": "status", "项目状态": "status",
+    "github地址": "github_url", "github": "github_url",
+    "需求": "requirements", "需求描述": "requirements",
+    "是否已结账": "is_paid", "已结账": "is_paid",
+    "完成日期": "completion_date", "完成时间": "completion_date",
+    "备注": "notes",
+    "标签": "tags", "标签id": "tag_ids",
+    "导入来源": "import_source",
+}
+
+_TRUE_VALUES = {"是", "已结账", "已付款", "y", "yes", "true", "1"}
+_FALSE_VALUES = {"否", "未结账", "未付款", "n", "no", "false", "0"}
+_LIST_SEPARATOR_RE = re.compile(r"[,，;；|、]")
+
+# 报告中保留的错误行数量
+_ERROR_LIMIT = 1000
+
+# 编码检测读取的字节数
+_SNIFF_BYTES = 64 * 1024
+
+# (行号, 原始数据, 解析错误)
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+@dataclass
+class ImportRowError:
+    """导入失败的行"""
+    row: int
+    message: str
+    title: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    """批量导入结果"""
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    project_ids: List[int] = field(default_factory=list)
+    errors: List[ImportRowError] = field(default_factory=list)
+
+    def add_error(self, row: int, message: str, title: Optional[str] = None) -> None:
+        self.failed += 1
+        if len(self.errors) < _ERROR_LIMIT:
+            self.errors.append(ImportRowError(row=row, message=message, title=title))
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "dry_run": self.dry_run,
+            "project_ids": self.project_ids,
+            "errors": [{"row": e.row, "message": e.message, "title": e.title} for e in self.errors],
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+@dataclass
+class _PreparedRow:
+    """校验通过的行"""
+    row: int
+    values: Dict[str, Any]
+    tag_ids: List[int]
+    new_tag_names: List[str]
+
+
+# ==================== 文件读取 ====================
+
+def _detect_encoding(stream: BinaryIO) -> str:
+    """根据文件开头判断编码：能按 UTF-8 解码时使用 UTF-8（兼容 BOM），否则按 GBK（GB18030）"""
+    sample = stream.read(_SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+@contextmanager
+def _open_text(stream: BinaryIO) -> Iterator[io.TextIOWrapper]:
+    """从头以文本方式读取；结束后解除包装，不关闭底层文件"""
+    stream.seek(0)
+    wrapper = io.TextIOWrapper(stream, encoding=_detect_encoding(stream), newline="")
+    try:
+        yield wrapper
+    finally:
+        wrapper.detach()
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[RawRow]:
+    """逐行读取 CSV（首行为表头），行号为文件中的行号"""
+    with _open_text(stream) as text:
+        reader = csv.DictReader(text)
+        try:
+            for raw in reader:
+                yield reader.line_num, raw, None
+        except UnicodeDecodeError:
+            raise ValidationException(f"第 {reader.line_num + 1} 行编码错误，请使用 UTF-8 或 GBK 编码", field="file")
+        except csv.Error as e:
+            raise ValidationException(f"第 {reader.line_num} 行 CSV 格式错误: {e}", field="file")
+
+
+def iter_jsonl_rows(stream: BinaryIO) -> Iterator[RawRow]:
+    """逐行读取 JSONL（每行一个 JSON 对象，空行跳过）"""
+    with _open_text(stream) as text:
+        line_number = 0
+        try:
+            for line_number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"JSON 格式错误: {e.msg}"
+                    continue
+                if not isinstance(raw, dict):
+                    yield line_number, None, "每行必须是一个 JSON 对象"
+                    continue
+                yield line_number, raw, None
+        except UnicodeDecodeError:
+            raise ValidationException(f"第 {line_number + 1} 行编码错误，请使用 UTF-8 或 GBK 编码", field="file")
+
+
+_READERS = {"csv": iter_csv_rows, "jsonl": iter_jsonl_rows}
+
+
+# ==================== 字段规范化 ====================
+
+def _split_list(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = _LIST_SEPARATOR_RE.split(str(value))
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+def normalize_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    统一字段名和取值
+
+    - 表头去空白、转小写后按 FIELD_ALIASES 映射
+    - 空字符串视为未填写
+    - 是否已结账支持 是/否，日期支持 2023/05/01
+    - tags、tag_ids 拆分为列表
+    """
+    data: Dict[str, Any] = {}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        name = str(key).strip().lower()
+        name = FIELD_ALIASES.get(name, name)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                continue
+        if value is None:
+            continue
+        data[name] = value
+
+    is_paid = data.get("is_paid")
+    if isinstance(is_paid, str):
+        lowered = is_paid.lower()
+        if lowered in _TRUE_VALUES:
+            data["is_paid"] = True
+        elif lowered in _FALSE_VALUES:
+            data["is_paid"] = False
+    completion_date = data.get("completion_date")
+    if isinstance(completion_date, str):
+        data["completion_date"] = completion_date.replace("/", "-")
+    if "tags" in data:
+        data["tags"] = _split_list(data["tags"])
+    if "tag_ids" in data:
+        data["tag_ids"] = _split_list(data["tag_ids"])
+    return data
+
+
+def _raw_title(raw: Optional[Dict[str, Any]]) -> Optional[str]:
+    """错误报告中显示的标题"""
+    if not raw:
+        return None
+    for key, value in raw.items():
+        if key is not None and FIELD_ALIASES.get(str(key).strip().lower(), str(key).strip().lower()) == "title":
+            return str(value).strip() or None
+    return None
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    messages = []
+    for item in error.errors():
+        location = ".".join(str(part) for part in item["loc"])
+        message = "必填字段未填写" if item["type"] == "missing" else item["msg"].removeprefix("Value error, ")
+        messages.append(f"{location}: {message}" if location else message)
+    return "; ".join(messages)
+
+
+# ==================== 导入 ====================
+
+class HistoricalImportService:
+    """历史项目批量导入服务"""
+
+    def __init__(self, session: Session, chunk_size: int = 500):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.historical_project_repo = HistoricalProjectRepository(session)
+        self.tag_repo = TagRepository(session)
+        self.project_tag_repo = HistoricalProjectTagRepository(session)
+        self.search_index = HistoricalProjectSearchIndex(session)
+        self._platform_ids: Dict[str, int] = {}
+        self._known_platform_ids: Set[int] = set()
+        self._tag_ids: Dict[str, int] = {}
+        self._known_tag_ids: Set[int] = set()
+
+    def import_file(
+        self,
+        stream: BinaryIO,
+        fmt: str,
+        user_id: int,
+        import_source: Optional[str] = "批量导入",
+        dry_run: bool = False,
+        skip_invalid: bool = True
+    ) -> ImportReport:
+        """
+        从 CSV / JSONL 文件导入（stream 需可 seek，会读取两遍）
+
+        Raises:
+            ValidationException: 不支持的格式，或文件编码、CSV 结构错误
+        """
+        reader = _READERS.get(fmt)
+        if reader is None:
+            raise ValidationException("仅支持 CSV 或 JSONL 文件", field="file")
+        return self.import_rows(lambda: reader(stream), user_id, import_source, dry_run, skip_invalid)
+
+    def import_rows(
+        self,
+        rows: Callable[[], Iterator[RawRow]],
+        user_id: int,
+        import_source: Optional[str] = None,
+        dry_run: bool = False,
+        skip_invalid: bool = True
+    ) -> ImportReport:
+        """
+        批量导入
+
+        Args:
+            rows: 返回 (行号, 原始数据, 解析错误) 迭代器的函数，会调用两次（校验、写入）
+            user_id: 创建人ID
+            import_source: 导入来源（覆盖行中的值）
+            dry_run: 只校验不写入
+            skip_invalid: 跳过错误行继续导入；为 False 时存在错误行则整批不导入
+
+        Returns:
+            ImportReport
+        """
+        report = ImportReport(dry_run=dry_run)
+        self._load_references()
+
+        # 第一遍：校验全部行
+        for row_number, raw, parse_error in rows():
+            report.total += 1
+            try:
+                self._prepare(row_number, raw, parse_error, import_source)
+            except ValueError as e:
+                report.add_error(row_number, str(e), _raw_title(raw))
+
+        if dry_run or not report.total or (report.failed and not skip_invalid):
+            return report
+
+        # 第二遍：分批写入
+        chunk: List[_PreparedRow] = []
+        for row_number, raw, parse_error in rows():
+            try:
+                chunk.append(self._prepare(row_number, raw, parse_error, import_source))
+            except ValueError:
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk, user_id, report)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk, user_id, report)
+
+        count_cache.invalidate(COUNT_CACHE_NAMESPACE)
+        logger.info(
+            f"历史项目批量导入完成: 共 {report.total} 行, 导入 {report.imported} 个, 失败 {report.failed} 行"
+        )
+        return report
+
+    def _load_references(self) -> None:
+        """预加载平台和标签（名称 -> id），校验时不再逐行查询"""
+        platforms = PlatformRepository(self.session).get_name_map()
+        self._known_platform_ids = set(platforms)
+        self._platform_ids = {name: platform_id for platform_id, name in platforms.items()}
+        self._tag_ids = self.tag_repo.get_id_map()
+        self._known_tag_ids = set(self._tag_ids.values())
+
+    def _prepare(
+        self,
+        row_number: int,
+        raw: Optional[Dict[str, Any]],
+        parse_error: Optional[str],
+        import_source: Optional[str]
+    ) -> _PreparedRow:
+        """校验一行并解析平台、标签；失败时抛出 ValueError（消息即错误原因）"""
+        if parse_error:
+            raise ValueError(parse_error)
+        data = normalize_row(raw)
+
+        platform_name = data.pop("platform", None)
+        if platform_name is not None and "platform_id" not in data:
+            platform_id = self._platform_ids.get(str(platform_name))
+            if platform_id is None:
+                raise ValueError(f"平台不存在: {platform_name}")
+            data["platform_id"] = platform_id
+
+        tag_ids: List[int] = []
+        for value in data.pop("tag_ids", []):
+            if not str(value).isdigit() or int(value) not in self._known_tag_ids:
+                raise ValueError(f"标签不存在: {value}")
+            tag_ids.append(int(value))
+        new_tag_names: List[str] = []
+        for name in data.pop("tags", []):
+            if len(name) > 50:
+                raise ValueError(f"标签名称过长: {name}")
+            if name in self._tag_ids:
+                tag_ids.append(self._tag_ids[name])
+            elif name not in new_tag_names:
+                new_tag_names.append(name)
+
+        if import_source:
+            data["import_source"] = import_source
+        try:
+            project = HistoricalProjectCreate.model_validate(data)
+        except ValidationError as e:
+            raise ValueError(_format_validation_error(e))
+        if project.platform_id is not None and project.platform_id not in self._known_platform_ids:
+            raise ValueError(f"平台不存在: {project.platform_id}")
+
+        values = project.model_dump(exclude={"requirement_files"})
+        return _PreparedRow(
+            row=row_number, values=values, tag_ids=list(dict.fromkeys(tag_ids)), new_tag_names=new_tag_names
+        )
+
+    def _write_chunk(self, chunk: List[_PreparedRow], user_id: int, report: ImportReport) -> None:
+        """在一个事务中写入一批项目及其标签关联"""
+        try:
+            self._create_missing_tags(chunk, user_id)
+            project_ids = self.historical_project_repo.bulk_insert([item.values for item in chunk], user_id)
+            pairs = []
+            for item, project_id in zip(chunk, project_ids):
+                tag_ids = item.tag_ids + [self._tag_ids[name] for name in item.new_tag_names]
+                pairs.extend((project_id, tag_id) for tag_id in dict.fromkeys(tag_ids))
+            self.project_tag_repo.bulk_create(pairs)
+            self.search_index.reindex(project_ids)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            # 本批新建的标签已回滚，重新加载
+            self._tag_ids = self.tag_repo.get_id_map()
+            self._known_tag_ids = set(self._tag_ids.values())
+            logger.error(f"历史项目批量导入写入失败（第 {chunk[0].row}~{chunk[-1].row} 行）: {e}", exc_info=True)
+            for item in chunk:
+                report.add_error(item.row, f"写入失败: {e.__class__.__name__}", item.values.get("title"))
+            return
+        report.imported += len(project_ids)
+        report.project_ids.extend(project_ids)
+
+    def _create_missing_tags(self, chunk: List[_PreparedRow], user_id: int) -> None:
+        """创建本批引用但尚不存在的标签"""
+        names = [
+            name for item in chunk for name in item.new_tag_names if name not in self._tag_ids
+        ]
+        if not names:
+            return
+        tags = [Tag(name=name, user_id=user_id) for name in dict.fromkeys(names)]
+        self.session.add_all(tags)
+        self.session.flush()
+        for tag in tags:
+            self._tag_ids[tag.name] = tag.id
+            self._known_tag_ids.add(tag.id)
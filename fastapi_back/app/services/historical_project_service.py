@@ -5,6 +5,7 @@ import logging
 from typing import Optional, List
 from sqlmodel import Session
 from fastapi import HTTPException, status
+from app.repositories.pagination import Page
 from app.repositories.historical_project_repository import HistoricalProjectRepository
 from app.repositories.attachment_repository import AttachmentRepository
 from app.repositories.user_repository import UserRepository
@@ -154,6 +155,37 @@ class HistoricalProjectService:
         
         return result
     
+    def list_historical_projects_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        search: Optional[str] = None,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None
+    ) -> Page[HistoricalProjectReadWithRelations]:
+        """游标分页获取历史项目列表"""
+        page = self.historical_project_repo.list_page(
+            cursor=cursor,
+            limit=limit,
+            search=search,
+            user_id=user_id,
+            platform_id=platform_id,
+            status=status,
+            tag_ids=tag_ids
+        )
+        
+        items = []
+        for project in page.items:
+            try:
+                items.append(self.get_historical_project_with_relations(project.id))
+            except Exception as e:
+                logger.error(f"Error processing historical project {project.id}: {str(e)}", exc_info=True)
+                continue
+        
+        return Page(items=items, next_cursor=page.next_cursor)
+    
     def update_historical_project(
         self,
         project_id: int,
@@ -215,19 +247,87 @@ class HistoricalProjectService:
         
         return self.get_historical_project_with_relations(historical_project.id)
     
+    def archive_project(
+        self,
+        project_id: int,
+        current_user_id: int,
+        is_admin: bool = False
+    ) -> HistoricalProjectReadWithRelations:
+        """将项目连同步骤、附件、待办、日志等全部关联数据归档为历史项目，并删除原项目"""
+        from app.repositories.project_repository import ProjectRepository
+        
+        project = ProjectRepository(self.session).get_by_id(project_id)
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="原项目不存在"
+            )
+        
+        # 权限检查：只有项目所有者或管理员可以归档
+        if not is_admin and project.user_id != current_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="无权归档此项目"
+            )
+        
+        historical_project = self.historical_project_repo.archive_project(project_id)
+        if not historical_project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="原项目不存在"
+            )
+        
+        return self.get_historical_project_with_relations(historical_project.id)
+    
     def batch_import(self, import_request: HistoricalProjectImportRequest, user_id: int) -> List[HistoricalProjectReadWithRelations]:
-        """批量导入历史项目"""
-        results = []
-        for project_data in import_request.projects:
-            try:
-                project_data.import_source = import_request.import_source or project_data.import_source
-                historical_project = self.historical_project_repo.create(project_data, user_id)
-                results.append(self.get_historical_project_with_relations(historical_project.id))
-            except Exception as e:
-                logger.error(f"Error importing historical project: {str(e)}", exc_info=True)
-                continue
+        """批量导入历史项目（分批 executemany 写入，返回成功导入的项目）"""
+        from app.services.historical_import_service import HistoricalImportService
+        
+        def rows():
+            for row_number, project_data in enumerate(import_request.projects, 1):
+                yield row_number, project_data.model_dump(exclude_none=True), None
+        
+        report = HistoricalImportService(self.session).import_rows(
+            rows, user_id, import_source=import_request.import_source
+        )
+        for error in report.errors:
+            logger.error(f"Error importing historical project (row {error.row}): {error.message}")
+        return self._build_imported_reads(report.project_ids)
+    
+    def _build_imported_reads(self, project_ids: List[int]) -> List[HistoricalProjectReadWithRelations]:
+        """
+        批量构建新导入项目的读取模型
+        
+        平台、创建人、标签各一次查询；新项目没有附件、待办等关联数据，计数均为 0。
+        """
+        from app.models.tag import TagRead
+        from app.repositories.tag_repository import HistoricalProjectTagRepository
+        
+        if not project_ids:
+            return []
+        projects = {project.id: project for project in self.historical_project_repo.get_by_ids(project_ids)}
+        platform_names = self.platform_repo.get_name_map()
+        user_names = {}
+        tags = HistoricalProjectTagRepository(self.session).list_tags_by_projects(project_ids)
+        tags_by_project = {}
+        for project_id, tag in tags:
+            tags_by_project.setdefault(project_id, []).append(TagRead.model_validate(tag))
         
-        return results
+        result = []
+        for project_id in project_ids:
+            project = projects.get(project_id)
+            if project is None:
+                continue
+            if project.user_id not in user_names:
+                user = self.user_repo.get_by_id(project.user_id)
+                user_names[project.user_id] = user.username if user else None
+            result.append(HistoricalProjectReadWithRelations(
+                **project.model_dump(),
+                platform_name=platform_names.get(project.platform_id),
+                user_name=user_names[project.user_id],
+                tags=tags_by_project.get(project_id, [])
+            ))
+        return result
     
     def get_count(
         self,
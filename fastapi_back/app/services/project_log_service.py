@@ -4,8 +4,12 @@
 from sqlmodel import Session
 from typing import List, Optional
 import json
+from pydantic import ValidationError
 from app.repositories.project_log_repository import ProjectLogRepository
-from app.models.project_log import ProjectLogCreate, ProjectLogRead, ProjectLogReadWithRelations, LogAction
+from app.repositories.pagination import Page
+from app.models.project_log import (
+    ProjectLogCreate, ProjectLogDetails, ProjectLogRead, ProjectLogReadWithRelations, LogAction
+)
 
 
 class ProjectLogService:
@@ -32,19 +36,71 @@ class ProjectLogService:
         log = self.log_repo.create(log_data)
         return ProjectLogRead.model_validate(log)
     
-    def get_project_logs(self, project_id: int, limit: Optional[int] = None) -> List[ProjectLogReadWithRelations]:
+    def get_project_logs(
+        self,
+        project_id: int,
+        limit: Optional[int] = None,
+        actions: Optional[List[str]] = None
+    ) -> List[ProjectLogReadWithRelations]:
         """获取项目的日志列表"""
-        logs = self.log_repo.list_by_project(project_id, limit)
+        rows = self.log_repo.list_timeline(limit, actions, project_id=project_id)
+        return self._build_log_reads(rows)
+    
+    def get_project_logs_page(
+        self,
+        project_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        actions: Optional[List[str]] = None
+    ) -> Page[ProjectLogReadWithRelations]:
+        """游标分页获取项目的日志列表"""
+        page = self.log_repo.list_timeline_page(cursor, limit, actions, project_id=project_id)
+        return Page(items=self._build_log_reads(page.items), next_cursor=page.next_cursor)
+    
+    def get_historical_project_logs(
+        self,
+        historical_project_id: int,
+        limit: Optional[int] = None,
+        actions: Optional[List[str]] = None
+    ) -> List[ProjectLogReadWithRelations]:
+        """获取历史项目的日志列表"""
+        rows = self.log_repo.list_timeline(limit, actions, historical_project_id=historical_project_id)
+        return self._build_log_reads(rows)
+    
+    def get_historical_project_logs_page(
+        self,
+        historical_project_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        actions: Optional[List[str]] = None
+    ) -> Page[ProjectLogReadWithRelations]:
+        """游标分页获取历史项目的日志列表"""
+        page = self.log_repo.list_timeline_page(cursor, limit, actions, historical_project_id=historical_project_id)
+        return Page(items=self._build_log_reads(page.items), next_cursor=page.next_cursor)
+    
+    @staticmethod
+    def parse_details(details: Optional[str]) -> Optional[ProjectLogDetails]:
+        """解析日志详细信息；为空、不是 JSON 对象或字段类型不符时返回 None"""
+        if not details:
+            return None
+        try:
+            data = json.loads(details)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        try:
+            return ProjectLogDetails.model_validate(data)
+        except ValidationError:
+            return None
+    
+    def _build_log_reads(self, rows) -> List[ProjectLogReadWithRelations]:
+        """时间线行记录（日志各列 + user_name）转换为读取模型，并解析详细信息"""
         result = []
-        for log in logs:
-            log_dict = ProjectLogReadWithRelations.model_validate(log)
-            if log.user_id:
-                from app.repositories.user_repository import UserRepository
-                user_repo = UserRepository(self.session)
-                user = user_repo.get_by_id(log.user_id)
-                if user:
-                    log_dict.user_name = user.username
-            result.append(log_dict)
+        for row in rows:
+            log_read = ProjectLogReadWithRelations.model_validate(dict(row._mapping))
+            log_read.payload = self.parse_details(log_read.details)
+            result.append(log_read)
         return result
     
     def log_todo_created(self, project_id: int, todo_description: str, step_names: List[str], user_id: Optional[int] = None):
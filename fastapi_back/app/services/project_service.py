@@ -8,15 +8,16 @@
 - core/exceptions 中的自定义异常
 """
 import logging
-from typing import Optional, List
+from collections import defaultdict
+from typing import Optional, List, Dict
 from sqlmodel import Session
 
 from app.repositories.project_repository import ProjectRepository
+from app.repositories.pagination import Page
 from app.repositories.step_repository import StepRepository
 from app.repositories.platform_repository import PlatformRepository
 from app.models.project import Project, ProjectStep
 from app.models.platform import Platform
-from app.models.tag import Tag
 from app.schemas.project import (
     ProjectCreate, ProjectUpdate, ProjectReadWithRelations,
     ProjectStepCreate, ProjectStepUpdate, ProjectStepRead
@@ -124,40 +125,7 @@ class ProjectService:
     def get_project_with_relations(self, project_id: int) -> ProjectReadWithRelations:
         """获取项目详情（包含关联数据）"""
         project = self._get_project_or_raise(project_id)
-
-        platform = self.platform_repo.get_by_id(project.platform_id)
-        steps = self.step_repo.list_by_project(project_id)
-
-        from app.repositories.tag_repository import ProjectTagRepository
-        project_tag_repo = ProjectTagRepository(self.session)
-        project_tags = project_tag_repo.list_by_project(project_id)
-
-        tags = []
-        for pt in project_tags:
-            tag = self.session.get(Tag, pt.tag_id)
-            if tag:
-                tags.append(TagRead.model_validate(tag))
-
-        project_dict = {
-            "id": project.id,
-            "title": project.title,
-            "student_name": project.student_name,
-            "platform_id": project.platform_id,
-            "user_id": project.user_id,
-            "price": project.price,
-            "actual_income": project.actual_income,
-            "status": project.status,
-            "github_url": project.github_url,
-            "requirements": project.requirements,
-            "is_paid": project.is_paid,
-            "created_at": project.created_at,
-            "updated_at": project.updated_at,
-        }
-        project_dict["platform"] = PlatformRead.model_validate(platform) if platform else None
-        project_dict["steps"] = [ProjectStepRead.model_validate(step) for step in steps]
-        project_dict["tags"] = tags
-
-        return ProjectReadWithRelations(**project_dict)
+        return self._build_project_reads([project], skip_invalid=False)[0]
 
     def list_projects(
         self,
@@ -170,33 +138,77 @@ class ProjectService:
     ) -> List[ProjectReadWithRelations]:
         """获取项目列表（包含关联数据）"""
         projects = self.project_repo.list(user_id, platform_id, status, tag_ids, skip, limit)
+        return self._build_project_reads(projects)
+
+    def list_projects_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        platform_id: Optional[int] = None,
+        status: Optional[str] = None,
+        tag_ids: Optional[List[int]] = None
+    ) -> Page[ProjectReadWithRelations]:
+        """游标分页获取项目列表（包含关联数据）"""
+        page = self.project_repo.list_page(cursor, limit, user_id, platform_id, status, tag_ids)
+        return Page(items=self._build_project_reads(page.items), next_cursor=page.next_cursor)
+
+    def _build_project_reads(
+        self,
+        projects: List[Project],
+        skip_invalid: bool = True
+    ) -> List[ProjectReadWithRelations]:
+        """
+        批量组装项目响应
+
+        平台、步骤、标签各用一次 IN 查询取回整页数据，再在内存中按项目分组，
+        查询次数与项目数量无关（避免 N+1 查询）。
+
+        Args:
+            projects: 项目列表
+            skip_invalid: 是否跳过组装失败的项目（列表接口跳过，详情接口抛出）
+        """
+        if not projects:
+            return []
+
+        project_ids = [project.id for project in projects]
+        platform_ids = list({project.platform_id for project in projects})
+
+        platforms = {
+            platform.id: PlatformRead.model_validate(platform)
+            for platform in self.platform_repo.get_by_ids(platform_ids)
+        }
+
+        steps_by_project: Dict[int, List[ProjectStepRead]] = defaultdict(list)
+        for step in self.step_repo.list_by_projects(project_ids):
+            steps_by_project[step.project_id].append(ProjectStepRead.model_validate(step))
+
+        from app.repositories.tag_repository import ProjectTagRepository
+        project_tag_repo = ProjectTagRepository(self.session)
+        tags_by_project: Dict[int, List[TagRead]] = defaultdict(list)
+        for project_id, tag in project_tag_repo.list_tags_by_projects(project_ids):
+            tags_by_project[project_id].append(TagRead.model_validate(tag))
 
         result = []
         for project in projects:
             try:
-                project_dict = self._build_project_dict(project)
-                result.append(ProjectReadWithRelations(**project_dict))
+                result.append(ProjectReadWithRelations(
+                    **self._project_fields(project),
+                    platform=platforms.get(project.platform_id),
+                    steps=steps_by_project.get(project.id, []),
+                    tags=tags_by_project.get(project.id, []),
+                ))
             except Exception as e:
+                if not skip_invalid:
+                    raise
                 logger.error(f"处理项目 {project.id} 时出错: {e}")
                 continue
 
         return result
 
-    def _build_project_dict(self, project: Project) -> dict:
-        """构建项目字典，用于返回"""
-        platform = self.platform_repo.get_by_id(project.platform_id)
-        steps = self.step_repo.list_by_project(project.id)
-
-        from app.repositories.tag_repository import ProjectTagRepository
-        project_tag_repo = ProjectTagRepository(self.session)
-        project_tags = project_tag_repo.list_by_project(project.id)
-
-        tags = []
-        for pt in project_tags:
-            tag = self.session.get(Tag, pt.tag_id)
-            if tag:
-                tags.append(TagRead.model_validate(tag))
-
+    @staticmethod
+    def _project_fields(project: Project) -> dict:
+        """提取项目标量字段，用于构建响应"""
         return {
             "id": project.id,
             "title": project.title,
@@ -211,9 +223,6 @@ class ProjectService:
             "is_paid": project.is_paid,
             "created_at": project.created_at,
             "updated_at": project.updated_at,
-            "platform": PlatformRead.model_validate(platform) if platform else None,
-            "steps": [ProjectStepRead.model_validate(step) for step in steps],
-            "tags": tags,
         }
 
     def update_project(
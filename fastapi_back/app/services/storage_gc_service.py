@@ -0,0 +1,346 @@
+"""
+上传文件对账与孤儿文件清理
+
+对比 uploads/ 目录与数据库中的文件引用（附件、视频、视频缩略图、文件内容块）：
+- 孤儿文件：磁盘上存在但没有任何记录引用 -> 报告，或移入 uploads/.quarantine/<时间>/ 隔离
+- 缺失文件：记录引用的文件在磁盘上不存在 -> 报告
+
+两侧都按路径字符串排序后流式归并比较：目录按名称排序递归遍历，数据库按路径分批
+（keyset 分页）读取，内存占用与文件/记录总数无关。以 "." 开头的目录（分片上传临时
+文件、隔离区、缩略图缓存）不参与对账；最近修改的文件（可能正在上传、记录尚未写入）
+会被跳过，隔离前还会逐个复查数据库，避免与并发上传竞争。
+
+使用示例:
+    report = StorageGcService(session).run(quarantine=False)
+    print(report.orphan_count, report.orphan_bytes, report.missing_count)
+"""
+import asyncio
+import heapq
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import exists, func, or_, select as sa_select
+from sqlmodel import Session, delete, select, update
+
+from app.core.config import settings
+from app.models.attachment import Attachment
+from app.models.file_blob import FileBlob
+from app.models.video_playback import VideoPlayback
+from app.utils.constants import UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_DIR_NAME = ".quarantine"
+
+# 报告中保留的样例数量
+_SAMPLE_LIMIT = 100
+
+# 引用文件路径的列：(名称, 列)
+_REFERENCE_COLUMNS = (
+    ("attachment", Attachment.file_path),
+    ("videoplayback", VideoPlayback.file_path),
+    ("videoplayback.thumbnail", VideoPlayback.thumbnail_path),
+    ("fileblob", FileBlob.storage_path),
+)
+
+
+@dataclass
+class GcReport:
+    """一次对账的结果"""
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    scanned_files: int = 0
+    scanned_references: int = 0
+    skipped_recent: int = 0
+    orphan_count: int = 0
+    orphan_bytes: int = 0
+    quarantined: int = 0
+    missing_count: int = 0
+    blob_refs_fixed: int = 0
+    orphans: List[str] = field(default_factory=list)
+    missing: List[Tuple[str, str]] = field(default_factory=list)  # (来源表, 路径)
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "scanned_files": self.scanned_files,
+            "scanned_references": self.scanned_references,
+            "skipped_recent": self.skipped_recent,
+            "orphan_count": self.orphan_count,
+            "orphan_bytes": self.orphan_bytes,
+            "quarantined": self.quarantined,
+            "missing_count": self.missing_count,
+            "blob_refs_fixed": self.blob_refs_fixed,
+            "orphans": self.orphans,
+            "missing": [{"source": source, "path": path} for source, path in self.missing],
+        }
+
+
+# 最近一次对账结果（供监控接口查看）
+last_report: Optional[GcReport] = None
+
+
+def normalize_path(path: str) -> str:
+    """统一为相对当前目录、以 / 分隔的路径"""
+    path = os.path.normpath(path)
+    if os.path.isabs(path):
+        path = os.path.relpath(path)
+    return path.replace(os.sep, "/")
+
+
+def iter_sorted_files(directory: str, prefix: Optional[str] = None) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    按路径字符串顺序遍历目录下的文件（跳过以 . 开头的条目）
+
+    子目录按 "名称/" 参与排序，这样 "a-b" 排在 "a/..." 之前，与数据库中按路径字符串
+    排序的结果一致。每次只在内存中保留当前目录的条目列表。
+    """
+    prefix = prefix if prefix is not None else normalize_path(directory)
+    try:
+        with os.scandir(directory) as it:
+            entries = [entry for entry in it if not entry.name.startswith(".")]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.name + "/" if e.is_dir(follow_symlinks=False) else e.name)
+    for entry in entries:
+        path = f"{prefix}/{entry.name}"
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_sorted_files(entry.path, path)
+        elif entry.is_file(follow_symlinks=False):
+            yield path, entry.stat(follow_symlinks=False)
+
+
+class StorageGcService:
+    """上传文件对账服务"""
+
+    def __init__(
+        self,
+        session: Session,
+        root: str = UPLOAD_DIR,
+        batch_size: int = 1000,
+        min_age_seconds: Optional[int] = None
+    ):
+        self.session = session
+        self.root = normalize_path(root)
+        self.batch_size = batch_size
+        self.min_age_seconds = settings.STORAGE_GC_MIN_AGE_SECONDS if min_age_seconds is None else min_age_seconds
+
+    # ---------- 数据库一侧 ----------
+
+    @staticmethod
+    def _normalized(column):
+        return func.replace(column, "\\", "/")
+
+    def _iter_column(self, source: str, column) -> Iterator[Tuple[str, str]]:
+        """按路径顺序分批读取某一列中位于 root 下的路径（去重）"""
+        expr = self._normalized(column)
+        last = ""
+        while True:
+            rows = self.session.exec(
+                sa_select(expr)
+                .where(column.is_not(None), expr.like(f"{self.root}/%"), expr > last)
+                .distinct()
+                .order_by(expr)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return
+            for (path,) in rows:
+                yield path, source
+            last = rows[-1][0]
+
+    def _iter_references(self) -> Iterator[Tuple[str, str]]:
+        """所有表的引用路径归并为一个有序流"""
+        return heapq.merge(*(self._iter_column(source, column) for source, column in _REFERENCE_COLUMNS))
+
+    def _irregular_references(self) -> Set[str]:
+        """
+        不是 "<root>/..." 形式的引用（绝对路径、./ 开头等），单独规范化后加入集合
+
+        这类记录通常很少，不参与归并。
+        """
+        paths = set()
+        for _, column in _REFERENCE_COLUMNS:
+            expr = self._normalized(column)
+            rows = self.session.exec(
+                sa_select(column).where(column.is_not(None), column != "", ~expr.like(f"{self.root}/%"))
+            ).all()
+            for (path,) in rows:
+                normalized = normalize_path(path)
+                if normalized.startswith(self.root + "/"):
+                    paths.add(normalized)
+        return paths
+
+    def _is_referenced(self, path: str) -> bool:
+        """隔离前复查：该文件是否已被（可能刚刚写入的）记录引用"""
+        variants = {path, path.replace("/", os.sep), "./" + path, os.path.abspath(path)}
+        for _, column in _REFERENCE_COLUMNS:
+            exists = self.session.exec(
+                sa_select(column).where(or_(*(column == variant for variant in variants))).limit(1)
+            ).first()
+            if exists is not None:
+                return True
+        return False
+
+    # ---------- 内容块引用计数 ----------
+
+    def reconcile_blob_refs(self) -> int:
+        """
+        按附件实际引用数修正 fileblob.ref_count
+
+        项目级联删除等路径会直接删除附件记录而不释放引用；没有任何附件引用的内容块记录
+        会被删除，其文件随后作为孤儿文件处理。最近被引用过的内容块（附件记录可能尚未写入）
+        会被跳过；修正按读到的计数做条件更新，期间被并发修改的内容块留到下次处理。
+
+        Returns:
+            修正的内容块数量
+        """
+        fixed = 0
+        last_id = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.min_age_seconds)
+        while True:
+            rows = self.session.exec(
+                select(FileBlob.id, FileBlob.sha256, FileBlob.ref_count)
+                .where(FileBlob.id > last_id)
+                .where(func.coalesce(FileBlob.last_ref_at, FileBlob.created_at) <= cutoff)
+                .order_by(FileBlob.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return fixed
+            shas = [sha256 for _, sha256, _ in rows]
+            actual = dict(self.session.exec(
+                select(Attachment.blob_sha256, func.count(Attachment.id))
+                .where(Attachment.blob_sha256.in_(shas))
+                .group_by(Attachment.blob_sha256)
+            ).all())
+            for blob_id, sha256, ref_count in rows:
+                count = actual.get(sha256, 0)
+                if count == ref_count:
+                    continue
+                # 比较并设置：计数已被并发上传/删除修改时不覆盖
+                if count == 0:
+                    statement = delete(FileBlob).where(
+                        FileBlob.id == blob_id,
+                        FileBlob.ref_count == ref_count,
+                        ~exists().where(Attachment.blob_sha256 == sha256),
+                    )
+                else:
+                    statement = update(FileBlob).where(
+                        FileBlob.id == blob_id, FileBlob.ref_count == ref_count
+                    ).values(ref_count=count)
+                if self.session.exec(statement).rowcount > 0:
+                    fixed += 1
+            self.session.commit()
+            last_id = rows[-1][0]
+
+    # ---------- 对账 ----------
+
+    def run(self, quarantine: bool = False, fix_blob_refs: bool = True) -> GcReport:
+        """
+        执行一次完整对账
+
+        Args:
+            quarantine: 是否将孤儿文件移入隔离区（否则只报告）
+            fix_blob_refs: 是否先修正内容块引用计数
+        """
+        global last_report
+        report = GcReport()
+        if fix_blob_refs:
+            report.blob_refs_fixed = self.reconcile_blob_refs()
+
+        irregular = self._irregular_references()
+        quarantine_root = os.path.join(self.root, QUARANTINE_DIR_NAME, report.started_at.strftime("%Y%m%d-%H%M%S"))
+        cutoff = time.time() - self.min_age_seconds
+
+        files = iter_sorted_files(self.root, self.root)
+        references = self._iter_references()
+        current_file = next(files, None)
+        current_ref = next(references, None)
+
+        while current_file is not None or current_ref is not None:
+            if current_ref is None or (current_file is not None and current_file[0] < current_ref[0]):
+                path, stat_result = current_file
+                report.scanned_files += 1
+                if path not in irregular:
+                    self._handle_orphan(report, path, stat_result, cutoff, quarantine, quarantine_root)
+                current_file = next(files, None)
+            elif current_file is None or current_ref[0] < current_file[0]:
+                report.scanned_references += 1
+                self._record_missing(report, current_ref[1], current_ref[0])
+                current_ref = next(references, None)
+            else:
+                # 同一路径可能被多张表引用（附件与内容块），全部跳过
+                path = current_file[0]
+                report.scanned_files += 1
+                while current_ref is not None and current_ref[0] == path:
+                    report.scanned_references += 1
+                    current_ref = next(references, None)
+                current_file = next(files, None)
+
+        for path in sorted(irregular):
+            report.scanned_references += 1
+            if not os.path.exists(path):
+                self._record_missing(report, "irregular", path)
+
+        report.finished_at = datetime.utcnow()
+        last_report = report
+        logger.info(
+            f"上传文件对账完成: 文件 {report.scanned_files} 个, 引用 {report.scanned_references} 个, "
+            f"孤儿文件 {report.orphan_count} 个（{report.orphan_bytes / (1024 * 1024):.1f}MB, 已隔离 {report.quarantined}）, "
+            f"缺失文件 {report.missing_count} 个, 修正内容块引用 {report.blob_refs_fixed} 个"
+        )
+        return report
+
+    def _handle_orphan(
+        self,
+        report: GcReport,
+        path: str,
+        stat_result: os.stat_result,
+        cutoff: float,
+        quarantine: bool,
+        quarantine_root: str
+    ) -> None:
+        if stat_result.st_mtime > cutoff:
+            report.skipped_recent += 1
+            return
+        if self._is_referenced(path):
+            return
+        report.orphan_count += 1
+        report.orphan_bytes += stat_result.st_size
+        if len(report.orphans) < _SAMPLE_LIMIT:
+            report.orphans.append(path)
+        if quarantine:
+            target = os.path.join(quarantine_root, os.path.relpath(path, self.root))
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                report.quarantined += 1
+            except OSError as e:
+                logger.warning(f"隔离孤儿文件失败: {path}: {e}")
+
+    @staticmethod
+    def _record_missing(report: GcReport, source: str, path: str) -> None:
+        report.missing_count += 1
+        if len(report.missing) < _SAMPLE_LIMIT:
+            report.missing.append((source, path))
+
+
+def _gc_once(engine, quarantine: bool) -> GcReport:
+    with Session(engine) as session:
+        return StorageGcService(session).run(quarantine=quarantine)
+
+
+async def run_storage_gc(engine, interval_seconds: int, quarantine: bool = False) -> None:
+    """后台定时任务：按间隔执行上传文件对账（在线程中执行，不阻塞事件循环）"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_gc_once, engine, quarantine)
+        except Exception as e:
+            logger.error(f"上传文件对账失败: {e}")
@@ -0,0 +1,134 @@
+"""
+Token黑名单服务层
+
+在数据库黑名单表之前放置进程内 Bloom 过滤器：
+- 过滤器判定“一定未撤销”时直接返回，不访问数据库
+- 过滤器判定“可能已撤销”时再查 token_hash 唯一索引确认
+- 启动时从数据库重建过滤器，后台定时任务清理过期记录并重建过滤器
+
+注意：过滤器是进程内的。多 worker 部署时，其他 worker 上撤销的 token 要等到
+下一次定时重建才会进入本进程的过滤器，重建间隔即为跨 worker 撤销的最大延迟。
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.security import hash_token
+from app.models.token_blacklist import TokenBlacklistCreate
+from app.repositories.token_blacklist_repository import TokenBlacklistRepository
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedTokenFilter:
+    """
+    已撤销 token 的 Bloom 过滤器
+
+    重建完成前（ready=False）不做判定，所有检查都回落到数据库。
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        # 正在重建的过滤器：重建期间的撤销同时写入，避免替换后丢失
+        self._rebuilding: List[BloomFilter] = []
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def add(self, token_hash: str) -> None:
+        """加入已撤销 token 的摘要"""
+        with self._lock:
+            self._bloom.add(token_hash)
+            for bloom in self._rebuilding:
+                bloom.add(token_hash)
+
+    def might_contain(self, token_hash: str) -> bool:
+        """过滤器未就绪或可能包含时返回 True（需要查库确认）"""
+        if not self.ready:
+            return True
+        return token_hash in self._bloom
+
+    def rebuild(self, repo: TokenBlacklistRepository) -> int:
+        """从数据库重建过滤器，返回加载的条目数"""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        # 先登记再查询：查询快照之后提交的撤销由 add() 同时写入新过滤器
+        with self._lock:
+            self._rebuilding.append(bloom)
+        try:
+            for token_hash in repo.iter_active_hashes():
+                with self._lock:
+                    bloom.add(token_hash)
+            with self._lock:
+                self._bloom = bloom
+                self.ready = True
+        finally:
+            with self._lock:
+                self._rebuilding.remove(bloom)
+        return len(bloom)
+
+    def reset(self) -> None:
+        """清空并标记为未就绪"""
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self.ready = False
+
+
+revoked_token_filter = RevokedTokenFilter(
+    capacity=settings.TOKEN_BLACKLIST_BLOOM_CAPACITY,
+    error_rate=settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE,
+)
+
+
+class TokenBlacklistService:
+    """Token黑名单服务层"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.blacklist_repo = TokenBlacklistRepository(session)
+
+    def revoke(self, token: str, expires_at: datetime, reason: Optional[str] = None) -> None:
+        """撤销token：写入黑名单表并加入过滤器"""
+        self.blacklist_repo.create(TokenBlacklistCreate(token=token, expires_at=expires_at, reason=reason))
+        revoked_token_filter.add(hash_token(token))
+
+    def is_revoked(self, token: str) -> bool:
+        """检查token是否已撤销（过滤器判定一定不存在时不查库）"""
+        if not revoked_token_filter.might_contain(hash_token(token)):
+            return False
+        return self.blacklist_repo.is_blacklisted(token)
+
+    def rebuild_filter(self) -> int:
+        """从数据库重建过滤器"""
+        count = revoked_token_filter.rebuild(self.blacklist_repo)
+        logger.info(f"Token黑名单过滤器已重建，条目数: {count}")
+        return count
+
+    def sweep_expired(self) -> int:
+        """清理过期的黑名单记录并重建过滤器"""
+        removed = self.blacklist_repo.cleanup_expired_tokens()
+        self.rebuild_filter()
+        if removed:
+            logger.info(f"已清理过期黑名单token: {removed} 条")
+        return removed
+
+
+def _sweep_once(engine) -> int:
+    with Session(engine) as session:
+        return TokenBlacklistService(session).sweep_expired()
+
+
+async def run_blacklist_sweeper(engine, interval_seconds: int) -> None:
+    """后台定时任务：按间隔清理过期黑名单记录（在线程中执行，不阻塞事件循环）"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_sweep_once, engine)
+        except Exception as e:
+            logger.error(f"清理过期黑名单token失败: {e}")
@@ -0,0 +1,375 @@
+"""
+分片上传服务层（断点续传）
+
+流程:
+    1. create_upload      创建会话，返回 upload_id、分片大小和分片数
+    2. put_chunk          按编号上传分片（校验 SHA-256，重复上传同一分片是幂等的）
+    3. get_upload_status  查询已接收的分片和可续传的偏移量
+    4. complete_upload    所有分片到齐后生成附件或视频记录
+
+分片直接写入 uploads/.partial/<upload_id>.part 的对应偏移处，完成时整体移动到
+最终目录（同一文件系统内只是一次 rename），不需要再拼接文件。
+"""
+import hashlib
+import logging
+import os
+import secrets
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.exceptions import (
+    BusinessException,
+    ForbiddenException,
+    NotFoundException,
+    OperationFailedException,
+    ValidationException,
+)
+from app.models.upload_session import (
+    UploadSession,
+    UploadSessionCreate,
+    UploadSessionRead,
+    UploadStatus,
+    UploadTarget,
+)
+from app.repositories.historical_project_repository import HistoricalProjectRepository
+from app.repositories.project_repository import ProjectRepository
+from app.repositories.system_settings_repository import SystemSettingsRepository
+from app.repositories.upload_session_repository import UploadSessionRepository
+from app.services.blob_store import hash_file
+from app.utils.constants import (
+    ALLOWED_VIDEO_EXTENSIONS,
+    UPLOAD_DIR,
+    UPLOAD_PARTIAL_DIR,
+    VIDEO_UPLOAD_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UploadSessionService:
+    """分片上传服务"""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.upload_repo = UploadSessionRepository(session)
+        self.project_repo = ProjectRepository(session)
+        self.historical_project_repo = HistoricalProjectRepository(session)
+        self.settings_repo = SystemSettingsRepository(session)
+
+    @staticmethod
+    def partial_path(upload_id: str) -> str:
+        """上传中的临时文件路径"""
+        return os.path.join(UPLOAD_PARTIAL_DIR, f"{upload_id}.part")
+
+    def _check_target_access(self, data: UploadSessionCreate, current_user_id: int, is_admin: bool) -> None:
+        """检查上传目标（项目/历史项目）的访问权限"""
+        if data.project_id is not None:
+            project = self.project_repo.get_by_id(data.project_id)
+            if not project:
+                raise NotFoundException("项目")
+            if not is_admin and project.user_id != current_user_id:
+                raise ForbiddenException("无权访问此项目的附件")
+        elif data.historical_project_id is not None and data.target == UploadTarget.ATTACHMENT:
+            if not self.settings_repo.is_feature_enabled("enable_resource_management"):
+                raise ForbiddenException("历史项目资源管理功能已禁用")
+            historical_project = self.historical_project_repo.get_by_id(data.historical_project_id)
+            if not historical_project:
+                raise NotFoundException("历史项目")
+            if not is_admin and historical_project.user_id != current_user_id:
+                raise ForbiddenException("无权访问此历史项目的附件")
+        else:
+            raise ValidationException("需要指定项目（视频只能上传到项目）", field="project_id")
+
+    def _get_upload_or_raise(self, upload_id: str, current_user_id: int, is_admin: bool) -> UploadSession:
+        upload = self.upload_repo.get_by_upload_id(upload_id)
+        if not upload:
+            raise NotFoundException("上传会话")
+        if not is_admin and upload.user_id != current_user_id:
+            raise ForbiddenException("无权访问此上传会话")
+        return upload
+
+    def _get_active_upload(self, upload_id: str, current_user_id: int, is_admin: bool) -> UploadSession:
+        """获取仍可上传分片的会话"""
+        upload = self._get_upload_or_raise(upload_id, current_user_id, is_admin)
+        if upload.status != UploadStatus.UPLOADING:
+            raise BusinessException(code=409, msg=f"上传会话已结束（{upload.status}）")
+        if upload.expires_at < datetime.utcnow():
+            raise BusinessException(code=410, msg="上传会话已过期，请重新上传")
+        return upload
+
+    def _to_read(self, upload: UploadSession) -> UploadSessionRead:
+        """构建会话状态（含已接收分片和连续偏移量）"""
+        chunks = self.upload_repo.list_chunks(upload.id)
+        received = [chunk.chunk_index for chunk in chunks]
+        offset = 0
+        for expected_index, chunk in enumerate(chunks):
+            if chunk.chunk_index != expected_index:
+                break
+            offset += chunk.size
+        return UploadSessionRead(
+            **upload.model_dump(exclude={"id", "user_id"}),
+            total_chunks=upload.total_chunks,
+            received_chunks=received,
+            received_bytes=sum(chunk.size for chunk in chunks),
+            offset=offset,
+        )
+
+    def create_upload(self, data: UploadSessionCreate, current_user_id: int, is_admin: bool) -> UploadSessionRead:
+        """创建上传会话"""
+        if data.target == UploadTarget.VIDEO:
+            extension = os.path.splitext(data.file_name)[1].lower()
+            if extension not in ALLOWED_VIDEO_EXTENSIONS:
+                raise ValidationException(
+                    f"不支持的文件类型，支持的格式：{', '.join(ALLOWED_VIDEO_EXTENSIONS)}", field="file_name"
+                )
+            if not data.title:
+                raise ValidationException("视频标题不能为空", field="title")
+        if data.total_size > settings.UPLOAD_MAX_FILE_SIZE:
+            raise ValidationException(
+                f"文件大小超过限制（最大{settings.UPLOAD_MAX_FILE_SIZE / (1024 ** 3):.0f}GB）", field="total_size"
+            )
+        chunk_size = data.chunk_size or settings.UPLOAD_CHUNK_SIZE
+        if chunk_size > settings.UPLOAD_MAX_CHUNK_SIZE:
+            raise ValidationException(
+                f"分片大小超过限制（最大{settings.UPLOAD_MAX_CHUNK_SIZE // (1024 * 1024)}MB）", field="chunk_size"
+            )
+        self._check_target_access(data, current_user_id, is_admin)
+        self.purge_expired()
+
+        upload = UploadSession(
+            **data.model_dump(exclude={"chunk_size"}),
+            chunk_size=chunk_size,
+            upload_id=secrets.token_hex(16),
+            user_id=current_user_id,
+            expires_at=datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+        )
+        os.makedirs(UPLOAD_PARTIAL_DIR, exist_ok=True)
+        # 预先创建空文件，分片按偏移写入（可乱序、并发）
+        open(self.partial_path(upload.upload_id), "wb").close()
+        upload = self.upload_repo.create(upload)
+        return self._to_read(upload)
+
+    def get_upload_status(self, upload_id: str, current_user_id: int, is_admin: bool) -> UploadSessionRead:
+        """查询上传进度"""
+        return self._to_read(self._get_upload_or_raise(upload_id, current_user_id, is_admin))
+
+    def put_chunk(
+        self,
+        upload_id: str,
+        chunk_index: int,
+        data: bytes,
+        sha256: str,
+        current_user_id: int,
+        is_admin: bool
+    ) -> UploadSessionRead:
+        """
+        写入一个分片
+
+        分片大小必须与会话约定一致（最后一个分片为剩余字节），内容必须与 sha256 匹配。
+        已接收且校验值相同的分片直接返回，不会重复写盘。
+        """
+        upload = self._get_active_upload(upload_id, current_user_id, is_admin)
+        if not 0 <= chunk_index < upload.total_chunks:
+            raise ValidationException(f"分片编号超出范围（0~{upload.total_chunks - 1}）", field="chunk_index")
+        expected_size = upload.expected_chunk_size(chunk_index)
+        if len(data) != expected_size:
+            raise ValidationException(f"分片大小应为 {expected_size} 字节，实际 {len(data)} 字节", field="chunk")
+
+        sha256 = sha256.strip().lower()
+        actual = hashlib.sha256(data).hexdigest()
+        if actual != sha256:
+            raise ValidationException("分片校验失败（SHA-256 不匹配），请重新上传该分片", field="sha256")
+
+        existing = self.upload_repo.get_chunk(upload.id, chunk_index)
+        if existing is None or existing.sha256 != actual:
+            try:
+                with open(self.partial_path(upload.upload_id), "r+b") as f:
+                    f.seek(chunk_index * upload.chunk_size)
+                    f.write(data)
+            except OSError as e:
+                raise OperationFailedException("保存分片失败", reason=str(e))
+            self.upload_repo.save_chunk(upload.id, chunk_index, len(data), actual)
+        return self._to_read(upload)
+
+    def complete_upload(
+        self,
+        upload_id: str,
+        current_user_id: int,
+        is_admin: bool,
+        sha256: Optional[str] = None
+    ) -> UploadSessionRead:
+        """
+        完成上传：校验分片完整性，移动文件并创建附件或视频记录
+
+        已完成的会话再次调用直接返回结果（幂等）；正在由另一个请求完成时返回 409。
+        """
+        upload = self._get_upload_or_raise(upload_id, current_user_id, is_admin)
+        if upload.status == UploadStatus.COMPLETED:
+            return self._to_read(upload)
+        if upload.status == UploadStatus.COMPLETING:
+            raise BusinessException(code=409, msg="上传正在完成中，请稍后查询结果")
+        upload = self._get_active_upload(upload_id, current_user_id, is_admin)
+
+        chunks = self.upload_repo.list_chunks(upload.id)
+        missing = sorted(set(range(upload.total_chunks)) - {chunk.chunk_index for chunk in chunks})
+        if missing:
+            raise BusinessException(code=400, msg=f"还有 {len(missing)} 个分片未上传", details={"missing_chunks": missing[:100]})
+
+        # 先占用会话：并发的完成请求（客户端在校验大文件期间重试）只有一个能继续
+        if not self.upload_repo.transition_status(upload.id, UploadStatus.UPLOADING, UploadStatus.COMPLETING):
+            self.session.refresh(upload)
+            if upload.status == UploadStatus.COMPLETED:
+                return self._to_read(upload)
+            raise BusinessException(code=409, msg="上传正在完成中，请稍后查询结果")
+
+        try:
+            upload.result_id = self._finalize(upload, current_user_id, is_admin, sha256)
+        except Exception:
+            # 完成失败时恢复为上传中，允许修正后重试
+            self.session.rollback()
+            self.upload_repo.transition_status(upload.id, UploadStatus.COMPLETING, UploadStatus.UPLOADING)
+            raise
+
+        upload.status = UploadStatus.COMPLETED
+        self.session.add(upload)
+        self.session.commit()
+        self.upload_repo.delete_chunks(upload.id)
+        self.session.refresh(upload)
+        try:
+            os.remove(self.partial_path(upload.upload_id))
+        except FileNotFoundError:
+            pass
+        return self._to_read(upload)
+
+    def _finalize(
+        self,
+        upload: UploadSession,
+        current_user_id: int,
+        is_admin: bool,
+        sha256: Optional[str] = None
+    ) -> int:
+        """校验整文件摘要，把临时文件交给附件/视频服务创建记录，返回记录ID"""
+        partial_path = self.partial_path(upload.upload_id)
+        sha256 = sha256.lower() if sha256 else None
+        if sha256 and hash_file(partial_path) != sha256:
+            raise ValidationException("文件校验失败（SHA-256 不匹配）", field="sha256")
+
+        extension = os.path.splitext(upload.file_name)[1].lower()
+        target_dir = VIDEO_UPLOAD_DIR if upload.target == UploadTarget.VIDEO else UPLOAD_DIR
+        os.makedirs(target_dir, exist_ok=True)
+        file_path = os.path.join(target_dir, f"{uuid.uuid4()}{extension}")
+        # 附件服务会把文件移入内容存储，这里交出的是副本（硬链接），
+        # 记录创建失败时临时文件原样保留，修正后可以直接重试
+        self._stage_file(partial_path, file_path)
+
+        try:
+            return self._create_record(upload, file_path, current_user_id, is_admin, sha256)
+        except Exception:
+            self._unstage_file(partial_path, file_path)
+            raise
+
+    @staticmethod
+    def _stage_file(partial_path: str, file_path: str) -> None:
+        """为临时文件创建目标路径上的副本，同一文件系统时使用硬链接避免复制数据"""
+        try:
+            os.link(partial_path, file_path)
+        except OSError:
+            shutil.copyfile(partial_path, file_path)
+
+    @staticmethod
+    def _unstage_file(partial_path: str, file_path: str) -> None:
+        """记录创建失败后清理副本，并确保临时文件不再与已存储的文件共享数据"""
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        if os.stat(partial_path).st_nlink > 1:
+            # 副本已移入内容存储且仍被其他附件引用，重传分片时原地写入会改坏已存储的文件
+            tmp_path = f"{partial_path}.tmp"
+            shutil.copyfile(partial_path, tmp_path)
+            os.replace(tmp_path, partial_path)
+
+    def _create_record(
+        self,
+        upload: UploadSession,
+        file_path: str,
+        current_user_id: int,
+        is_admin: bool,
+        sha256: Optional[str] = None
+    ) -> int:
+        """通过附件/视频服务创建记录，返回记录ID（sha256 为已校验的整文件摘要）"""
+        if upload.target == UploadTarget.VIDEO:
+            from app.models.video_playback import VideoPlaybackUpdate
+            from app.services.video_playback_service import VideoPlaybackService
+            video_service = VideoPlaybackService(self.session)
+            video = video_service.create_video(
+                project_id=upload.project_id,
+                title=upload.title,
+                file_path=file_path,
+                file_name=upload.file_name,
+                file_size=upload.total_size,
+                current_user_id=current_user_id,
+                is_admin=is_admin
+            )
+            if upload.description:
+                video_service.update_video(
+                    video.id, VideoPlaybackUpdate(description=upload.description), current_user_id, is_admin
+                )
+            return video.id
+
+        from app.services.attachment_service import AttachmentService
+        attachment_service = AttachmentService(self.session)
+        if upload.project_id is not None:
+            attachment = attachment_service.create_attachment(
+                project_id=upload.project_id,
+                file_path=file_path,
+                file_name=upload.file_name,
+                file_type=upload.file_type,
+                description=upload.description,
+                folder_id=upload.folder_id,
+                current_user_id=current_user_id,
+                is_admin=is_admin,
+                sha256=sha256
+            )
+        else:
+            attachment = attachment_service.create_attachment_for_historical_project(
+                historical_project_id=upload.historical_project_id,
+                file_path=file_path,
+                file_name=upload.file_name,
+                file_type=upload.file_type,
+                description=upload.description,
+                folder_id=upload.folder_id,
+                current_user_id=current_user_id,
+                is_admin=is_admin,
+                sha256=sha256
+            )
+        return attachment.id
+
+    def abort_upload(self, upload_id: str, current_user_id: int, is_admin: bool) -> None:
+        """取消上传并删除已上传的分片"""
+        upload = self._get_upload_or_raise(upload_id, current_user_id, is_admin)
+        if upload.status != UploadStatus.UPLOADING:
+            return
+        self._discard(upload, UploadStatus.ABORTED)
+
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """清理过期未完成的会话及其临时文件"""
+        expired = self.upload_repo.list_expired(now)
+        for upload in expired:
+            self._discard(upload, UploadStatus.ABORTED)
+        if expired:
+            logger.info(f"清理过期上传会话 {len(expired)} 个")
+        return len(expired)
+
+    def _discard(self, upload: UploadSession, status: UploadStatus) -> None:
+        try:
+            os.remove(self.partial_path(upload.upload_id))
+        except FileNotFoundError:
+            pass
+        upload.status = status
+        self.session.add(upload)
+        self.session.commit()
+        self.upload_repo.delete_chunks(upload.id)
@@ -10,6 +10,7 @@ from app.repositories.user_repository import UserRepository
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash
+from app.core.token_cache import token_cache
 from app.core.exceptions import NotFoundException, BusinessException
 
 
@@ -62,7 +63,10 @@ class UserService:
         if "password" in update_data:
             update_data["password_hash"] = get_password_hash(update_data.pop("password"))
 
-        return self.user_repo.update(user, update_data)
+        user = self.user_repo.update(user, update_data)
+        # 角色、启用状态、密码等变更后，使该用户的 token 验证缓存失效
+        token_cache.invalidate_user(user.id)
+        return user
 
     def delete_user(self, user_id: int, current_user: User) -> None:
         """删除用户"""
@@ -75,4 +79,5 @@ class UserService:
             raise BusinessException(code=400, msg="不能删除自己")
 
         self.user_repo.delete(user)
+        token_cache.invalidate_user(user_id)
 
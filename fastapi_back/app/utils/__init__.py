@@ -13,7 +13,12 @@ from app.utils.constants import (
     DEFAULT_STEPS,
     MAX_FILE_SIZE,
     UPLOAD_DIR,
+    VIDEO_UPLOAD_DIR,
+    UPLOAD_PARTIAL_DIR,
+    BLOB_DIR,
+    DERIVATIVE_DIR,
     ALLOWED_FILE_TYPES,
+    ALLOWED_VIDEO_EXTENSIONS,
     DEFAULT_PAGE,
     DEFAULT_PAGE_SIZE,
     MAX_PAGE_SIZE,
@@ -46,7 +51,12 @@ __all__ = [
     "DEFAULT_STEPS",
     "MAX_FILE_SIZE",
     "UPLOAD_DIR",
+    "VIDEO_UPLOAD_DIR",
+    "UPLOAD_PARTIAL_DIR",
+    "BLOB_DIR",
+    "DERIVATIVE_DIR",
     "ALLOWED_FILE_TYPES",
+    "ALLOWED_VIDEO_EXTENSIONS",
     "DEFAULT_PAGE",
     "DEFAULT_PAGE_SIZE",
     "MAX_PAGE_SIZE",
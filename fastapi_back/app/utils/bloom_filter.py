@@ -0,0 +1,59 @@
+"""
+Bloom 过滤器
+
+用于在访问数据库前快速判断元素“一定不存在”。存在误判（假阳性）但没有漏判，
+误判率由容量和 error_rate 决定。
+
+使用示例:
+    bloom = BloomFilter(capacity=100000, error_rate=0.001)
+    bloom.add("abc")
+    if "xyz" not in bloom:
+        ...  # 一定不存在，无需查库
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    基于 bytearray 的 Bloom 过滤器（双重哈希生成 k 个位置）
+
+    Attributes:
+        capacity: 预期元素数量
+        error_rate: 达到容量时的目标误判率
+        num_bits: 位数组大小
+        num_hashes: 哈希函数个数
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate 必须在 (0, 1) 区间内")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """添加元素"""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        """可能存在返回 True，一定不存在返回 False"""
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
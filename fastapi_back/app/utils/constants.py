@@ -183,6 +183,13 @@ DEFAULT_STEPS: List[str] = [
 # 文件上传相关常量
 MAX_FILE_SIZE = 1 * 1024 * 1024 * 1024  # 1GB
 UPLOAD_DIR = "uploads"
+VIDEO_UPLOAD_DIR = "uploads/videos"
+UPLOAD_PARTIAL_DIR = "uploads/.partial"  # 分片上传中的临时文件
+BLOB_DIR = "uploads/blobs"  # 按内容摘要去重存储的附件文件
+DERIVATIVE_DIR = "uploads/.derivatives"  # 缩略图、文本预览等派生文件缓存
+
+# 视频回放允许的格式
+ALLOWED_VIDEO_EXTENSIONS = [".mp4", ".avi", ".mov", ".wmv", ".flv", ".webm", ".mkv"]
 
 # 允许的文件类型白名单
 ALLOWED_FILE_TYPES = {
@@ -0,0 +1,96 @@
+"""
+HTTP Range 请求工具
+
+解析 Range / If-Range 请求头（RFC 7233），供文件下载、ZIP 打包等接口支持断点续传。
+
+使用示例:
+    try:
+        ranges = parse_range_header(request.headers.get("range"), total_size)
+    except RangeNotSatisfiable:
+        ...  # 返回 416，Content-Range: bytes */total_size
+    if ranges and if_range_matches(request.headers.get("if-range"), etag, last_modified):
+        start, end = ranges[0]  # 闭区间
+"""
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    """Range 请求的所有区间都超出了资源范围（应返回 416）"""
+
+    def __init__(self, total_size: int):
+        super().__init__(f"请求范围超出资源大小 {total_size}")
+        self.total_size = total_size
+
+
+def parse_range_header(value: Optional[str], total_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    解析 Range 请求头
+
+    Args:
+        value: Range 请求头，如 "bytes=0-499, -500"
+        total_size: 资源总大小
+
+    Returns:
+        闭区间列表 [(start, end), ...]；请求头不存在或格式无效时返回 None（按完整响应处理）
+
+    Raises:
+        RangeNotSatisfiable: 所有区间都无法满足
+    """
+    if not value:
+        return None
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        if not sep:
+            return None
+        first, last = first.strip(), last.strip()
+        try:
+            if first == "":
+                # 后缀范围：最后 N 个字节
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(total_size - suffix, 0), total_size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else total_size - 1
+                if last and end < start:
+                    return None
+                end = min(end, total_size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start < total_size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable(total_size)
+    return ranges
+
+
+def if_range_matches(value: Optional[str], etag: Optional[str], last_modified: Optional[str] = None) -> bool:
+    """
+    检查 If-Range 条件（不存在时视为满足）
+
+    If-Range 只能使用强 ETag 比较；使用日期时要求与 Last-Modified 完全一致。
+    """
+    if not value:
+        return True
+    value = value.strip()
+    if value.startswith('"') or value.startswith("W/"):
+        return etag is not None and not value.startswith("W/") and value == etag
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(value) == parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
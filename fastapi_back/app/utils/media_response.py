@@ -0,0 +1,227 @@
+"""
+支持 Range 请求的媒体文件响应
+
+用于视频播放、附件预览和下载，在 FileResponse 的基础上补充：
+- 强 ETag（由文件大小和 mtime 生成）与 Last-Modified
+- 条件 GET：If-None-Match / If-Modified-Since 命中时返回 304
+- Range 请求：单区间返回 206，多区间返回 multipart/byteranges，If-Range 不匹配时返回完整内容
+- 零拷贝：ASGI 服务器支持 http.response.zerocopysend 扩展时交给服务器 sendfile，
+  否则在线程中分块读取
+
+使用示例:
+    return MediaFileResponse(path, media_type="video/mp4", filename="回放.mp4", content_disposition_type="inline")
+"""
+import os
+import secrets
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.utils.http_range import RangeNotSatisfiable, if_range_matches, parse_range_header
+
+CHUNK_SIZE = 64 * 1024
+
+# 多区间请求最多处理的区间数，超过时按完整响应处理（避免大量小区间放大开销）
+MAX_RANGES = 16
+
+_ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    """由文件大小和修改时间生成强 ETag"""
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def etag_matches(value: str, etag: str) -> bool:
+    """检查 If-None-Match（弱比较，支持多个 ETag 和 *）"""
+    value = value.strip()
+    if value == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in value.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+class MediaFileResponse(Response):
+    """
+    支持条件 GET 和 Range 请求的文件响应
+
+    Args:
+        path: 文件路径
+        media_type: MIME 类型
+        filename: 下载文件名（设置后输出 Content-Disposition）
+        content_disposition_type: inline（在线播放/预览）或 attachment（下载）
+        headers: 额外响应头
+    """
+    chunk_size = CHUNK_SIZE
+
+    def __init__(
+        self,
+        path: str,
+        media_type: Optional[str] = None,
+        filename: Optional[str] = None,
+        content_disposition_type: str = "attachment",
+        headers: Optional[Mapping[str, str]] = None,
+        stat_result: Optional[os.stat_result] = None,
+    ):
+        self.path = path
+        self.status_code = 200
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        self.init_headers(headers)
+        self.stat_result = stat_result or os.stat(path)
+        if not stat.S_ISREG(self.stat_result.st_mode):
+            raise RuntimeError(f"File at path {path} is not a file.")
+
+        self.etag = make_etag(self.stat_result)
+        self.last_modified = formatdate(self.stat_result.st_mtime, usegmt=True)
+        self.headers.setdefault("accept-ranges", "bytes")
+        self.headers.setdefault("etag", self.etag)
+        self.headers.setdefault("last-modified", self.last_modified)
+        if filename is not None:
+            encoded_filename = quote(filename, safe='')
+            self.headers.setdefault(
+                "content-disposition",
+                f'{content_disposition_type}; filename="{encoded_filename}"; filename*=UTF-8\'\'{encoded_filename}'
+            )
+
+    def _not_modified(self, request_headers: Headers) -> bool:
+        """条件 GET 判断（If-None-Match 优先于 If-Modified-Since）"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(self.stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        send_header_only = scope["method"].upper() == "HEAD"
+        total_size = self.stat_result.st_size
+
+        if self._not_modified(request_headers):
+            await self._send_start(send, 304, self._validator_headers())
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and if_range_matches(request_headers.get("if-range"), self.etag, self.last_modified):
+            try:
+                ranges = parse_range_header(range_header, total_size)
+            except RangeNotSatisfiable:
+                headers = self._validator_headers() + [(b"content-range", f"bytes */{total_size}".encode("latin-1"))]
+                await self._send_start(send, 416, headers)
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+            if ranges and len(ranges) > MAX_RANGES:
+                ranges = None
+
+        if not ranges:
+            await self._send_start(send, self.status_code, self._headers_with_length(total_size))
+            await self._send_segments(scope, send, [(0, total_size)], send_header_only)
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            headers = self._headers_with_length(end - start + 1)
+            headers.append((b"content-range", f"bytes {start}-{end}/{total_size}".encode("latin-1")))
+            await self._send_start(send, 206, headers)
+            await self._send_segments(scope, send, [(start, end - start + 1)], send_header_only)
+        else:
+            await self._send_multipart(scope, send, ranges, send_header_only)
+
+        if self.background is not None:
+            await self.background()
+
+    def _validator_headers(self) -> List[Tuple[bytes, bytes]]:
+        """304/416 响应只携带缓存校验相关的头"""
+        keep = {b"etag", b"last-modified", b"accept-ranges", b"cache-control"}
+        return [(k, v) for k, v in self.raw_headers if k in keep]
+
+    def _headers_with_length(self, length: int, content_type: Optional[str] = None) -> List[Tuple[bytes, bytes]]:
+        headers = [(k, v) for k, v in self.raw_headers if k not in (b"content-length", b"content-type")]
+        headers.append((b"content-length", str(length).encode("latin-1")))
+        content_type = content_type or self.headers.get("content-type", self.media_type)
+        headers.append((b"content-type", content_type.encode("latin-1")))
+        return headers
+
+    @staticmethod
+    async def _send_start(send: Send, status_code: int, headers: List[Tuple[bytes, bytes]]) -> None:
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+
+    async def _send_multipart(self, scope: Scope, send: Send, ranges: List[Tuple[int, int]], send_header_only: bool) -> None:
+        """多区间请求：multipart/byteranges"""
+        total_size = self.stat_result.st_size
+        boundary = secrets.token_hex(16)
+        content_type = self.headers.get("content-type", self.media_type)
+        part_headers = [
+            (
+                f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{total_size}\r\n\r\n"
+            ).encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        length = (
+            sum(len(header) for header in part_headers)
+            + sum(end - start + 1 for start, end in ranges)
+            + 2 * (len(ranges) - 1)  # 各部分之间的 CRLF
+            + len(closing)
+        )
+        headers = self._headers_with_length(length, f"multipart/byteranges; boundary={boundary}")
+        await self._send_start(send, 206, headers)
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        for index, ((start, end), header) in enumerate(zip(ranges, part_headers)):
+            prefix = header if index == 0 else b"\r\n" + header
+            await send({"type": "http.response.body", "body": prefix, "more_body": True})
+            await self._send_segments(scope, send, [(start, end - start + 1)], False, more_body=True)
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
+
+    async def _send_segments(
+        self,
+        scope: Scope,
+        send: Send,
+        segments: List[Tuple[int, int]],
+        send_header_only: bool,
+        more_body: bool = False,
+    ) -> None:
+        """发送文件中的若干 (offset, count) 片段"""
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": more_body})
+            return
+
+        if _ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                for index, (offset, count) in enumerate(segments):
+                    last = index == len(segments) - 1
+                    await send({
+                        "type": _ZEROCOPY_EXTENSION,
+                        "file": file,
+                        "offset": offset,
+                        "count": count,
+                        "more_body": more_body or not last,
+                    })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for offset, count in segments:
+                await file.seek(offset)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": more_body})
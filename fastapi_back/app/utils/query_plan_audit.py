@@ -0,0 +1,138 @@
+"""
+查询计划审计工具
+
+记录运行期间执行过的 SQL 语句（去重），随后对每条语句执行 EXPLAIN QUERY PLAN，
+标记出全表扫描（SCAN <table> 且未使用索引）的查询，用于发现缺失的索引。
+
+工作负载可以是单元测试、压测脚本或本地运行的应用；审计可以针对内存库
+（按当前模型建表，包含模型中声明的索引）或真实数据库文件。
+
+使用示例:
+    recorder = QueryRecorder()
+    recorder.install()          # 监听所有 Engine
+    ...                         # 执行工作负载
+    recorder.remove()
+
+    findings = audit_query_plans(engine, recorder, ignore_tables={"platform"})
+    for finding in findings:
+        if finding.full_scans:
+            print(finding.full_scans, finding.statement)
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 只审计这些类型的语句（INSERT 不涉及扫描）
+_AUDITED_PREFIXES = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+# 不审计的系统表/内部语句
+_SKIPPED_PATTERNS = ("sqlite_master", "sqlite_schema", "sqlite_temp_master", "alembic_version", "PRAGMA")
+
+# SQLite 的计划行：SCAN project / SCAN TABLE project / SCAN p USING INDEX ...
+_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+
+@dataclass
+class PlanFinding:
+    """单条语句的查询计划审计结果"""
+    statement: str
+    executions: int
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class QueryRecorder:
+    """
+    记录执行过的 SQL 语句（按语句文本去重，保留首次的参数和执行次数）
+
+    Attributes:
+        statements: 语句 -> 首次执行的参数
+        counts: 语句 -> 执行次数
+    """
+
+    def __init__(self):
+        self.statements: Dict[str, Any] = {}
+        self.counts: Dict[str, int] = {}
+        self._target = None
+        self._lock = threading.Lock()
+
+    def install(self, target=Engine) -> None:
+        """开始记录（默认监听所有 Engine，也可以传入单个 Engine）"""
+        event.listen(target, "before_cursor_execute", self._record)
+        self._target = target
+
+    def remove(self) -> None:
+        """停止记录"""
+        if self._target is not None:
+            event.remove(self._target, "before_cursor_execute", self._record)
+            self._target = None
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        text = statement.strip()
+        if not text.upper().startswith(_AUDITED_PREFIXES):
+            return
+        if any(pattern in text for pattern in _SKIPPED_PATTERNS):
+            return
+        if executemany and parameters:
+            parameters = parameters[0]
+        with self._lock:
+            self.statements.setdefault(text, parameters)
+            self.counts[text] = self.counts.get(text, 0) + 1
+
+
+def find_full_scans(plan: Iterable[str], ignore_tables: Optional[Set[str]] = None) -> List[str]:
+    """从查询计划中找出全表扫描的表名"""
+    ignore_tables = ignore_tables or set()
+    tables = []
+    for detail in plan:
+        match = _SCAN_PATTERN.match(detail)
+        if match is None:
+            continue
+        table, rest = match.group(1), match.group(2)
+        # 使用索引的扫描（按索引顺序遍历）不算全表扫描
+        if "USING" in rest or table.upper() == "CONSTANT":
+            continue
+        if table not in ignore_tables:
+            tables.append(table)
+    return tables
+
+
+def explain_query_plan(connection, statement: str, parameters: Any = None) -> List[str]:
+    """执行 EXPLAIN QUERY PLAN，返回每一行的 detail 文本"""
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    return [row[-1] for row in rows]
+
+
+def audit_query_plans(
+    engine: Engine,
+    recorder: QueryRecorder,
+    ignore_tables: Optional[Set[str]] = None
+) -> List[PlanFinding]:
+    """
+    对记录的语句逐条执行 EXPLAIN QUERY PLAN
+
+    Args:
+        engine: 用于执行 EXPLAIN 的引擎（表结构和索引以该库为准）
+        recorder: 已记录语句的 QueryRecorder
+        ignore_tables: 允许全表扫描的表（如数据量很小的字典表）
+
+    Returns:
+        审计结果，包含全表扫描的语句排在前面，其次按执行次数降序
+    """
+    findings = []
+    with engine.connect() as connection:
+        for statement, parameters in recorder.statements.items():
+            finding = PlanFinding(statement=statement, executions=recorder.counts.get(statement, 0))
+            try:
+                finding.plan = explain_query_plan(connection, statement, parameters)
+                finding.full_scans = find_full_scans(finding.plan, ignore_tables)
+            except Exception as e:
+                finding.error = str(e).splitlines()[0]
+            findings.append(finding)
+    findings.sort(key=lambda f: (not f.full_scans, -f.executions))
+    return findings
@@ -0,0 +1,141 @@
+"""
+上传文件保存
+
+附件上传和视频上传共用的保存流程：
+- 读取块大小自适应（1MB 起步、逐次翻倍，最大 8MB；已知文件大小时直接按大小选择）
+- 写盘与 SHA-256 计算在线程池中完成，同一次遍历得到大小和摘要，不阻塞事件循环
+- 已知文件大小时在写入前检查上限；未知时每次最多只读到上限 + 1 字节
+- 先写入 uploads/.partial 下的临时文件，完成后原子重命名到目标目录，
+  目标路径上不会出现写了一半的文件
+
+使用示例:
+    saved = await save_upload(file, UPLOAD_DIR)
+    attachment_service.create_attachment(..., file_path=saved.path, sha256=saved.sha256)
+"""
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+
+from app.utils.constants import MAX_FILE_SIZE, UPLOAD_PARTIAL_DIR
+
+MIN_CHUNK_SIZE = 1024 * 1024  # 1MB
+MAX_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+
+
+@dataclass
+class SavedUpload:
+    """已保存的上传文件"""
+    path: str
+    size: int
+    sha256: str
+
+
+def initial_chunk_size(expected_size: Optional[int]) -> int:
+    """
+    首次读取的块大小
+
+    已知文件大小时取约 1/16（在 1MB~8MB 之间），未知时从 1MB 开始。
+    """
+    if not expected_size:
+        return MIN_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, expected_size // 16))
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024 * 1024):g}GB"
+    return f"{size / (1024 * 1024):.2f}MB"
+
+
+def _size_error(size: int, max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"文件大小超过限制（最大{_format_size(max_size)}），当前文件大小：{size / (1024 * 1024):.2f}MB"
+    )
+
+
+def _write_chunk(buffer: BinaryIO, digest, chunk: bytes) -> None:
+    buffer.write(chunk)
+    digest.update(chunk)
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(
+    file: UploadFile,
+    dest_dir: str,
+    max_size: Optional[int] = None,
+    partial_dir: str = UPLOAD_PARTIAL_DIR
+) -> SavedUpload:
+    """
+    保存上传文件到目标目录（文件名为 UUID + 原扩展名）
+
+    Args:
+        file: 上传的文件
+        dest_dir: 目标目录（需与 partial_dir 位于同一文件系统）
+        max_size: 文件大小上限（字节），默认 MAX_FILE_SIZE
+        partial_dir: 临时文件目录
+
+    Returns:
+        保存后的路径、大小和 SHA-256
+
+    Raises:
+        HTTPException: 文件超过大小上限（400）或写入失败（500）
+    """
+    max_size = MAX_FILE_SIZE if max_size is None else max_size
+    # 多段表单解析后已知大小时，直接在写入前拒绝
+    if file.size is not None and file.size > max_size:
+        raise _size_error(file.size, max_size)
+
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    filename = f"{uuid.uuid4()}{extension}"
+    partial_path = os.path.join(partial_dir, filename + ".part")
+    dest_path = os.path.join(dest_dir, filename)
+
+    size = 0
+    digest = hashlib.sha256()
+    chunk_size = initial_chunk_size(file.size)
+    try:
+        await anyio.to_thread.run_sync(lambda: os.makedirs(partial_dir, exist_ok=True))
+        buffer = await anyio.to_thread.run_sync(open, partial_path, "wb")
+        try:
+            while True:
+                # 最多读到上限 + 1 字节，超限时不会为多余的数据分配内存
+                chunk = await file.read(min(chunk_size, max_size - size + 1))
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise _size_error(size, max_size)
+                await anyio.to_thread.run_sync(_write_chunk, buffer, digest, chunk)
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+        finally:
+            buffer.close()
+
+        def publish() -> None:
+            os.makedirs(dest_dir, exist_ok=True)
+            os.replace(partial_path, dest_path)
+
+        await anyio.to_thread.run_sync(publish)
+    except OSError as e:
+        _discard(partial_path)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"保存文件失败: {str(e)}"
+        )
+    except BaseException:
+        # 超出大小限制或客户端断开（任务被取消）时删除临时文件
+        _discard(partial_path)
+        raise
+
+    return SavedUpload(path=dest_path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,335 @@
+"""
+流式 ZIP 打包
+
+按需逐块生成 ZIP 字节流，不在内存或磁盘中构建完整归档，内存占用与归档大小无关。
+
+特性：
+- 已压缩的媒体/归档/Office 文件使用存储模式（STORED），其余文件使用 DEFLATE
+- 所有条目使用数据描述符（data descriptor），首次下载无需预先读取文件即可开始输出
+- 输出是确定性的：相同的文件列表总是生成相同的字节，因此可以按字节偏移续传；
+  每个条目的 CRC 和压缩后大小按 (路径, 大小, mtime) 缓存，续传时可直接跳过之前的条目
+- 超过 4GB 的文件或归档自动使用 ZIP64
+
+使用示例:
+    stream = ZipStream([ZipEntry.from_path("交付/报告.pdf", "/uploads/a.pdf")])
+    total = stream.prepare()                    # 计算总大小（续传/Range 请求时需要）
+    for chunk in stream.iter_bytes(start=1024):  # 从第 1024 字节开始输出
+        ...
+"""
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+# 已压缩格式，再次 DEFLATE 几乎没有收益，只浪费 CPU
+STORED_EXTENSIONS = {
+    # 图片
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif",
+    # 视频
+    ".mp4", ".webm", ".avi", ".mov", ".mkv", ".flv", ".wmv", ".m4v", ".mpeg", ".mpg", ".3gp", ".ts", ".ogv",
+    # 音频
+    ".mp3", ".aac", ".ogg", ".oga", ".m4a", ".wma", ".flac", ".opus",
+    # 归档
+    ".zip", ".rar", ".7z", ".gz", ".bz2", ".xz",
+    # 基于 ZIP 的文档格式
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp", ".apk", ".jar",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+_DEFLATE_LEVEL = 6
+_ZIP64_LIMIT = 0xFFFFFFFF
+# 未压缩大小超过该值的条目使用 ZIP64（预留 DEFLATE 对不可压缩数据的膨胀空间）
+_ZIP64_ENTRY_THRESHOLD = _ZIP64_LIMIT - (1 << 24)
+
+_METHOD_STORED = 0
+_METHOD_DEFLATED = 8
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP64_END_RECORD = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_END_LOCATOR = struct.Struct("<IIQI")
+
+
+@dataclass(frozen=True)
+class ZipEntry:
+    """归档中的一个文件"""
+    arcname: str
+    path: str
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_path(cls, arcname: str, path: str) -> "ZipEntry":
+        stat = os.stat(path)
+        return cls(arcname=arcname, path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    @property
+    def method(self) -> int:
+        ext = os.path.splitext(self.arcname)[1].lower()
+        return _METHOD_STORED if ext in STORED_EXTENSIONS else _METHOD_DEFLATED
+
+    @property
+    def zip64(self) -> bool:
+        return self.size >= _ZIP64_ENTRY_THRESHOLD
+
+    @property
+    def cache_key(self) -> Tuple[str, int, int, int]:
+        return (self.path, self.size, self.mtime_ns, self.method)
+
+
+class ZipMetaCache:
+    """条目元数据缓存：(路径, 大小, mtime, 压缩方式) -> (CRC32, 压缩后大小)，LRU 淘汰"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: Tuple[int, int]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+zip_meta_cache = ZipMetaCache()
+
+
+def _dos_datetime(mtime_ns: int) -> Tuple[int, int]:
+    """转换为 ZIP 使用的 DOS 日期和时间（本地时间，1980 年之前按 1980 年处理）"""
+    t = time.localtime(max(mtime_ns // 1_000_000_000, 315532800))
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class ZipStream:
+    """
+    确定性的流式 ZIP 生成器
+
+    Attributes:
+        entries: 归档条目（顺序即归档中的顺序）
+        chunk_size: 读取文件的块大小
+    """
+
+    def __init__(self, entries: List[ZipEntry], chunk_size: int = CHUNK_SIZE, meta_cache: ZipMetaCache = None):
+        self.entries = list(entries)
+        self.chunk_size = chunk_size
+        self.meta_cache = meta_cache if meta_cache is not None else zip_meta_cache
+
+    @property
+    def etag(self) -> str:
+        """由条目列表（名称、大小、mtime、压缩方式）和 zlib 版本生成的强 ETag"""
+        digest = hashlib.sha256(zlib.ZLIB_RUNTIME_VERSION.encode())
+        for entry in self.entries:
+            digest.update(f"{entry.arcname}\0{entry.size}\0{entry.mtime_ns}\0{entry.method}\n".encode("utf-8"))
+        return f'"{digest.hexdigest()[:32]}"'
+
+    @property
+    def total_size(self) -> Optional[int]:
+        """归档总大小；存在未缓存元数据的条目时返回 None（调用 prepare() 计算）"""
+        metas = [self.meta_cache.get(entry.cache_key) for entry in self.entries]
+        if any(meta is None for meta in metas):
+            return None
+        return self._layout_size([meta[1] for meta in metas])
+
+    def prepare(self) -> int:
+        """计算所有条目的 CRC 和压缩后大小（已缓存的跳过），返回归档总大小"""
+        for entry in self.entries:
+            if self.meta_cache.get(entry.cache_key) is None:
+                for _ in self._entry_data(entry, emit=False):
+                    pass
+        return self.total_size
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        输出 [start, end) 区间的归档字节
+
+        已缓存元数据的条目如果完全位于 start 之前会被直接跳过，不读取文件；
+        存储模式的条目可以直接定位到文件中的偏移。
+        """
+        offset = 0
+        central_records = []
+
+        def clip(data: bytes, data_offset: int) -> Optional[bytes]:
+            lo = max(start, data_offset)
+            hi = len(data) + data_offset if end is None else min(end, len(data) + data_offset)
+            if lo >= hi:
+                return None
+            return data[lo - data_offset:hi - data_offset]
+
+        for entry in self.entries:
+            if end is not None and offset >= end:
+                return
+            header_offset = offset
+            name = entry.arcname.encode("utf-8")
+
+            header = self._local_header(entry, name)
+            piece = clip(header, offset)
+            if piece:
+                yield piece
+            offset += len(header)
+
+            meta = self.meta_cache.get(entry.cache_key)
+            if meta is not None and offset + meta[1] <= start:
+                # 整个数据区都在续传起点之前
+                offset += meta[1]
+            elif meta is not None and entry.method == _METHOD_STORED:
+                yield from self._stored_range(entry, offset, start, end)
+                offset += meta[1]
+            else:
+                for chunk in self._entry_data(entry, emit=True):
+                    piece = clip(chunk, offset)
+                    if piece:
+                        yield piece
+                    offset += len(chunk)
+                    if end is not None and offset >= end:
+                        return
+                meta = self.meta_cache.get(entry.cache_key)
+
+            crc, compressed_size = meta
+            descriptor = self._data_descriptor(entry, crc, compressed_size)
+            piece = clip(descriptor, offset)
+            if piece:
+                yield piece
+            offset += len(descriptor)
+            central_records.append((entry, name, crc, compressed_size, header_offset))
+
+        if end is not None and offset >= end:
+            return
+        trailer = self._central_directory(central_records, offset)
+        piece = clip(trailer, offset)
+        if piece:
+            yield piece
+
+    def _stored_range(self, entry: ZipEntry, offset: int, start: int, end: Optional[int]) -> Iterator[bytes]:
+        """直接读取存储模式条目与 [start, end) 重叠的部分"""
+        lo = max(start - offset, 0)
+        hi = entry.size if end is None else min(end - offset, entry.size)
+        if lo >= hi:
+            return
+        with open(entry.path, "rb") as f:
+            f.seek(lo)
+            remaining = hi - lo
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise IOError(f"文件在打包过程中被截断: {entry.path}")
+                remaining -= len(chunk)
+                yield chunk
+
+    def _entry_data(self, entry: ZipEntry, emit: bool) -> Iterator[bytes]:
+        """读取文件并输出条目数据区（emit=False 时只计算元数据），结束后写入元数据缓存"""
+        crc = 0
+        compressed_size = 0
+        read_size = 0
+        compressor = zlib.compressobj(_DEFLATE_LEVEL, zlib.DEFLATED, -15) if entry.method == _METHOD_DEFLATED else None
+        with open(entry.path, "rb") as f:
+            while read_size < entry.size:
+                chunk = f.read(min(self.chunk_size, entry.size - read_size))
+                if not chunk:
+                    raise IOError(f"文件在打包过程中被截断: {entry.path}")
+                read_size += len(chunk)
+                crc = zlib.crc32(chunk, crc)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                compressed_size += len(chunk)
+                if emit:
+                    yield chunk
+        if compressor is not None:
+            chunk = compressor.flush()
+            compressed_size += len(chunk)
+            if emit and chunk:
+                yield chunk
+        self.meta_cache.set(entry.cache_key, (crc, compressed_size))
+
+    @staticmethod
+    def _local_header(entry: ZipEntry, name: bytes) -> bytes:
+        dos_time, dos_date = _dos_datetime(entry.mtime_ns)
+        extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0) if entry.zip64 else b""
+        version = 45 if entry.zip64 else 20
+        sizes = _ZIP64_LIMIT if entry.zip64 else 0
+        return _LOCAL_HEADER.pack(
+            0x04034B50, version, _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8, entry.method,
+            dos_time, dos_date, 0, sizes, sizes, len(name), len(extra)
+        ) + name + extra
+
+    @staticmethod
+    def _data_descriptor(entry: ZipEntry, crc: int, compressed_size: int) -> bytes:
+        if entry.zip64:
+            return struct.pack("<IIQQ", 0x08074B50, crc, compressed_size, entry.size)
+        return struct.pack("<IIII", 0x08074B50, crc, compressed_size, entry.size)
+
+    @staticmethod
+    def _central_header(entry: ZipEntry, name: bytes, crc: int, compressed_size: int, header_offset: int) -> bytes:
+        dos_time, dos_date = _dos_datetime(entry.mtime_ns)
+        zip64_fields = []
+        usize, csize, offset = entry.size, compressed_size, header_offset
+        if entry.zip64:
+            zip64_fields += [entry.size, compressed_size]
+            usize = csize = _ZIP64_LIMIT
+        if header_offset >= _ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+            offset = _ZIP64_LIMIT
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+        version = 45 if zip64_fields else 20
+        return _CENTRAL_HEADER.pack(
+            0x02014B50, version, version, _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8, entry.method,
+            dos_time, dos_date, crc, csize, usize, len(name), len(extra), 0, 0, 0, 0, offset
+        ) + name + extra
+
+    def _central_directory(self, records: list, cd_offset: int) -> bytes:
+        central = b"".join(self._central_header(*record) for record in records)
+        count = len(records)
+        needs_zip64 = count >= 0xFFFF or len(central) >= _ZIP64_LIMIT or cd_offset >= _ZIP64_LIMIT
+        trailer = b""
+        if needs_zip64:
+            zip64_end_offset = cd_offset + len(central)
+            trailer += _ZIP64_END_RECORD.pack(
+                0x06064B50, _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0, count, count, len(central), cd_offset
+            )
+            trailer += _ZIP64_END_LOCATOR.pack(0x07064B50, 0, zip64_end_offset, 1)
+        trailer += _END_RECORD.pack(
+            0x06054B50, 0, 0,
+            min(count, 0xFFFF), min(count, 0xFFFF),
+            min(len(central), _ZIP64_LIMIT), min(cd_offset, _ZIP64_LIMIT), 0
+        )
+        return central + trailer
+
+    def _layout_size(self, compressed_sizes: List[int]) -> int:
+        """由每个条目的压缩后大小计算归档总大小（不读取文件）"""
+        offset = 0
+        records = []
+        for entry, compressed_size in zip(self.entries, compressed_sizes):
+            name = entry.arcname.encode("utf-8")
+            header_offset = offset
+            offset += len(self._local_header(entry, name))
+            offset += compressed_size
+            offset += len(self._data_descriptor(entry, 0, compressed_size))
+            records.append((entry, name, 0, compressed_size, header_offset))
+        return offset + len(self._central_directory(records, offset))
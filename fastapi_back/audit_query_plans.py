@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+查询计划审计脚本
+
+以单元测试作为工作负载，记录所有 Repository / Service 执行过的 SQL，然后对每条
+语句执行 EXPLAIN QUERY PLAN，列出全表扫描的查询。
+
+默认在内存库中按当前模型建表（包含模型声明的索引）；也可以通过 --database-url
+针对真实数据库（已执行迁移、带有真实统计信息）进行审计。
+
+使用方法:
+    python audit_query_plans.py
+    python audit_query_plans.py --database-url sqlite:///./project_manager.db
+    python audit_query_plans.py --ignore platform,tag,user --strict
+"""
+import argparse
+import os
+import sys
+
+# 添加当前目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlmodel import SQLModel, create_engine
+
+from app.utils.query_plan_audit import QueryRecorder, audit_query_plans
+
+# 数据量很小、全表扫描可接受的表
+DEFAULT_IGNORED_TABLES = "platform,systemsettings,steptemplate"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对 Repository 查询执行 EXPLAIN QUERY PLAN，标记全表扫描")
+    parser.add_argument("--database-url", default=None, help="用于 EXPLAIN 的数据库（默认按模型创建内存库）")
+    parser.add_argument("--ignore", default=DEFAULT_IGNORED_TABLES, help="允许全表扫描的表，逗号分隔")
+    parser.add_argument("--tests", default="tests", help="作为工作负载运行的测试路径")
+    parser.add_argument("--verbose", action="store_true", help="输出所有语句的查询计划")
+    parser.add_argument("--strict", action="store_true", help="存在全表扫描时以非零状态码退出（用于 CI）")
+    args = parser.parse_args()
+
+    recorder = QueryRecorder()
+    recorder.install()
+    try:
+        pytest.main([args.tests, "-q", "-p", "no:cacheprovider", "--no-header", "--tb=no"])
+    finally:
+        recorder.remove()
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        import main as _app  # noqa: F401  注册所有模型
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+
+    ignore_tables = {table.strip() for table in args.ignore.split(",") if table.strip()}
+    findings = audit_query_plans(engine, recorder, ignore_tables=ignore_tables)
+
+    flagged = [f for f in findings if f.full_scans]
+    errors = [f for f in findings if f.error]
+
+    print("\n" + "=" * 80)
+    print(f"查询计划审计: 共 {len(findings)} 条不同语句，全表扫描 {len(flagged)} 条，无法分析 {len(errors)} 条")
+    print("=" * 80)
+
+    for finding in findings:
+        if not (finding.full_scans or args.verbose):
+            continue
+        marker = "❌ 全表扫描 " + ", ".join(finding.full_scans) if finding.full_scans else "✅"
+        print(f"\n{marker}  (执行 {finding.executions} 次)")
+        print(f"  SQL: {' '.join(finding.statement.split())}")
+        for detail in finding.plan:
+            print(f"    {detail}")
+
+    for finding in errors:
+        print(f"\n⚠️  无法分析: {finding.error}\n  SQL: {' '.join(finding.statement.split())[:200]}")
+
+    if args.strict and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+SQLite 并发压测脚本
+
+对比默认连接配置（rollback journal、synchronous=FULL）与 settings 中的调优配置
+（WAL、synchronous=NORMAL、busy_timeout、mmap、cache_size、连接池）在并发读写下的
+吞吐量和 "database is locked" 错误数。
+
+模拟的负载：
+- 写：浏览次数自增、插入登录日志（短事务）
+- 读：按条件统计和分页查询日志
+
+使用方法:
+    python benchmark_sqlite_concurrency.py
+    python benchmark_sqlite_concurrency.py --threads 16 --seconds 10 --write-ratio 0.3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# 添加当前目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import create_database_engine
+
+SCHEMA = [
+    "CREATE TABLE bench_counter (id INTEGER PRIMARY KEY, views INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE bench_log (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, "
+    "action TEXT, created_at REAL)",
+    "CREATE INDEX ix_bench_log_user ON bench_log (user_id, created_at)",
+]
+
+COUNTER_ROWS = 100
+
+
+def prepare_database(path: str) -> None:
+    """创建压测表并写入初始数据"""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.execute(
+            text("INSERT INTO bench_counter (id, views) VALUES (:id, 0)"),
+            [{"id": i} for i in range(1, COUNTER_ROWS + 1)]
+        )
+        conn.execute(
+            text("INSERT INTO bench_log (user_id, action, created_at) VALUES (:u, 'login', :t)"),
+            [{"u": i % 50, "t": time.time()} for i in range(5000)]
+        )
+    engine.dispose()
+
+
+def run_profile(name: str, engine, threads: int, seconds: float, write_ratio: float) -> dict:
+    """在给定引擎上运行混合读写负载"""
+    stats = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rnd = random.Random(seed)
+        local = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+        while time.perf_counter() < deadline:
+            try:
+                if rnd.random() < write_ratio:
+                    with engine.begin() as conn:
+                        if rnd.random() < 0.5:
+                            conn.execute(
+                                text("UPDATE bench_counter SET views = views + 1 WHERE id = :id"),
+                                {"id": rnd.randint(1, COUNTER_ROWS)}
+                            )
+                        else:
+                            conn.execute(
+                                text("INSERT INTO bench_log (user_id, action, created_at) "
+                                     "VALUES (:u, 'login', :t)"),
+                                {"u": rnd.randint(0, 49), "t": time.time()}
+                            )
+                    local["writes"] += 1
+                else:
+                    with engine.connect() as conn:
+                        user_id = rnd.randint(0, 49)
+                        conn.execute(
+                            text("SELECT COUNT(*) FROM bench_log WHERE user_id = :u"), {"u": user_id}
+                        ).scalar()
+                        conn.execute(
+                            text("SELECT * FROM bench_log WHERE user_id = :u "
+                                 "ORDER BY created_at DESC LIMIT 20"),
+                            {"u": user_id}
+                        ).all()
+                    local["reads"] += 1
+            except OperationalError as e:
+                if "locked" in str(e) or "busy" in str(e):
+                    local["locked"] += 1
+                else:
+                    local["errors"] += 1
+        with lock:
+            for key, value in local.items():
+                stats[key] += value
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    stats["name"] = name
+    stats["elapsed"] = elapsed
+    stats["ops_per_sec"] = (stats["reads"] + stats["writes"]) / elapsed
+    stats["writes_per_sec"] = stats["writes"] / elapsed
+    return stats
+
+
+def print_result(result: dict) -> None:
+    print(
+        f"{result['name']:<10} "
+        f"总吞吐 {result['ops_per_sec']:>9.1f} ops/s | "
+        f"写 {result['writes_per_sec']:>8.1f}/s | "
+        f"读 {result['reads']:>7} 写 {result['writes']:>6} | "
+        f"锁冲突 {result['locked']:>5} 其他错误 {result['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 并发读写压测（默认配置 vs 调优配置）")
+    parser.add_argument("--threads", type=int, default=8, help="并发线程数")
+    parser.add_argument("--seconds", type=float, default=5.0, help="每种配置的压测时长（秒）")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="写操作比例（0~1）")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"SQLite 并发压测: threads={args.threads}, seconds={args.seconds}, write_ratio={args.write_ratio}")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = []
+
+        baseline_path = os.path.join(tmpdir, "baseline.db")
+        prepare_database(baseline_path)
+        # 旧配置：只设置 check_same_thread（rollback journal、synchronous=FULL、sqlite3 默认 5 秒锁等待）
+        baseline_engine = create_engine(
+            f"sqlite:///{baseline_path}",
+            connect_args={"check_same_thread": False},
+            pool_size=args.threads,
+        )
+        results.append(run_profile("默认配置", baseline_engine, args.threads, args.seconds, args.write_ratio))
+        baseline_engine.dispose()
+
+        tuned_path = os.path.join(tmpdir, "tuned.db")
+        prepare_database(tuned_path)
+        tuned_engine = create_database_engine(f"sqlite:///{tuned_path}", pool_size=args.threads)
+        results.append(run_profile("调优配置", tuned_engine, args.threads, args.seconds, args.write_ratio))
+        tuned_engine.dispose()
+
+    for result in results:
+        print_result(result)
+
+    baseline, tuned = results
+    if baseline["ops_per_sec"] > 0:
+        print(f"\n吞吐提升: {tuned['ops_per_sec'] / baseline['ops_per_sec']:.2f}x，"
+              f"锁冲突 {baseline['locked']} -> {tuned['locked']}")
+
+
+if __name__ == "__main__":
+    main()
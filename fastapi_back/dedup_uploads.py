@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+附件去重迁移脚本
+
+将 uploads/ 下的旧附件文件按 SHA-256 移入内容寻址存储（uploads/blobs），
+内容相同的文件只保留一份，附件记录改为指向共享的内容块。
+
+按附件 ID 分批处理，可以随时中断后重新运行；建议先用 --dry-run 查看可节省的空间。
+
+使用方法:
+    python dedup_uploads.py --dry-run
+    python dedup_uploads.py
+    python dedup_uploads.py --database-url sqlite:///./project_manager.db --batch-size 200
+"""
+import argparse
+import os
+import sys
+
+# 添加当前目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import Session, create_engine
+
+from app.core.database import engine as default_engine
+from app.services.attachment_service import AttachmentService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将旧附件移入内容寻址存储并去重")
+    parser.add_argument("--database-url", default=None, help="数据库地址（默认使用应用配置）")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批处理的附件数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不移动文件、不修改数据库")
+    args = parser.parse_args()
+
+    import main as _app  # noqa: F401  注册所有模型并执行迁移
+
+    engine = create_engine(args.database_url) if args.database_url else default_engine
+    with Session(engine) as session:
+        stats = AttachmentService(session).deduplicate_files(batch_size=args.batch_size, dry_run=args.dry_run)
+
+    mode = "（试运行）" if args.dry_run else ""
+    print(f"处理附件 {stats['processed']} 个{mode}，其中重复 {stats['deduplicated']} 个，"
+          f"文件缺失 {stats['missing']} 个")
+    print(f"节省空间 {stats['bytes_saved'] / (1024 * 1024):.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
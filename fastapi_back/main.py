@@ -1,7 +1,11 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, get_async_engine
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.request_logging import RequestLoggingMiddleware
 from app.exceptions.handlers import setup_exception_handlers
 from sqlmodel import SQLModel
 import logging
@@ -22,6 +26,8 @@ from app.models.refresh_token import RefreshToken
 from app.models.token_blacklist import TokenBlacklist
 from app.models.login_log import LoginLog
 from app.models.tag import Tag, ProjectTag, HistoricalProjectTag
+from app.models.upload_session import UploadSession, UploadChunk
+from app.models.file_blob import FileBlob
 from app.models.historical_project import HistoricalProjectReadWithRelations
 
 # 导入 Schema（DTO）
@@ -34,13 +40,7 @@ ProjectReadWithRelations.model_rebuild()
 HistoricalProjectReadWithRelations.model_rebuild()
 
 # 然后导入API路由
-from app.api import auth, platforms, projects, dashboard, users, attachments, attachment_folders, todos, project_logs, step_templates, project_parts, github_commits, video_playbacks, historical_projects, system_settings, tags
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from app.api import auth, platforms, projects, dashboard, users, attachments, attachment_folders, todos, project_logs, step_templates, project_parts, github_commits, video_playbacks, historical_projects, system_settings, tags, monitoring, uploads
 
 logger = logging.getLogger(__name__)
 
@@ -74,69 +74,57 @@ def run_migrations():
 # Run database migrations on startup
 run_migrations()
 
+# 配置日志（队列异步输出，不阻塞事件循环）
+# 需在迁移之后执行：Alembic 的 fileConfig 会重置根日志处理器
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时重建 token 黑名单过滤器、同步历史项目检索索引，并启动后台清理、上传文件对账任务"""
+    from sqlmodel import Session
+    from app.services.token_blacklist_service import TokenBlacklistService, run_blacklist_sweeper
+    from app.services.storage_gc_service import run_storage_gc
+    from app.repositories.search_index import HistoricalProjectSearchIndex
+
+    try:
+        with Session(engine) as session:
+            TokenBlacklistService(session).sweep_expired()
+    except Exception as e:
+        logger.warning(f"Could not rebuild token blacklist filter: {e}")
+
+    try:
+        with Session(engine) as session:
+            HistoricalProjectSearchIndex(session).sync()
+    except Exception as e:
+        logger.warning(f"Could not sync historical project search index: {e}")
+
+    sweeper = asyncio.create_task(
+        run_blacklist_sweeper(engine, settings.TOKEN_BLACKLIST_SWEEP_INTERVAL_SECONDS)
+    )
+    storage_gc = None
+    if settings.STORAGE_GC_ENABLED:
+        storage_gc = asyncio.create_task(
+            run_storage_gc(engine, settings.STORAGE_GC_INTERVAL_SECONDS, settings.STORAGE_GC_QUARANTINE)
+        )
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        if storage_gc is not None:
+            storage_gc.cancel()
+        if get_async_engine.cache_info().currsize:
+            await get_async_engine().dispose()
+        shutdown_logging()
+
+
 app = FastAPI(
     title="外包项目管理系统",
     description="外包项目管理系统 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# 添加请求日志中间件（必须在 CORS 中间件之后，但会在路由处理之前执行）
-@app.middleware("http")
-async def log_requests(request, call_next):
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # 跳过 OPTIONS 预检请求的详细日志（CORS 预检请求不包含 Authorization header）
-    if request.method == "OPTIONS":
-        response = await call_next(request)
-        return response
-    
-    # 记录请求信息（不包括敏感信息）
-    # 尝试多种方式获取 header（不区分大小写）
-    auth_header = (
-        request.headers.get("authorization") or 
-        request.headers.get("Authorization") or
-        request.headers.get("AUTHORIZATION")
-    )
-    
-    # 详细记录特定 API 的请求（用于调试）
-    is_historical_project_request = "/historical-projects" in str(request.url.path)
-    is_auth_api_request = "/auth/login-logs" in str(request.url.path) or "/auth/refresh-tokens" in str(request.url.path)
-    
-    if auth_header:
-        auth_preview = auth_header[7:37] if len(auth_header) > 7 else 'invalid'
-        logger.info(f"[请求中间件] {request.method} {request.url.path} - Auth: Bearer {auth_preview}... (长度: {len(auth_header)})")
-        if is_historical_project_request:
-            logger.info(f"[历史项目请求] 找到 Authorization header，长度: {len(auth_header)}")
-        if is_auth_api_request:
-            logger.info(f"[Token管理API] {request.method} {request.url.path} - 找到 Authorization header，长度: {len(auth_header)}")
-    else:
-        logger.warning(f"[请求中间件] {request.method} {request.url.path} - Auth: None (missing Authorization header)")
-        if is_historical_project_request:
-            logger.error(f"[历史项目请求] ⚠️ 未找到 Authorization header！")
-            # 列出所有请求头以便调试
-            logger.error(f"[历史项目请求] 请求头列表: {list(request.headers.keys())}")
-            # 列出所有 header 的值（用于调试）
-            for key in request.headers.keys():
-                value = request.headers.get(key)
-                logger.error(f"[历史项目请求]   {key}: {str(value)[:50] if value else None}...")
-        elif is_auth_api_request:
-            logger.error(f"[Token管理API] ⚠️ {request.method} {request.url.path} - 未找到 Authorization header！")
-            # 列出所有请求头以便调试
-            logger.error(f"[Token管理API] 请求头列表: {list(request.headers.keys())}")
-            # 列出所有 header 的值（用于调试）
-            for key in request.headers.keys():
-                value = request.headers.get(key)
-                logger.error(f"[Token管理API]   {key}: {str(value)[:50] if value else None}...")
-        else:
-            # 非特殊请求，只记录基本信息
-            logger.warning(f"Request headers: {list(request.headers.keys())}")
-            for key in request.headers.keys():
-                logger.warning(f"  {key}: {request.headers.get(key)[:50] if request.headers.get(key) else None}...")
-    
-    response = await call_next(request)
-    return response
-
 # 配置CORS
 # 开发环境：允许所有来源（包括局域网）
 # 生产环境：请设置 CORS_ALLOW_ALL=False 并配置具体的 CORS_ORIGINS
@@ -161,6 +149,15 @@ else:
         expose_headers=["*"],  # 暴露所有响应头
     )
 
+# 请求日志中间件（最后添加，位于最外层，统计包含 CORS 在内的完整耗时）
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_rate=settings.REQUEST_LOG_SAMPLE_RATE,
+    slow_ms=settings.REQUEST_LOG_SLOW_MS,
+    debug_routes=settings.REQUEST_LOG_DEBUG_ROUTES,
+    server_timing=settings.SERVER_TIMING_ENABLED,
+)
+
 # 注册异常处理器
 setup_exception_handlers(app)
 
@@ -181,6 +178,8 @@ app.include_router(video_playbacks.router, prefix="/api", tags=["视频回放"])
 app.include_router(historical_projects.router, prefix="/api/historical-projects", tags=["历史项目管理"])
 app.include_router(system_settings.router, prefix="/api/system-settings", tags=["系统设置"])
 app.include_router(tags.router, prefix="/api/tags", tags=["标签管理"])
+app.include_router(monitoring.router, prefix="/api/monitoring", tags=["系统监控"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["分片上传"])
 
 
 @app.get("/")
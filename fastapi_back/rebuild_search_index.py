@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+重建历史项目全文检索索引
+
+应用启动时会在索引行数与历史项目数量不一致时自动重建；绕过 ORM 批量修改数据、
+或修改了分词规则后，可运行本脚本强制重建。
+
+使用方法:
+    python rebuild_search_index.py
+    python rebuild_search_index.py --database-url sqlite:///./project_manager.db
+"""
+import argparse
+import os
+import sys
+
+# 添加当前目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import Session, create_engine
+
+from app.core.database import engine as default_engine
+from app.repositories.search_index import HistoricalProjectSearchIndex, search_index_available
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建历史项目全文检索索引")
+    parser.add_argument("--database-url", default=None, help="数据库地址（默认使用应用配置）")
+    args = parser.parse_args()
+
+    import main as _app  # noqa: F401  注册所有模型并执行迁移
+
+    engine = create_engine(args.database_url) if args.database_url else default_engine
+    with Session(engine) as session:
+        if not search_index_available(session):
+            print("当前数据库没有全文检索索引（仅支持 SQLite），搜索使用 LIKE 查询")
+            return
+        total = HistoricalProjectSearchIndex(session).rebuild()
+    print(f"已索引 {total} 个历史项目")
+
+
+if __name__ == "__main__":
+    main()
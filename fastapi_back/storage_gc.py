@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+上传文件对账脚本
+
+对比 uploads/ 目录与数据库中的附件、视频、内容块记录，报告没有记录引用的孤儿文件
+和记录存在但文件缺失的情况；加 --quarantine 时将孤儿文件移入 uploads/.quarantine/<时间>/，
+确认无误后可手动删除隔离目录。
+
+使用方法:
+    python storage_gc.py
+    python storage_gc.py --quarantine
+    python storage_gc.py --database-url sqlite:///./project_manager.db --min-age 0
+"""
+import argparse
+import os
+import sys
+
+# 添加当前目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import Session, create_engine
+
+from app.core.database import engine as default_engine
+from app.services.storage_gc_service import StorageGcService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对账上传目录，报告或隔离孤儿文件")
+    parser.add_argument("--database-url", default=None, help="数据库地址（默认使用应用配置）")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批读取的记录数")
+    parser.add_argument("--min-age", type=int, default=None, help="跳过最近 N 秒内修改的文件（默认使用应用配置）")
+    parser.add_argument("--quarantine", action="store_true", help="将孤儿文件移入隔离区")
+    args = parser.parse_args()
+
+    import main as _app  # noqa: F401  注册所有模型并执行迁移
+
+    engine = create_engine(args.database_url) if args.database_url else default_engine
+    with Session(engine) as session:
+        report = StorageGcService(
+            session, batch_size=args.batch_size, min_age_seconds=args.min_age
+        ).run(quarantine=args.quarantine)
+
+    print(f"扫描文件 {report.scanned_files} 个，引用 {report.scanned_references} 个，"
+          f"跳过最近修改 {report.skipped_recent} 个，修正内容块引用 {report.blob_refs_fixed} 个")
+    print(f"孤儿文件 {report.orphan_count} 个（{report.orphan_bytes / (1024 * 1024):.2f} MB），"
+          f"已隔离 {report.quarantined} 个")
+    for path in report.orphans:
+        print(f"  孤儿: {path}")
+    print(f"缺失文件 {report.missing_count} 个")
+    for source, path in report.missing:
+        print(f"  缺失 [{source}]: {path}")
+
+
+if __name__ == "__main__":
+    main()
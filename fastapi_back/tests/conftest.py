@@ -3,13 +3,21 @@ Pytest 配置和共享 fixtures
 
 提供测试所需的数据库会话、测试客户端和认证 fixtures。
 """
+import os
+import uuid
+
 import pytest
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.pool import NullPool
 from sqlmodel.pool import StaticPool
 
-from app.core.database import get_session
+from app.core.database import get_async_session, get_read_session, get_session
+from app.core.token_cache import token_cache
+from app.repositories.pagination import count_cache
 from app.models.user import User
 from app.models.project import Project, ProjectStep
 from app.models.platform import Platform
@@ -18,37 +26,69 @@ from app.core.security import get_password_hash
 from main import app
 
 
-# 使用内存数据库进行测试
+# 使用内存数据库进行测试（共享缓存的命名内存库，异步引擎可访问同一份数据）
+@pytest.fixture(name="database_uri")
+def database_uri_fixture() -> str:
+    """每个测试独立的内存数据库 URI"""
+    return f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared&uri=true"
+
+
 @pytest.fixture(name="engine")
-def engine_fixture():
+def engine_fixture(database_uri: str):
     """创建内存数据库引擎"""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{database_uri}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
     yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(engine, database_uri: str):
+    """创建访问同一内存数据库的异步引擎（依赖 engine 保持内存库存活）"""
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_uri}", poolclass=NullPool)
+    yield async_engine
+    async_engine.sync_engine.dispose()
+
+
+@pytest.fixture(name="async_session")
+async def async_session_fixture(async_engine) -> AsyncGenerator[AsyncSession, None]:
+    """创建异步数据库会话"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
 
 
 @pytest.fixture(name="session")
 def session_fixture(engine) -> Generator[Session, None, None]:
     """创建数据库会话"""
+    # 每个测试使用新的数据库，清空进程内的列表总数缓存
+    count_cache.clear()
     with Session(engine) as session:
         yield session
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session) -> Generator[TestClient, None, None]:
+def client_fixture(session: Session, async_engine) -> Generator[TestClient, None, None]:
     """创建测试客户端"""
 
     def get_session_override():
         return session
 
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    token_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+    token_cache.clear()
 
 
 @pytest.fixture(name="test_user")
@@ -150,3 +190,11 @@ def test_tag_fixture(session: Session) -> Tag:
     session.commit()
     session.refresh(tag)
     return tag
+
+
+@pytest.fixture(name="upload_workdir")
+def upload_workdir_fixture(tmp_path, monkeypatch) -> None:
+    """上传目录使用相对路径，切换到临时目录避免污染工作区（通过 usefixtures 启用）"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("uploads")
+
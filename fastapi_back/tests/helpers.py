@@ -0,0 +1,25 @@
+"""
+测试辅助函数
+"""
+import os
+import time
+from typing import Optional
+
+
+def write_upload(relative: str, content: bytes = b"x", age_seconds: Optional[int] = None) -> str:
+    """
+    在 uploads/ 下写入测试文件（配合 upload_workdir fixture 使用）
+
+    Args:
+        relative: 相对 uploads/ 的路径
+        content: 文件内容
+        age_seconds: 将修改时间设为多少秒之前（默认不修改）
+    """
+    path = os.path.join("uploads", relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    if age_seconds is not None:
+        mtime = time.time() - age_seconds
+        os.utime(path, (mtime, mtime))
+    return path
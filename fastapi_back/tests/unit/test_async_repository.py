@@ -0,0 +1,44 @@
+"""
+异步数据访问层单元测试
+"""
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core import database
+from app.models.platform import Platform
+from app.repositories.async_base import AsyncBaseRepository
+
+
+class TestAsyncBaseRepository:
+    """异步 Repository 基类测试类"""
+
+    async def test_crud(self, async_session: AsyncSession):
+        """测试创建、查询、更新、统计和删除"""
+        repo = AsyncBaseRepository(async_session, Platform)
+
+        platform = await repo.create(Platform(name="异步平台"))
+        assert platform.id is not None
+
+        assert (await repo.get_by_id(platform.id)).name == "异步平台"
+        assert [p.id for p in await repo.get_by_ids([platform.id, 9999])] == [platform.id]
+        assert (await repo.find_one(name="异步平台")).id == platform.id
+
+        await repo.update(platform, {"name": "新名称"})
+        assert await repo.count(name="新名称") == 1
+
+        assert await repo.delete_by_id(platform.id) is True
+        assert await repo.exists(platform.id) is False
+
+
+class TestAsyncDatabaseUrl:
+    """异步数据库 URL 推导测试类"""
+
+    def test_derived_from_sync_url(self, monkeypatch):
+        """测试由同步 URL 推导异步驱动"""
+        monkeypatch.setattr(database.settings, "ASYNC_DATABASE_URL", None)
+        monkeypatch.setattr(database.settings, "DATABASE_URL", "sqlite:///./project_manager.db")
+        assert database.get_async_database_url() == "sqlite+aiosqlite:///./project_manager.db"
+
+    def test_explicit_url_wins(self, monkeypatch):
+        """测试显式配置 ASYNC_DATABASE_URL 时直接使用"""
+        monkeypatch.setattr(database.settings, "ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./other.db")
+        assert database.get_async_database_url() == "sqlite+aiosqlite:///./other.db"
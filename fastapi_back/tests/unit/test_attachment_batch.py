@@ -0,0 +1,73 @@
+"""
+批量获取附件信息单元测试
+"""
+from app.core.db_profiler import install_db_profiler
+from app.core.request_context import begin_request, end_request
+from app.models.attachment import Attachment
+from app.models.attachment_folder import AttachmentFolder
+from app.models.historical_project import HistoricalProject
+from app.models.project import Project
+from app.services.attachment_service import AttachmentService
+
+
+def add_attachment(session, **fields) -> int:
+    attachment = Attachment(file_path="uploads/x", file_name=f"{len(fields)}.jpg", **fields)
+    session.add(attachment)
+    session.commit()
+    return attachment.id
+
+
+class TestAttachmentBatch:
+    """AttachmentService.get_attachments_batch 测试类"""
+
+    def _setup(self, session, test_project, test_user, admin_user):
+        other_project = Project(title="他人项目", platform_id=test_project.platform_id, user_id=admin_user.id)
+        historical = HistoricalProject(title="历史项目", user_id=test_user.id)
+        folder = AttachmentFolder(project_id=test_project.id, name="项目快照")
+        session.add_all([other_project, historical, folder])
+        session.commit()
+        return {
+            "own": add_attachment(session, project_id=test_project.id, folder_id=folder.id),
+            "historical": add_attachment(session, historical_project_id=historical.id),
+            "other": add_attachment(session, project_id=other_project.id),
+        }
+
+    def test_filters_and_keeps_order(self, engine, session, test_project, test_user, admin_user):
+        """测试保持请求顺序、跳过无权访问和不存在的附件，查询次数与数量无关"""
+        ids = self._setup(session, test_project, test_user, admin_user)
+        service = AttachmentService(session)
+        user_id = test_user.id
+        install_db_profiler(engine)
+
+        ctx = begin_request()
+        try:
+            result = service.get_attachments_batch(
+                [ids["historical"], 9999, ids["other"], ids["own"], ids["historical"]],
+                current_user_id=user_id
+            )
+        finally:
+            end_request(ctx)
+
+        assert [att.id for att in result] == [ids["historical"], ids["own"], ids["historical"]]
+        assert result[1].folder_name == "项目快照"
+        # 附件、项目所有者、历史项目所有者、文件夹名称
+        assert ctx.query_count == 4
+
+    def test_admin_sees_all(self, session, test_project, test_user, admin_user):
+        """测试管理员可以获取所有附件"""
+        ids = self._setup(session, test_project, test_user, admin_user)
+
+        result = AttachmentService(session).get_attachments_batch(
+            [ids["other"], ids["own"]], current_user_id=admin_user.id, is_admin=True
+        )
+
+        assert [att.id for att in result] == [ids["other"], ids["own"]]
+
+    def test_batch_endpoint(self, client, auth_headers, session, test_project, test_user, admin_user):
+        """测试批量接口跳过不存在的附件而不是整体失败"""
+        ids = self._setup(session, test_project, test_user, admin_user)
+
+        response = client.post("/api/attachments/batch", headers=auth_headers, json=[ids["own"], 9999, ids["other"]])
+
+        assert response.status_code == 200
+        assert [att["id"] for att in response.json()] == [ids["own"]]
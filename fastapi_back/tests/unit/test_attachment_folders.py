@@ -0,0 +1,66 @@
+"""
+附件文件夹列表单元测试
+"""
+from datetime import datetime, timedelta
+
+from app.models.attachment import Attachment
+from app.models.attachment_folder import AttachmentFolder
+from app.repositories.attachment_repository import AttachmentRepository
+
+
+def seed(session, project_id):
+    """两个文件夹（含"其他"），以及未归入文件夹的附件"""
+    folder = AttachmentFolder(project_id=project_id, name="项目快照")
+    other = AttachmentFolder(project_id=project_id, name="其他")
+    session.add_all([folder, other])
+    session.commit()
+    base = datetime(2026, 1, 1)
+    for index, folder_id in enumerate([folder.id, folder.id, folder.id, other.id, None, None]):
+        session.add(Attachment(
+            project_id=project_id, folder_id=folder_id, file_path=f"uploads/{index}",
+            file_name=f"{index}.jpg", created_at=base + timedelta(minutes=index)
+        ))
+    session.commit()
+    return folder.id, other.id
+
+
+class TestAttachmentFolderQueries:
+    """文件夹统计查询测试类"""
+
+    def test_count_by_folder(self, session, test_project):
+        """测试一次查询统计各文件夹数量，包含未归入文件夹的附件"""
+        folder_id, other_id = seed(session, test_project.id)
+
+        counts = AttachmentRepository(session).count_by_folder(project_id=test_project.id)
+
+        assert counts == {folder_id: 3, other_id: 1, None: 2}
+
+    def test_list_recent_by_folder(self, session, test_project):
+        """测试每个文件夹取最近 N 个附件，未归入文件夹的附件并入"其他" """
+        folder_id, other_id = seed(session, test_project.id)
+
+        recent = AttachmentRepository(session).list_recent_by_folder(
+            2, project_id=test_project.id, null_folder_id=other_id
+        )
+
+        assert [att.file_name for att in recent[folder_id]] == ["2.jpg", "1.jpg"]
+        assert [att.file_name for att in recent[other_id]] == ["5.jpg", "4.jpg"]
+
+
+class TestListFoldersApi:
+    """文件夹列表接口测试类"""
+
+    def test_counts_and_recent(self, client, auth_headers, session, test_project):
+        """测试文件夹列表的数量（"其他"包含未归入文件夹的附件）和最近附件"""
+        folder_id, other_id = seed(session, test_project.id)
+
+        response = client.get(f"/api/attachment-folders/project/{test_project.id}?recent=1", headers=auth_headers)
+
+        assert response.status_code == 200
+        folders = {folder["id"]: folder for folder in response.json()}
+        assert folders[folder_id]["attachment_count"] == 3
+        assert folders[other_id]["attachment_count"] == 3
+        assert [att["file_name"] for att in folders[other_id]["recent_attachments"]] == ["5.jpg"]
+
+        plain = client.get(f"/api/attachment-folders/project/{test_project.id}", headers=auth_headers).json()
+        assert all(folder["recent_attachments"] is None for folder in plain)
@@ -0,0 +1,179 @@
+"""
+内容寻址附件存储单元测试
+"""
+import os
+
+import pytest
+from sqlmodel import select
+
+from app.models.attachment import Attachment
+from app.models.file_blob import FileBlob
+from app.services.attachment_service import AttachmentService
+from app.services.blob_store import BlobStore, hash_file
+from tests.helpers import write_upload
+
+
+pytestmark = pytest.mark.usefixtures("upload_workdir")
+
+
+class TestBlobStore:
+    """BlobStore 测试类"""
+
+    def test_ingest_deduplicates(self, session):
+        """测试相同内容只保存一份，引用计数累加"""
+        store = BlobStore(session)
+        first = store.ingest(write_upload("a.bin", b"same content"))
+        second = store.ingest(write_upload("b.bin", b"same content"))
+
+        assert first.sha256 == second.sha256
+        assert second.ref_count == 2
+        assert first.storage_path == os.path.join("uploads", "blobs", first.sha256[:2], first.sha256[2:4], first.sha256)
+        assert not os.path.exists(os.path.join("uploads", "a.bin"))
+        assert not os.path.exists(os.path.join("uploads", "b.bin"))
+
+    def test_release_deletes_last_reference(self, session):
+        """测试最后一个引用释放时删除文件和记录"""
+        store = BlobStore(session)
+        blob = store.ingest(write_upload("a.bin", b"content"))
+        store.add_reference(blob.sha256)
+
+        assert store.release(blob.sha256) is False
+        assert os.path.exists(blob.storage_path)
+        assert store.release(blob.sha256) is True
+        assert not os.path.exists(blob.storage_path)
+        assert store.blob_repo.get_by_sha256(blob.sha256) is None
+
+    def test_release_race_keeps_rereferenced_blob(self, session):
+        """测试引用归零后、删除前被重新上传时，记录和文件都保留"""
+        store = BlobStore(session)
+        blob = store.ingest(write_upload("a.bin", b"content"))
+        # 模拟 release 已将计数减到 0，尚未删除记录时并发上传了相同内容
+        assert store.blob_repo.add_references(blob.sha256, -1) == 0
+        again = store.ingest(write_upload("b.bin", b"content"))
+
+        assert again.ref_count == 1
+        assert store.blob_repo.delete_if_unreferenced(blob.sha256) is False
+        assert os.path.exists(blob.storage_path)
+        assert not os.path.exists(os.path.join("uploads", "b.bin"))
+
+    def test_ingest_after_release_deletes_record(self, session, monkeypatch):
+        """测试 release 删除记录后、删除文件前上传相同内容时，新上传的文件保留"""
+        store = BlobStore(session)
+        blob = store.ingest(write_upload("a.bin", b"content"))
+        delete_if_unreferenced = store.blob_repo.delete_if_unreferenced
+        uploaded = []
+
+        def delete_then_upload(sha256):
+            deleted = delete_if_unreferenced(sha256)
+            uploaded.append(BlobStore(session).ingest(write_upload("b.bin", b"content")))
+            return deleted
+
+        monkeypatch.setattr(store.blob_repo, "delete_if_unreferenced", delete_then_upload)
+
+        assert store.release(blob.sha256) is True
+        assert uploaded[0].ref_count == 1
+        assert hash_file(blob.storage_path) == blob.sha256
+        assert os.listdir(os.path.dirname(blob.storage_path)) == [blob.sha256]
+
+    def test_ingest_before_release_deletes_record(self, session, monkeypatch):
+        """测试 release 引用归零后、删除记录前上传相同内容时，记录和文件都保留"""
+        store = BlobStore(session)
+        blob = store.ingest(write_upload("a.bin", b"content"))
+        delete_if_unreferenced = store.blob_repo.delete_if_unreferenced
+
+        def upload_then_delete(sha256):
+            BlobStore(session).ingest(write_upload("b.bin", b"content"))
+            return delete_if_unreferenced(sha256)
+
+        monkeypatch.setattr(store.blob_repo, "delete_if_unreferenced", upload_then_delete)
+
+        assert store.release(blob.sha256) is False
+        assert store.blob_repo.get_by_sha256(blob.sha256).ref_count == 1
+        assert hash_file(blob.storage_path) == blob.sha256
+        assert os.listdir(os.path.dirname(blob.storage_path)) == [blob.sha256]
+
+    def test_ingest_restores_missing_file(self, session):
+        """测试记录存在但文件已被删除时，用上传的文件补回"""
+        store = BlobStore(session)
+        blob = store.ingest(write_upload("a.bin", b"content"))
+        os.remove(blob.storage_path)
+
+        again = store.ingest(write_upload("b.bin", b"content"))
+
+        assert again.ref_count == 2
+        assert hash_file(blob.storage_path) == blob.sha256
+
+
+class TestAttachmentDeduplication:
+    """附件去重测试类"""
+
+    def _create(self, service, project_id, user_id, content, name="报告.pdf"):
+        return service.create_attachment(
+            project_id=project_id, file_path=write_upload(f"{name}-{os.urandom(4).hex()}", content),
+            file_name=name, file_type="文档", current_user_id=user_id
+        )
+
+    def test_copy_is_metadata_only(self, session, test_project, test_user):
+        """测试复制附件只增加引用，不复制文件"""
+        service = AttachmentService(session)
+        original = self._create(service, test_project.id, test_user.id, b"deliverable" * 1000)
+
+        copy = service.copy_attachment(original.id, current_user_id=test_user.id)
+
+        assert copy.id != original.id
+        assert copy.file_path == original.file_path
+        assert session.get(Attachment, copy.id).blob_sha256 == session.get(Attachment, original.id).blob_sha256
+        assert len(os.listdir(os.path.dirname(original.file_path))) == 1
+
+    def test_delete_keeps_shared_file(self, session, test_project, test_user):
+        """测试删除附件时共享文件保留到最后一个引用"""
+        service = AttachmentService(session)
+        first = self._create(service, test_project.id, test_user.id, b"same")
+        second = self._create(service, test_project.id, test_user.id, b"same")
+        assert first.file_path == second.file_path
+
+        service.delete_attachment(first.id, current_user_id=test_user.id)
+        assert os.path.exists(second.file_path)
+
+        service.delete_attachment(second.id, current_user_id=test_user.id)
+        assert not os.path.exists(second.file_path)
+
+    def test_deduplicate_legacy_files(self, session, test_project):
+        """测试旧附件迁移到内容寻址存储"""
+        for name, content in [("a.txt", b"dup"), ("b.txt", b"dup"), ("c.txt", b"unique")]:
+            session.add(Attachment(project_id=test_project.id, file_path=write_upload(name, content), file_name=name))
+        session.add(Attachment(project_id=test_project.id, file_path="uploads/missing.txt", file_name="missing.txt"))
+        session.commit()
+        service = AttachmentService(session)
+
+        dry_run = service.deduplicate_files(dry_run=True)
+        assert dry_run == {"processed": 3, "deduplicated": 1, "missing": 1, "bytes_saved": 3}
+        assert os.path.exists(os.path.join("uploads", "a.txt"))
+
+        stats = service.deduplicate_files(batch_size=2)
+
+        assert stats["processed"] == 3
+        assert sorted(os.listdir("uploads")) == ["blobs"]
+        blobs = {blob.sha256: blob.ref_count for blob in session.exec(select(FileBlob)).all()}
+        assert blobs[hash_file(session.get(Attachment, 1).file_path)] == 2
+        assert sorted(blobs.values()) == [1, 2]
+
+
+class TestCopyAttachmentApi:
+    """复制附件接口测试类"""
+
+    def test_copy_endpoint(self, client, auth_headers, session, test_project, test_user):
+        """测试复制接口共享内容并增加引用计数"""
+        service = AttachmentService(session)
+        original = service.create_attachment(
+            project_id=test_project.id, file_path=write_upload("x.bin", b"x" * 100),
+            file_name="x.bin", file_type="其他", current_user_id=test_user.id
+        )
+
+        response = client.post(f"/api/attachments/{original.id}/copy", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["file_path"] == original.file_path
+        blob = BlobStore(session).blob_repo.get_by_sha256(session.get(Attachment, original.id).blob_sha256)
+        session.refresh(blob)
+        assert blob.ref_count == 2
@@ -0,0 +1,104 @@
+"""
+Dashboard Service 单元测试
+"""
+import json
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.services.dashboard_service import AsyncDashboardService, DashboardService
+from app.models.todo import Todo
+from app.models.project import Project, ProjectStep
+from app.models.user import User
+from app.models.platform import Platform
+
+
+class TestDashboardService:
+    """Dashboard Service 测试类"""
+
+    @staticmethod
+    def _add_project(session: Session, user: User, platform: Platform, **kwargs) -> Project:
+        project = Project(title="项目", platform_id=platform.id, user_id=user.id, **kwargs)
+        session.add(project)
+        session.commit()
+        session.refresh(project)
+        return project
+
+    def test_aggregated_stats(
+        self,
+        session: Session,
+        test_user: User,
+        admin_user: User,
+        test_platform: Platform
+    ):
+        """测试收益、待处理项目数、进行中步骤数的聚合统计"""
+        other_platform = Platform(name="其他平台")
+        session.add(other_platform)
+        session.commit()
+        session.refresh(other_platform)
+
+        paid = self._add_project(
+            session, test_user, test_platform, is_paid=True, actual_income=100.0, status="已结账"
+        )
+        self._add_project(
+            session, test_user, other_platform, is_paid=True, actual_income=50.0, status="已结账"
+        )
+        pending = self._add_project(session, test_user, test_platform, price=300.0)
+        self._add_project(
+            session, admin_user, test_platform, is_paid=True, actual_income=20.0, status="已结账"
+        )
+        session.add(ProjectStep(name="进行中", project_id=pending.id, status="进行中"))
+        session.add(ProjectStep(name="已完成", project_id=paid.id, status="已完成"))
+        session.commit()
+
+        service = DashboardService(session)
+
+        user_stats = service.get_dashboard_stats(user_id=test_user.id, is_admin=False)
+        assert user_stats.total_revenue == 150.0
+        assert user_stats.platform_revenue == {"测试平台": 100.0, "其他平台": 50.0}
+        assert user_stats.pending_projects_count == 1
+        assert user_stats.in_progress_steps_count == 1
+
+        admin_stats = service.get_dashboard_stats(user_id=None, is_admin=True)
+        assert admin_stats.total_revenue == 170.0
+        assert admin_stats.platform_revenue == {"测试平台": 120.0, "其他平台": 50.0}
+
+    async def test_async_service_matches_sync(
+        self,
+        session: Session,
+        async_session: AsyncSession,
+        test_user: User,
+        admin_user: User,
+        test_platform: Platform
+    ):
+        """测试异步服务与同步服务结果一致（包括按用户过滤的今日待办）"""
+        project = self._add_project(session, test_user, test_platform, is_paid=True, actual_income=80.0)
+        other = self._add_project(session, admin_user, test_platform)
+        step = ProjectStep(name="写代码", project_id=project.id, status="进行中")
+        session.add(step)
+        session.commit()
+        session.refresh(step)
+        session.add(Todo(project_id=project.id, description="我的", step_ids=json.dumps([step.id])))
+        session.add(Todo(project_id=other.id, description="别人的", step_ids="[]"))
+        session.commit()
+
+        sync_stats = DashboardService(session).get_dashboard_stats(user_id=test_user.id, is_admin=False)
+        async_stats = await AsyncDashboardService(async_session).get_dashboard_stats(
+            user_id=test_user.id, is_admin=False
+        )
+
+        assert async_stats == sync_stats
+        assert [todo["description"] for todo in async_stats.today_todos] == ["我的"]
+        assert async_stats.today_todos[0]["step_names"] == ["写代码"]
+
+    def test_stats_endpoint_uses_async_session(
+        self, client: TestClient, auth_headers: dict, test_project: Project, test_step: ProjectStep
+    ):
+        """测试统计接口（异步会话可读取同步会话写入的数据）"""
+        response = client.get("/api/dashboard/stats", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["pending_projects_count"] == 1
+        assert data["in_progress_steps_count"] == 1
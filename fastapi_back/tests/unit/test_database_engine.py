@@ -0,0 +1,42 @@
+"""
+数据库引擎配置单元测试
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import create_database_engine
+
+
+class TestDatabaseEngine:
+    """SQLite 连接参数与只读连接池测试类"""
+
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """测试新连接应用 WAL、synchronous、busy_timeout 等 PRAGMA"""
+        engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        try:
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert engine.pool.size() == 5
+        finally:
+            engine.dispose()
+
+    def test_read_only_engine_rejects_writes(self, tmp_path):
+        """测试只读引擎可以读取但不能写入"""
+        url = f"sqlite:///{tmp_path / 'app.db'}"
+        engine = create_database_engine(url)
+        read_engine = create_database_engine(url, read_only=True, pool_size=2)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+                conn.execute(text("INSERT INTO item (id) VALUES (1)"))
+
+            with read_engine.connect() as conn:
+                assert conn.execute(text("SELECT COUNT(*) FROM item")).scalar() == 1
+                with pytest.raises(OperationalError):
+                    conn.execute(text("INSERT INTO item (id) VALUES (2)"))
+        finally:
+            read_engine.dispose()
+            engine.dispose()
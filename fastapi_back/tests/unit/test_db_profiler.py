@@ -0,0 +1,112 @@
+"""
+数据库查询性能分析单元测试
+"""
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.core import db_profiler
+from app.core.db_profiler import OVERFLOW_ROUTE, UNMATCHED_ROUTE, RouteStats, install_db_profiler, route_stats
+from app.core.request_context import begin_request, end_request
+
+
+class TestDbProfiler:
+    """数据库查询性能分析测试类"""
+
+    def test_counts_and_times_queries_in_request(self, engine, session: Session):
+        """测试请求上下文内统计查询次数和耗时"""
+        install_db_profiler(engine)
+        ctx = begin_request()
+        try:
+            session.exec(text("SELECT 1"))
+            session.exec(text("SELECT 2"))
+        finally:
+            end_request(ctx)
+
+        assert ctx.query_count == 2
+        assert ctx.db_time_ms > 0
+
+    def test_failed_statement_does_not_skew_timing(self, engine, session: Session):
+        """测试语句出错后不在连接上残留开始时间，之后的计时不受影响"""
+        install_db_profiler(engine)
+        ctx = begin_request()
+        try:
+            with pytest.raises(OperationalError):
+                session.exec(text("SELECT * FROM no_such_table"))
+            session.rollback()
+            started = time.perf_counter()
+            session.exec(text("SELECT 1"))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        finally:
+            end_request(ctx)
+
+        assert ctx.query_count == 2
+        assert ctx.db_time_ms <= elapsed_ms
+        assert "query_start_time" not in session.connection().info
+
+    def test_slow_query_logged(self, engine, session: Session, caplog, monkeypatch):
+        """测试超过阈值的语句记录慢查询日志"""
+        install_db_profiler(engine)
+        monkeypatch.setattr(db_profiler.settings, "DB_SLOW_QUERY_MS", 0)
+
+        with caplog.at_level(logging.WARNING, logger="app.db.slow_query"):
+            session.exec(text("SELECT 1"))
+
+        assert any("SELECT 1" in r.getMessage() for r in caplog.records)
+
+    def test_route_stats_top(self):
+        """测试按查询次数和数据库耗时排序"""
+        stats = RouteStats()
+        stats.record("/a", query_count=10, db_time_ms=1.0, duration_ms=5.0)
+        stats.record("/b", query_count=2, db_time_ms=50.0, duration_ms=60.0)
+        stats.record("/a", query_count=20, db_time_ms=2.0, duration_ms=5.0)
+
+        by_queries = stats.top(1, sort_by="queries")
+        assert by_queries[0]["route"] == "/a"
+        assert by_queries[0]["requests"] == 2
+        assert by_queries[0]["max_queries"] == 20
+        assert by_queries[0]["avg_queries"] == 15
+
+        assert stats.top(1, sort_by="db_time")[0]["route"] == "/b"
+
+    def test_route_stats_capped(self):
+        """测试路由数达到上限后新路由计入同一个键"""
+        stats = RouteStats(max_routes=2)
+        for route in ("/a", "/b", "/c", "/d"):
+            stats.record(route, query_count=1, db_time_ms=1.0, duration_ms=1.0)
+        stats.record("/a", query_count=1, db_time_ms=1.0, duration_ms=1.0)
+
+        counts = {item["route"]: item["requests"] for item in stats.top(10)}
+        assert counts == {"/a": 2, "/b": 1, OVERFLOW_ROUTE: 2}
+
+    def test_unmatched_paths_share_one_key(self, client: TestClient):
+        """测试未匹配路由的请求不按原始路径累计"""
+        route_stats.reset()
+        for i in range(3):
+            client.get(f"/no-such-path-{i}")
+
+        routes = {item["route"]: item["requests"] for item in route_stats.top(10)}
+        assert routes == {UNMATCHED_ROUTE: 3}
+
+    def test_server_timing_and_admin_endpoint(
+        self, engine, client: TestClient, admin_auth_headers: dict, auth_headers: dict
+    ):
+        """测试 Server-Timing 响应头和管理员统计接口"""
+        install_db_profiler(engine)
+        route_stats.reset()
+
+        response = client.get("/api/projects/", headers=admin_auth_headers)
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+
+        response = client.get("/api/monitoring/routes?sort_by=queries", headers=admin_auth_headers)
+        assert response.status_code == 200
+        routes = {item["route"] for item in response.json()["data"]}
+        assert "/api/projects/" in routes
+
+        response = client.get("/api/monitoring/routes", headers=auth_headers)
+        assert response.status_code == 403
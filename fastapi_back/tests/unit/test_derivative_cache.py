@@ -0,0 +1,129 @@
+"""
+附件预览派生文件缓存单元测试
+"""
+import io
+import os
+import time
+
+import pytest
+
+from app.models.attachment import Attachment
+from app.services.derivative_cache import DerivativeCache, snap_thumbnail_size
+from tests.helpers import write_upload
+
+
+pytestmark = pytest.mark.usefixtures("upload_workdir")
+
+
+class TestTextPreview:
+    """文本预览测试类"""
+
+    def test_decodes_gbk_and_reuses_cache(self):
+        """测试 GBK 文本转为 UTF-8，第二次请求命中缓存"""
+        cache = DerivativeCache("uploads/.derivatives")
+        source = write_upload("notes.txt", "开题报告修改意见".encode("gbk"))
+
+        preview = cache.text_preview(source)
+
+        with open(preview.path, encoding="utf-8") as f:
+            assert f.read() == "开题报告修改意见"
+        assert preview.truncated is False
+        assert cache.text_preview(source).path == preview.path
+
+    def test_truncates_on_character_boundary(self):
+        """测试截断时不会把被切开的多字节字符当作解码失败"""
+        cache = DerivativeCache("uploads/.derivatives")
+        source = write_upload("long.md", ("中文" * 100).encode("utf-8"))
+
+        preview = cache.text_preview(source, max_bytes=100)
+
+        with open(preview.path, encoding="utf-8") as f:
+            assert f.read() == ("中文" * 100)[:33]
+        assert preview.truncated is True
+
+    def test_binary_returns_none(self):
+        """测试无法解码的内容返回 None"""
+        cache = DerivativeCache("uploads/.derivatives")
+        assert cache.text_preview(write_upload("data.txt", b"\xff\xfe\x00\x81" * 10)) is None
+
+
+class TestEviction:
+    """容量控制测试类"""
+
+    def test_evicts_least_recently_used(self):
+        """测试超过上限时淘汰最久未访问的派生文件"""
+        cache = DerivativeCache("uploads/.derivatives", max_bytes=3500)
+        previews = []
+        for index in range(3):
+            previews.append(cache.text_preview(write_upload(f"{index}.txt", b"a" * 1000 + bytes([index]))))
+            past = time.time() - 100 + index
+            os.utime(previews[-1].path, (past, past))
+        # 访问第一个，使其成为最近使用；第四个写入后超过上限
+        cache.text_preview(os.path.join("uploads", "0.txt"))
+        latest = cache.text_preview(write_upload("3.txt", b"a" * 1000 + b"3"))
+
+        assert not os.path.exists(previews[1].path)
+        assert all(os.path.exists(p.path) for p in (previews[0], previews[2], latest))
+        assert cache.evict(target_bytes=0) == 3003
+
+
+class TestThumbnail:
+    """缩略图测试类"""
+
+    def test_snap_size(self):
+        """测试尺寸对齐到预设值"""
+        assert snap_thumbnail_size(1) == 128
+        assert snap_thumbnail_size(300) == 512
+        assert snap_thumbnail_size(5000) == 1024
+
+    def test_resizes_image(self):
+        """测试生成缩放后的 WebP 缩略图"""
+        image_module = pytest.importorskip("PIL.Image")
+        buffer = io.BytesIO()
+        image_module.new("RGB", (2000, 1000), "red").save(buffer, format="JPEG")
+        # 内容寻址存储中的文件没有扩展名，按原始文件名判断
+        cache = DerivativeCache("uploads/.derivatives")
+        source = write_upload("a" * 64, buffer.getvalue())
+
+        thumbnail = cache.thumbnail(source, size=200, fmt="webp", file_name="photo.jpg")
+
+        with image_module.open(thumbnail.path) as image:
+            assert image.format == "WEBP"
+            assert image.size == (256, 128)
+        assert cache.thumbnail(source, size=200, fmt="webp", file_name="report.pdf") is None
+
+
+class TestPreviewApi:
+    """预览接口测试类"""
+
+    def test_text_preview_endpoint(self, client, session, auth_headers, test_project):
+        """测试文本预览接口返回 UTF-8 内容"""
+        attachment = Attachment(
+            project_id=test_project.id, file_path=write_upload("readme.md", "# 说明".encode("gbk")),
+            file_name="readme.md"
+        )
+        session.add(attachment)
+        session.commit()
+
+        response = client.get(f"/api/attachments/{attachment.id}/preview", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/markdown; charset=utf-8"
+        assert response.headers["x-preview-truncated"] == "false"
+        assert response.text == "# 说明"
+
+    def test_thumbnail_falls_back_to_original(self, client, session, auth_headers, test_project):
+        """测试不能生成缩略图时返回原文件"""
+        attachment = Attachment(
+            project_id=test_project.id, file_path=write_upload("scan.pdf", b"%PDF-1.4"), file_name="scan.pdf"
+        )
+        session.add(attachment)
+        session.commit()
+
+        response = client.get(f"/api/attachments/{attachment.id}/thumbnail?size=128", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.content == b"%PDF-1.4"
+        assert client.get(
+            f"/api/attachments/{attachment.id}/thumbnail?format=gif", headers=auth_headers
+        ).status_code == 400
@@ -0,0 +1,102 @@
+"""
+历史项目批量导入单元测试
+"""
+import io
+import json
+
+from sqlmodel import select
+
+from app.models.historical_project import HistoricalProject
+from app.models.tag import HistoricalProjectTag, Tag
+from app.repositories.historical_project_repository import HistoricalProjectRepository
+from app.services.historical_import_service import HistoricalImportService
+
+
+def csv_file(text: str, encoding: str = "utf-8") -> io.BytesIO:
+    return io.BytesIO(text.encode(encoding))
+
+
+class TestHistoricalImportService:
+    """批量导入服务测试类"""
+
+    def test_csv_with_chinese_headers(self, session, test_user, test_platform):
+        """测试中文表头、GBK 编码、平台名称和新标签"""
+        content = (
+            "标题,学生姓名,平台,价格,是否已结账,完成日期,标签\n"
+            f"图书管理系统,张三,{test_platform.name},1200,是,2023/05/01,Java；毕业设计\n"
+            "成绩分析,李四,,300,否,,毕业设计\n"
+        )
+        report = HistoricalImportService(session, chunk_size=1).import_file(
+            csv_file(content, "gbk"), "csv", test_user.id
+        )
+
+        assert (report.total, report.imported, report.failed) == (2, 2, 0)
+        first = session.get(HistoricalProject, report.project_ids[0])
+        assert first.platform_id == test_platform.id
+        assert first.is_paid is True
+        assert first.completion_date.year == 2023
+        assert first.import_source == "批量导入"
+        tag = session.exec(select(Tag).where(Tag.name == "毕业设计")).one()
+        assert tag.usage_count == 2
+        assert len(session.exec(select(HistoricalProjectTag)).all()) == 3
+        assert [p.id for p in HistoricalProjectRepository(session).list(search="图书")] == [report.project_ids[0]]
+
+    def test_invalid_rows_reported(self, session, test_user):
+        """测试错误行逐行报告，其余行正常导入"""
+        lines = [
+            json.dumps({"title": "有效项目", "price": 10}),
+            "{broken",
+            json.dumps({"title": " "}),
+            json.dumps({"title": "未知平台", "platform": "不存在"}),
+        ]
+        report = HistoricalImportService(session).import_file(
+            csv_file("\n".join(lines)), "jsonl", test_user.id
+        )
+
+        assert (report.total, report.imported, report.failed) == (4, 1, 3)
+        assert [error.row for error in report.errors] == [2, 3, 4]
+        assert report.errors[1].message == "title: 必填字段未填写"
+        assert report.errors[2].message == "平台不存在: 不存在"
+
+    def test_strict_and_dry_run_do_not_write(self, session, test_user):
+        """测试 dry_run 和 skip_invalid=False 时不写入"""
+        content = "title,price\n项目A,100\n项目B,abc\n"
+        service = HistoricalImportService(session)
+
+        strict = service.import_file(csv_file(content), "csv", test_user.id, skip_invalid=False)
+        dry_run = service.import_file(csv_file("title\n项目C\n"), "csv", test_user.id, dry_run=True)
+
+        assert strict.failed == 1 and strict.imported == 0
+        assert dry_run.total == 1 and dry_run.imported == 0
+        assert session.exec(select(HistoricalProject)).all() == []
+
+
+class TestBatchImportApi:
+    """批量导入接口测试类"""
+
+    def test_file_import(self, client, auth_headers):
+        """测试上传 CSV 导入并返回逐行报告"""
+        response = client.post(
+            "/api/historical-projects/batch-import/file",
+            files={"file": ("projects.csv", "title,student_name\n项目A,王五\n,缺标题\n".encode("utf-8"), "text/csv")},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total"], body["imported"], body["failed"]) == (2, 1, 1)
+        assert body["errors"][0]["row"] == 3
+
+    def test_json_batch_import(self, client, auth_headers, test_platform):
+        """测试原有 JSON 批量导入接口返回导入的项目"""
+        response = client.post(
+            "/api/historical-projects/batch-import",
+            json={"projects": [{"title": "项目A", "platform_id": test_platform.id}, {"title": "项目B"}]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["title"] for item in body] == ["项目A", "项目B"]
+        assert body[0]["platform_name"] == test_platform.name
+        assert body[0]["import_source"] == "手动导入"
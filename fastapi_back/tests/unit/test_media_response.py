@@ -0,0 +1,201 @@
+"""
+Range 媒体文件响应单元测试
+"""
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.attachment import Attachment
+from app.models.video_playback import VideoPlayback, VideoPlaybackLink
+from app.utils.media_response import MediaFileResponse
+from main import app as main_app
+
+CONTENT = os.urandom(100_000)
+
+
+@pytest.fixture(name="media_file")
+def media_file_fixture(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+@pytest.fixture(name="media_client")
+def media_client_fixture(media_file):
+    """只挂载一个文件路由的最小应用"""
+    app = FastAPI()
+
+    @app.api_route("/file", methods=["GET", "HEAD"])
+    async def get_file():
+        return MediaFileResponse(media_file, media_type="video/mp4", filename="回放.mp4", content_disposition_type="inline")
+
+    return TestClient(app)
+
+
+class TestMediaFileResponse:
+    """MediaFileResponse 测试类"""
+
+    def test_full_response_headers(self, media_client):
+        """测试完整响应带 ETag、Last-Modified 和 Accept-Ranges"""
+        response = media_client.get("/file")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"].startswith('"')
+        assert "last-modified" in response.headers
+        assert response.headers["content-disposition"].startswith("inline;")
+
+    def test_single_range(self, media_client):
+        """测试单区间返回 206"""
+        response = media_client.get("/file", headers={"Range": "bytes=1000-1999"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 1000-1999/{len(CONTENT)}"
+        assert response.content == CONTENT[1000:2000]
+
+        suffix = media_client.get("/file", headers={"Range": "bytes=-500"})
+        assert suffix.content == CONTENT[-500:]
+
+    def test_multi_range(self, media_client):
+        """测试多区间返回 multipart/byteranges"""
+        response = media_client.get("/file", headers={"Range": "bytes=0-9, 500-599"})
+
+        assert response.status_code == 206
+        content_type = response.headers["content-type"]
+        assert content_type.startswith("multipart/byteranges; boundary=")
+        boundary = content_type.split("boundary=")[1].encode()
+        assert int(response.headers["content-length"]) == len(response.content)
+
+        parts = [p for p in response.content.split(b"--" + boundary) if p.strip(b"\r\n-")]
+        assert len(parts) == 2
+        assert parts[0].endswith(CONTENT[0:10] + b"\r\n")
+        assert b"Content-Range: bytes 500-599/" in parts[1]
+        assert parts[1].split(b"\r\n\r\n", 1)[1] == CONTENT[500:600] + b"\r\n"
+
+    def test_if_range(self, media_client):
+        """测试 If-Range 匹配时返回区间，不匹配时返回完整内容"""
+        etag = media_client.get("/file").headers["etag"]
+
+        matched = media_client.get("/file", headers={"Range": "bytes=0-99", "If-Range": etag})
+        stale = media_client.get("/file", headers={"Range": "bytes=0-99", "If-Range": '"0-0"'})
+
+        assert matched.status_code == 206
+        assert stale.status_code == 200
+        assert stale.content == CONTENT
+
+    def test_conditional_get(self, media_client):
+        """测试 If-None-Match / If-Modified-Since 命中时返回 304"""
+        first = media_client.get("/file")
+
+        by_etag = media_client.get("/file", headers={"If-None-Match": first.headers["etag"]})
+        by_date = media_client.get("/file", headers={"If-Modified-Since": first.headers["last-modified"]})
+        changed = media_client.get("/file", headers={"If-None-Match": '"other"'})
+
+        assert by_etag.status_code == 304
+        assert by_etag.content == b""
+        assert by_date.status_code == 304
+        assert changed.status_code == 200
+
+    def test_range_not_satisfiable(self, media_client):
+        """测试超出范围返回 416"""
+        response = media_client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    def test_head_request(self, media_client):
+        """测试 HEAD 请求只返回响应头"""
+        response = media_client.head("/file", headers={"Range": "bytes=0-99"})
+
+        assert response.status_code == 206
+        assert response.headers["content-length"] == "100"
+        assert response.content == b""
+
+
+class TestZeroCopySend:
+    """经过应用完整中间件栈的零拷贝发送测试类"""
+
+    async def _call(self, app, path, headers):
+        """模拟支持 http.response.zerocopysend 扩展的 ASGI 服务器，返回状态、响应头和响应体"""
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+            "extensions": {"http.response.zerocopysend": {}},
+        }
+        start, body = {}, bytearray()
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.zerocopysend":
+                message["file"].seek(message["offset"])
+                body.extend(message["file"].read(message["count"]))
+            else:
+                body.extend(message.get("body", b""))
+
+        await app(scope, receive, send)
+        return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, bytes(body)
+
+    async def test_through_middleware_stack(self, media_file):
+        """测试扩展消息穿过请求日志等中间件，单区间和完整响应内容正确"""
+        app = FastAPI()
+        app.user_middleware = list(main_app.user_middleware)
+
+        @app.get("/file")
+        async def get_file():
+            return MediaFileResponse(media_file, media_type="video/mp4")
+
+        status, headers, body = await self._call(app, "/file", {"Range": "bytes=1000-1999"})
+        assert status == 206
+        assert body == CONTENT[1000:2000]
+        assert "server-timing" in headers
+
+        status, _, body = await self._call(app, "/file", {})
+        assert status == 200
+        assert body == CONTENT
+
+
+class TestMediaEndpoints:
+    """视频观看链接和附件预览的 Range 支持测试类"""
+
+    def test_watch_video_range(self, client, session, test_project, test_user, media_file):
+        """测试观看链接视频支持 Range 请求"""
+        video = VideoPlayback(
+            project_id=test_project.id, title="回放", file_path=media_file,
+            file_name="回放.mp4", file_size=len(CONTENT), status="就绪"
+        )
+        session.add(video)
+        session.commit()
+        session.refresh(video)
+        session.add(VideoPlaybackLink(video_id=video.id, password="x", token="tok123", created_by=test_user.id))
+        session.commit()
+
+        response = client.get("/api/video-playbacks/watch/tok123/video", headers={"Range": "bytes=50000-"})
+
+        assert response.status_code == 206
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.content == CONTENT[50000:]
+
+    def test_attachment_preview_range(self, client, session, auth_headers, test_project, media_file):
+        """测试附件预览支持 Range 请求"""
+        attachment = Attachment(project_id=test_project.id, file_path=media_file, file_name="clip.mp4")
+        session.add(attachment)
+        session.commit()
+        session.refresh(attachment)
+
+        response = client.get(
+            f"/api/attachments/{attachment.id}/preview",
+            headers={**auth_headers, "Range": "bytes=0-1023"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[:1024]
@@ -0,0 +1,151 @@
+"""
+游标分页单元测试
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.models.historical_project import HistoricalProjectCreate
+from app.models.project_log import LogAction, ProjectLog
+from app.repositories.historical_project_repository import HistoricalProjectRepository
+from app.repositories.pagination import CountCache, decode_cursor, encode_cursor
+from app.repositories.project_log_repository import ProjectLogRepository
+from app.repositories.tag_repository import HistoricalProjectTagRepository, TagRepository
+
+
+def add_logs(session, project_id, count, created_at):
+    """添加创建时间相同的日志（测试同值时按 id 排序）"""
+    for i in range(count):
+        session.add(ProjectLog(
+            project_id=project_id, action=LogAction.UPDATE, description=f"log {i}", created_at=created_at
+        ))
+    session.commit()
+
+
+class TestCursor:
+    """游标编码测试类"""
+
+    def test_round_trip(self):
+        """测试日期时间和整数编码后可还原"""
+        values = (datetime(2026, 1, 2, 3, 4, 5, 6), 42)
+        assert decode_cursor(encode_cursor(values), 2) == values
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor((1,))])
+    def test_invalid_cursor(self, cursor):
+        """测试格式错误或键数量不符的游标"""
+        with pytest.raises(ValidationException):
+            decode_cursor(cursor, 2)
+
+
+class TestKeysetPagination:
+    """游标分页测试类"""
+
+    def test_pages_cover_all_rows_once(self, session, test_project):
+        """测试逐页读取不重复不遗漏，最后一页没有游标"""
+        base = datetime(2026, 1, 1)
+        add_logs(session, test_project.id, 3, base)
+        add_logs(session, test_project.id, 4, base + timedelta(hours=1))
+        repo = ProjectLogRepository(session)
+
+        seen, cursor = [], None
+        while True:
+            page = repo.list_by_project_page(test_project.id, cursor, limit=3)
+            seen.extend(log.id for log in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        expected = [log.id for log in repo.list_by_project(test_project.id)]
+        assert len(seen) == 7
+        assert seen == sorted(seen, key=expected.index)
+        assert set(seen) == set(expected)
+
+    def test_insert_between_pages(self, session, test_project):
+        """测试翻页期间插入新记录不会导致后续页重复"""
+        add_logs(session, test_project.id, 4, datetime(2026, 1, 1))
+        repo = ProjectLogRepository(session)
+
+        first = repo.list_by_project_page(test_project.id, limit=2)
+        add_logs(session, test_project.id, 2, datetime(2026, 2, 1))
+        second = repo.list_by_project_page(test_project.id, first.next_cursor, limit=2)
+
+        assert not {log.id for log in first.items} & {log.id for log in second.items}
+        assert second.next_cursor is None
+
+
+class TestCountCache:
+    """总数缓存测试类"""
+
+    def test_cached_until_invalidated(self):
+        """测试缓存命中与按命名空间失效"""
+        cache = CountCache(ttl_seconds=60)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute(("a", 1), compute) == 1
+        assert cache.get_or_compute(("a", 1), compute) == 1
+        cache.invalidate("b")
+        assert cache.get_or_compute(("a", 1), compute) == 1
+        cache.invalidate("a")
+        assert cache.get_or_compute(("a", 1), compute) == 2
+
+    def test_historical_count_invalidated_on_write(self, session, test_user):
+        """测试新增、删除历史项目后总数缓存失效"""
+        repo = HistoricalProjectRepository(session)
+        assert repo.count(user_id=test_user.id) == 0
+
+        project = repo.create(HistoricalProjectCreate(title="毕业设计"), user_id=test_user.id)
+        assert repo.count(user_id=test_user.id) == 1
+
+        repo.delete(project)
+        assert repo.count(user_id=test_user.id) == 0
+
+    def test_historical_count_invalidated_on_tag_change(self, session, test_user, test_tag):
+        """测试增删历史项目标签、删除标签后按标签筛选的总数缓存失效"""
+        repo = HistoricalProjectRepository(session)
+        tag_repo = HistoricalProjectTagRepository(session)
+        project = repo.create(HistoricalProjectCreate(title="毕业设计"), user_id=test_user.id)
+        tag_id = test_tag.id
+        assert repo.count(tag_ids=[tag_id]) == 0
+
+        tag_repo.create(project.id, tag_id)
+        assert repo.count(tag_ids=[tag_id]) == 1
+
+        tag_repo.delete(project.id, tag_id)
+        assert repo.count(tag_ids=[tag_id]) == 0
+
+        tag_repo.create(project.id, tag_id)
+        assert repo.count(tag_ids=[tag_id]) == 1
+        tag_repo.delete_all_by_project(project.id)
+        assert repo.count(tag_ids=[tag_id]) == 0
+
+        tag_repo.create(project.id, tag_id)
+        assert repo.count(tag_ids=[tag_id]) == 1
+        TagRepository(session).delete(tag_id)
+        assert repo.count(tag_ids=[tag_id]) == 0
+
+
+class TestCursorApi:
+    """游标分页接口测试类"""
+
+    def test_project_logs_cursor_header(self, client, auth_headers, session, test_project):
+        """测试通过响应头返回下一页游标"""
+        add_logs(session, test_project.id, 3, datetime(2026, 1, 1))
+
+        first = client.get(f"/api/project-logs/project/{test_project.id}?limit=2&cursor=", headers=auth_headers)
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get(f"/api/project-logs/project/{test_project.id}?limit=2&cursor={cursor}", headers=auth_headers)
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_projects_invalid_cursor(self, client, auth_headers, test_project):
+        """测试无效游标返回 422"""
+        response = client.get("/api/projects/?cursor=%%%", headers=auth_headers)
+        assert response.status_code == 422
@@ -0,0 +1,98 @@
+"""
+项目归档单元测试
+"""
+from sqlmodel import select
+
+from app.core.db_profiler import install_db_profiler
+from app.core.request_context import begin_request, end_request
+from app.models.attachment import Attachment
+from app.models.attachment_folder import AttachmentFolder
+from app.models.file_blob import FileBlob
+from app.models.project import Project, ProjectStep
+from app.models.project_log import LogAction, ProjectLog
+from app.models.tag import HistoricalProjectTag, ProjectTag
+from app.models.todo import Todo
+from app.repositories.historical_project_repository import HistoricalProjectRepository
+
+
+def build_graph(session, project, step, tag, attachment_count=2):
+    """为项目添加文件夹、附件、待办、日志和标签"""
+    blob = FileBlob(sha256="a" * 64, size=3, storage_path="uploads/blobs/aa/aa/" + "a" * 64, ref_count=attachment_count)
+    folder = AttachmentFolder(project_id=project.id, name="资料")
+    session.add_all([blob, folder])
+    session.flush()
+    for i in range(attachment_count):
+        session.add(Attachment(
+            project_id=project.id, folder_id=folder.id, file_path=blob.storage_path,
+            file_name=f"file{i}.txt", blob_sha256=blob.sha256
+        ))
+    session.add(Todo(project_id=project.id, description="写论文", step_ids=f"[{step.id}]"))
+    session.add(ProjectLog(project_id=project.id, action=LogAction.UPDATE, description="更新"))
+    session.add(ProjectTag(project_id=project.id, tag_id=tag.id))
+    session.commit()
+
+
+class TestArchiveProject:
+    """项目归档测试类"""
+
+    def test_moves_whole_graph(self, session, test_project, test_step, test_tag):
+        """测试关联数据整体改挂到历史项目，原项目删除，文件和引用计数不变"""
+        build_graph(session, test_project, test_step, test_tag)
+        project_id, step_id, owner_id = test_project.id, test_step.id, test_project.user_id
+        paths = sorted(a.file_path for a in session.exec(select(Attachment)).all())
+
+        historical = HistoricalProjectRepository(session).archive_project(project_id)
+
+        hid = historical.id
+        assert historical.user_id == owner_id
+        assert historical.original_project_id == project_id
+        assert session.get(Project, project_id) is None
+        step = session.get(ProjectStep, step_id)
+        assert (step.project_id, step.historical_project_id) == (None, hid)
+        for model in (Attachment, AttachmentFolder, Todo, ProjectLog):
+            rows = session.exec(select(model)).all()
+            assert rows and all(r.project_id is None and r.historical_project_id == hid for r in rows)
+        assert sorted(a.file_path for a in session.exec(select(Attachment)).all()) == paths
+        assert session.exec(select(FileBlob)).one().ref_count == 2
+        assert session.exec(select(ProjectTag)).all() == []
+        assert [t.tag_id for t in session.exec(select(HistoricalProjectTag)).all()] == [test_tag.id]
+
+    def test_query_count_independent_of_size(self, session, engine, test_project, test_step, test_tag):
+        """测试语句数量与附件数量无关"""
+        build_graph(session, test_project, test_step, test_tag, attachment_count=50)
+        project_id = test_project.id
+        install_db_profiler(engine)
+
+        ctx = begin_request()
+        try:
+            HistoricalProjectRepository(session).archive_project(project_id)
+        finally:
+            end_request(ctx)
+
+        assert ctx.query_count <= 25
+
+    def test_missing_project(self, session):
+        """测试项目不存在时返回 None"""
+        assert HistoricalProjectRepository(session).archive_project(9999) is None
+
+
+class TestArchiveApi:
+    """项目归档接口测试类"""
+
+    def test_archive_endpoint(self, client, auth_headers, test_project):
+        """测试接口返回历史项目，原项目不可再访问"""
+        project_id = test_project.id
+        response = client.post(f"/api/historical-projects/archive-from-project/{project_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["original_project_id"] == project_id
+        assert client.get(f"/api/projects/{project_id}", headers=auth_headers).status_code == 404
+
+    def test_other_user_forbidden(self, client, auth_headers, session, admin_user, test_platform):
+        """测试非所有者（非管理员）不能归档"""
+        project = Project(title="他人项目", student_name="张三", platform_id=test_platform.id, user_id=admin_user.id)
+        session.add(project)
+        session.commit()
+
+        response = client.post(f"/api/historical-projects/archive-from-project/{project.id}", headers=auth_headers)
+        assert response.status_code == 403
+        assert session.get(Project, project.id) is not None
@@ -0,0 +1,94 @@
+"""
+项目日志时间线单元测试
+"""
+import json
+from datetime import datetime, timedelta
+
+from app.core.db_profiler import install_db_profiler
+from app.core.request_context import begin_request, end_request
+from app.models.project_log import LogAction, ProjectLog
+from app.services.project_log_service import ProjectLogService
+
+
+def add_timeline(session, project_id, user_id, count=6):
+    """交替添加步骤更新和待办完成日志"""
+    base = datetime(2026, 1, 1)
+    for i in range(count):
+        if i % 2:
+            action, details = LogAction.TODO_COMPLETED, {"step_names": ["开题"], "completion_note": f"完成 {i}"}
+        else:
+            action, details = LogAction.STEP_UPDATED, {"step_name": "开题", "photos": [str(i)]}
+        session.add(ProjectLog(
+            project_id=project_id, action=action, description=f"log {i}",
+            details=json.dumps(details, ensure_ascii=False), user_id=user_id,
+            created_at=base + timedelta(minutes=i)
+        ))
+    session.commit()
+
+
+class TestProjectLogTimeline:
+    """日志时间线测试类"""
+
+    def test_user_name_and_payload(self, session, test_project, test_user):
+        """测试带出用户名并解析详细信息，格式不正确的详细信息 payload 为 None"""
+        add_timeline(session, test_project.id, test_user.id, count=2)
+        session.add(ProjectLog(project_id=test_project.id, action=LogAction.OTHER, description="x", details="{bad"))
+        session.commit()
+
+        logs = ProjectLogService(session).get_project_logs(test_project.id)
+
+        assert logs[0].action == LogAction.OTHER
+        assert logs[0].user_name is None and logs[0].payload is None
+        assert logs[1].user_name == test_user.username
+        assert logs[1].payload.completion_note == "完成 1"
+        assert logs[2].payload.photos == ["0"]
+
+    def test_single_query_per_page(self, session, engine, test_project, test_user):
+        """测试每页只有一次查询，与日志条数无关"""
+        add_timeline(session, test_project.id, test_user.id, count=20)
+        project_id = test_project.id
+        install_db_profiler(engine)
+
+        ctx = begin_request()
+        try:
+            page = ProjectLogService(session).get_project_logs_page(project_id, limit=15)
+        finally:
+            end_request(ctx)
+
+        assert len(page.items) == 15
+        assert ctx.query_count == 1
+
+    def test_action_filter_with_cursor(self, session, test_project, test_user):
+        """测试按操作类型过滤并翻页"""
+        add_timeline(session, test_project.id, test_user.id, count=6)
+        service = ProjectLogService(session)
+        actions = [LogAction.TODO_COMPLETED.value]
+
+        first = service.get_project_logs_page(test_project.id, limit=2, actions=actions)
+        second = service.get_project_logs_page(test_project.id, first.next_cursor, limit=2, actions=actions)
+
+        assert [log.description for log in first.items + second.items] == ["log 5", "log 3", "log 1"]
+        assert second.next_cursor is None
+
+
+class TestProjectLogTimelineApi:
+    """日志时间线接口测试类"""
+
+    def test_filter_by_action(self, client, auth_headers, session, test_project, test_user):
+        """测试接口按 action 过滤并返回 payload"""
+        add_timeline(session, test_project.id, test_user.id, count=4)
+
+        response = client.get(
+            f"/api/project-logs/project/{test_project.id}?action=step_updated", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [log["action"] for log in data] == ["step_updated", "step_updated"]
+        assert data[0]["payload"]["step_name"] == "开题"
+        assert data[0]["user_name"] == test_user.username
+
+    def test_invalid_action(self, client, auth_headers, test_project):
+        """测试无效的操作类型返回 422"""
+        response = client.get(f"/api/project-logs/project/{test_project.id}?action=nope", headers=auth_headers)
+        assert response.status_code == 422
@@ -168,3 +168,88 @@ class TestStepService:
         from app.repositories.step_repository import StepRepository
         repo = StepRepository(session)
         assert repo.get_by_id(step_id) is None
+
+
+class TestProjectListQueryCount:
+    """项目列表查询次数基准测试（验证无 N+1 查询）"""
+
+    @staticmethod
+    def _seed_projects(session: Session, user: User, platform: Platform, count: int) -> None:
+        from app.models.project import ProjectStep
+        from app.models.tag import Tag, ProjectTag
+
+        tag = Tag(name="基准标签")
+        session.add(tag)
+        session.commit()
+        session.refresh(tag)
+
+        for i in range(count):
+            project = Project(
+                title=f"基准项目{i}",
+                platform_id=platform.id,
+                user_id=user.id,
+            )
+            session.add(project)
+            session.commit()
+            session.refresh(project)
+            session.add(ProjectStep(name="步骤1", project_id=project.id, order_index=0))
+            session.add(ProjectStep(name="步骤2", project_id=project.id, order_index=1))
+            session.add(ProjectTag(project_id=project.id, tag_id=tag.id))
+        session.commit()
+
+    @staticmethod
+    def _count_queries(engine, func) -> int:
+        from sqlalchemy import event
+
+        counter = {"n": 0}
+
+        def before_cursor_execute(*args, **kwargs):
+            counter["n"] += 1
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            func()
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        return counter["n"]
+
+    def test_query_count_flat_with_page_size(
+        self,
+        engine,
+        session: Session,
+        test_user: User,
+        test_platform: Platform
+    ):
+        """测试查询次数不随分页大小增长"""
+        self._seed_projects(session, test_user, test_platform, 50)
+        service = ProjectService(session)
+
+        counts = {}
+        for page_size in (1, 10, 50):
+            session.expunge_all()
+            counts[page_size] = self._count_queries(
+                engine, lambda: service.list_projects(limit=page_size)
+            )
+
+        assert counts[1] == counts[10] == counts[50]
+        assert counts[50] <= 4
+
+    def test_list_projects_assembles_relations(
+        self,
+        session: Session,
+        test_user: User,
+        test_platform: Platform
+    ):
+        """测试批量组装的关联数据与单个项目详情一致"""
+        self._seed_projects(session, test_user, test_platform, 3)
+        service = ProjectService(session)
+
+        projects = service.list_projects()
+
+        assert len(projects) == 3
+        for project in projects:
+            detail = service.get_project_with_relations(project.id)
+            assert project.platform.id == test_platform.id
+            assert [s.name for s in project.steps] == ["步骤1", "步骤2"]
+            assert [t.name for t in project.tags] == ["基准标签"]
+            assert project == detail
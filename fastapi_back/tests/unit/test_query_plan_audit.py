@@ -0,0 +1,57 @@
+"""
+查询计划审计单元测试
+"""
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.models.project import Project
+from app.models.user import User
+from app.repositories.login_log_repository import LoginLogRepository
+from app.repositories.project_log_repository import ProjectLogRepository
+from app.repositories.step_repository import StepRepository
+from app.utils.query_plan_audit import QueryRecorder, audit_query_plans, find_full_scans
+
+
+class TestQueryPlanAudit:
+    """查询计划审计测试类"""
+
+    def test_find_full_scans(self):
+        """测试区分全表扫描与索引扫描"""
+        plan = [
+            "SCAN project",
+            "SCAN projectstep USING INDEX ix_projectstep_project_id_order_index",
+            "SEARCH platform USING INTEGER PRIMARY KEY (rowid=?)",
+            "SCAN CONSTANT ROW",
+            "SCAN tag",
+        ]
+        assert find_full_scans(plan) == ["project", "tag"]
+        assert find_full_scans(plan, ignore_tables={"tag"}) == ["project"]
+
+    def test_flags_unindexed_filter(self, engine, session: Session):
+        """测试未建索引的过滤条件被标记为全表扫描"""
+        recorder = QueryRecorder()
+        recorder.install(engine)
+        try:
+            session.exec(text("SELECT id FROM project WHERE student_name = :name"), params={"name": "张三"})
+        finally:
+            recorder.remove()
+
+        findings = audit_query_plans(engine, recorder)
+        assert findings[0].full_scans == ["project"]
+
+    def test_repository_hot_queries_use_indexes(self, engine, session: Session, test_user: User, test_project: Project):
+        """测试日志、登录记录、步骤等热点查询命中索引"""
+        recorder = QueryRecorder()
+        recorder.install(engine)
+        try:
+            ProjectLogRepository(session).list_by_project(test_project.id)
+            LoginLogRepository(session).list_by_user(username=test_user.username)
+            LoginLogRepository(session).get_recent_failed_attempts(test_user.username)
+            StepRepository(session).list_by_project(test_project.id)
+            StepRepository(session).count_in_progress_steps(test_user.id)
+        finally:
+            recorder.remove()
+
+        findings = audit_query_plans(engine, recorder)
+        assert findings
+        assert [f.statement for f in findings if f.full_scans or f.error] == []
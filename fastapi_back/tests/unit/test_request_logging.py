@@ -0,0 +1,63 @@
+"""
+请求日志中间件单元测试
+"""
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core.db_profiler import install_db_profiler
+from app.core.logging_config import ACCESS_LOGGER_NAME, JsonAccessFormatter
+from app.core.request_logging import (
+    RequestLoggingMiddleware, enable_route_debug, disable_route_debug
+)
+
+
+def _access_records(caplog):
+    return [r for r in caplog.records if r.name == ACCESS_LOGGER_NAME]
+
+
+class TestRequestLogging:
+    """请求日志中间件测试类"""
+
+    def test_one_structured_line_per_request(
+        self, engine, client: TestClient, auth_headers: dict, caplog, test_user
+    ):
+        """测试每个请求输出一行包含路由模板、查询次数和用户ID的访问日志"""
+        install_db_profiler(engine)
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER_NAME):
+            response = client.get("/api/projects/999", headers=auth_headers)
+
+        records = _access_records(caplog)
+        assert len(records) == 1
+        access = records[0].access
+        assert access["method"] == "GET"
+        assert access["route"] == "/api/projects/{project_id}"
+        assert access["status"] == response.status_code
+        assert access["user_id"] == test_user.id
+        assert access["db_queries"] >= 1
+        assert "headers" not in access
+
+        line = JsonAccessFormatter().format(records[0])
+        assert '"route":"/api/projects/{project_id}"' in line
+
+    def test_debug_route(self, client: TestClient, caplog):
+        """测试调试路由附带请求头名称"""
+        enable_route_debug("/health")
+        try:
+            with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER_NAME):
+                client.get("/health?x=1")
+        finally:
+            disable_route_debug("/health")
+
+        access = _access_records(caplog)[-1].access
+        assert access["query"] == "x=1"
+        assert "host" in access["headers"]
+
+    def test_sampling(self):
+        """测试采样率为 0 时只记录错误和慢请求"""
+        middleware = RequestLoggingMiddleware(app=None, sample_rate=0.0, slow_ms=500)
+
+        assert middleware._should_log(200, 10) is False
+        assert middleware._should_log(500, 10) is True
+        assert middleware._should_log(200, 800) is True
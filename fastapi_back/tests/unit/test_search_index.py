@@ -0,0 +1,83 @@
+"""
+历史项目全文检索单元测试
+"""
+from sqlmodel import select
+
+from app.models.historical_project import HistoricalProjectCreate
+from app.models.tag import HistoricalProjectTag, Tag
+from app.repositories.historical_project_repository import HistoricalProjectRepository
+from app.repositories.search_index import (
+    HistoricalProjectSearchIndex, build_match_query, fts_table, ngram_text
+)
+
+
+def create(repo, user_id, title, **fields):
+    return repo.create(HistoricalProjectCreate(title=title, **fields), user_id=user_id)
+
+
+class TestTokenizer:
+    """分词测试类"""
+
+    def test_ngram_text(self):
+        """测试中文切分为二元组并追加末字，英文按单词小写"""
+        assert ngram_text("毕业设计Java") == "毕业 业设 设计 计 java"
+        assert ngram_text(None) == ""
+
+    def test_build_match_query(self):
+        """测试检索词转换为前缀短语，无可检索字符时返回 None"""
+        assert build_match_query("毕业设计 spring") == '"毕业 业设 设计"* AND "spring"*'
+        assert build_match_query("!!") is None
+
+
+class TestHistoricalProjectSearch:
+    """历史项目检索测试类"""
+
+    def test_chinese_and_prefix_search(self, session, test_user):
+        """测试中文子串、单字和英文前缀检索"""
+        repo = HistoricalProjectRepository(session)
+        target = create(repo, test_user.id, "图书管理系统", requirements="基于SpringBoot的毕业设计")
+        create(repo, test_user.id, "学生成绩分析", notes="Python 数据可视化")
+
+        assert [p.id for p in repo.list(search="管理")] == [target.id]
+        assert [p.id for p in repo.list(search="毕业设")] == [target.id]
+        assert [p.id for p in repo.list(search="spring")] == [target.id]
+        assert [p.id for p in repo.list(search="统")] == [target.id]
+        assert repo.count(search="可视化") == 1
+        assert repo.list(search="管理 python") == []
+
+    def test_ranked_by_title(self, session, test_user):
+        """测试标题匹配排在需求描述匹配之前"""
+        repo = HistoricalProjectRepository(session)
+        in_requirements = create(repo, test_user.id, "成绩分析", requirements="包含小程序端")
+        in_title = create(repo, test_user.id, "小程序商城")
+
+        assert [p.id for p in repo.list(search="小程序")] == [in_title.id, in_requirements.id]
+
+    def test_index_follows_updates_and_tags(self, session, test_user):
+        """测试修改、标签关联和删除后索引同步"""
+        repo = HistoricalProjectRepository(session)
+        project = create(repo, test_user.id, "旧标题")
+        repo.update(project, {"title": "新标题"})
+        assert repo.list(search="旧标题") == []
+        assert [p.id for p in repo.list(search="新标题")] == [project.id]
+
+        tag = Tag(name="人工智能")
+        session.add(tag)
+        session.commit()
+        session.add(HistoricalProjectTag(historical_project_id=project.id, tag_id=tag.id))
+        session.commit()
+        assert [p.id for p in repo.list(search="智能")] == [project.id]
+
+        repo.delete(project)
+        assert session.exec(select(fts_table.c.rowid)).all() == []
+
+    def test_sync_rebuilds_missing_rows(self, session, test_user):
+        """测试索引行数不一致时重建"""
+        repo = HistoricalProjectRepository(session)
+        project = create(repo, test_user.id, "课程设计")
+        session.connection().execute(fts_table.delete())
+        session.commit()
+
+        assert HistoricalProjectSearchIndex(session).sync() == 1
+        assert HistoricalProjectSearchIndex(session).sync() == 0
+        assert [p.id for p in repo.list(search="课程")] == [project.id]
@@ -0,0 +1,130 @@
+"""
+上传文件对账单元测试
+"""
+import os
+
+import pytest
+
+from app.models.attachment import Attachment
+from app.models.file_blob import FileBlob
+from app.models.video_playback import VideoPlayback
+from app.services.attachment_service import AttachmentService
+from app.services.blob_store import BlobStore
+from app.services.storage_gc_service import StorageGcService, iter_sorted_files
+from tests.helpers import write_upload
+
+
+pytestmark = pytest.mark.usefixtures("upload_workdir")
+
+# 超过对账最短存在时间的文件年龄（秒）
+OLD = 7200
+
+
+class TestIterSortedFiles:
+    """目录遍历测试类"""
+
+    def test_matches_string_order(self):
+        """测试遍历顺序与路径字符串排序一致，且跳过隐藏目录"""
+        for relative in ["a-b.txt", "a/z.txt", "a/b/c.txt", "b.txt", ".partial/x.part", "videos/v.mp4"]:
+            write_upload(relative)
+
+        paths = [path for path, _ in iter_sorted_files("uploads")]
+
+        assert paths == sorted(paths)
+        assert paths == ["uploads/a-b.txt", "uploads/a/b/c.txt", "uploads/a/z.txt", "uploads/b.txt", "uploads/videos/v.mp4"]
+
+
+class TestStorageGcService:
+    """StorageGcService 测试类"""
+
+    def test_reports_orphans_and_missing(self, session, test_project):
+        """测试报告孤儿文件和缺失文件，被引用及最近修改的文件不受影响"""
+        kept = write_upload("kept.pdf", age_seconds=OLD)
+        session.add(Attachment(project_id=test_project.id, file_path=kept, file_name="kept.pdf"))
+        session.add(Attachment(project_id=test_project.id, file_path="uploads/gone.pdf", file_name="gone.pdf"))
+        video = write_upload("videos/v.mp4", age_seconds=OLD)
+        thumb = write_upload("videos/v.jpg", age_seconds=OLD)
+        session.add(VideoPlayback(
+            project_id=test_project.id, title="录屏", file_path=video, file_name="v.mp4",
+            file_size=1, thumbnail_path=thumb
+        ))
+        session.commit()
+        write_upload("orphan.bin", b"12345", age_seconds=OLD)
+        write_upload("videos/old.mp4", b"123", age_seconds=OLD)
+        write_upload("uploading.bin")
+
+        report = StorageGcService(session, batch_size=1).run()
+
+        assert sorted(report.orphans) == ["uploads/orphan.bin", "uploads/videos/old.mp4"]
+        assert report.orphan_bytes == 8
+        assert report.skipped_recent == 1
+        assert report.missing == [("attachment", "uploads/gone.pdf")]
+        assert os.path.exists("uploads/orphan.bin")
+
+    def test_quarantine_and_irregular_paths(self, session, test_project):
+        """测试隔离孤儿文件；以绝对路径或反斜杠保存的引用也视为被引用"""
+        absolute = os.path.abspath(write_upload("abs.pdf", age_seconds=OLD))
+        backslash = write_upload("sub/win.pdf", age_seconds=OLD).replace("/", "\\")
+        for path in (absolute, backslash):
+            session.add(Attachment(project_id=test_project.id, file_path=path, file_name="a.pdf"))
+        session.commit()
+        write_upload("sub/orphan.pdf", age_seconds=OLD)
+
+        report = StorageGcService(session).run(quarantine=True)
+
+        assert report.orphans == ["uploads/sub/orphan.pdf"]
+        assert report.quarantined == 1
+        assert report.missing_count == 0
+        assert not os.path.exists("uploads/sub/orphan.pdf")
+        quarantined = [os.path.join(root, name) for root, _, names in os.walk("uploads/.quarantine") for name in names]
+        assert len(quarantined) == 1 and quarantined[0].endswith(os.path.join("sub", "orphan.pdf"))
+        assert os.path.exists("uploads/abs.pdf") and os.path.exists("uploads/sub/win.pdf")
+
+    def test_reconcile_blob_refs(self, session, test_project, test_user):
+        """测试级联删除遗留的引用计数被修正，无引用的内容块文件成为孤儿"""
+        service = AttachmentService(session)
+        kept = service.create_attachment(
+            project_id=test_project.id, file_path=write_upload("a.bin", b"shared", age_seconds=OLD),
+            file_name="a.bin", file_type="其他", current_user_id=test_user.id
+        )
+        service.copy_attachment(kept.id, current_user_id=test_user.id)
+        dropped = service.create_attachment(
+            project_id=test_project.id, file_path=write_upload("b.bin", b"dropped", age_seconds=OLD),
+            file_name="b.bin", file_type="其他", current_user_id=test_user.id
+        )
+        # 模拟级联删除：直接删除附件记录，不释放引用
+        session.delete(session.get(Attachment, dropped.id))
+        session.delete(session.get(Attachment, kept.id))
+        session.commit()
+
+        report = StorageGcService(session, min_age_seconds=0).run()
+
+        blobs = session.exec(FileBlob.__table__.select()).all()
+        assert report.blob_refs_fixed == 2
+        assert [(blob.storage_path, blob.ref_count) for blob in blobs] == [(kept.file_path, 1)]
+        assert report.orphans == [dropped.file_path.replace(os.sep, "/")]
+
+    def test_reconcile_skips_recently_referenced(self, session, test_project, test_user):
+        """测试最近被引用的内容块不参与修正（附件记录可能尚未写入）"""
+        blob = BlobStore(session).ingest(write_upload("a.bin", b"in flight"))
+
+        assert StorageGcService(session, min_age_seconds=3600).reconcile_blob_refs() == 0
+        assert session.get(FileBlob, blob.id).ref_count == 1
+        assert StorageGcService(session, min_age_seconds=0).reconcile_blob_refs() == 1
+        assert session.get(FileBlob, blob.id) is None
+
+
+class TestStorageGcApi:
+    """对账接口测试类"""
+
+    def test_admin_only(self, client, auth_headers, admin_auth_headers):
+        """测试仅管理员可执行对账并查看结果"""
+        write_upload("orphan.bin", age_seconds=OLD)
+
+        assert client.post("/api/monitoring/storage/gc", headers=auth_headers).status_code == 403
+        response = client.post("/api/monitoring/storage/gc", headers=admin_auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"]["orphans"] == ["uploads/orphan.bin"]
+        latest = client.get("/api/monitoring/storage", headers=admin_auth_headers).json()["data"]
+        assert latest["orphan_count"] == 1
@@ -0,0 +1,92 @@
+"""
+待办日期区间查询单元测试
+"""
+from datetime import date, datetime
+
+from app.core.db_profiler import install_db_profiler
+from app.core.request_context import begin_request, end_request
+from app.models.historical_project import HistoricalProject
+from app.models.project import Project
+from app.models.todo import Todo
+from app.repositories.todo_repository import TodoRepository, local_day_range_utc
+
+
+def add_todo(session, description, target_date, project_id=None, historical_project_id=None):
+    session.add(Todo(
+        project_id=project_id, historical_project_id=historical_project_id,
+        description=description, step_ids="[]", target_date=target_date
+    ))
+    session.commit()
+
+
+class TestTodoRange:
+    """日期区间查询测试类"""
+
+    def test_local_day_range(self):
+        """测试本地日期区间换算为 UTC 范围"""
+        assert local_day_range_utc(date(2026, 3, 1), date(2026, 3, 2)) == (
+            datetime(2026, 2, 28, 16), datetime(2026, 3, 2, 16)
+        )
+
+    def test_grouped_by_local_day_and_scoped(self, session, test_project, test_user, admin_user, test_platform):
+        """测试按本地日期分组，只返回用户自己的项目和历史项目的待办"""
+        historical = HistoricalProject(title="旧项目", user_id=test_user.id)
+        other = Project(title="他人项目", student_name="李四", platform_id=test_platform.id, user_id=admin_user.id)
+        session.add_all([historical, other])
+        session.commit()
+        # UTC 3月1日 17:00 为本地 3月2日 01:00
+        add_todo(session, "跨天", datetime(2026, 3, 1, 17), project_id=test_project.id)
+        add_todo(session, "当天", datetime(2026, 3, 1, 2), project_id=test_project.id)
+        add_todo(session, "历史", datetime(2026, 3, 2, 3), historical_project_id=historical.id)
+        add_todo(session, "他人", datetime(2026, 3, 1, 2), project_id=other.id)
+        add_todo(session, "区间外", datetime(2026, 3, 5, 2), project_id=test_project.id)
+
+        groups = TodoRepository(session).list_by_range_with_steps(date(2026, 3, 1), date(2026, 3, 3), test_user.id)
+
+        assert {day: [item.todo.description for item in items] for day, items in groups.items()} == {
+            date(2026, 3, 1): ["当天"],
+            date(2026, 3, 2): ["跨天", "历史"],
+        }
+        assert groups[date(2026, 3, 2)][1].historical_project_title == "旧项目"
+
+
+class TestTodoRangeApi:
+    """日期区间接口测试类"""
+
+    def test_range_endpoint(self, client, auth_headers, session, test_project):
+        """测试区间接口按日期分组返回"""
+        add_todo(session, "a", datetime(2026, 3, 1, 2), project_id=test_project.id)
+        add_todo(session, "b", datetime(2026, 3, 3, 2), project_id=test_project.id)
+
+        response = client.get("/api/todos/range?start_date=2026-03-01&end_date=2026-03-31", headers=auth_headers)
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert [(group["date"], [t["description"] for t in group["todos"]]) for group in data] == [
+            ("2026-03-01", ["a"]), ("2026-03-03", ["b"])
+        ]
+        assert data[0]["todos"][0]["project_title"] == test_project.title
+
+    def test_invalid_range(self, client, auth_headers):
+        """测试结束日期早于开始日期返回 400"""
+        response = client.get("/api/todos/range?start_date=2026-03-02&end_date=2026-03-01", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_calendar_single_todo_query(self, client, auth_headers, session, engine, test_project):
+        """测试日历接口整月待办只查询一次"""
+        add_todo(session, "a", datetime(2026, 3, 1, 2), project_id=test_project.id)
+        add_todo(session, "b", datetime(2026, 3, 1, 3), project_id=test_project.id)
+        install_db_profiler(engine)
+
+        ctx = begin_request()
+        try:
+            response = client.get("/api/todos/calendar?year=2026&month=3", headers=auth_headers)
+        finally:
+            end_request(ctx)
+
+        assert response.status_code == 200
+        days = {day["date"]: day for day in response.json()["data"]}
+        assert len(days) == 31
+        assert days["2026-03-01"]["todo_count"] == 2
+        assert days["2026-03-02"]["todo_count"] == 0
+        assert ctx.query_count < 10
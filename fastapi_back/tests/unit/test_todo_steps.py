@@ -0,0 +1,130 @@
+"""
+待办-步骤关联表单元测试
+"""
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+from sqlmodel import select
+
+from app.core.db_profiler import install_db_profiler
+from app.core.request_context import begin_request, end_request
+from app.models.project import ProjectStep
+from app.models.todo import Todo, TodoStep
+from app.repositories.todo_repository import TodoRepository, parse_step_ids
+
+TODAY = datetime.utcnow()
+
+
+def add_steps(session, project, names):
+    steps = [ProjectStep(name=name, project_id=project.id, order_index=i) for i, name in enumerate(names)]
+    session.add_all(steps)
+    session.commit()
+    return steps
+
+
+def links(session, todo_id):
+    rows = session.exec(select(TodoStep).where(TodoStep.todo_id == todo_id).order_by(TodoStep.position)).all()
+    return [row.step_id for row in rows]
+
+
+class TestTodoStepSync:
+    """关联表同步测试类"""
+
+    def test_links_follow_step_ids(self, session, test_project):
+        """测试新增、修改待办和删除步骤、待办时同步关联表，忽略不存在的步骤"""
+        a, b, c = add_steps(session, test_project, ["开题", "初稿", "终稿"])
+        todo = Todo(project_id=test_project.id, description="写论文", step_ids=json.dumps([c.id, 9999, a.id]))
+        session.add(todo)
+        session.commit()
+        assert links(session, todo.id) == [c.id, a.id]
+
+        todo.step_ids = json.dumps([b.id])
+        session.add(todo)
+        session.commit()
+        assert links(session, todo.id) == [b.id]
+
+        session.delete(b)
+        session.commit()
+        assert links(session, todo.id) == []
+
+        todo_id = todo.id
+        session.delete(todo)
+        session.commit()
+        assert session.exec(select(TodoStep).where(TodoStep.todo_id == todo_id)).all() == []
+
+    def test_parse_step_ids(self):
+        """测试解析格式不正确或重复的步骤 ID"""
+        assert parse_step_ids("[3, 1, 3, \"x\", true]") == [3, 1]
+        assert parse_step_ids("{bad") == []
+        assert parse_step_ids(None) == []
+
+
+class TestListByDateWithSteps:
+    """联表查询测试类"""
+
+    def test_single_query(self, session, engine, test_project, test_user):
+        """测试待办、步骤和项目一次查询取出，步骤按 step_ids 顺序"""
+        steps = add_steps(session, test_project, [f"步骤{i}" for i in range(4)])
+        for i in range(5):
+            step_ids = [s.id for s in reversed(steps[:i])]
+            session.add(Todo(project_id=test_project.id, description=f"待办{i}", step_ids=json.dumps(step_ids), target_date=TODAY))
+        session.commit()
+        user_id, title = test_user.id, test_project.title
+        install_db_profiler(engine)
+
+        ctx = begin_request()
+        try:
+            items = TodoRepository(session).list_by_date_with_steps(TODAY.date(), user_id)
+        finally:
+            end_request(ctx)
+
+        assert ctx.query_count == 1
+        assert [item.todo.description for item in items] == [f"待办{i}" for i in range(5)]
+        assert items[0].step_names == []
+        assert items[3].step_names == ["步骤2", "步骤1", "步骤0"]
+        assert all(item.project_title == title for item in items)
+
+
+class TestBackfillMigration:
+    """回填迁移测试类"""
+
+    def test_backfill_from_json(self, session, test_project):
+        """测试迁移按 step_ids 回填关联表并跳过不存在的步骤"""
+        a, b = add_steps(session, test_project, ["开题", "初稿"])
+        connection = session.connection()
+        connection.execute(Todo.__table__.insert(), [
+            {"project_id": test_project.id, "description": "x", "step_ids": json.dumps([b.id, 404, a.id]),
+             "is_completed": False, "created_at": TODAY, "updated_at": TODAY},
+            {"project_id": test_project.id, "description": "y", "step_ids": "not json",
+             "is_completed": False, "created_at": TODAY, "updated_at": TODAY},
+        ])
+        todo_ids = list(connection.execute(select(Todo.id).order_by(Todo.id)).scalars())
+
+        path = os.path.join(os.path.dirname(__file__), "..", "..", "alembic", "versions", "008_todo_step.py")
+        spec = importlib.util.spec_from_file_location("migration_008_todo_step", path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        migration._backfill(connection)
+        session.commit()
+
+        assert links(session, todo_ids[0]) == [b.id, a.id]
+        assert links(session, todo_ids[1]) == []
+
+
+class TestTodosApi:
+    """待办接口测试类"""
+
+    def test_get_todos_step_names(self, client, auth_headers, session, test_project, test_step):
+        """测试待办列表接口返回的步骤 ID 和名称"""
+        session.add(Todo(project_id=test_project.id, description="写论文", step_ids=json.dumps([test_step.id]), target_date=TODAY))
+        session.commit()
+
+        response = client.get(f"/api/todos/?target_date={TODAY.date().isoformat()}", headers=auth_headers)
+
+        assert response.status_code == 200
+        todo = response.json()["data"][0]
+        assert todo["step_ids"] == [test_step.id]
+        assert todo["step_names"] == [test_step.name]
+        assert todo["project_title"] == test_project.title
@@ -0,0 +1,94 @@
+"""
+Token 黑名单 Service 单元测试
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models.token_blacklist import TokenBlacklist
+from app.services.token_blacklist_service import TokenBlacklistService, revoked_token_filter
+from app.utils.bloom_filter import BloomFilter
+
+
+@pytest.fixture(autouse=True)
+def reset_filter():
+    revoked_token_filter.reset()
+    yield
+    revoked_token_filter.reset()
+
+
+class TestBloomFilter:
+    """Bloom 过滤器测试类"""
+
+    def test_no_false_negatives(self):
+        """测试已添加的元素一定判定为存在"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f"item-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+        assert false_positives < 50
+
+
+class TestTokenBlacklistService:
+    """Token 黑名单 Service 测试类"""
+
+    def test_revoke_stores_digest(self, session: Session):
+        """测试撤销后只保存摘要并能被检测到"""
+        service = TokenBlacklistService(session)
+        service.revoke("raw.jwt.token", datetime.utcnow() + timedelta(minutes=15), reason="logout")
+
+        entry = session.exec(select(TokenBlacklist)).one()
+        assert len(entry.token_hash) == 64
+        assert "raw.jwt.token" not in entry.token_hash
+        assert service.is_revoked("raw.jwt.token") is True
+        assert service.is_revoked("other.jwt.token") is False
+
+    def test_filter_skips_database(self, session: Session, engine):
+        """测试过滤器就绪后，未撤销的 token 不访问数据库"""
+        from sqlalchemy import event
+
+        service = TokenBlacklistService(session)
+        service.revoke("revoked.token", datetime.utcnow() + timedelta(minutes=15))
+        service.rebuild_filter()
+
+        queries = []
+        listener = lambda *args, **kwargs: queries.append(1)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            assert service.is_revoked("fresh.token") is False
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert queries == []
+        assert service.is_revoked("revoked.token") is True
+
+    def test_revoke_during_rebuild(self, session: Session):
+        """测试重建查询快照之后撤销的 token 在替换过滤器后仍被检测到"""
+        service = TokenBlacklistService(session)
+        service.rebuild_filter()
+        iter_active_hashes = service.blacklist_repo.iter_active_hashes
+
+        def snapshot_then_revoke(*args, **kwargs):
+            hashes = list(iter_active_hashes(*args, **kwargs))
+            service.revoke("logout.token", datetime.utcnow() + timedelta(minutes=15))
+            yield from hashes
+
+        service.blacklist_repo.iter_active_hashes = snapshot_then_revoke
+        service.rebuild_filter()
+
+        assert service.is_revoked("logout.token") is True
+
+    def test_sweep_expired(self, session: Session):
+        """测试清理过期记录"""
+        service = TokenBlacklistService(session)
+        service.revoke("expired.token", datetime.utcnow() - timedelta(minutes=1))
+        service.revoke("active.token", datetime.utcnow() + timedelta(minutes=15))
+
+        assert service.sweep_expired() == 1
+        assert service.is_revoked("expired.token") is False
+        assert service.is_revoked("active.token") is True
+        assert len(session.exec(select(TokenBlacklist)).all()) == 1
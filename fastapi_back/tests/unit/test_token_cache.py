@@ -0,0 +1,74 @@
+"""
+Token 验证缓存单元测试
+"""
+import time
+
+from app.core.token_cache import TokenCache
+from app.models.user import User
+
+
+def _make_user(user_id: int = 1, role: str = "user") -> User:
+    return User(id=user_id, username=f"user{user_id}", password_hash="x", role=role)
+
+
+class TestTokenCache:
+    """Token 验证缓存测试类"""
+
+    def test_set_and_get(self):
+        """测试缓存命中返回用户快照"""
+        cache = TokenCache(ttl_seconds=60)
+        cache.set("token-a", {"sub": "user1", "exp": time.time() + 600}, _make_user())
+
+        entry = cache.get("token-a")
+
+        assert entry is not None
+        user = entry.to_user()
+        assert user.id == 1
+        assert user.username == "user1"
+        assert user.password_hash == ""
+        assert cache.get("token-b") is None
+
+    def test_never_outlives_token_exp(self):
+        """测试缓存条目不会超过 token 的 exp"""
+        cache = TokenCache(ttl_seconds=600)
+        cache.set("expired", {"exp": time.time() - 1}, _make_user())
+        cache.set("short", {"exp": time.time() + 0.05}, _make_user())
+
+        assert cache.get("expired") is None
+        assert cache.get("short") is not None
+        time.sleep(0.1)
+        assert cache.get("short") is None
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        cache = TokenCache(ttl_seconds=60, max_size=2)
+        cache.set("t1", {}, _make_user(1))
+        cache.set("t2", {}, _make_user(2))
+        cache.get("t1")
+        cache.set("t3", {}, _make_user(3))
+
+        assert cache.get("t1") is not None
+        assert cache.get("t2") is None
+        assert cache.get("t3") is not None
+
+    def test_invalidate_token_and_user(self):
+        """测试按 token 和按用户失效"""
+        cache = TokenCache(ttl_seconds=60)
+        cache.set("t1", {}, _make_user(1))
+        cache.set("t2", {}, _make_user(1))
+        cache.set("t3", {}, _make_user(2))
+
+        cache.invalidate_token("t1")
+        assert cache.get("t1") is None
+        assert cache.get("t2") is not None
+
+        assert cache.invalidate_user(1) == 1
+        assert cache.get("t2") is None
+        assert cache.get("t3") is not None
+
+    def test_disabled(self):
+        """测试禁用缓存时不缓存任何条目"""
+        cache = TokenCache(enabled=False)
+        cache.set("t1", {}, _make_user())
+
+        assert cache.get("t1") is None
@@ -0,0 +1,82 @@
+"""
+上传文件保存单元测试
+"""
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.models.attachment import Attachment
+from app.utils import upload_pipeline
+from app.utils.upload_pipeline import MAX_CHUNK_SIZE, MIN_CHUNK_SIZE, initial_chunk_size, save_upload
+
+CONTENT = os.urandom(3 * 1024 * 1024 + 17)
+
+
+pytestmark = pytest.mark.usefixtures("upload_workdir")
+
+
+def make_upload(content: bytes, filename: str = "录屏.MP4", known_size: bool = True) -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=filename, size=len(content) if known_size else None)
+
+
+class TestSaveUpload:
+    """save_upload 测试类"""
+
+    def test_initial_chunk_size(self):
+        """测试块大小按文件大小在 1MB~8MB 之间选择"""
+        assert initial_chunk_size(None) == MIN_CHUNK_SIZE
+        assert initial_chunk_size(1024) == MIN_CHUNK_SIZE
+        assert initial_chunk_size(64 * 1024 * 1024) == 4 * 1024 * 1024
+        assert initial_chunk_size(10 * 1024 * 1024 * 1024) == MAX_CHUNK_SIZE
+
+    async def test_saves_with_size_and_hash(self):
+        """测试保存后返回大小和摘要，临时文件已移走"""
+        saved = await save_upload(make_upload(CONTENT, known_size=False), "uploads/videos")
+
+        assert saved.path.startswith(os.path.join("uploads", "videos")) and saved.path.endswith(".mp4")
+        assert saved.size == len(CONTENT)
+        assert saved.sha256 == hashlib.sha256(CONTENT).hexdigest()
+        with open(saved.path, "rb") as f:
+            assert f.read() == CONTENT
+        assert os.listdir(os.path.join("uploads", ".partial")) == []
+
+    @pytest.mark.parametrize("known_size", [True, False])
+    async def test_rejects_oversized(self, known_size):
+        """测试超过上限时拒绝且不留下文件"""
+        with pytest.raises(HTTPException) as exc_info:
+            await save_upload(make_upload(CONTENT, known_size=known_size), "uploads", max_size=len(CONTENT) - 1)
+
+        assert exc_info.value.status_code == 400
+
+        assert not os.path.exists("uploads") or all(not files for _, _, files in os.walk("uploads"))
+
+
+class TestUploadEndpoints:
+    """上传接口测试类"""
+
+    def test_upload_attachment(self, client, auth_headers, session, test_project):
+        """测试附件上传保存到内容寻址存储"""
+        response = client.post(
+            f"/api/attachments/project/{test_project.id}", headers=auth_headers,
+            files={"file": ("report.pdf", CONTENT, "application/pdf")}
+        )
+
+        assert response.status_code == 200
+        attachment = session.get(Attachment, response.json()["id"])
+        assert attachment.blob_sha256 == hashlib.sha256(CONTENT).hexdigest()
+        assert os.path.getsize(attachment.file_path) == len(CONTENT)
+
+    def test_upload_video_rejects_oversized(self, client, auth_headers, test_project, monkeypatch):
+        """测试视频超过大小限制返回 400"""
+        monkeypatch.setattr(upload_pipeline, "MAX_FILE_SIZE", 1024)
+
+        response = client.post(
+            f"/api/video-playbacks/project/{test_project.id}/upload", headers=auth_headers,
+            data={"title": "录屏"}, files={"file": ("a.mp4", CONTENT, "video/mp4")}
+        )
+
+        assert response.status_code == 400
+        assert "文件大小超过限制" in response.json()["msg"]
@@ -0,0 +1,205 @@
+"""
+分片上传（断点续传）单元测试
+"""
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.core.exceptions import BusinessException, ValidationException
+from app.models.attachment import Attachment
+from app.models.upload_session import UploadSessionCreate, UploadStatus
+from app.models.video_playback import VideoPlayback
+from app.repositories.attachment_repository import AttachmentRepository
+from app.services.upload_session_service import UploadSessionService
+
+CHUNK_SIZE = 1024
+CONTENT = os.urandom(CHUNK_SIZE * 3 + 100)
+
+
+def chunk_of(index: int) -> bytes:
+    return CONTENT[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]
+
+
+def sha256_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+pytestmark = pytest.mark.usefixtures("upload_workdir")
+
+
+class TestUploadSessionService:
+    """UploadSessionService 测试类"""
+
+    def _create(self, service, project_id, user_id, **overrides):
+        data = UploadSessionCreate(
+            project_id=project_id, file_name="录屏.mp4", total_size=len(CONTENT), chunk_size=CHUNK_SIZE, **overrides
+        )
+        return service.create_upload(data, user_id, False)
+
+    def test_chunks_out_of_order_and_complete(self, session, test_project, test_user):
+        """测试乱序上传分片后完成，生成附件且内容一致"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id)
+        assert upload.total_chunks == 4
+
+        for index in (2, 0, 3):
+            status = service.put_chunk(upload.upload_id, index, chunk_of(index), sha256_of(chunk_of(index)), test_user.id, False)
+        assert status.received_chunks == [0, 2, 3]
+        assert status.offset == CHUNK_SIZE  # 只有分片0是连续的
+
+        service.put_chunk(upload.upload_id, 1, chunk_of(1), sha256_of(chunk_of(1)), test_user.id, False)
+        result = service.complete_upload(upload.upload_id, test_user.id, False, sha256=sha256_of(CONTENT))
+
+        assert result.status == UploadStatus.COMPLETED
+        attachment = session.get(Attachment, result.result_id)
+        assert attachment.project_id == test_project.id
+        assert attachment.file_name == "录屏.mp4"
+        with open(attachment.file_path, "rb") as f:
+            assert f.read() == CONTENT
+        assert not os.path.exists(service.partial_path(upload.upload_id))
+
+        # 重复调用完成接口返回同一结果
+        assert service.complete_upload(upload.upload_id, test_user.id, False).result_id == result.result_id
+
+    def test_record_failure_keeps_partial_for_retry(self, session, test_project, test_user, monkeypatch):
+        """测试附件记录创建失败时临时文件保留，重试可以完成"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id)
+        for index in range(4):
+            service.put_chunk(upload.upload_id, index, chunk_of(index), sha256_of(chunk_of(index)), test_user.id, False)
+
+        original_create = AttachmentRepository.create
+
+        def failing_create(self, **fields):
+            raise RuntimeError("数据库不可用")
+
+        monkeypatch.setattr(AttachmentRepository, "create", failing_create)
+        with pytest.raises(RuntimeError):
+            service.complete_upload(upload.upload_id, test_user.id, False)
+        with open(service.partial_path(upload.upload_id), "rb") as f:
+            assert f.read() == CONTENT
+
+        monkeypatch.setattr(AttachmentRepository, "create", original_create)
+        result = service.complete_upload(upload.upload_id, test_user.id, False, sha256=sha256_of(CONTENT))
+
+        assert result.status == UploadStatus.COMPLETED
+        with open(session.get(Attachment, result.result_id).file_path, "rb") as f:
+            assert f.read() == CONTENT
+        assert not os.path.exists(service.partial_path(upload.upload_id))
+
+    def test_concurrent_complete_creates_one_record(self, session, test_project, test_user, monkeypatch):
+        """测试完成过程中重复调用完成接口返回 409，只创建一个附件"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id)
+        for index in range(4):
+            service.put_chunk(upload.upload_id, index, chunk_of(index), sha256_of(chunk_of(index)), test_user.id, False)
+
+        original_create = AttachmentRepository.create
+        retries = []
+
+        def create_with_retry(self, **fields):
+            # 模拟客户端在第一次请求仍在处理时重试
+            with pytest.raises(BusinessException) as exc_info:
+                UploadSessionService(session).complete_upload(upload.upload_id, test_user.id, False)
+            retries.append(exc_info.value.code)
+            return original_create(self, **fields)
+
+        monkeypatch.setattr(AttachmentRepository, "create", create_with_retry)
+        result = service.complete_upload(upload.upload_id, test_user.id, False)
+
+        assert retries == [409]
+        assert result.status == UploadStatus.COMPLETED
+        assert len(session.exec(select(Attachment)).all()) == 1
+        assert service.complete_upload(upload.upload_id, test_user.id, False).result_id == result.result_id
+
+    def test_checksum_and_size_validation(self, session, test_project, test_user):
+        """测试校验值或分片大小不匹配时拒绝"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id)
+
+        with pytest.raises(ValidationException):
+            service.put_chunk(upload.upload_id, 0, chunk_of(0), sha256_of(b"other"), test_user.id, False)
+        with pytest.raises(ValidationException):
+            service.put_chunk(upload.upload_id, 0, chunk_of(0)[:10], sha256_of(chunk_of(0)[:10]), test_user.id, False)
+        with pytest.raises(ValidationException):
+            service.put_chunk(upload.upload_id, 9, chunk_of(0), sha256_of(chunk_of(0)), test_user.id, False)
+
+        assert service.get_upload_status(upload.upload_id, test_user.id, False).received_chunks == []
+
+    def test_video_target(self, session, test_project, test_user):
+        """测试视频上传完成后创建视频记录"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id, target="video", title="答辩录屏")
+        for index in range(upload.total_chunks):
+            service.put_chunk(upload.upload_id, index, chunk_of(index), sha256_of(chunk_of(index)), test_user.id, False)
+
+        result = service.complete_upload(upload.upload_id, test_user.id, False)
+
+        video = session.get(VideoPlayback, result.result_id)
+        assert video.title == "答辩录屏"
+        assert video.file_size == len(CONTENT)
+        assert video.file_path.startswith(os.path.join("uploads", "videos"))
+
+    def test_purge_expired(self, session, test_project, test_user):
+        """测试过期会话及临时文件被清理"""
+        service = UploadSessionService(session)
+        upload = self._create(service, test_project.id, test_user.id)
+        service.put_chunk(upload.upload_id, 0, chunk_of(0), sha256_of(chunk_of(0)), test_user.id, False)
+
+        assert service.purge_expired(now=datetime.utcnow() + timedelta(days=2)) == 1
+        status = service.get_upload_status(upload.upload_id, test_user.id, False)
+        assert status.status == UploadStatus.ABORTED
+        assert status.received_chunks == []
+        assert not os.path.exists(service.partial_path(upload.upload_id))
+
+
+class TestUploadApi:
+    """分片上传接口测试类"""
+
+    def test_resume_flow(self, client, auth_headers, test_project):
+        """测试创建会话、重复上传分片、查询进度和完成"""
+        created = client.post("/api/uploads", headers=auth_headers, json={
+            "project_id": test_project.id, "file_name": "report.pdf",
+            "total_size": len(CONTENT), "chunk_size": CHUNK_SIZE
+        })
+        assert created.status_code == 200
+        upload_id = created.json()["data"]["upload_id"]
+
+        def put(index):
+            return client.put(
+                f"/api/uploads/{upload_id}/chunks/{index}", content=chunk_of(index),
+                headers={**auth_headers, "X-Chunk-SHA256": sha256_of(chunk_of(index))}
+            )
+
+        assert put(0).status_code == 200
+        assert put(0).json()["data"]["received_chunks"] == [0]  # 重试同一分片是幂等的
+        assert client.get(f"/api/uploads/{upload_id}", headers=auth_headers).json()["data"]["offset"] == CHUNK_SIZE
+
+        incomplete = client.post(f"/api/uploads/{upload_id}/complete", headers=auth_headers)
+        assert incomplete.json()["details"]["missing_chunks"] == [1, 2, 3]
+
+        for index in (1, 2, 3):
+            put(index)
+        completed = client.post(f"/api/uploads/{upload_id}/complete", headers=auth_headers)
+
+        assert completed.status_code == 200
+        attachment_id = completed.json()["data"]["result_id"]
+        download = client.get(f"/api/attachments/{attachment_id}/download", headers=auth_headers)
+        assert download.content == CONTENT
+
+    def test_other_user_forbidden(self, client, auth_headers, admin_user, session, test_project, test_user):
+        """测试不能向他人的上传会话写入分片"""
+        service = UploadSessionService(session)
+        upload = service.create_upload(
+            UploadSessionCreate(project_id=test_project.id, file_name="a.bin", total_size=10), admin_user.id, True
+        )
+
+        response = client.put(
+            f"/api/uploads/{upload.upload_id}/chunks/0", content=b"0123456789",
+            headers={**auth_headers, "X-Chunk-SHA256": sha256_of(b"0123456789")}
+        )
+
+        assert response.status_code == 403
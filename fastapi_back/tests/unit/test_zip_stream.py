@@ -0,0 +1,157 @@
+"""
+流式 ZIP 打包单元测试
+"""
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.models.attachment import Attachment
+from app.models.attachment_folder import AttachmentFolder
+from app.utils.http_range import RangeNotSatisfiable, if_range_matches, parse_range_header
+from app.utils.zip_stream import ZipEntry, ZipMetaCache, ZipStream
+
+
+@pytest.fixture(name="files")
+def files_fixture(tmp_path):
+    """创建可压缩的文本文件和不可压缩的“媒体”文件"""
+    report = tmp_path / "report.txt"
+    report.write_text("项目报告\n" * 5000, encoding="utf-8")
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(os.urandom(200_000))
+    return [
+        ZipEntry.from_path("交付/报告.txt", str(report)),
+        ZipEntry.from_path("视频/clip.mp4", str(video)),
+    ]
+
+
+class TestZipStream:
+    """ZipStream 测试类"""
+
+    def test_archive_is_valid(self, files):
+        """测试输出为合法 ZIP，已压缩格式使用存储模式"""
+        data = b"".join(ZipStream(files, meta_cache=ZipMetaCache()).iter_bytes())
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            infos = {info.filename: info for info in archive.infolist()}
+            assert infos["交付/报告.txt"].compress_type == zipfile.ZIP_DEFLATED
+            assert infos["视频/clip.mp4"].compress_type == zipfile.ZIP_STORED
+            with open(files[1].path, "rb") as f:
+                assert archive.read("视频/clip.mp4") == f.read()
+
+    def test_total_size_after_prepare(self, files):
+        """测试 prepare 后可得到准确的总大小"""
+        stream = ZipStream(files, meta_cache=ZipMetaCache())
+        assert stream.total_size is None
+
+        total = stream.prepare()
+
+        assert stream.total_size == total
+        assert total == len(b"".join(stream.iter_bytes()))
+
+    def test_range_slices_match_full_output(self, files):
+        """测试任意字节区间与完整输出一致（断点续传）"""
+        cache = ZipMetaCache()
+        full = b"".join(ZipStream(files, meta_cache=cache).iter_bytes())
+
+        for start, end in [(0, 10), (25, 5000), (1000, len(full)), (len(full) - 22, len(full))]:
+            part = b"".join(ZipStream(files, meta_cache=cache).iter_bytes(start, end))
+            assert part == full[start:end]
+
+    def test_etag_changes_with_content(self, files, tmp_path):
+        """测试文件变化后 ETag 随之变化"""
+        etag = ZipStream(files).etag
+        os.utime(files[0].path, ns=(0, files[0].mtime_ns + 1_000_000_000))
+        changed = [ZipEntry.from_path(files[0].arcname, files[0].path), files[1]]
+
+        assert ZipStream(changed).etag != etag
+        assert ZipStream(files).etag == etag
+
+
+class TestHttpRange:
+    """Range 请求头解析测试类"""
+
+    def test_parse_range_header(self):
+        """测试常见 Range 写法"""
+        assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+        assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+        assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+        assert parse_range_header("bytes=0-1, 5-9999", 1000) == [(0, 1), (5, 999)]
+        assert parse_range_header("items=0-1", 1000) is None
+        assert parse_range_header("bytes=abc", 1000) is None
+
+    def test_unsatisfiable_range(self):
+        """测试超出范围时抛出 RangeNotSatisfiable"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range_header("bytes=1000-", 1000)
+
+    def test_if_range(self):
+        """测试 If-Range 只接受强 ETag 或一致的日期"""
+        assert if_range_matches(None, '"abc"')
+        assert if_range_matches('"abc"', '"abc"')
+        assert not if_range_matches('W/"abc"', '"abc"')
+        last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert if_range_matches(last_modified, '"abc"', last_modified)
+        assert not if_range_matches(last_modified, '"abc"')
+
+
+class TestArchiveEndpoint:
+    """打包下载接口测试类"""
+
+    @pytest.fixture(name="project_attachments")
+    def project_attachments_fixture(self, session, test_project, tmp_path):
+        folder = AttachmentFolder(name="交付", project_id=test_project.id)
+        session.add(folder)
+        session.commit()
+        session.refresh(folder)
+
+        for name, content in [("a.txt", b"alpha" * 1000), ("a.txt", b"beta" * 1000), ("b.png", os.urandom(5000))]:
+            path = tmp_path / f"{len(os.listdir(tmp_path))}_{name}"
+            path.write_bytes(content)
+            session.add(Attachment(
+                project_id=test_project.id, folder_id=folder.id, file_path=str(path), file_name=name
+            ))
+        # 磁盘上不存在的文件会被跳过
+        session.add(Attachment(project_id=test_project.id, file_path=str(tmp_path / "missing"), file_name="missing.txt"))
+        session.commit()
+        return folder
+
+    def test_download_project_archive(self, client, auth_headers, test_project, project_attachments):
+        """测试打包下载项目附件，重名文件自动追加序号"""
+        response = client.get(f"/api/attachments/project/{test_project.id}/archive", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["accept-ranges"] == "bytes"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["交付/a (2).txt", "交付/a.txt", "交付/b.png"]
+            assert archive.read("交付/a (2).txt") == b"beta" * 1000
+
+    def test_range_resume(self, client, auth_headers, test_project, project_attachments):
+        """测试 Range 请求返回 206 且内容与完整下载一致"""
+        url = f"/api/attachments/project/{test_project.id}/archive"
+        full = client.get(url, headers=auth_headers)
+        etag = full.headers["etag"]
+
+        response = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": etag})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 100-{len(full.content) - 1}/{len(full.content)}"
+        assert response.content == full.content[100:]
+
+        stale = client.get(url, headers={**auth_headers, "Range": "bytes=100-", "If-Range": '"stale"'})
+        assert stale.status_code == 200
+        assert stale.content == full.content
+
+        beyond = client.get(url, headers={**auth_headers, "Range": f"bytes={len(full.content)}-"})
+        assert beyond.status_code == 416
+
+    def test_download_folder_archive(self, client, auth_headers, project_attachments):
+        """测试打包下载单个文件夹"""
+        response = client.get(f"/api/attachments/folder/{project_attachments.id}/archive", headers=auth_headers)
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["a (2).txt", "a.txt", "b.png"]
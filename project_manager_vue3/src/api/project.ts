@@ -82,6 +82,7 @@ export interface ProjectLog {
   action: string
   description: string
   details?: string
+  payload?: Record<string, any> | null
   user_id?: number
   user_name?: string
   created_at: string